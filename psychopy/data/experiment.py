@@ -5,6 +5,8 @@ import sys
 import copy
 import pickle
 import atexit
+import threading
+import concurrent.futures
 
 import psychopy.visual.window
 from psychopy import logging
@@ -13,6 +15,14 @@ from psychopy.tools.filetools import (openOutputFile, genDelimiter,
 from .utils import checkValidFilePath
 from .base import _ComparisonMixin
 
+# guards the data pending in all experiment handlers, which is added from the
+# threads computing it
+_pendingDataLock = threading.Lock()
+
+# longest time `ExperimentHandler.close()` waits for data added with
+# `addDataWhenReady()` before saving, in seconds
+PENDING_DATA_TIMEOUT = 30.0
+
 
 class ExperimentHandler(_ComparisonMixin):
     """A container class for keeping track of multiple loops/handlers
@@ -89,6 +99,7 @@ class ExperimentHandler(_ComparisonMixin):
         self.entries = []  # chronological list of entries
         self._paramNamesSoFar = []
         self.dataNames = []  # names of all the data (eg. resp.keys)
+        self._pendingData = {}  # futures of data added when ready: adders
         self.autoLog = autoLog
         self.appendFiles = appendFiles
 
@@ -101,6 +112,16 @@ class ExperimentHandler(_ComparisonMixin):
             checkValidFilePath(dataFileName, makeValid=True)
         atexit.register(self.close)
 
+    def __getstate__(self):
+        # futures of pending data can't be pickled
+        state = self.__dict__.copy()
+        state['_pendingData'] = {}
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._pendingData = {}  # for handlers pickled before it was added
+
     def __del__(self):
         self.close()
 
@@ -228,6 +249,74 @@ class ExperimentHandler(_ComparisonMixin):
             value = copy.deepcopy(value)
         self.thisEntry[name] = value
 
+    def addDataWhenReady(self, name, future):
+        """Add data to the current entry once it has been computed in the
+        background, such as a transcription from a
+        :class:`~psychopy.sound.transcribe.TranscriptionQueue`.
+
+        The value is written into the entry current when this is called, even
+        if `nextEntry()` has been called since. The data file is saved after
+        all data pending has been added (see `waitForPendingData()`).
+
+        e.g.::
+
+            future = transcriptionQueue.submit(clip)
+            exp.addDataWhenReady('mic.script', future)
+            exp.nextEntry()
+
+        :parameters:
+
+            name : str
+                The name of the column in the datafile being written.
+
+            future : concurrent.futures.Future
+                Future of the value. If it fails, the error message is added
+                instead.
+        """
+        if name not in self.dataNames:
+            self.dataNames.append(name)
+        entry = self.thisEntry
+
+        def _addData(future):
+            with _pendingDataLock:
+                if future not in self._pendingData:
+                    return  # added already by `waitForPendingData()`
+            try:
+                value = future.result()
+            except Exception as err:
+                logging.error("Data {} could not be added: {}".format(name, err))
+                value = "{}: {}".format(type(err).__name__, err)
+            entry[name] = value
+            with _pendingDataLock:
+                self._pendingData.pop(future, None)
+
+        with _pendingDataLock:
+            self._pendingData[future] = _addData
+        future.add_done_callback(_addData)  # called now if done already
+
+    def waitForPendingData(self, timeout=None):
+        """Wait for the data added with `addDataWhenReady()` to be added.
+
+        :parameters:
+
+            timeout : float or None
+                Longest time to wait in seconds, `None` to wait until all the
+                data has been added.
+
+        :returns: `True` if no data is pending.
+        """
+        with _pendingDataLock:
+            pending = dict(self._pendingData)
+        if not pending:
+            return True
+        done, notDone = concurrent.futures.wait(pending, timeout)
+        # `wait()` returns before the futures' callbacks are called, so add
+        # their data now rather than saving without it
+        for future in done:
+            pending[future](future)
+
+        return not notDone
+
     def timestampOnFlip(self, win, name):
         """Add a timestamp (in the future) to the current row
 
@@ -429,6 +518,13 @@ class ExperimentHandler(_ComparisonMixin):
         self.saveWideText = saveWideText
         
     def close(self):
+        if self.dataFileName not in ['', None] and \
+                (self.savePickle or self.saveWideText):
+            # bounded, as this is called on exit, when data which isn't
+            # ready by now may never be
+            if not self.waitForPendingData(PENDING_DATA_TIMEOUT):
+                logging.warning('Saving data before all pending data has '
+                                'been added')
         if self.dataFileName not in ['', None]:
             if self.autoLog:
                 msg = 'Saving data for %s ExperimentHandler' % self.name
@@ -397,8 +397,10 @@ class MicrophoneComponent(BaseComponent):
         )
         buff.writeIndentedLines(code % inits)
         if transcribe:
+            # transcribed in the background, so the next routine isn't delayed
             code = (
-                "language=%(transcribeLang)s, expectedWords=%(transcribeWords)s\n"
+                "language=%(transcribeLang)s, expectedWords=%(transcribeWords)s,\n"
+                "queue=True\n"
             )
         else:
             code = (
@@ -412,8 +414,9 @@ class MicrophoneComponent(BaseComponent):
         )
         buff.writeIndentedLines(code % inits)
         if transcribe:
+            # added to the data of this trial once it has been transcribed
             code = (
-                "%(loop)s.addData('%(name)s.script', %(name)sScript)\n"
+                "thisExp.addDataWhenReady('%(name)s.script', %(name)sScript)\n"
             )
             buff.writeIndentedLines(code % inits)
         # Write base end routine code
@@ -3,9 +3,9 @@
 
 import sys
 import glob
+import importlib
 from itertools import chain
 from psychopy import logging
-from . import eyetracker
 
 try:
     from collections.abc import Iterable
@@ -24,6 +24,19 @@ __all__ = [
 ]
 
 
+def __getattr__(name):
+    """Import the submodules of `psychopy.hardware` on first use."""
+    if not name.startswith('_'):
+        fullName = '{}.{}'.format(__name__, name)
+        try:
+            return importlib.import_module(fullName)
+        except ModuleNotFoundError as err:
+            if err.name != fullName:
+                raise
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
+
+
 def getSerialPorts():
     """Finds the names of all (virtual) serial ports present on the system
 
@@ -26,6 +26,7 @@ __all__ = [
     # 'CAMERA_API_OPENCV',
     'CAMERA_API_UNKNOWN',
     'CAMERA_API_NULL',
+    'CAMERA_API_VIRTUAL',
     'CameraError',
     'CameraNotReadyError',
     'CameraNotFoundError',
@@ -35,6 +36,8 @@ __all__ = [
     'Camera',
     'CameraInfo',
     'StreamData',
+    'FrameRingBuffer',
+    'VirtualCameraPlayer',
     'getCameras',
     'getCameraDescriptions',
     'renderVideo'
@@ -54,20 +57,25 @@ from psychopy.visual.movies.metadata import MovieMetadata, NULL_MOVIE_METADATA
 from psychopy.visual.movies.frame import MovieFrame, NULL_MOVIE_FRAME_INFO
 from psychopy.sound.microphone import Microphone
 import psychopy.logging as logging
-from ffpyplayer.player import MediaPlayer
-from ffpyplayer.writer import MediaWriter
-from ffpyplayer.pic import SWScale
-from ffpyplayer.tools import list_dshow_devices, get_format_codec
-# Something in moviepy.editor's initialisation breaks Mouse, so import these
-# from the source instead
-# from moviepy.editor import VideoFileClip, AudioFileClip, CompositeAudioClip
-from moviepy.video.io.VideoFileClip import VideoFileClip
-from moviepy.audio.io.AudioFileClip import AudioFileClip
-from moviepy.audio.AudioClip import CompositeAudioClip
+try:
+    from ffpyplayer.player import MediaPlayer
+    from ffpyplayer.writer import MediaWriter
+    from ffpyplayer.pic import SWScale
+    from ffpyplayer.tools import list_dshow_devices, get_format_codec
+    _hasFFPyPlayer = True
+except (ModuleNotFoundError, ImportError):
+    logging.error(
+        "Camera support is not available this session, `ffpyplayer` could "
+        "not be imported (use `pip install ffpyplayer` to get it).")
+    _hasFFPyPlayer = False
 import uuid
+import subprocess
+import wave
 import threading
 import queue
 import time
+import collections
+from fractions import Fraction
 # import cv2  # used to get camera information
 
 
@@ -83,7 +91,7 @@ CAMERA_NULL_VALUE = u'Null'  # fields where we couldn't get a value
 # CAMERA_MODE_CV = u'cv'
 # CAMERA_MODE_PHOTO = u'photo'
 # default names for video and audio tracks in the temp directory
-CAMERA_TEMP_FILE_VIDEO = u'video.mp4'
+CAMERA_TEMP_FILE_VIDEO = u'video.mkv'  # Matroska is playable if cut short
 CAMERA_TEMP_FILE_AUDIO = u'audio.wav'
 
 # camera API flags, these specify which API camera settings were queried with
@@ -93,6 +101,7 @@ CAMERA_API_DIRECTSHOW = u'DirectShow'      # windows
 # CAMERA_API_OPENCV = u'OpenCV'              # opencv, cross-platform API
 CAMERA_API_UNKNOWN = u'Unknown'            # unknown API
 CAMERA_API_NULL = u'Null'                  # empty field
+CAMERA_API_VIRTUAL = u'Virtual'            # movie file standing in for one
 
 # camera libraries for playback nad recording
 CAMERA_LIB_FFPYPLAYER = u'FFPyPlayer'
@@ -103,6 +112,12 @@ CAMERA_LIB_NULL = u'Null'
 CAMERA_FRAMERATE_NOMINAL_NTSC = '30.000030'
 CAMERA_FRAMERATE_NTSC = 30.000030
 
+# number of frames in the ring buffer the stream thread writes frames into
+CAMERA_FRAME_RING_SLOTS = 3
+
+# number of recent frames to report the latency of
+CAMERA_LATENCY_FRAMES = 1000
+
 # FourCC and pixel format mappings, mostly used with AVFoundation to determine
 # the FFMPEG decoder which is most suitable for it. Please expand this if you
 # know any more!
@@ -437,18 +452,24 @@ class StreamData:
         Video stream status.
     cameraLib : str
         Camera library in use to process the stream.
+    timestamps : dict or None
+        Times the frame went through each stage of the stream, see
+        `Camera.getLatencyReport()`.
 
     """
     __slots__ = ['_metadata',
                  '_frameImage',
                  '_streamStatus',
-                 '_cameraLib']
+                 '_cameraLib',
+                 '_timestamps']
 
-    def __init__(self, metadata, frameImage, streamStatus, cameraLib):
+    def __init__(self, metadata, frameImage, streamStatus, cameraLib,
+                 timestamps=None):
         self._metadata = metadata
         self._frameImage = frameImage
         self._streamStatus = streamStatus
         self._cameraLib = cameraLib
+        self._timestamps = timestamps
 
     @property
     def metadata(self):
@@ -489,6 +510,13 @@ class StreamData:
 
         self._streamStatus = value
 
+    @property
+    def timestamps(self):
+        """Times in seconds the frame was captured (`'tCapture'`) and written
+        to the frame ring buffer (`'tRing'`) (`dict` or `None`).
+        """
+        return self._timestamps
+
     @property
     def cameraLib(self):
         """Camera library in use to obtain the stream (`str`). Value is
@@ -500,6 +528,312 @@ class StreamData:
         return u''
 
 
+class _RingFrameImage:
+    """Frame in a `FrameRingBuffer`, looking like the `ffpyplayer.pic.Image`
+    it was copied from."""
+    __slots__ = ['_data', '_size', '_pixelFormat']
+
+    def __init__(self, data, size, pixelFormat):
+        self._data = data
+        self._size = size
+        self._pixelFormat = pixelFormat
+
+    def get_size(self):
+        return self._size
+
+    def get_pixel_format(self):
+        return self._pixelFormat
+
+    def to_bytearray(self):
+        return [self._data]
+
+
+class FrameRingBuffer:
+    """Ring of preallocated buffers camera frames are written into.
+
+    The stream thread copies each frame from the decoder into the next free
+    slot, and the application thread reads the latest frame where it is, to
+    upload it to a texture without copying it again. The slot read last is
+    never written to until another frame is read, so frames must be used (or
+    copied) before the next call to `read()`.
+
+    Parameters
+    ----------
+    frameBytes : int
+        Size of a frame in bytes.
+    nSlots : int
+        Number of frames in the ring, at least 3: one being read, the latest
+        and the one being written.
+
+    """
+    def __init__(self, frameBytes, nSlots=CAMERA_FRAME_RING_SLOTS):
+        if nSlots < 3:
+            raise ValueError("A frame ring buffer needs at least 3 slots.")
+
+        self._frames = np.zeros((nSlots, frameBytes), dtype=np.uint8)
+        self._info = [None] * nSlots
+        self._latest = -1  # slot with the latest frame
+        self._reading = -1  # slot read last
+        self._latestRead = False
+        self._nWritten = 0
+        self._nDropped = 0
+        self._lock = threading.Lock()
+
+    @property
+    def frameBytes(self):
+        """Size of a frame in bytes (`int`)."""
+        return self._frames.shape[1]
+
+    @property
+    def nSlots(self):
+        """Number of frames in the ring (`int`)."""
+        return self._frames.shape[0]
+
+    @property
+    def nWritten(self):
+        """Number of frames written (`int`)."""
+        return self._nWritten
+
+    @property
+    def nDropped(self):
+        """Number of frames written over before being read (`int`)."""
+        return self._nDropped
+
+    def write(self, planes, info=None):
+        """Copy a frame into the next free slot, making it the latest.
+
+        Parameters
+        ----------
+        planes : list
+            Buffers holding the planes of the frame, copied one after another.
+        info : object
+            Information about the frame, returned with it by `read()`.
+
+        """
+        with self._lock:
+            slot = (self._latest + 1) % self.nSlots
+            while slot in (self._latest, self._reading):
+                slot = (slot + 1) % self.nSlots
+
+        frame = self._frames[slot]
+        offset = 0
+        for plane in planes:
+            data = np.frombuffer(plane, dtype=np.uint8)
+            frame[offset:offset + data.size] = data
+            offset += data.size
+
+        with self._lock:
+            if self._latest >= 0 and not self._latestRead:
+                self._nDropped += 1
+            self._info[slot] = info
+            self._latest = slot
+            self._latestRead = False
+            self._nWritten += 1
+
+    def read(self):
+        """Get the latest frame, if it hasn't been read already.
+
+        Returns
+        -------
+        tuple or None
+            `(frame, info)`, where `frame` is a read-only view of the slot the
+            frame is in and `info` what was written with it. `None` if no new
+            frame has been written since the last call.
+
+        """
+        with self._lock:
+            if self._latest < 0 or self._latestRead:
+                return None
+            self._reading = self._latest
+            self._latestRead = True
+            frame = self._frames[self._reading]
+            info = self._info[self._reading]
+
+        frame.flags.writeable = False
+        return frame, info
+
+
+class VirtualCameraPlayer:
+    """Plays a movie file as if it were a camera.
+
+    Frames are decoded in real time, as a camera would capture them, and
+    skipped if not asked for in time. This has the methods of
+    `ffpyplayer.player.MediaPlayer` the camera stream thread uses, so a
+    `Camera` opened with the path to a movie file as its `device` uses it in
+    place of a camera. This is useful for testing experiments (and PsychoPy)
+    on machines without a camera.
+
+    Parameters
+    ----------
+    filename : str
+        Movie file to play.
+    loop : bool
+        Play the movie again from the beginning when it ends, so the stream
+        never ends.
+
+    """
+    def __init__(self, filename, loop=True):
+        self._filename = filename
+        self._loop = loop
+        self._reader = None
+        self._metadata = None
+        self._startTime = None  # stream time 0
+        self._frameIndex = 0  # index of the next frame
+        self._openReader()
+
+    def _openReader(self):
+        import imageio_ffmpeg
+
+        self._reader = imageio_ffmpeg.read_frames(
+            self._filename, pix_fmt='rgb24')
+        meta = next(self._reader)
+        frameRate = Fraction(meta['fps']).limit_denominator(1001)
+        self._metadata = {
+            'src_vid_size': tuple(meta['size']),
+            'frame_size': tuple(meta['size']),
+            'src_pix_fmt': 'rgb24',
+            'frame_rate': (frameRate.numerator, frameRate.denominator),
+            'duration': meta['duration'],
+            'title': os.path.basename(self._filename)}
+
+    @staticmethod
+    def getCameraInfo(filename):
+        """Get a `CameraInfo` describing a movie file played as a camera.
+
+        Parameters
+        ----------
+        filename : str
+            Movie file.
+
+        Returns
+        -------
+        CameraInfo
+
+        """
+        player = VirtualCameraPlayer(filename, loop=False)
+        metadata = player.get_metadata()
+        player.close_player()
+        numer, denom = metadata['frame_rate']
+        return CameraInfo(
+            index=-1,
+            name=filename,
+            frameSize=tuple(int(x) for x in metadata['frame_size']),
+            frameRate=numer / float(denom),
+            pixelFormat='rgb24',
+            codecFormat=CAMERA_NULL_VALUE,
+            cameraLib=u'ffpyplayer',
+            cameraAPI=CAMERA_API_VIRTUAL)
+
+    def _readFrame(self):
+        try:
+            return next(self._reader)
+        except StopIteration:
+            if not self._loop:
+                return None
+            self._openReader()  # the stream time carries on
+            return next(self._reader, None)
+
+    def get_frame(self, show=True):
+        """Get the frame captured last, if it hasn't been got already.
+
+        Returns
+        -------
+        tuple
+            `((image, pts), val)` like `MediaPlayer.get_frame()`, or
+            `(None, secs)` if the next frame isn't captured yet, where `secs`
+            is the time until it is. `val` is `'eof'` at the end of a movie
+            which doesn't loop.
+
+        """
+        from ffpyplayer.pic import Image
+
+        if self._reader is None:
+            return None, 'eof'
+
+        now = time.perf_counter()
+        if self._startTime is None:
+            self._startTime = now
+        frameRate = self._metadata['frame_rate']
+        frameInterval = frameRate[1] / float(frameRate[0])
+
+        # frames captured since the last one got are lost, like a camera's
+        streamTime = now - self._startTime
+        lastIndex = int(math.floor(streamTime / frameInterval))
+        if lastIndex < self._frameIndex:
+            return None, (self._frameIndex * frameInterval) - streamTime
+        while self._frameIndex < lastIndex:
+            if self._readFrame() is None:
+                return None, 'eof'
+            self._frameIndex += 1
+
+        data = self._readFrame()
+        if data is None:
+            return None, 'eof'
+        pts = self._frameIndex * frameInterval
+        self._frameIndex += 1
+
+        image = Image(plane_buffers=[data], pix_fmt='rgb24',
+                      size=self._metadata['frame_size'])
+        return (image, pts), 0.0
+
+    def get_metadata(self):
+        """Metadata of the stream (`dict`)."""
+        return self._metadata
+
+    def get_pts(self):
+        """Current stream time in seconds (`float`)."""
+        if self._startTime is None:
+            return 0.0
+        return time.perf_counter() - self._startTime
+
+    def close_player(self):
+        """Stop decoding the movie."""
+        if self._reader is not None:
+            self._reader.close()
+            self._reader = None
+
+
+class _RecordedSamplesReader:
+    """Reads the samples a microphone records as they come in, without
+    changing its recording buffer.
+
+    The reader keeps its own count of the samples it has read, so the
+    microphone's recording is still complete when the camera stops, and a ring
+    buffer (see `RecordingBuffer`) keeps spilling to its file. A recording
+    buffer which isn't a ring buffer stops taking samples once it's full, so
+    use a ring buffer for recordings longer than that.
+
+    Parameters
+    ----------
+    mic : :class:`~psychopy.sound.microphone.Microphone`
+        Microphone which has just started recording.
+
+    """
+    def __init__(self, mic):
+        self.mic = mic
+        self._nRead = 0  # samples read from the start of the recording
+
+    def read(self):
+        """Read the samples recorded since the last call.
+
+        Returns
+        -------
+        ndarray
+            Copy of the samples.
+
+        """
+        # not while the microphone's polling thread is writing samples
+        with self.mic._pollLock:
+            recording = self.mic.recording
+            nWritten = recording.nSamplesWritten
+            if nWritten < self._nRead:  # the microphone restarted
+                self._nRead = 0
+            samples = recording.getSamples(self._nRead, nWritten)
+            self._nRead = nWritten
+
+        return samples
+
+
 class StreamWriterThread(threading.Thread):
     """Class for high-performance writing of video frames to disk asynchronously
     using threading.
@@ -510,6 +844,11 @@ class StreamWriterThread(threading.Thread):
     done either by calling methods associated with this class, or directly
      putting commands into the command queue, from another thread.
 
+    Frames are encoded as they arrive, and audio samples from the microphone
+    are written to a WAV file as they are captured. Both files are kept valid
+    as they are written, so a recording is not lost if the experiment exits
+    without closing the writer.
+
     """
     def __init__(self, mic=None):
         threading.Thread.__init__(self)
@@ -536,6 +875,7 @@ class StreamWriterThread(threading.Thread):
         self._warmUpLock.acquire(blocking=False)
         writer = None   # instance for the writer
         filepath = ''  # path to the file
+        audioWriter = None  # WAV file for audio samples
         alive = True
         while alive:
             # block main thread until we are in the command loop
@@ -588,6 +928,31 @@ class StreamWriterThread(threading.Thread):
 
                 if blockUntilDone:
                     self._commandQueue.task_done()
+            elif cmdOptCode == 'open_audio':
+                # Open a WAV file to write audio samples to as they arrive.
+                if audioWriter is not None:
+                    raise IOError(
+                        "Attempted to open an audio file without closing the "
+                        "existing one first.")
+                audioFilePath, sampleRateHz, channels = cmdVals
+                audioWriter = wave.open(audioFilePath, 'wb')
+                audioWriter.setnchannels(channels)
+                audioWriter.setsampwidth(2)  # 16-bit
+                audioWriter.setframerate(sampleRateHz)
+                self._commandQueue.task_done()
+            elif cmdOptCode == 'write_audio':
+                # Write samples to the audio file. The header is updated with
+                # each write, so the file is always complete.
+                samples, = cmdVals
+                self._commandQueue.task_done()
+                if audioWriter is None:
+                    raise IOError(
+                        'Got `write_audio` command but no audio file has been '
+                        'opened yet.')
+                if len(samples):
+                    audioWriter.writeframes(
+                        (np.clip(samples, -1.0, 1.0) * 32767).astype(
+                            '<i2').tobytes())
             elif cmdOptCode == 'close':
                 # Close the file we are writing to but keep the writer
                 # thread hot. This allows for successive recordings to be
@@ -599,6 +964,9 @@ class StreamWriterThread(threading.Thread):
                         "without opening on first.")
                 writer.close()
                 writer = None
+                if audioWriter is not None:
+                    audioWriter.close()
+                    audioWriter = None
                 self._commandQueue.task_done()
             elif cmdOptCode == 'end':  # end the thread
                 alive = False
@@ -607,6 +975,8 @@ class StreamWriterThread(threading.Thread):
         # if we have an open file, close it just in case
         if writer is not None:
             writer.close()
+        if audioWriter is not None:
+            audioWriter.close()
 
         # set when the writer exits
         self._commandQueue.task_done()  # when end is called
@@ -662,8 +1032,37 @@ class StreamWriterThread(threading.Thread):
         """
         self.sendCommand('write_frame', (colorData, pts, blockUntilDone))
 
+    def openAudio(self, filePath, sampleRateHz, channels):
+        """Open a WAV file to write audio samples to, along with the frames.
+
+        Parameters
+        ----------
+        filePath : str
+            Path to file to write samples to.
+        sampleRateHz : int
+            Sampling rate of the samples in Hertz.
+        channels : int
+            Number of channels.
+
+        """
+        self.sendCommand('open_audio', (filePath, sampleRateHz, channels))
+
+    def writeAudio(self, samples):
+        """Write audio samples to the presently opened audio file. This
+        returns immediately, samples are written out asynchronously.
+
+        Parameters
+        ----------
+        samples : ArrayLike
+            Samples to write, with values between -1 and 1 and shape
+            `(nSamples, channels)`.
+
+        """
+        self.sendCommand('write_audio', (samples,))
+
     def close(self):
-        """Close the file. This will write out the result.
+        """Close the file, and the audio file if one is open. This will write
+        out the result.
         """
         self.sendCommand('close', (None,))
 
@@ -696,17 +1095,20 @@ class MovieStreamIOThread(threading.Thread):
         player instance methods might not be thread-safe after handing off the
         object to this thread.
     bufferFrames : int
-        Number of frames to buffer. Sets the frame queue size for the thread.
+        Number of frames in the ring buffer frames are written to for the
+        application thread, at least 3.
 
     """
-    def __init__(self, player, bufferFrames=1):
+    def __init__(self, player, bufferFrames=CAMERA_FRAME_RING_SLOTS):
         threading.Thread.__init__(self)
         self.daemon = True  # no harm just reading a stream
 
         self._player = player  # player interface to FFMPEG
-        self._mic = None
-        self._frameQueue = queue.Queue(
-            maxsize=bufferFrames)  # frames for the monitor
+        self._micReader = None
+        # Frames for the monitor are copied into a ring of preallocated
+        # buffers, allocated once the size of the frames is known.
+        self._bufferFrames = max(3, int(bufferFrames))
+        self._frameRing = None
         self._cmdQueue = queue.Queue()  # command queue
 
         # Queue for return values if needed. We set the `maxsize` to ensure
@@ -723,13 +1125,46 @@ class MovieStreamIOThread(threading.Thread):
         # Locks for syncing the player and main application thread
         self._warmUpLock = threading.Lock()
 
+    @property
+    def frameRing(self):
+        """Ring buffer frames are written to for the application thread
+        (`FrameRingBuffer` or `None`).
+        """
+        return self._frameRing
+
+    def _putFrame(self, image, streamStatus, metadata, tCapture):
+        """Copy a frame into the ring buffer for the application thread.
+
+        The frame is copied straight from the buffers of the decoder, so this
+        is the only copy made before the frame is uploaded to a texture.
+
+        """
+        if hasattr(image, 'to_memoryview'):
+            planes = image.to_memoryview()
+        else:
+            planes = image.to_bytearray()
+        planes = [plane for plane in planes if plane is not None and len(plane)]
+        frameBytes = sum(len(plane) for plane in planes)
+
+        if self._frameRing is None or self._frameRing.frameBytes != frameBytes:
+            self._frameRing = FrameRingBuffer(frameBytes, self._bufferFrames)
+
+        self._frameRing.write(planes, {
+            'metadata': metadata,
+            'size': image.get_size(),
+            'pixelFormat': image.get_pixel_format(),
+            'streamStatus': streamStatus,
+            'timestamps': {
+                'tCapture': tCapture,
+                'tRing': logging.defaultClock.getTime()}})
+
     def run(self):
         """Main sub-routine for this thread.
 
-        When the thread is running, data about captured frames are put into the
-        `frameQueue` as `(metadata, img, pts)`. If the queue is empty, that
-        means the main application thread is running faster than the encoder
-        can get frames.
+        When the thread is running, captured frames are copied into the frame
+        ring buffer (see `FrameRingBuffer`) with the stream status. If there is
+        no new frame in it, that means the main application thread is running
+        faster than the encoder can get frames.
 
         """
         # Warmup lock for the thread, prevent another thread for running
@@ -767,6 +1202,7 @@ class MovieStreamIOThread(threading.Thread):
         # point to configure the writer.
         while statusFlag != STARTED:
             frameData, val = self._player.get_frame()
+            tCapture = logging.defaultClock.getTime()
 
             # If we get a frame then the stream is started, tht also means we
             # can get the metadata now.
@@ -796,25 +1232,10 @@ class MovieStreamIOThread(threading.Thread):
             status=statusFlag,    # current status flag, should be `NOT_STARTED`
             streamTime=pts)       # frame timestamp
 
-        # Put the frame in the frame queue so the main thread can read access it
-        # safely. The main thread should hold onto any frame it gets when the
-        # queue is empty.
-        if self._frameQueue.full():
-            raise RuntimeError(
-                "Stream decoder frame queue is full and it really shouldn't be "
-                "at this point. Make sure data has been flushed out of the "
-                "queue from previous use.")
-
-        # Object to pass video frame data back to the application thread for
-        # presentation or processing.
-        lastFrame = StreamData(
-            metadata,
-            colorData,
-            streamStatus,
-            u'ffpyplayer')
-
-        # Pass the object to the main thread using the frame queue.
-        self._frameQueue.put(lastFrame)  # put frame data in here
+        # Put the frame in the ring buffer so the main thread can access it
+        # safely. The main thread holds onto the last frame it got until there
+        # is a new one.
+        self._putFrame(colorData, streamStatus, metadata, tCapture)
 
         # update the status flag indicating that we started pulling frames
         statusFlag = STARTED
@@ -864,6 +1285,7 @@ class MovieStreamIOThread(threading.Thread):
 
             # pull the next available frame from the stream
             frameData, val = self._player.get_frame(show=True)
+            tCapture = logging.defaultClock.getTime()
 
             # process status flags coming from the stream reader
             if isinstance(val, str):
@@ -896,11 +1318,7 @@ class MovieStreamIOThread(threading.Thread):
             colorData, pts = frameData
             streamTime = pts
             if streamTime <= ptsLast:
-                # return the last frame to be displayed
-                try:
-                    self._frameQueue.put_nowait(lastFrame)
-                except queue.Full:
-                    pass
+                # the main thread keeps showing the last frame it got
                 # try to make sure we aren't writing the same frame again
                 time.sleep(0.004)  # 250Hz
                 continue
@@ -944,9 +1362,15 @@ class MovieStreamIOThread(threading.Thread):
                          )
                     )
 
-                # poll the mic if available to flush the sample buffer
-                if self._mic is not None:
-                    self._mic.poll()
+                # Poll the mic if available to flush the sample buffer, and
+                # pass the new samples on to be written with the frames.
+                if self._micReader is not None:
+                    self._micReader.mic.poll()
+                    if writer is not None:
+                        samples = self._micReader.read()
+                        if len(samples):
+                            writer.commandQueue.put(
+                                ('write_audio', (samples,)))
 
                 recordingFrameIdx += 1
 
@@ -961,27 +1385,18 @@ class MovieStreamIOThread(threading.Thread):
                     statusFlag = STARTED   # keep the stream running
                     self._cmdQueue.task_done()
 
-            # Put the frame in the queue to allow the main thread to safely
-            # access it. If the queue is full, the frame data will be discarded
-            # at this point. The image will be lost unless the encoder is
-            # recording.
+            # Put the frame in the ring buffer to allow the main thread to
+            # safely access it. If the main thread hasn't read the previous
+            # frame, that frame is dropped. The image will be lost unless the
+            # encoder is recording.
             streamStatus = StreamStatus(
                 status=statusFlag,
                 streamTime=streamTime,
                 recTime=recordingTime,
                 recBytes=recordingBytes)
 
-            # Object to pass video frame data back to the application thread
-            # for presentation or processing.
-            img, _ = frameData
-            lastFrame = toReturn = StreamData(
-                metadata, img, streamStatus, u'ffpyplayer')
-
             # push the frame to the main application
-            try:
-                self._frameQueue.put_nowait(toReturn)  # put frame data in here
-            except queue.Full:
-                pass
+            self._putFrame(colorData, streamStatus, metadata, tCapture)
 
             # compute the estimated time until the next frame is presented to
             # throttle CPU use a bit
@@ -1010,20 +1425,20 @@ class MovieStreamIOThread(threading.Thread):
         # this will prevent the main loop for executing until we're ready
         self._warmUpLock.acquire()
 
-    def record(self, writer, mic=None):
+    def record(self, writer, micReader=None):
         """Start recording frames to the output video file.
 
         Parameters
         ----------
         writer : MediaWriter
             Media writer object to record with.
-        mic : Microphone or None
-            Option audio capture device to use with the camera. This object will
-            be controlled by the thread.
+        micReader : _RecordedSamplesReader or None
+            Reader of the samples recorded by the audio capture device to use
+            with the camera. The device will be polled by the thread.
 
         """
         self._writer = writer
-        self._mic = mic
+        self._micReader = micReader
 
         self._cmdQueue.put(('record', writer))
         self._cmdQueue.join()
@@ -1041,23 +1456,30 @@ class MovieStreamIOThread(threading.Thread):
         self._cmdQueue.join()
 
     def getRecentFrame(self):
-        """Get the most recent frame data from the feed (`tuple`).
+        """Get the most recent frame data from the feed.
 
         Returns
         -------
-        tuple or None
-            Frame data formatted as `(metadata, frameData, val)`. The `metadata`
-            is a `dict`, `frameData` is a `tuple` with format (`colorData`,
-            `pts`) and `val` is a `str` returned by the
-            `MediaPlayer.get_frame()` method. Returns `None` if there is no
-            frame data.
+        StreamData or None
+            Frame data, whose `frameImage` refers to the slot of the frame ring
+            buffer the frame is in. This is valid until the next call. Returns
+            `None` if there is no new frame since the last call.
 
         """
-        if self._frameQueue.empty():
+        if self._frameRing is None:
+            return None
+
+        recentFrame = self._frameRing.read()
+        if recentFrame is None:
             return None
 
-        # hold only last frame and return that instead of None?
-        return self._frameQueue.get_nowait()
+        frameData, info = recentFrame
+        return StreamData(
+            info['metadata'],
+            _RingFrameImage(frameData, info['size'], info['pixelFormat']),
+            info['streamStatus'],
+            u'ffpyplayer',
+            info['timestamps'])
 
 
 class MovieCompositorBGThread(threading.Thread):
@@ -1218,8 +1640,8 @@ class Camera:
 
     This class is capable of opening, recording, and saving camera video streams
     to disk. Camera stream reading/writing is done in a separate thread. Output
-    video and audio tracks are written to a temp directory and composited into
-    the final video when `save()` is called.
+    video and audio tracks are encoded to a temp directory while recording, and
+    copied into the final video when `save()` is called.
 
     GNU/Linux is presently unsupported at this time, however support is likely
     to arrive in a later release.
@@ -1235,11 +1657,15 @@ class Camera:
         possible camera devices and makes them selectable without explicitly
         having the name of the cameras attached to the system. Use caution when
         specifying an integer, as the same index may not reference the same
-        camera everytime.
+        camera everytime. The path to a movie file opens a virtual camera
+        playing the movie, see `VirtualCameraPlayer`.
     mic : :class:`~psychopy.sound.microphone.Microphone` or None
         Microphone to record audio samples from during recording. The microphone
         input device must not be in use when `record()` is called. The audio
-        track will be merged with the video upon calling `save()`.
+        track will be merged with the video upon calling `save()`. Samples are
+        read from the microphone's recording buffer, which is left as it is, so
+        use one in ring buffer mode (`loopback=True`) for recordings longer
+        than the buffer.
     cameraLib : str
         Interface library (backend) to use for accessing the camera. Only
         `ffpyplayer` is available at this time.
@@ -1281,14 +1707,23 @@ class Camera:
         cam.save('myVideo.mp4', useThreads=False)
         cam.close()
 
+    Testing an experiment without a camera, using a movie file as one::
+
+        cam = Camera('testMovie.mp4')
+
     """
     def __init__(self, device=0, mic=None, cameraLib=u'ffpyplayer',
                  frameRate=None, frameSize=None, bufferSecs=4, win=None,
                  name='cam'):
+        if not _hasFFPyPlayer:
+            raise ModuleNotFoundError(
+                "Cannot create a `Camera`, `ffpyplayer` is not installed.")
+
         # add attributes for setters
         self.__dict__.update(
             {'_device': None,
              '_mic': None,
+             '_micReader': None,
              '_outFile': None,
              '_mode': u'video',
              '_frameRate': None,
@@ -1300,8 +1735,13 @@ class Camera:
         # Process camera settings
         #
 
-        # get all the cameras attached to the system
-        supportedCameraSettings = getCameras()
+        # get all the cameras attached to the system, or the movie file to play
+        # as a camera
+        if isinstance(device, str) and os.path.isfile(device):
+            device = VirtualCameraPlayer.getCameraInfo(device)
+            supportedCameraSettings = {device.name: [device]}
+        else:
+            supportedCameraSettings = getCameras()
 
         # create a mapping of supported camera formats
         _formatMapping = dict()
@@ -1401,6 +1841,9 @@ class Camera:
         self._recordingTime = self._streamTime = 0.0
         self._recordingBytes = 0
 
+        # times recent frames went through each stage, for `getLatencyReport`
+        self._frameTimes = collections.deque(maxlen=CAMERA_LATENCY_FRAMES)
+
         # store win (unused but needs to be set/got safely for parity with JS)
         self.win = win
 
@@ -1629,6 +2072,13 @@ class Camera:
         # open a writer and block until done
         self._tWriter.open(self._tempVideoFileName, [writerOptions])
 
+        # audio is written along with the frames as it's captured
+        if self._mic is not None:
+            self._tWriter.openAudio(
+                self._tempAudioFileName,
+                self._mic.recording.sampleRateHz,
+                self._mic.recording.channels)
+
     def _closeWriter(self):
         """Close the video writer.
         """
@@ -1786,10 +2236,17 @@ class Camera:
 
         # self._isReady = streamStatus.status >= STARTED
 
-        # if we have a new frame, update the frame information
+        # If we have a new frame, update the frame information. The frame is
+        # used where the stream thread put it, without copying it.
         videoBuffer = frameImage.to_bytearray()[0]
         videoFrameArray = np.frombuffer(videoBuffer, dtype=np.uint8)
 
+        # Times of the stages the frame goes through. The time it's uploaded to
+        # a texture and shown are added by `ImageStim`.
+        timestamps = dict(enqueuedFrame.timestamps or {})
+        timestamps['tFetch'] = logging.defaultClock.getTime()
+        self._frameTimes.append(timestamps)
+
         # provide the last frame
         self._lastFrame = MovieFrame(
             frameIndex=self._frameIndex,
@@ -1801,10 +2258,65 @@ class Camera:
             audioSamples=None,
             metadata=metadata,
             movieLib=u'ffpyplayer',
-            userData=None)
+            userData=timestamps)
 
         return True
 
+    def getLatencyReport(self):
+        """Get how long recent frames took to go through each stage between
+        being captured and shown.
+
+        The stages are `'copy'` (from the decoder to the frame ring buffer, by
+        the stream thread), `'wait'` (in the ring buffer until the application
+        gets it with `getVideoFrame()`), `'upload'` (until an `ImageStim` has
+        uploaded it to a texture), `'display'` (until the window flipped with
+        the frame drawn) and `'total'` (from capture to display). Only frames
+        which got to the end of a stage count for it. Frames are timed from
+        when the stream thread got them from the decoder, so time spent in the
+        camera and driver isn't included.
+
+        Returns
+        -------
+        dict
+            Mapping of stage names to `dict` with the number of frames (`'n'`)
+            and the `'mean'`, `'median'` and `'max'` time taken in seconds
+            (`None` if no frame got through the stage). The number of frames
+            the application never got is `'dropped'`.
+
+        Examples
+        --------
+        Print the average time from capture to display::
+
+            report = cam.getLatencyReport()
+            print(report['total']['mean'])
+
+        """
+        stages = (('copy', 'tCapture', 'tRing'),
+                  ('wait', 'tRing', 'tFetch'),
+                  ('upload', 'tFetch', 'tUpload'),
+                  ('display', 'tUpload', 'tFlip'),
+                  ('total', 'tCapture', 'tFlip'))
+
+        frameTimes = list(self._frameTimes)
+        report = {}
+        for stage, start, end in stages:
+            durations = np.asarray(
+                [times[end] - times[start] for times in frameTimes
+                 if start in times and end in times], dtype=float)
+            if durations.size:
+                report[stage] = {'n': durations.size,
+                                 'mean': float(np.mean(durations)),
+                                 'median': float(np.median(durations)),
+                                 'max': float(np.max(durations))}
+            else:
+                report[stage] = {'n': 0, 'mean': None, 'median': None,
+                                 'max': None}
+
+        frameRing = None if self._tStream is None else self._tStream.frameRing
+        report['dropped'] = 0 if frameRing is None else frameRing.nDropped
+
+        return report
+
     def open(self):
         """Open the camera stream and begin decoding frames (if available).
 
@@ -1858,6 +2370,9 @@ class Camera:
             lib_opts['pixel_format'] = _cameraInfo.pixelFormat
             ff_opts['framedrop'] = True
             ff_opts['fast'] = True
+        elif _cameraInfo.cameraAPI == CAMERA_API_VIRTUAL:  # movie file
+            _camera = _cameraInfo.name
+            _frameRate = _cameraInfo.frameRate
         # elif _cameraInfo.cameraAPI == CAMERA_API_VIDEO4LINUX:
         #     raise OSError(
         #         "Sorry, camera does not support Linux at this time. However, "
@@ -1883,7 +2398,11 @@ class Camera:
         lib_opts['framerate'] = str(_frameRate)
 
         # open a stream and pause it until ready
-        self._player = MediaPlayer(_camera, ff_opts=ff_opts, lib_opts=lib_opts)
+        if _cameraInfo.cameraAPI == CAMERA_API_VIRTUAL:
+            self._player = VirtualCameraPlayer(_camera)
+        else:
+            self._player = MediaPlayer(
+                _camera, ff_opts=ff_opts, lib_opts=lib_opts)
 
         # pass off the player to the thread which will process the stream
         self._tStream = MovieStreamIOThread(self._player)
@@ -1912,8 +2431,9 @@ class Camera:
         # start the microphone
         if self._mic is not None:
             self._mic.record()
+            self._micReader = _RecordedSamplesReader(self._mic)
 
-        self._tStream.record(self._tWriter, self._mic)
+        self._tStream.record(self._tWriter, self._micReader)
         self._status = STARTED
 
     # def snapshot(self):
@@ -1933,17 +2453,18 @@ class Camera:
         self._tStream.stop()
         self._isReady = False  # not ready
 
+        # stop audio recording if `mic` is available, writing out the samples
+        # captured since the stream thread last passed them on
+        if self._micReader is not None:
+            if self._mic.isStarted:
+                self._mic.stop()
+            self._tWriter.writeAudio(self._micReader.read())
+            self._micReader = None
+
         # Close the writer file (not thread) now that the stream thread is no
         # longer writing frames.
         self._tWriter.close()
 
-        # stop audio recording if `mic` is available
-        if self._mic is not None:
-            if self._mic.isStarted:
-                self._mic.stop()
-            audioTrack = self._mic.getRecording()
-            audioTrack.save(self._tempAudioFileName, 'wav')
-
     def close(self):
         """Close the camera.
         """
@@ -1980,6 +2501,10 @@ class Camera:
         must be called prior to saving a video. If `record()` is called again
         before `save()`, the previous recording will be deleted and lost.
 
+        The video and audio were encoded while recording, so this only copies
+        them into the new file (see `renderVideo()`), which takes little time
+        even for long recordings.
+
         Parameters
         ----------
         filename : str
@@ -2072,6 +2597,9 @@ class Camera:
     def getVideoFrame(self):
         """Pull the next frame from the stream (if available).
 
+        The color data of the frame is not a copy, and is only valid until the
+        next call. Copy it to keep it for longer.
+
         Returns
         -------
         MovieFrame
@@ -2360,6 +2888,11 @@ def renderVideo(outputFile, videoFile, audioFile=None):
     mainly for compositing video and audio data for the camera. Video and audio
     should have roughly the same duration.
 
+    The video stream is copied into the output file as it is, without decoding
+    it, unless the format of the output file can't hold it. Audio is encoded
+    with the default codec for the format. This uses the FFmpeg program which
+    comes with `imageio-ffmpeg`.
+
     Parameters
     ----------
     outputFile : str
@@ -2377,17 +2910,28 @@ def renderVideo(outputFile, videoFile, audioFile=None):
         Size of the resulting file in bytes.
 
     """
-    # merge audio and video tracks, we use MoviePy for this
-    videoClip = VideoFileClip(videoFile)
+    import imageio_ffmpeg
 
-    # if we have a microphone, merge the audio track in
+    # merge audio and video tracks
+    inputArgs = [imageio_ffmpeg.get_ffmpeg_exe(), '-y', '-loglevel', 'error',
+                 '-i', videoFile]
     if audioFile is not None:
-        audioClip = AudioFileClip(audioFile)
-        # add audio track to the video
-        videoClip.audio = CompositeAudioClip([audioClip])
-
-    # transcode with the format the user wants
-    videoClip.write_videofile(outputFile, verbose=False, logger=None)
+        inputArgs += ['-i', audioFile]
+    inputArgs += ['-map', '0:v:0']
+    if audioFile is not None:
+        inputArgs += ['-map', '1:a:0']
+
+    # copy the video stream if the output format allows it, else transcode it
+    for videoArgs in (['-c:v', 'copy'], []):
+        proc = subprocess.run(
+            inputArgs + videoArgs + [outputFile],
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if proc.returncode == 0:
+            break
+    else:
+        raise RuntimeError(
+            "Failed to render video `{}`: {}".format(
+                outputFile, proc.stderr.decode(errors='replace').strip()))
 
     return os.path.getsize(outputFile)
 
@@ -140,7 +140,8 @@ class Preferences:
             'userPrefsDir',  # root dir
             'themes',  # define theme path
             'fonts',  # find / copy fonts
-            'packages'  # packages and plugins
+            'packages',  # packages and plugins
+            'cache'  # files cached between sessions (eg. shader binaries)
         )
 
         # build directory structure inside user directory
@@ -19,7 +19,8 @@ preferences > hardware > audioLib:
 For portaudio-based backends (all except for pygame) there is also a
 choice of the underlying sound driver (e.g. ASIO, CoreAudio etc).
 
-After importing sound, the sound lib and driver being used will be stored as::
+The sound lib is loaded the first time it is needed (e.g. to create a `Sound`)
+and the lib and driver being used will then be stored as::
     `psychopy.sound.audioLib`
     `psychopy.sound.audioDriver`
 
@@ -42,6 +43,8 @@ from psychopy import logging, prefs, constants
 from .exceptions import DependencyError, SoundFormatError
 from .audiodevice import *
 from .audioclip import *  # import objects related to AudioClip
+from .synthesis import *  # cache of synthesized tones
+from .detectors import *  # detectors of events in recorded audio
 
 # import microphone if possible
 try:
@@ -61,10 +64,6 @@ except ImportError as err:
                   "possible on this machine. For details see stack trace below:\n"
                   f"{formatted_tb}")
 
-pyoSndServer = None
-Sound = None
-audioLib = None
-audioDriver = None
 bits32 = sys.maxsize == 2 ** 32
 
 _audioLibs = ['PTB', 'sounddevice', 'pyo', 'pysoundcard', 'pygame']
@@ -76,79 +75,141 @@ if travisCI:
     # for sounddevice we built in some TravisCI protection but not in pyo
     prefs.hardware['audioLib'] = ['sounddevice']
 
-if isinstance(prefs.hardware['audioLib'], str):
-    prefs.hardware['audioLib'] = [prefs.hardware['audioLib']]
-for thisLibName in prefs.hardware['audioLib']:
-    try:
-        if thisLibName.lower() == 'ptb':
-            try:
-                # always installed
-                from . import backend_ptb as backend
-                Sound = backend.SoundPTB
-                audioDriver = backend.audioDriver
-            except Exception:
-                continue
-        elif thisLibName == 'pyo':
-            try:
-                from . import backend_pyo as backend
-                Sound = backend.SoundPyo
-                pyoSndServer = backend.pyoSndServer
-                audioDriver = backend.audioDriver
-            except Exception:
-                continue
-        elif thisLibName == 'sounddevice':
-            try:
-                from . import backend_sounddevice as backend
-                Sound = backend.SoundDeviceSound
-            except Exception:
-                continue
-        elif thisLibName == 'pygame':
-            try:
-                from . import backend_pygame as backend
-                Sound = backend.SoundPygame
-            except Exception:
-                continue
-        elif thisLibName == 'pysoundcard':
-            try:
-                from . import backend_pysound as backend
-                Sound = backend.SoundPySoundCard
-            except Exception:
-                continue
+# Set by _loadBackend() the first time one of them is used, so that importing
+# psychopy.sound doesn't load (and start) an audio library until it's needed.
+_backendNames = ('Sound', 'audioLib', 'audioDriver', 'backend', 'init',
+                 'getDevices', 'pyoSndServer', 'deviceNames')
+
+
+def _loadBackend():
+    """Load the first audio library in `prefs.hardware['audioLib']` which is
+    available, and apply the `audioDevice` preference.
+
+    Does nothing if a library was loaded already.
+    """
+    global Sound, audioLib, audioDriver, backend, init, getDevices, \
+        pyoSndServer, deviceNames
+    if 'audioLib' in globals():
+        return
+
+    pyoSndServer = None
+    Sound = None
+    audioLib = None
+    audioDriver = None
+
+    if isinstance(prefs.hardware['audioLib'], str):
+        prefs.hardware['audioLib'] = [prefs.hardware['audioLib']]
+    for thisLibName in prefs.hardware['audioLib']:
+        try:
+            if thisLibName.lower() == 'ptb':
+                try:
+                    # always installed
+                    from . import backend_ptb as backend
+                    Sound = backend.SoundPTB
+                    audioDriver = backend.audioDriver
+                except Exception:
+                    continue
+            elif thisLibName == 'pyo':
+                try:
+                    from . import backend_pyo as backend
+                    Sound = backend.SoundPyo
+                    pyoSndServer = backend.pyoSndServer
+                    audioDriver = backend.audioDriver
+                except Exception:
+                    continue
+            elif thisLibName == 'sounddevice':
+                try:
+                    from . import backend_sounddevice as backend
+                    Sound = backend.SoundDeviceSound
+                except Exception:
+                    continue
+            elif thisLibName == 'pygame':
+                try:
+                    from . import backend_pygame as backend
+                    Sound = backend.SoundPygame
+                except Exception:
+                    continue
+            elif thisLibName == 'pysoundcard':
+                try:
+                    from . import backend_pysound as backend
+                    Sound = backend.SoundPySoundCard
+                except Exception:
+                    continue
+            else:
+                msg = ("audioLib pref should be one of {!r}, not {!r}"
+                       .format(_audioLibs, thisLibName))
+                raise ValueError(msg)
+            # if we got this far we were successful in loading the lib
+            audioLib = thisLibName
+            init = backend.init
+            if hasattr(backend, 'getDevices'):
+                getDevices = backend.getDevices
+            logging.info('sound is using audioLib: %s' % audioLib)
+            break
+        except DependencyError as e:
+            failed.append(thisLibName.lower())
+            msg = '%s audio lib was requested but not loaded: %s'
+            logging.warning(msg % (thisLibName, sys.exc_info()[1]))
+            continue  # to try next audio lib
+
+    if audioLib is None:
+        # leave the backend unloaded, to try again next time
+        for name in _backendNames:
+            globals().pop(name, None)
+        raise DependencyError(
+                "No sound libs could be loaded. Tried: {}\n"
+                "Check whether the necessary sound libs are installed"
+                .format(prefs.hardware['audioLib']))
+    elif audioLib.lower() != 'ptb':
+        if not bits32 and 'ptb' not in failed:
+            # Could be running PTB, just aren't?
+            logging.warning("We strongly recommend you activate the PTB sound "
+                            "engine in PsychoPy prefs as the preferred audio "
+                            "engine. Its timing is vastly superior. Your prefs "
+                            "are currently set to use {} (in that order)."
+                            .format(prefs.hardware['audioLib']))
+        else:  # Can't run PTB anyway due to Py2 or 32bit system
+            logging.warning("For experiments that use audio stimuli, timing will "
+                            "be much better if you upgrade your PsychoPy "
+                            "installation to a 64bit Python3 installation and use "
+                            "the PTB backend.")
+
+    # Set the device according to user prefs (if current lib allows it)
+    deviceNames = []
+    if hasattr(backend, 'defaultOutput'):
+        pref = prefs.hardware['audioDevice']
+        # is it a list or a simple string?
+        if type(prefs.hardware['audioDevice'])==list:
+            # multiple options so use zeroth
+            dev = prefs.hardware['audioDevice'][0]
+        else:
+            # a single option
+            dev = prefs.hardware['audioDevice']
+        # is it simply "default" (do nothing)
+        if dev=='default' or travisCI:
+            pass  # do nothing
+        elif dev not in backend.getDevices(kind='output'):
+            deviceNames = sorted(backend.getDevices(kind='output').keys())
+            logging.warn(u"Requested audio device '{}' that is not available on "
+                            "this hardware. The 'audioDevice' preference should be one of "
+                            "{}".format(dev, deviceNames))
         else:
-            msg = ("audioLib pref should be one of {!r}, not {!r}"
-                   .format(_audioLibs, thisLibName))
-            raise ValueError(msg)
-        # if we got this far we were successful in loading the lib
-        audioLib = thisLibName
-        init = backend.init
-        if hasattr(backend, 'getDevices'):
-            getDevices = backend.getDevices
-        logging.info('sound is using audioLib: %s' % audioLib)
-        break
-    except DependencyError as e:
-        failed.append(thisLibName.lower())
-        msg = '%s audio lib was requested but not loaded: %s'
-        logging.warning(msg % (thisLibName, sys.exc_info()[1]))
-        continue  # to try next audio lib
-
-if audioLib is None:
-    raise DependencyError(
-            "No sound libs could be loaded. Tried: {}\n"
-            "Check whether the necessary sound libs are installed"
-            .format(prefs.hardware['audioLib']))
-elif audioLib.lower() != 'ptb':
-    if not bits32 and 'ptb' not in failed:
-        # Could be running PTB, just aren't?
-        logging.warning("We strongly recommend you activate the PTB sound "
-                        "engine in PsychoPy prefs as the preferred audio "
-                        "engine. Its timing is vastly superior. Your prefs "
-                        "are currently set to use {} (in that order)."
-                        .format(prefs.hardware['audioLib']))
-    else:  # Can't run PTB anyway due to Py2 or 32bit system
-        logging.warning("For experiments that use audio stimuli, timing will "
-                        "be much better if you upgrade your PsychoPy "
-                        "installation to a 64bit Python3 installation and use "
-                        "the PTB backend.")
+            setDevice(dev, kind='output')
+
+
+def __getattr__(name):
+    """Load the audio library the first time it's used."""
+    if name in _backendNames:
+        try:
+            _loadBackend()
+        except DependencyError as err:
+            # so that `hasattr(sound, 'Sound')` is False without an audio lib
+            raise AttributeError(
+                "module {!r} has no attribute {!r}: {}".format(
+                    __name__, name, err)) from err
+        return globals()[name]
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
 
 
 # function to set the device (if current lib allows it)
@@ -158,6 +219,7 @@ def setDevice(dev, kind=None):
     :param dev: the device to be used (name, index or sounddevice.device)
     :param kind: one of [None, 'output', 'input']
     """
+    _loadBackend()
     if not hasattr(backend, 'defaultOutput'):
         raise IOError("Attempting to SetDevice (audio) but not supported by "
                       "the current audio library ({!r})".format(audioLib))
@@ -176,24 +238,3 @@ def setDevice(dev, kind=None):
             raise TypeError("`kind` should be one of [None, 'output', 'input']"
                             "not {!r}".format(kind))
 
-# Set the device according to user prefs (if current lib allows it)
-deviceNames = []
-if hasattr(backend, 'defaultOutput'):
-    pref = prefs.hardware['audioDevice']
-    # is it a list or a simple string?
-    if type(prefs.hardware['audioDevice'])==list:
-        # multiple options so use zeroth
-        dev = prefs.hardware['audioDevice'][0]
-    else:
-        # a single option
-        dev = prefs.hardware['audioDevice']
-    # is it simply "default" (do nothing)
-    if dev=='default' or travisCI:
-        pass  # do nothing
-    elif dev not in backend.getDevices(kind='output'):
-        deviceNames = sorted(backend.getDevices(kind='output').keys())
-        logging.warn(u"Requested audio device '{}' that is not available on "
-                        "this hardware. The 'audioDevice' preference should be one of "
-                        "{}".format(dev, deviceNames))
-    else:
-        setDevice(dev, kind='output')
@@ -14,6 +14,7 @@ from psychopy.constants import (STARTED, PLAYING, PAUSED, FINISHED, STOPPED,
 from psychopy.tools.filetools import pathToString, defaultStim, defaultStimRoot
 from sys import platform
 from .audioclip import AudioClip
+from .synthesis import getSynthesisCache
 
 
 if platform == 'win32':
@@ -56,6 +57,29 @@ def apodize(soundArray, sampleRate):
     return soundArray
 
 
+def _getNoteFreq(thisNote, octave):
+    """Frequency of a note name in the given octave, in Hz."""
+    freqA = 440.0
+    thisOctave = octave - 4
+    mult = 2.0**(stepsFromA[thisNote] / 12.)
+    return freqA * mult * 2.0 ** thisOctave
+
+
+def _getToneSamples(thisFreq, secs, sampleRate, hamming=True):
+    """Samples of a tone for a sound, from the synthesis cache."""
+    def synthesize():
+        nSamples = int(secs * sampleRate)
+        outArr = numpy.arange(0.0, 1.0, 1.0 / nSamples)
+        outArr *= 2 * numpy.pi * thisFreq * secs
+        outArr = numpy.sin(outArr)
+        if hamming and nSamples > 30:
+            outArr = apodize(outArr, sampleRate)
+        return outArr
+
+    key = ('sine', thisFreq, secs, sampleRate, 1.0, bool(hamming))
+    return getSynthesisCache().get(key, synthesize)
+
+
 class HammingWindow():
     def __init__(self, winSecs, soundSecs, sampleRate):
         """
@@ -218,10 +242,7 @@ class _SoundBase():
 
     def _setSndFromNote(self, thisNote, secs, octave, hamming=True):
         # note name -> freq -> sound
-        freqA = 440.0
-        thisOctave = octave - 4
-        mult = 2.0**(stepsFromA[thisNote] / 12.)
-        thisFreq = freqA * mult * 2.0 ** thisOctave
+        thisFreq = _getNoteFreq(thisNote, octave)
         self._setSndFromFreq(thisFreq, secs, hamming=hamming)
 
     def _setSndFromFreq(self, thisFreq, secs, hamming=True):
@@ -232,13 +253,10 @@ class _SoundBase():
             self.loops = -1
         if not self.sampleRate:
             self.sampleRate = self._getDefaultSampleRate()
-        nSamples = int(secs * self.sampleRate)
-        outArr = numpy.arange(0.0, 1.0, 1.0 / nSamples)
-        outArr *= 2 * numpy.pi * thisFreq * secs
-        outArr = numpy.sin(outArr)
-        if hamming and nSamples > 30:
-            outArr = apodize(outArr, self.sampleRate)
-        self._setSndFromArray(outArr)
+        # cached, so tones used on many trials are only synthesized once
+        outArr = _getToneSamples(thisFreq, secs, self.sampleRate, hamming)
+        # backends may change the samples they're given, keep the cache intact
+        self._setSndFromArray(outArr.copy())
 
     def _getDefaultSampleRate(self):
         """For backends this might depend on what streams are open"""
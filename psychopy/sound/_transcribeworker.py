@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Worker process of the transcription queue, see `TranscriptionQueue` in
+`transcribe.py`.
+
+This is run as a script by the queue, so that starting it doesn't re-run the
+experiment script (as `multiprocessing` would). The queue sends the address to
+connect to and its module search path on `stdin`. Each worker loads the
+transcription engines once, then transcribes batches of clips until it is shut
+down.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+import pickle
+import sys
+
+
+def _getPicklableError(err):
+    """The error raised, or a `RuntimeError` with its message if it can't be
+    sent to the queue."""
+    try:
+        pickle.dumps(err)
+    except Exception:
+        return RuntimeError("{}: {}".format(type(err).__name__, err))
+    return err
+
+
+def run(conn):
+    """Transcribe clips as commanded through `conn` until told to shut down.
+
+    Parameters
+    ----------
+    conn : multiprocessing.connection.Connection
+        Connection to the queue. Commands are `(op, value)`. `('warmUp',
+        engines)` loads engines and is replied to with a list of the errors
+        loading them. `('batch', items)`, where each item is `(clip, kwargs)`
+        for `transcribe()`, is replied to with a list of `(True, result)` or
+        `(False, error)` for the items.
+
+    """
+    from psychopy.sound.transcribe import transcribe, recognizeSphinx, \
+        recognizeGoogle
+
+    while True:
+        try:
+            op, value = conn.recv()
+        except EOFError:  # the queue has gone
+            return
+
+        if op == 'shutdown':
+            return
+        elif op == 'warmUp':
+            # engines keep their recognizer or client for later clips
+            errors = []
+            for engine in value:
+                recognize = {'sphinx': recognizeSphinx,
+                             'google': recognizeGoogle}.get(engine.lower())
+                try:
+                    if recognize is not None:
+                        recognize(None)
+                except Exception as err:
+                    errors.append("{}: {}".format(engine, err))
+            conn.send(errors)
+        elif op == 'batch':
+            results = []
+            for clip, kwargs in value:
+                try:
+                    results.append((True, transcribe(clip, **kwargs)))
+                except Exception as err:
+                    results.append((False, _getPicklableError(err)))
+            conn.send(results)
+
+
+if __name__ == "__main__":
+    from multiprocessing.connection import Client
+
+    address, authkey, sysPath = pickle.load(sys.stdin.buffer)
+    sys.path[:] = sysPath  # import the same PsychoPy as the queue
+    conn = Client(address, authkey=authkey)
+    try:
+        run(conn)
+    finally:
+        conn.close()
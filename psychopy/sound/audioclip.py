@@ -31,6 +31,7 @@ from psychopy import prefs
 from psychopy.tools.audiotools import *
 from psychopy.tools import filetools as ft
 from .exceptions import *
+from .synthesis import getSynthesisCache
 
 
 # constants for specifying the number of channels
@@ -216,11 +217,23 @@ class AudioClip:
     # colored noise (e.g., white) and tones (e.g., sine, square, etc.)
     #
     # All of these methods return `AudioClip` objects containing the generated
-    # samples.
+    # samples. Samples are kept in the synthesis cache, so generating the same
+    # sound again only copies them.
     #
 
     @staticmethod
-    def whiteNoise(duration=1.0, sampleRateHz=SAMPLE_RATE_48kHz, channels=2):
+    def _fromSynthesized(key, synthesize, sampleRateHz, channels):
+        """Create a clip with `channels` copies of cached mono samples."""
+        samples = getSynthesisCache().get(key, synthesize)
+        # tiling copies the read-only samples from the cache
+        samples = np.tile(samples, (1, max(1, channels))).astype(
+            np.float32, copy=False)
+
+        return AudioClip(samples, sampleRateHz=sampleRateHz)
+
+    @staticmethod
+    def whiteNoise(duration=1.0, sampleRateHz=SAMPLE_RATE_48kHz, channels=2,
+                   seed=None):
         """Generate gaussian white noise.
 
         **New feature, use with caution.**
@@ -233,18 +246,27 @@ class AudioClip:
             Samples rate of the audio for playback.
         channels : int
             Number of channels for the output.
+        seed : int or None
+            Seed for the random samples. The same seed gives the same noise,
+            which is cached. `None` gives new noise each time.
 
         Returns
         -------
         AudioClip
 
         """
-        samples = whiteNoise(duration, sampleRateHz)
+        def synthesize():
+            return whiteNoise(duration, sampleRateHz, seed)
 
-        if channels > 1:
-            samples = np.tile(samples, (1, channels)).astype(np.float32)
+        if seed is None:  # new noise each time, so not cached
+            samples = synthesize()
+            if channels > 1:
+                samples = np.tile(samples, (1, channels)).astype(np.float32)
+            return AudioClip(samples, sampleRateHz=sampleRateHz)
 
-        return AudioClip(samples, sampleRateHz=sampleRateHz)
+        return AudioClip._fromSynthesized(
+            ('whiteNoise', duration, sampleRateHz, seed), synthesize,
+            sampleRateHz, channels)
 
     @staticmethod
     def silence(duration=1.0, sampleRateHz=SAMPLE_RATE_48kHz, channels=2):
@@ -327,12 +349,10 @@ class AudioClip:
             fullInstr.save('/path/to/instructions_with_tone.wav')  # save it
 
         """
-        samples = sinetone(duration, freqHz, gain, sampleRateHz)
-
-        if channels > 1:
-            samples = np.tile(samples, (1, channels)).astype(np.float32)
-
-        return AudioClip(samples, sampleRateHz=sampleRateHz)
+        return AudioClip._fromSynthesized(
+            ('sinetone', freqHz, duration, sampleRateHz, gain),
+            lambda: sinetone(duration, freqHz, gain, sampleRateHz),
+            sampleRateHz, channels)
 
     @staticmethod
     def square(duration=1.0, freqHz=440, dutyCycle=0.5, gain=0.8,
@@ -360,12 +380,10 @@ class AudioClip:
         AudioClip
 
         """
-        samples = squaretone(duration, freqHz, dutyCycle, gain, sampleRateHz)
-
-        if channels > 1:
-            samples = np.tile(samples, (1, channels)).astype(np.float32)
-
-        return AudioClip(samples, sampleRateHz=sampleRateHz)
+        return AudioClip._fromSynthesized(
+            ('squaretone', freqHz, duration, sampleRateHz, gain, dutyCycle),
+            lambda: squaretone(duration, freqHz, dutyCycle, gain, sampleRateHz),
+            sampleRateHz, channels)
 
     @staticmethod
     def sawtooth(duration=1.0, freqHz=440, peak=1.0, gain=0.8,
@@ -395,12 +413,10 @@ class AudioClip:
         AudioClip
 
         """
-        samples = sawtone(duration, freqHz, peak, gain, sampleRateHz)
-
-        if channels > 1:
-            samples = np.tile(samples, (1, channels)).astype(np.float32)
-
-        return AudioClip(samples, sampleRateHz=sampleRateHz)
+        return AudioClip._fromSynthesized(
+            ('sawtone', freqHz, duration, sampleRateHz, gain, peak),
+            lambda: sawtone(duration, freqHz, peak, gain, sampleRateHz),
+            sampleRateHz, channels)
 
     # --------------------------------------------------------------------------
     # Audio editing methods
@@ -702,8 +718,8 @@ class AudioClip:
 
         Speech-to-text conversion blocks the main application thread when used
         on Python. Don't transcribe audio during time-sensitive parts of your
-        experiment! This issue is known to the developers and will be fixed in a
-        later release.
+        experiment! Use a :class:`~psychopy.sound.transcribe.TranscriptionQueue`
+        to transcribe clips in the background instead.
 
         Parameters
         ----------
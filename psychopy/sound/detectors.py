@@ -0,0 +1,387 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Detectors of events in audio streamed from a microphone.
+
+Detectors are given each block of samples as it is polled from the stream (see
+:meth:`~psychopy.sound.Microphone.addDetector`), and time the events they find
+from the capture time of the samples. When the microphone is polled by its
+background thread (see :meth:`~psychopy.sound.Microphone.startPolling`), event
+times don't depend on how often the experiment's frame loop runs.
+
+Samples are processed a block at a time, in windows of a few milliseconds.
+Filters carry their state from one block to the next, so the result is the
+same however the stream is split into blocks.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'BandpassFilter',
+    'AudioEventDetector',
+    'RMSThresholdDetector',
+    'VoiceOnsetDetector'
+]
+
+import functools
+import numpy as np
+import psychopy.logging as logging
+
+# quietest baseline level allowed for voice onset detection, that of the least
+# significant bit of 16-bit samples
+MIN_BASELINE = 1.0 / 2 ** 15
+
+
+def _getRunLengths(isAbove, runBefore=0):
+    """Number of consecutive `True` values up to and including each element of
+    `isAbove`, continuing a run of `runBefore` values from before it."""
+    index = np.arange(len(isAbove))
+    lastBelow = np.maximum.accumulate(np.where(isAbove, -1, index))
+    runs = index - lastBelow
+    runs[lastBelow < 0] += runBefore
+
+    return runs
+
+
+@functools.lru_cache(maxsize=32)
+def _getBandpassSOS(order, low, high, sampleRateHz):
+    """Second-order sections of a Butterworth band-pass filter."""
+    from scipy.signal import butter
+
+    nyquist = sampleRateHz / 2.0
+    band = (low / nyquist, min(high / nyquist, 0.99))
+    return butter(order, band, btype='band', output='sos')
+
+
+class BandpassFilter:
+    """Butterworth band-pass filter of streamed samples.
+
+    The filter keeps its state from one block of samples to the next, so
+    filtering a stream a block at a time gives the same result as filtering it
+    all at once. Filter coefficients are computed once for each band and rate.
+
+    Parameters
+    ----------
+    low, high : float
+        Band of frequencies to keep in Hz.
+    sampleRateHz : int
+        Sample rate of the stream.
+    order : int
+        Order of the filter.
+
+    """
+    def __init__(self, low, high, sampleRateHz, order=6):
+        self._sos = _getBandpassSOS(
+            int(order), float(low), float(high), float(sampleRateHz))
+        self.reset()
+
+    def reset(self):
+        """Reset the filter state, for a new stream."""
+        self._zi = np.zeros((self._sos.shape[0], 2))
+
+    def filter(self, samples):
+        """Filter the next block of mono samples.
+
+        Parameters
+        ----------
+        samples : ndarray
+            Samples following those filtered last.
+
+        Returns
+        -------
+        ndarray
+            Filtered samples, as `float32`.
+
+        """
+        from scipy.signal import sosfilt
+
+        filtered, self._zi = sosfilt(self._sos, samples, zi=self._zi)
+        return filtered.astype(np.float32)
+
+
+class AudioEventDetector:
+    """Base class for detectors of events in streamed audio.
+
+    Subclasses override `_detect()`, and `_filter()` to filter samples before
+    they are split into windows. `_filter()` may return several signals for
+    each sample, as an array of shape `(nSamples, nSignals)`.
+
+    Parameters
+    ----------
+    windowSecs : float
+        Length of the windows samples are processed in, in seconds. This is
+        the resolution of the event times.
+    callback : callable or None
+        Function called as ``callback(detector, eventTime)`` for each event.
+        This is called from the thread polling the microphone, so it should
+        return quickly.
+
+    """
+    def __init__(self, windowSecs=0.002, callback=None):
+        self.windowSecs = float(windowSecs)
+        self.callback = callback
+        self._sampleRateHz = None
+        self._windowSize = 1
+        self.reset()
+
+    def reset(self):
+        """Forget events and samples processed so far, for a new recording.
+        """
+        self._carry = None  # samples not filling a window yet
+        self._nWindows = 0  # windows processed
+        self._events = []
+
+    @property
+    def events(self):
+        """Times of the events detected since the last reset (`list`).
+        """
+        return list(self._events)
+
+    @property
+    def eventTime(self):
+        """Time of the first event detected since the last reset (`float` or
+        `None`).
+        """
+        return self._events[0] if self._events else None
+
+    def _setSampleRate(self, sampleRateHz):
+        """Set up processing for samples at a new rate."""
+        self._sampleRateHz = sampleRateHz
+        self._windowSize = max(1, int(round(self.windowSecs * sampleRateHz)))
+
+    def _filter(self, samples):
+        """Filter a block of mono samples, continuing from the last block."""
+        return samples
+
+    def _detect(self, windows, windowTimes):
+        """Find events in windows of samples.
+
+        Parameters
+        ----------
+        windows : ndarray
+            Array of shape `(nWindows, windowSize)` of filtered samples, or
+            `(nWindows, windowSize, nSignals)` if `_filter()` returns several
+            signals.
+        windowTimes : ndarray
+            Time of the first sample of each window.
+
+        Returns
+        -------
+        list
+            Times of the events found.
+
+        """
+        raise NotImplementedError(
+            "`_detect()` must be overridden by subclasses.")
+
+    def process(self, samples, sampleRateHz, startTime):
+        """Process a block of samples from the stream.
+
+        Parameters
+        ----------
+        samples : ArrayLike
+            Samples of shape `(nSamples, channels)` or `(nSamples,)`. Channels
+            are averaged.
+        sampleRateHz : int
+            Sample rate of the stream.
+        startTime : float
+            Capture time of the first sample in the block. Event times are in
+            the same time base.
+
+        Returns
+        -------
+        list
+            Times of the events found in the block.
+
+        """
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples.mean(axis=1)
+        if not len(samples):
+            return []
+
+        if sampleRateHz != self._sampleRateHz:
+            if self._sampleRateHz is not None:
+                self.reset()
+            self._setSampleRate(sampleRateHz)
+
+        # samples left over from the last block begin the first window
+        data = self._filter(samples)
+        dataStartTime = startTime
+        if self._carry is not None:
+            data = np.concatenate((self._carry, data))
+            dataStartTime -= len(self._carry) / float(sampleRateHz)
+        windowSize = self._windowSize
+        nWindows = len(data) // windowSize
+        self._carry = data[nWindows * windowSize:]
+        if not nWindows:
+            return []
+
+        windows = data[:nWindows * windowSize].reshape(
+            (nWindows, windowSize) + data.shape[1:])
+        windowTimes = dataStartTime + \
+            np.arange(nWindows) * (windowSize / float(sampleRateHz))
+        events = [float(t) for t in self._detect(windows, windowTimes)]
+        self._nWindows += nWindows
+
+        for eventTime in events:
+            self._events.append(eventTime)
+            if self.callback is not None:
+                try:
+                    self.callback(self, eventTime)
+                except Exception as err:
+                    logging.error(
+                        "Error in audio event callback: {}".format(err))
+
+        return events
+
+
+class RMSThresholdDetector(AudioEventDetector):
+    """Detect sounds louder than a threshold.
+
+    An event is the start of each run of `holdWindows` windows or more whose
+    root-mean-square level is above `threshold`.
+
+    Parameters
+    ----------
+    threshold : float
+        RMS level of samples (between 0 and 1) to exceed.
+    windowSecs : float
+        Length of the windows the RMS level is computed over, in seconds.
+    holdWindows : int
+        Number of consecutive windows which must be above the threshold.
+    callback : callable or None
+        Function called as ``callback(detector, eventTime)`` for each event.
+
+    Examples
+    --------
+    Print the time of each sound made while recording::
+
+        def onSound(detector, eventTime):
+            print('sound at', eventTime)
+
+        mic.addDetector(RMSThresholdDetector(0.1, callback=onSound))
+        mic.startPolling()
+        mic.start()
+
+    """
+    def __init__(self, threshold=0.1, windowSecs=0.01, holdWindows=1,
+                 callback=None):
+        self.threshold = float(threshold)
+        self.holdWindows = max(1, int(holdWindows))
+        AudioEventDetector.__init__(
+            self, windowSecs=windowSecs, callback=callback)
+
+    def reset(self):
+        AudioEventDetector.reset(self)
+        self._runBefore = 0
+
+    def _detect(self, windows, windowTimes):
+        power = np.sqrt(np.mean(np.square(windows), axis=1))
+        runs = _getRunLengths(power > self.threshold, self._runBefore)
+        self._runBefore = int(runs[-1])
+
+        # a run may have started in an earlier block
+        windowSecs = self._windowSize / float(self._sampleRateHz)
+        runEnds = np.flatnonzero(runs == self.holdWindows)
+        return windowTimes[runEnds] - (self.holdWindows - 1) * windowSecs
+
+
+class VoiceOnsetDetector(AudioEventDetector):
+    """Detect the onset of speech, as `psychopy.voicekey.OnsetVoiceKey` does.
+
+    Samples are band-pass filtered to the range of speech. The baseline level
+    is the RMS level of the filtered samples between `baselineOn` and
+    `baselineOff` seconds from the start of the recording, which should be
+    silent. Speech starts with the first run of `holdWindows` windows whose
+    RMS level is more than `factor` times the baseline level. Only one onset
+    is detected per recording.
+
+    Parameters
+    ----------
+    low, high : float
+        Band of frequencies to keep in Hz.
+    factor : float
+        Multiple of the baseline level speech must exceed.
+    windowSecs : float
+        Length of the windows the RMS level is computed over, in seconds.
+    holdWindows : int
+        Number of consecutive windows which must be above the threshold.
+    baselineOn, baselineOff : float
+        Period of the recording to take the baseline level from, in seconds.
+    baseline : float or None
+        Baseline level to use, rather than measuring it.
+    filterOrder : int
+        Order of the Butterworth band-pass filter.
+    callback : callable or None
+        Function called as ``callback(detector, eventTime)`` at the onset.
+
+    """
+    def __init__(self, low=100, high=3000, factor=10, windowSecs=0.002,
+                 holdWindows=5, baselineOn=0.035, baselineOff=0.180,
+                 baseline=None, filterOrder=6, callback=None):
+        self.low = float(low)
+        self.high = float(high)
+        self.factor = float(factor)
+        self.holdWindows = max(1, int(holdWindows))
+        self.baselineOn = float(baselineOn)
+        self.baselineOff = float(baselineOff)
+        self._fixedBaseline = baseline
+        self.filterOrder = int(filterOrder)
+        self._bandpass = None
+        AudioEventDetector.__init__(
+            self, windowSecs=windowSecs, callback=callback)
+
+    def reset(self):
+        AudioEventDetector.reset(self)
+        self._runBefore = 0
+        self._baselineSum = 0.0
+        self._baselineCount = 0
+        self.baseline = self._fixedBaseline
+        if self._bandpass is not None:
+            self._bandpass.reset()
+
+    def _setSampleRate(self, sampleRateHz):
+        AudioEventDetector._setSampleRate(self, sampleRateHz)
+        self._bandpass = BandpassFilter(
+            self.low, self.high, sampleRateHz, self.filterOrder)
+
+    def _filter(self, samples):
+        return self._bandpass.filter(samples)
+
+    def _detect(self, windows, windowTimes):
+        if self._events:  # onset found already
+            return []
+
+        power = np.sqrt(np.mean(np.square(windows, dtype=np.float64), axis=1))
+        windowSecs = self._windowSize / float(self._sampleRateHz)
+        recTimes = (self._nWindows + np.arange(len(power))) * windowSecs
+
+        if self.baseline is None:
+            inBaseline = (recTimes >= self.baselineOn) & \
+                         (recTimes + windowSecs <= self.baselineOff)
+            self._baselineSum += float(np.sum(np.square(power[inBaseline])))
+            self._baselineCount += int(np.count_nonzero(inBaseline))
+            isAfter = recTimes + windowSecs > self.baselineOff
+            if not np.any(isAfter):
+                return []
+            self.baseline = max(
+                np.sqrt(self._baselineSum / max(self._baselineCount, 1)),
+                MIN_BASELINE)
+            power, windowTimes = power[isAfter], windowTimes[isAfter]
+
+        runs = _getRunLengths(
+            power > self.factor * self.baseline, self._runBefore)
+        self._runBefore = int(runs[-1])
+        runEnds = np.flatnonzero(runs >= self.holdWindows)
+        if not len(runEnds):
+            return []
+
+        return [windowTimes[runEnds[0]] - (self.holdWindows - 1) * windowSecs]
+
+
+if __name__ == "__main__":
+    pass
@@ -10,7 +10,10 @@
 
 __all__ = ['Microphone']
 
+import os
 import sys
+import threading
+import soundfile as sf
 import psychopy.logging as logging
 from psychopy.constants import NOT_STARTED
 from psychopy.preferences import prefs
@@ -30,6 +33,145 @@ except (ImportError, ModuleNotFoundError):
         "microphone stream will raise an error.")
     _hasPTB = False
 
+# longest time samples wait in a recording buffer before being spilled to disk
+SPILL_INTERVAL = 0.25
+
+# default time between polls of a microphone by its polling thread
+POLL_INTERVAL = 0.005
+
+
+class _SpillWriterThread(threading.Thread):
+    """Thread streaming the samples written to a circular `RecordingBuffer` to
+    a file, before they are overwritten.
+
+    The buffer and this thread share no locks. The buffer only ever increases
+    its count of samples written, after writing them, and this thread its count
+    of samples spilled, after they are flushed to the file. Each only reads the
+    other's count, so samples between the two are never written over or read
+    while being written.
+
+    FLAC encoders only write whole blocks of samples, so samples can't be read
+    back as soon as they are flushed. FLAC files are written as W64 files while
+    recording, and compressed when the thread is stopped. W64 (Sony Wave64) is
+    used rather than WAV, which can't hold more than 4 GB (about 3 hours of 48
+    kHz stereo), or RF64, which can't be read until it's closed.
+
+    """
+    def __init__(self, recording, filename):
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self._recording = recording
+        self.filename = str(filename)
+        self._compress = self.filename.lower().endswith('.flac')
+        if self._compress:
+            self._readName = self.filename + '.w64'
+        else:
+            self._readName = self.filename
+        self._file = sf.SoundFile(
+            self._readName, 'w',
+            samplerate=recording.sampleRateHz,
+            channels=recording.channels,
+            format='W64',  # WAV without the 4 GB limit
+            subtype='FLOAT')  # lossless for float32 samples
+
+        self.nSpilled = 0  # samples flushed to the file
+        self._wakeEvent = threading.Event()
+        self._running = True
+
+    def wake(self):
+        """Spill samples now rather than when next due."""
+        self._wakeEvent.set()
+
+    def spill(self):
+        """Write samples added to the buffer since the last call."""
+        recording = self._recording
+        nWritten = recording.nSamplesWritten
+        nSpilled = self.nSpilled
+        if nSpilled == nWritten:
+            return
+
+        totalSamples = recording.totalSamples
+        while nSpilled < nWritten:
+            ringOffset = nSpilled % totalSamples
+            nSamples = min(nWritten - nSpilled, totalSamples - ringOffset)
+            self._file.write(
+                recording.samples[ringOffset:ringOffset + nSamples])
+            nSpilled += nSamples
+        self._file.flush()
+
+        self.nSpilled = nSpilled  # after flushing, so readers find them
+
+    def read(self, start, end):
+        """Read spilled samples back from the file."""
+        samples, _ = sf.read(
+            self._readName, start=start, stop=end, dtype='float32',
+            always_2d=True)
+        return samples
+
+    def _compressFile(self):
+        """Write the recording to the FLAC file."""
+        recording = self._recording
+        with sf.SoundFile(self._readName) as src, \
+                sf.SoundFile(self.filename, 'w',
+                             samplerate=recording.sampleRateHz,
+                             channels=recording.channels,
+                             format='FLAC',
+                             subtype='PCM_24') as dst:
+            for block in src.blocks(blocksize=65536, dtype='float32',
+                                    always_2d=True):
+                dst.write(block)
+
+        w64Name = self._readName
+        self._readName = self.filename
+        os.remove(w64Name)
+
+    def run(self):
+        while self._running:
+            self._wakeEvent.wait(SPILL_INTERVAL)
+            self._wakeEvent.clear()
+            self.spill()
+
+        self.spill()
+        self._file.close()
+        if self._compress:
+            self._compressFile()
+
+    def stop(self):
+        """Spill any remaining samples, close the file and exit."""
+        self._running = False
+        self._wakeEvent.set()
+        self.join()
+
+
+class _MicrophonePollingThread(threading.Thread):
+    """Thread polling a microphone at a fixed interval while it's recording.
+    """
+    def __init__(self, mic, interval=POLL_INTERVAL):
+        threading.Thread.__init__(self)
+        self.daemon = True
+
+        self._mic = mic
+        self.interval = float(interval)
+        self._stopEvent = threading.Event()
+
+    def run(self):
+        mic = self._mic
+        while not self._stopEvent.wait(self.interval):
+            try:
+                mic._pollIfStarted()
+            except Exception as err:
+                logging.error(
+                    "Stopped polling the microphone after an error: "
+                    "{}".format(err))
+                break
+
+    def stop(self):
+        """Stop polling and wait for the thread to exit."""
+        self._stopEvent.set()
+        if self is not threading.current_thread():
+            self.join()
+
 
 class RecordingBuffer:
     """Class for a storing a recording from a stream.
@@ -62,10 +204,35 @@ class RecordingBuffer:
         property will be set to `True`. If 'warn', a warning will be logged and
         the `isFull` flag will be set. Finally, if 'error' the application will
         raise an exception.
+    loopback : bool
+        Use the buffer as a ring, writing samples over the oldest ones once it
+        is full, so recordings can go on for any length of time using a fixed
+        amount of memory. Only the latest `bufferSecs` of a recording are kept,
+        unless `spillFile` is given.
+    spillFile : str or None
+        File to stream the recording to as it is written, so none of it is
+        lost when the buffer loops back. The file is a W64 (WAV without its
+        4 GB limit) file of 32-bit floats, or a FLAC file if the name ends in
+        `.flac` (which is written as a W64 file until `close()` is called).
+        Samples are written
+        to it by a separate thread at least every `SPILL_INTERVAL` seconds, and
+        only written over in the buffer once they are in the file. Segments of
+        the recording are read from the file where they are no longer in the
+        buffer. Each new recording writes over the file. Implies
+        `loopback=True`.
+
+    Examples
+    --------
+    Record for hours keeping 60 seconds of audio in memory::
+
+        recording = RecordingBuffer(
+            sampleRateHz=48000, channels=1, maxRecordingSize=11520,
+            spillFile='session.flac')
 
     """
     def __init__(self, sampleRateHz=SAMPLE_RATE_48kHz, channels=2,
-                 maxRecordingSize=24000, policyWhenFull='ignore'):
+                 maxRecordingSize=24000, policyWhenFull='ignore',
+                 loopback=False, spillFile=None):
         self._channels = channels
         self._sampleRateHz = sampleRateHz
         self._maxRecordingSize = maxRecordingSize
@@ -75,6 +242,12 @@ class RecordingBuffer:
         self._spaceRemaining = None  # set in `_allocRecBuffer`
         self._totalSamples = None  # set in `_allocRecBuffer`
 
+        # ring buffer mode, samples written since the start of the recording
+        self._loopback = bool(loopback) or spillFile is not None
+        self._nWritten = 0
+        self._spillFile = spillFile
+        self._spillWriter = None  # started in `_allocRecBuffer`
+
         # check if the value is valid
         if policyWhenFull not in ['ignore', 'warn', 'error']:
             raise ValueError("Invalid value for `policyWhenFull`.")
@@ -88,6 +261,8 @@ class RecordingBuffer:
     def _allocRecBuffer(self):
         """Allocate the recording buffer. Called internally if properties are
         changed."""
+        self._stopSpilling()  # the old buffer mustn't be spilled any more
+
         # allocate another array
         nBytes = self._maxRecordingSize * 1000
         recArraySize = int((nBytes / self._channels) / (np.float32()).itemsize)
@@ -100,11 +275,62 @@ class RecordingBuffer:
         self._totalSamples = len(self._samples)
         self._spaceRemaining = self._totalSamples
 
+        if self._loopback:  # a new recording starts
+            self._restartRecording()
+
+    def _stopSpilling(self):
+        if self._spillWriter is not None:
+            self._spillWriter.stop()
+            self._spillWriter = None
+
+    def _restartRecording(self):
+        """Start a new recording in ring buffer mode, writing over the spill
+        file if there is one."""
+        self._stopSpilling()
+
+        self._nWritten = self._loops = 0
+        self._offset = self._lastSample = 0
+        self._spaceRemaining = self._totalSamples
+
+        if self._spillFile is not None:
+            self._spillWriter = _SpillWriterThread(self, self._spillFile)
+            self._spillWriter.start()
+
     @property
     def samples(self):
         """Reference to the actual sample buffer (`ndarray`)."""
         return self._samples
 
+    @property
+    def loopback(self):
+        """`True` if the buffer is used as a ring (`bool`)."""
+        return self._loopback
+
+    @property
+    def spillFile(self):
+        """File the recording is streamed to (`str` or `None`)."""
+        return self._spillFile
+
+    @property
+    def nSamplesWritten(self):
+        """Number of samples written since the recording started (`int`). In
+        ring buffer mode this includes samples no longer in the buffer.
+        """
+        if self._loopback:
+            return self._nWritten
+
+        return self._lastSample
+
+    @property
+    def sampleRateHz(self):
+        """Sampling rate of the recording in Hertz (`int`)."""
+        return self._sampleRateHz
+
+    @property
+    def channels(self):
+        """Number of channels recorded (`int`)."""
+        return self._channels
+
     @property
     def bufferSecs(self):
         """Capacity of the recording buffer in seconds (`float`)."""
@@ -125,12 +351,20 @@ class RecordingBuffer:
         """The space remaining in the recording buffer (`int`). Indicates the
         number of samples that the buffer can still add before overflowing.
         """
+        if self._loopback:
+            if self._spillWriter is None:  # never overflows
+                return self._totalSamples
+            return self._totalSamples - (
+                self._nWritten - self._spillWriter.nSpilled)
+
         return self._spaceRemaining
 
     @property
     def isFull(self):
-        """Is the recording buffer full (`bool`)."""
-        return self._spaceRemaining <= 0
+        """Is the recording buffer full (`bool`). In ring buffer mode, this is
+        only ever `True` if samples can't be spilled to disk fast enough.
+        """
+        return self.spaceRemaining <= 0
 
     @property
     def totalSamples(self):
@@ -191,7 +425,9 @@ class RecordingBuffer:
         """Set the write offset.
 
         Use this to specify where to begin writing samples the next time `write`
-        is called. You should call `seek(0)` when starting a new recording.
+        is called. You should call `seek(0)` when starting a new recording. In
+        ring buffer mode, only `seek(0, absolute=True)` is allowed, which starts
+        a new recording.
 
         Parameters
         ----------
@@ -203,10 +439,18 @@ class RecordingBuffer:
             is `False`.
 
         """
+        if self._loopback:
+            if not absolute or offset != 0:
+                raise ValueError(
+                    "A recording buffer in ring buffer mode can only seek to "
+                    "the start of a new recording.")
+            self._restartRecording()
+            return
+
         if not absolute:
             self._offset += offset
         else:
-            self._offset = absolute
+            self._offset = offset
 
         assert 0 <= self._offset < self._totalSamples
         self._spaceRemaining = self._totalSamples - self._offset
@@ -227,6 +471,9 @@ class RecordingBuffer:
             been recorded, if not, the number of samples rejected is given.
 
         """
+        if self._loopback:
+            return self._writeRing(samples)
+
         nSamples = len(samples)
         if self.isFull:
             if self._policyWhenFull == 'ignore':
@@ -270,7 +517,64 @@ class RecordingBuffer:
         d = nSamples - self._spaceRemaining
         return 0 if d < 0 else d
 
+    def _onFull(self, nLost):
+        """Apply the policy when full to `nLost` samples which didn't fit."""
+        if self._policyWhenFull == 'warn':
+            if not self._warnedRecBufferFull:
+                logging.warning(
+                    f"Audio recording buffer filled! Samples could not be "
+                    f"spilled to `{self._spillFile}` fast enough, and "
+                    f"{nLost} were lost.")
+                logging.flush()
+                self._warnedRecBufferFull = True
+        elif self._policyWhenFull == 'error':
+            raise AudioRecordingBufferFullError(
+                "Cannot write samples, recording buffer is full.")
+
+    def _writeRing(self, samples):
+        """Write samples in ring buffer mode, see `write`."""
+        nSamples = len(samples)
+        if not nSamples:
+            return 0
+
+        totalSamples = self._totalSamples
+        spillWriter = self._spillWriter
+        if spillWriter is not None:
+            # samples not in the file yet can't be written over
+            nFree = totalSamples - (self._nWritten - spillWriter.nSpilled)
+            nWrite = min(nSamples, nFree)
+            if nWrite < nSamples:
+                self._onFull(nSamples - nWrite)
+        elif nSamples > totalSamples:  # only the latest samples would be kept
+            samples = samples[nSamples - totalSamples:]
+            nWrite = totalSamples
+        else:
+            nWrite = nSamples
+
+        # copy in up to two parts, wrapping around the end of the buffer
+        nDone = 0
+        while nDone < nWrite:
+            ringOffset = (self._nWritten + nDone) % totalSamples
+            nPart = min(nWrite - nDone, totalSamples - ringOffset)
+            self._samples[ringOffset:ringOffset + nPart, :] = \
+                samples[nDone:nDone + nPart, :]
+            nDone += nPart
+
+        # update the count last, the spill writer may only read up to it
+        self._nWritten += nWrite
+        self._loops = self._nWritten // totalSamples
+        self._offset = self._lastSample = self._nWritten % totalSamples
+        if spillWriter is not None and self.spaceRemaining < totalSamples // 2:
+            spillWriter.wake()  # don't wait, it's filling up
+
+        return nSamples - nWrite if spillWriter is not None else 0
+
     def clear(self):
+        """Clear the buffer. A new recording is started, writing over the
+        spill file if there is one.
+        """
+        self._stopSpilling()
+
         # reset all live attributes
         self._samples = None
         self._offset = 0
@@ -280,9 +584,81 @@ class RecordingBuffer:
         # reallocate buffer
         self._allocRecBuffer()
 
+    def close(self):
+        """Stop spilling samples to disk, writing out any remaining samples and
+        closing the spill file. Segments can still be read afterwards.
+        """
+        if self._spillWriter is not None:
+            self._spillWriter.stop()  # kept to read segments from
+
+    def _getRingSegment(self, idxStart, idxEnd):
+        """Samples between two indices into the recording in ring buffer
+        mode, read from the spill file where they are no longer in memory."""
+        nWritten = self._nWritten
+        totalSamples = self._totalSamples
+        idxEnd = min(max(idxEnd, 0), nWritten)
+        idxStart = min(max(idxStart, 0), idxEnd)
+
+        # start of the recording still in memory
+        idxMemory = max(0, nWritten - totalSamples)
+        parts = []
+        if idxStart < idxMemory:
+            if self._spillWriter is None:
+                logging.warning(
+                    "Audio recording segment starts before the oldest sample "
+                    "in the recording buffer, the samples before that have "
+                    "been written over.")
+            else:
+                parts.append(
+                    self._spillWriter.read(idxStart, min(idxEnd, idxMemory)))
+            idxStart = min(idxMemory, idxEnd)
+
+        while idxStart < idxEnd:
+            ringOffset = idxStart % totalSamples
+            nPart = min(idxEnd - idxStart, totalSamples - ringOffset)
+            parts.append(self._samples[ringOffset:ringOffset + nPart, :])
+            idxStart += nPart
+
+        if not parts:
+            return np.zeros((0, self._channels), dtype=np.float32)
+
+        return np.concatenate(parts)
+
+    def getSamples(self, idxStart=0, idxEnd=None):
+        """Get a copy of the samples between two indices into the recording.
+
+        In ring buffer mode, indices are from the start of the recording, and
+        samples no longer in memory are read from the spill file.
+
+        Parameters
+        ----------
+        idxStart : int
+            Index of the first sample.
+        idxEnd : int or None
+            Index after the last sample. If `None` the last sample recorded is
+            the last one.
+
+        Returns
+        -------
+        ndarray
+            Samples of shape `(nSamples, channels)`.
+
+        """
+        if self._loopback:
+            idxEnd = self._nWritten if idxEnd is None else idxEnd
+            return self._getRingSegment(idxStart, idxEnd)
+
+        idxEnd = self._lastSample if idxEnd is None else idxEnd
+
+        return np.array(self._samples[idxStart:idxEnd, :],
+                        dtype=np.float32, order='C')
+
     def getSegment(self, start=0, end=None):
         """Get a segment of recording data as an `AudioClip`.
 
+        In ring buffer mode, times are from the start of the recording, and
+        parts of the segment no longer in memory are read from the spill file.
+
         Parameters
         ----------
         start : float or int
@@ -298,12 +674,10 @@ class RecordingBuffer:
 
         """
         idxStart = int(start * self._sampleRateHz)
-        idxEnd = self._lastSample if end is None else int(
-            end * self._sampleRateHz)
+        idxEnd = None if end is None else int(end * self._sampleRateHz)
 
         return AudioClip(
-            np.array(self._samples[idxStart:idxEnd, :],
-                     dtype=np.float32, order='C'),
+            self.getSamples(idxStart, idxEnd),
             sampleRateHz=self._sampleRateHz)
 
 
@@ -351,6 +725,13 @@ class Microphone:
         of `1` will keep the microphone running (or 'hot') with reduces latency
         when th recording is started. Cannot be set when after initialization at
         this time.
+    loopback : bool
+        Use the recording buffer as a ring, keeping the latest samples of
+        recordings longer than the buffer. See `RecordingBuffer`.
+    spillFile : str or None
+        WAV or FLAC file to stream recordings to as they are made, so that
+        recordings of any length can be made with a buffer of a fixed size.
+        Implies `loopback=True`. See `RecordingBuffer`.
 
     Examples
     --------
@@ -382,6 +763,19 @@ class Microphone:
         mic.stop()  # stop recording
         audioClip = mic.getRecording()
 
+    Alternatively, poll the stream from a background thread, which also times
+    the onset of speech independently of the frame rate::
+
+        from psychopy.sound.detectors import VoiceOnsetDetector
+
+        voiceKey = VoiceOnsetDetector()
+        mic.addDetector(voiceKey)
+        mic.startPolling()  # poll every 5 ms while recording
+        startTime = mic.start()
+        ...
+        mic.stop()
+        rt = voiceKey.eventTime - startTime
+
     """
     # Force the use of WASAPI for audio capture on Windows. If `True`, only
     # WASAPI devices will be returned when calling static method
@@ -396,7 +790,9 @@ class Microphone:
                  maxRecordingSize=24000,
                  policyWhenFull='warn',
                  audioLatencyMode=None,
-                 audioRunMode=0):
+                 audioRunMode=0,
+                 loopback=False,
+                 spillFile=None):
 
         if not _hasPTB:  # fail if PTB is not installed
             raise ModuleNotFoundError(
@@ -513,7 +909,9 @@ class Microphone:
             sampleRateHz=self._sampleRateHz,
             channels=self._channels,
             maxRecordingSize=maxRecordingSize,
-            policyWhenFull=policyWhenFull
+            policyWhenFull=policyWhenFull,
+            loopback=loopback,
+            spillFile=spillFile
         )
 
         # setup clips and transcripts dicts
@@ -523,6 +921,11 @@ class Microphone:
         self.lastScript = None
         self._isStarted = False  # internal state
 
+        # background polling and event detection
+        self._pollLock = threading.RLock()
+        self._pollThread = None
+        self._detectors = []
+
         logging.debug('Audio capture device #{} ready'.format(
             self._device.deviceIndex))
 
@@ -736,20 +1139,25 @@ class Microphone:
         if self._stream is None:
             raise AudioStreamError("Stream not ready.")
 
-        # reset the writing 'head'
-        self._recording.seek(0, absolute=True)
+        with self._pollLock:
+            # reset the writing 'head'
+            self._recording.seek(0, absolute=True)
 
-        # reset warnings
-        # self._warnedRecBufferFull = False
+            # detect events in the new recording only
+            for detector in self._detectors:
+                detector.reset()
 
-        startTime = self._stream.start(
-            repetitions=0,
-            when=when,
-            wait_for_start=int(waitForStart),
-            stop_time=stopTime)
+            # reset warnings
+            # self._warnedRecBufferFull = False
+
+            startTime = self._stream.start(
+                repetitions=0,
+                when=when,
+                wait_for_start=int(waitForStart),
+                stop_time=stopTime)
 
-        # recording has begun or is scheduled to do so
-        self._isStarted = True
+            # recording has begun or is scheduled to do so
+            self._isStarted = True
 
         logging.debug(
             'Scheduled start of audio capture for device #{} at t={}.'.format(
@@ -815,14 +1223,16 @@ class Microphone:
         if not self.isStarted:
             return
 
-        # poll remaining samples, if any
-        if not self.isRecBufferFull:
-            self.poll()
+        with self._pollLock:
+            # poll remaining samples, if any
+            if not self.isRecBufferFull:
+                self.poll()
 
-        startTime, endPositionSecs, xruns, estStopTime = self._stream.stop(
-            block_until_stopped=int(blockUntilStopped),
-            stopTime=stopTime)
-        self._isStarted = False
+            startTime, endPositionSecs, xruns, estStopTime = \
+                self._stream.stop(
+                    block_until_stopped=int(blockUntilStopped),
+                    stopTime=stopTime)
+            self._isStarted = False
 
         logging.debug(
             ('Device #{} stopped capturing audio samples at estimated time '
@@ -864,7 +1274,9 @@ class Microphone:
         session.
 
         """
+        self.stopPolling()
         self._stream.close()
+        self._recording.close()  # finish writing the spill file, if any
         logging.debug('Stream closed')
 
     def poll(self):
@@ -879,32 +1291,128 @@ class Microphone:
         Can only be called between called of `start` (or `record`) and `stop`
         (or `pause`).
 
+        This may be called while the microphone is also being polled by its
+        background thread (see `startPolling`).
+
         Returns
         -------
         int
             Number of overruns in sampling.
 
         """
-        if not self.isStarted:
-            raise AudioStreamError(
-                "Cannot poll samples from audio device, not started.")
+        with self._pollLock:
+            if not self.isStarted:
+                raise AudioStreamError(
+                    "Cannot poll samples from audio device, not started.")
+
+            # figure out what to do with this other information
+            audioData, absRecPosition, overflow, cStartTime = \
+                self._stream.get_audio_data()
+
+            if overflow:
+                logging.warning(
+                    "Audio stream buffer overflow, some audio samples have "
+                    "been lost! To prevent this, ensure `Microphone.poll()` is "
+                    "being called often enough (or use `startPolling()`), or "
+                    "increase the size of the audio buffer with `bufferSecs`.")
+
+            overruns = self._recording.write(audioData)
+
+            # `cStartTime` is the capture time of the first sample polled
+            if len(audioData):
+                for detector in self._detectors:
+                    detector.process(
+                        audioData, self._sampleRateHz, cStartTime)
 
-        # figure out what to do with this other information
-        audioData, absRecPosition, overflow, cStartTime = \
-            self._stream.get_audio_data()
+        return overruns
 
-        if overflow:
-            logging.warning(
-                "Audio stream buffer overflow, some audio samples have been "
-                "lost! To prevent this, ensure `Microphone.poll()` is being "
-                "called often enough, or increase the size of the audio buffer "
-                "with `bufferSecs`.")
+    def _pollIfStarted(self):
+        """Poll samples if recording, called by the polling thread."""
+        with self._pollLock:
+            if self._isStarted:
+                self.poll()
 
-        overruns = self._recording.write(audioData)
+    @property
+    def isPolling(self):
+        """`True` if the microphone is polled by a background thread
+        (`bool`)."""
+        return self._pollThread is not None
 
-        return overruns
+    def startPolling(self, interval=POLL_INTERVAL):
+        """Poll the microphone from a background thread while recording.
 
-    def bank(self, tag=None, transcribe=False, **kwargs):
+        Samples are then added to the recording buffer, and passed to the
+        detectors, every `interval` seconds however often the experiment's
+        frame loop runs. The thread keeps running between recordings until
+        `stopPolling` or `close` is called.
+
+        Parameters
+        ----------
+        interval : float
+            Time between polls in seconds.
+
+        """
+        if self._pollThread is not None:
+            self.stopPolling()
+
+        self._pollThread = _MicrophonePollingThread(self, interval)
+        self._pollThread.start()
+
+    def stopPolling(self):
+        """Stop polling the microphone from a background thread."""
+        if self._pollThread is None:
+            return
+
+        self._pollThread.stop()
+        self._pollThread = None
+
+    @property
+    def detectors(self):
+        """Detectors the samples recorded are passed to (`list`)."""
+        return list(self._detectors)
+
+    def addDetector(self, detector):
+        """Detect events in the audio recorded.
+
+        Each block of samples polled is passed to the detector with its capture
+        time, in the time base of `psychopy.clock.getTime()` (that of
+        Psychtoolbox's `GetSecs()`) as returned by `start()`. Detectors are
+        reset when a recording starts.
+
+        Parameters
+        ----------
+        detector : `~psychopy.sound.detectors.AudioEventDetector`
+            Detector to add, such as a
+            `~psychopy.sound.detectors.VoiceOnsetDetector`.
+
+        Examples
+        --------
+        Time the onset of speech from the start of a recording::
+
+            from psychopy.sound.detectors import VoiceOnsetDetector
+
+            voiceKey = VoiceOnsetDetector()
+            mic.addDetector(voiceKey)
+            mic.startPolling()
+
+            startTime = mic.start()
+            ...  # frame loop
+            mic.stop()
+            if voiceKey.eventTime is not None:
+                rt = voiceKey.eventTime - startTime
+
+        """
+        with self._pollLock:
+            if detector not in self._detectors:
+                self._detectors.append(detector)
+
+    def removeDetector(self, detector):
+        """Stop passing the audio recorded to a detector."""
+        with self._pollLock:
+            if detector in self._detectors:
+                self._detectors.remove(detector)
+
+    def bank(self, tag=None, transcribe=False, queue=None, **kwargs):
         """Store current buffer as a clip within the microphone object.
 
         This method is used internally by the Microphone component in Builder,
@@ -918,6 +1426,13 @@ class Microphone:
         transcribe : bool or str
             Set to the name of a transcription engine (e.g. "GOOGLE") to
             transcribe using that engine, or set as `False` to not transcribe.
+        queue : `~psychopy.sound.transcribe.TranscriptionQueue`, bool or None
+            Queue to transcribe the clip with in the background, or `True` for
+            the shared queue (see `getTranscriptionQueue()`). The transcript
+            stored and returned is then a `concurrent.futures.Future` of it,
+            which can be added to the data with
+            `ExperimentHandler.addDataWhenReady()`. If `None` or `False`, the
+            clip is transcribed before this method returns.
         kwargs : dict
             Additional keyword arguments to pass to
             :class:`~psychopy.sound.AudioClip.transcribe()`.
@@ -952,8 +1467,15 @@ class Microphone:
                     "Invalid transcription engine {} specified.".format(
                         transcribe))
 
-            self.lastScript = self.lastClip.transcribe(
-                engine=engine, **kwargs)
+            if queue:
+                from .transcribe import getTranscriptionQueue
+                if queue is True:
+                    queue = getTranscriptionQueue()
+                self.lastScript = queue.submit(
+                    self.lastClip, engine=engine, **kwargs)
+            else:
+                self.lastScript = self.lastClip.transcribe(
+                    engine=engine, **kwargs)
         else:
             self.lastScript = "Transcription disabled."
 
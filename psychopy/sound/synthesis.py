@@ -0,0 +1,254 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Cache of synthesized sounds.
+
+Tones are synthesized each time a `Sound` is created or set to a note or
+frequency, and each time an `AudioClip` is generated with `AudioClip.sine()`
+and friends. When an experiment sets a sound with a different frequency or
+duration on each trial, that happens between trials, on the critical path. The
+samples of each tone are kept in a cache instead, so a tone is only
+synthesized the first time it's used. Call :func:`preSynthesize` with the
+conditions of a loop to synthesize all of its tones before the first trial.
+
+The cache keeps the most recently used sounds up to a total size in bytes.
+Cached samples are read-only, `Sound` and `AudioClip` copy them.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'SynthesisCache',
+    'getSynthesisCache',
+    'preSynthesize'
+]
+
+import collections
+import threading
+import numpy as np
+import psychopy.logging as logging
+from psychopy.tools.filetools import pathToString
+
+# default size of the cache, about 3 minutes of mono 48kHz audio as `float64`
+DEFAULT_CACHE_BYTES = 64 * 1024 ** 2
+
+
+class SynthesisCache:
+    """Least-recently-used cache of synthesized samples.
+
+    Samples are stored under a key describing how they were synthesized, e.g.
+    `(waveform, freqHz, duration, sampleRateHz, gain, hamming)`. Once the total
+    size of the samples stored exceeds `maxBytes`, the least recently used are
+    dropped.
+
+    Parameters
+    ----------
+    maxBytes : int
+        Total size of the samples to keep in bytes. `0` disables the cache.
+
+    Examples
+    --------
+    Allow the shared cache to hold more sounds::
+
+        from psychopy.sound import getSynthesisCache
+        getSynthesisCache().maxBytes = 256 * 1024 ** 2
+
+    """
+    def __init__(self, maxBytes=DEFAULT_CACHE_BYTES):
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._nBytes = 0
+        self._maxBytes = max(0, int(maxBytes))
+        self.hits = 0  # number of lookups found in the cache
+        self.misses = 0  # number of lookups synthesized
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def maxBytes(self):
+        """Total size of the samples to keep in bytes (`int`). Setting it
+        drops samples until the cache fits.
+        """
+        return self._maxBytes
+
+    @maxBytes.setter
+    def maxBytes(self, value):
+        with self._lock:
+            self._maxBytes = max(0, int(value))
+            self._evict()
+
+    @property
+    def nBytes(self):
+        """Total size of the samples in the cache in bytes (`int`).
+        """
+        return self._nBytes
+
+    def _evict(self):
+        """Drop the least recently used samples until the cache fits, with
+        the lock held."""
+        while self._nBytes > self._maxBytes and self._entries:
+            _, samples = self._entries.popitem(last=False)
+            self._nBytes -= samples.nbytes
+
+    def get(self, key, synthesize):
+        """Get the samples stored under `key`, synthesizing them if they
+        aren't in the cache.
+
+        Parameters
+        ----------
+        key : tuple
+            Hashable description of the samples.
+        synthesize : callable
+            Function returning the samples, called without arguments if they
+            aren't in the cache.
+
+        Returns
+        -------
+        ndarray
+            Read-only samples. Copy them to change them.
+
+        """
+        with self._lock:
+            samples = self._entries.get(key)
+            if samples is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return samples
+
+        # synthesize without the lock, so other threads can use the cache
+        samples = np.asarray(synthesize())
+        samples.flags.writeable = False
+        with self._lock:
+            self.misses += 1
+            if key not in self._entries and samples.nbytes <= self._maxBytes:
+                self._entries[key] = samples
+                self._nBytes += samples.nbytes
+                self._evict()
+
+        return samples
+
+    def clear(self):
+        """Drop all the samples in the cache.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._nBytes = 0
+
+
+_synthesisCache = SynthesisCache()
+
+
+def getSynthesisCache():
+    """Get the cache of synthesized samples shared by `Sound` and `AudioClip`.
+
+    Returns
+    -------
+    SynthesisCache
+
+    """
+    return _synthesisCache
+
+
+def _getConditionValue(condition, value, name):
+    """`value`, or the value of the column it names if it's a string."""
+    if not isinstance(value, str):
+        return value
+    if value not in condition:
+        raise KeyError(
+            "No column named `{}` for the {} of sounds.".format(value, name))
+
+    return condition[value]
+
+
+def preSynthesize(conditions, soundKey='sound', secs=0.5, octave=4,
+                  hamming=True, sampleRateHz=None):
+    """Synthesize the tones played on each trial of a loop before it starts.
+
+    Tones are synthesized as `Sound` would synthesize them with
+    `value=condition[soundKey]`, and stored in the synthesis cache, so creating
+    or setting a sound to them during the trials doesn't synthesize them again.
+    Values which aren't frequencies or note names (e.g. sound files) are
+    skipped.
+
+    Parameters
+    ----------
+    conditions : str or list of dict
+        Conditions of the loop, or the name of a conditions file to load with
+        :func:`~psychopy.data.importConditions`.
+    soundKey : str or list of str
+        Column(s) of the conditions giving the sound value, one per sound
+        played in a trial.
+    secs : float or str
+        Duration of the tones in seconds, or the name of the column giving it.
+    octave : int or str
+        Octave of note names, or the name of the column giving it.
+    hamming : bool
+        Whether the tones are apodized, as the `hamming` argument of `Sound`.
+    sampleRateHz : int or None
+        Sample rate the sounds will be created with. `None` uses the default
+        of the audio library, as `Sound` does when it's not given a rate.
+
+    Returns
+    -------
+    int
+        Number of different tones in the conditions.
+
+    Examples
+    --------
+    Synthesize the tones of a loop before the first trial::
+
+        from psychopy import data, sound
+        sound.preSynthesize('conditions.csv', soundKey='toneFreq',
+                            secs='toneDur')
+        trials = data.TrialHandler(
+            data.importConditions('conditions.csv'), nReps=5)
+
+    """
+    from ._base import _getNoteFreq, _getToneSamples, knownNoteNames
+
+    if not isinstance(conditions, (list, tuple)):
+        from psychopy.data import importConditions
+        conditions = importConditions(pathToString(conditions))
+    soundKeys = [soundKey] if isinstance(soundKey, str) else list(soundKey)
+
+    if sampleRateHz is None:
+        from psychopy import sound
+        # the default rate doesn't depend on the instance
+        sampleRateHz = sound.Sound._getDefaultSampleRate(sound.Sound)
+
+    tones = set()
+    for condition in conditions:
+        thisSecs = float(_getConditionValue(condition, secs, 'duration'))
+        if thisSecs < 0:  # played forever by looping 10 s
+            thisSecs = 10.0
+        for key in soundKeys:
+            value = condition.get(key)
+            try:
+                freq = float(value)
+            except (ValueError, TypeError):
+                if not isinstance(value, str) or \
+                        value.capitalize() not in knownNoteNames:
+                    continue  # e.g. a file
+                freq = _getNoteFreq(
+                    value.capitalize(),
+                    int(_getConditionValue(condition, octave, 'octave')))
+            if 37 <= freq <= 20000:
+                tones.add((freq, thisSecs))
+
+    for freq, thisSecs in tones:
+        _getToneSamples(freq, thisSecs, sampleRateHz, hamming)
+    logging.info("Synthesized {} tones for {} conditions".format(
+        len(tones), len(conditions)))
+
+    return len(tones)
+
+
+if __name__ == "__main__":
+    pass
@@ -14,10 +14,19 @@ __all__ = [
     'TRANSCR_LANG_DEFAULT',
     'recognizerEngineValues',
     'recognizeSphinx',
-    'recognizeGoogle'
+    'recognizeGoogle',
+    'TranscriptionQueue',
+    'getTranscriptionQueue'
 ]
 
+import atexit
+import collections
 import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import Future
 import psychopy.logging as logging
 from psychopy.alerts import alert
 from pathlib import Path
@@ -234,8 +243,8 @@ def transcribe(audioClip, engine='sphinx', language='en-US', expectedWords=None,
 
     Speech-to-text conversion blocks the main application thread when used on
     Python. Don't transcribe audio during time-sensitive parts of your
-    experiment! This issue is known to the developers and will be fixed in a
-    later release.
+    experiment! Use a :class:`TranscriptionQueue` to transcribe clips in the
+    background instead.
 
     Parameters
     ----------
@@ -652,5 +661,267 @@ def recognizeGoogle(audioClip=None, language='en-US', expectedWords=None,
     return toReturn
 
 
+# ------------------------------------------------------------------------------
+# Transcription in background processes
+#
+
+# queues to close on exit
+_queues = []
+
+# queue shared by microphones which don't specify one
+_defaultQueue = None
+
+
+class _TranscriptionWorker:
+    """A transcription process and the connection commands are sent through.
+
+    Parameters
+    ----------
+    timeout : float
+        Longest time to wait for the process to connect in seconds.
+
+    """
+    def __init__(self, timeout=30.0):
+        from psychopy.tools.systemtools import startWorkerProcess
+        from . import _transcribeworker
+
+        self.proc, self.conn = startWorkerProcess(
+            _transcribeworker.__file__, (list(sys.path),), timeout)
+
+    def request(self, op, value=None):
+        """Send a command and wait for the reply."""
+        try:
+            self.conn.send((op, value))
+            return self.conn.recv()
+        except (EOFError, OSError):
+            raise RuntimeError("Transcription process has exited.")
+
+    def shutdown(self, timeout=2.0):
+        try:
+            self.conn.send(('shutdown', None))
+        except (EOFError, OSError):
+            pass
+        try:
+            self.proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.conn.close()
+
+
+class TranscriptionQueue:
+    """Queue of clips to transcribe in background processes.
+
+    Clips are transcribed by up to `nWorkers` processes, started as they are
+    needed. Each loads the engines in `warmUp` when it starts, and keeps them
+    for all the clips it transcribes. A process takes up to `batchSize` of the
+    clips waiting each time, so clips are sent in batches when they are
+    submitted faster than they can be transcribed.
+
+    Parameters
+    ----------
+    nWorkers : int or None
+        Largest number of processes. `None` uses one less than the number of
+        processor cores, up to 4.
+    batchSize : int
+        Largest number of clips sent to a process at once.
+    warmUp : list or tuple
+        Engines to load when a process starts, rather than for the first clip.
+
+    Examples
+    --------
+    Transcribe a recording while the next trial runs, adding the result to
+    the data of this trial when it's ready::
+
+        queue = TranscriptionQueue()
+        future = queue.submit(mic.getRecording(), expectedWords=['yes', 'no'])
+        thisExp.addDataWhenReady('mic.script', future)
+
+    """
+    def __init__(self, nWorkers=None, batchSize=4, warmUp=('sphinx',)):
+        if nWorkers is None:
+            nWorkers = min(4, (os.cpu_count() or 2) - 1)
+        self.nWorkers = max(1, int(nWorkers))
+        self.batchSize = max(1, int(batchSize))
+        self.warmUp = tuple(warmUp)
+
+        self._items = collections.deque()  # `(future, clip, kwargs)`
+        self._cond = threading.Condition()
+        self._threads = []
+        self._nIdle = 0  # threads waiting for clips
+        self._isClosed = False
+
+        _queues.append(self)
+
+    @property
+    def nPending(self):
+        """Number of clips waiting to be sent to a process (`int`)."""
+        return len(self._items)
+
+    def submit(self, audioClip, engine='sphinx', language='en-US',
+               expectedWords=None, config=None):
+        """Transcribe a clip in the background.
+
+        Parameters are as for :func:`transcribe`.
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future of the :class:`TranscriptionResult`. If transcription
+            fails, the error is raised by its `result()` method.
+
+        """
+        if isinstance(audioClip, AudioClip):
+            clip = (audioClip.samples, audioClip.sampleRateHz)
+        else:
+            clip = tuple(audioClip)
+        kwargs = {'engine': engine,
+                  'language': language,
+                  'expectedWords': expectedWords,
+                  'config': config}
+
+        future = Future()
+        with self._cond:
+            if self._isClosed:
+                raise RuntimeError("Transcription queue has been closed.")
+            self._items.append((future, clip, kwargs))
+            if not self._nIdle and len(self._threads) < self.nWorkers:
+                thread = threading.Thread(target=self._runWorker)
+                thread.daemon = True
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+
+        return future
+
+    def _failPending(self, err):
+        """Fail all the clips waiting, when a process can't be started."""
+        with self._cond:
+            items, self._items = self._items, collections.deque()
+        for future, _, _ in items:
+            if future.set_running_or_notify_cancel():
+                future.set_exception(err)
+
+    def _takeBatch(self):
+        """Wait for clips to transcribe, returning `None` once closed."""
+        with self._cond:
+            self._nIdle += 1
+            while not self._items and not self._isClosed:
+                self._cond.wait()
+            self._nIdle -= 1
+            if not self._items:
+                return None
+            nItems = min(self.batchSize, len(self._items))
+            batch = [self._items.popleft() for _ in range(nItems)]
+
+        return [item for item in batch if item[0].set_running_or_notify_cancel()]
+
+    def _runWorker(self):
+        """Run a process, transcribing batches of clips with it."""
+        worker = None
+        try:
+            worker = _TranscriptionWorker()
+            for err in worker.request('warmUp', self.warmUp):
+                logging.warning(
+                    "Transcription engine could not be loaded, " + err)
+
+            while True:
+                batch = self._takeBatch()
+                if batch is None:
+                    break
+                if not batch:
+                    continue
+                try:
+                    results = worker.request(
+                        'batch', [(clip, kwargs) for _, clip, kwargs in batch])
+                except Exception as err:
+                    for future, _, _ in batch:
+                        future.set_exception(err)
+                    raise
+                for (future, _, _), (ok, value) in zip(batch, results):
+                    if ok:
+                        future.set_result(value)
+                    else:
+                        future.set_exception(value)
+        except Exception as err:
+            logging.error("Transcription process failed: {}".format(err))
+            with self._cond:
+                self._threads.remove(threading.current_thread())
+                isLast = not self._threads
+            if isLast:
+                self._failPending(err)
+        finally:
+            if worker is not None:
+                worker.shutdown()
+
+    def close(self, wait=True, timeout=60.0):
+        """Stop the processes. Clips can't be submitted afterwards.
+
+        Parameters
+        ----------
+        wait : bool
+            Transcribe the clips waiting first, and wait for the processes to
+            exit. If `False`, clips waiting are cancelled.
+        timeout : float or None
+            Longest time to wait in seconds, `None` to wait until all the
+            clips have been transcribed. Clips still waiting after that are
+            cancelled.
+
+        """
+        with self._cond:
+            self._isClosed = True
+            if not wait:
+                items, self._items = self._items, collections.deque()
+                for future, _, _ in items:
+                    future.cancel()
+            self._cond.notify_all()
+            threads = list(self._threads)
+
+        if wait:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            for thread in threads:
+                thread.join(None if deadline is None else
+                            max(0.0, deadline - time.monotonic()))
+            if any(thread.is_alive() for thread in threads):
+                logging.warning(
+                    "Transcription queue closed before all clips were "
+                    "transcribed")
+                with self._cond:
+                    items, self._items = self._items, collections.deque()
+                for future, _, _ in items:
+                    future.cancel()
+
+        if self in _queues:
+            _queues.remove(self)
+
+
+def getTranscriptionQueue():
+    """Get the transcription queue shared by microphones, creating it on first
+    use.
+
+    Returns
+    -------
+    TranscriptionQueue
+
+    """
+    global _defaultQueue
+    if _defaultQueue is None:
+        _defaultQueue = TranscriptionQueue()
+
+    return _defaultQueue
+
+
+def closeTranscriptionQueues():
+    """Close all transcription queues, after transcribing the clips waiting.
+    This is called when Python exits.
+    """
+    global _defaultQueue
+    for queue in list(_queues):
+        queue.close()
+    _defaultQueue = None
+
+
+atexit.register(closeTranscriptionQueues)
+
+
 if __name__ == "__main__":
     pass
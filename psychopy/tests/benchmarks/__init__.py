@@ -0,0 +1,7 @@
+"""Benchmarks for performance sensitive parts of PsychoPy.
+
+These are scripts rather than tests, run them as modules, e.g.::
+
+    python -m psychopy.tests.benchmarks.tesselation
+
+"""
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Measure the time taken to import PsychoPy's packages, using the
+``-X importtime`` option of a fresh interpreter for each measurement.
+
+Run with::
+
+    python -m psychopy.tests.benchmarks.importtime
+
+or, to fail (exit status 1) if importing any of the packages takes longer
+than a limit, e.g. 1.5 s::
+
+    python -m psychopy.tests.benchmarks.importtime --max 1.5
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+import argparse
+import subprocess
+import sys
+
+defaultModules = ('psychopy.visual', 'psychopy.hardware', 'psychopy.sound')
+
+
+def parseImportTime(output):
+    """Parse the report printed by ``python -X importtime``.
+
+    Returns
+    -------
+    list
+        `(name, selfSecs, cumulativeSecs)` for each module imported, in the
+        order they finished importing.
+
+    """
+    times = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        selfUs, cumulativeUs, name = line[len('import time:'):].split('|')
+        try:
+            times.append(
+                (name.strip(), int(selfUs) / 1e6, int(cumulativeUs) / 1e6))
+        except ValueError:  # the header line
+            continue
+    return times
+
+
+def measureImportTime(module):
+    """Time importing a module in a new interpreter.
+
+    Returns
+    -------
+    tuple
+        `(secs, times)`, the cumulative time taken to import `module` and
+        the times of all modules imported (see :func:`parseImportTime`).
+
+    """
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import ' + module],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        universal_newlines=True)
+    if proc.returncode != 0:
+        raise RuntimeError("Importing {} failed:\n{}".format(
+            module, proc.stderr.strip().splitlines()[-1]))
+    times = parseImportTime(proc.stderr)
+    secs = [cumulative for name, _, cumulative in times if name == module]
+    return secs[-1], times
+
+
+def run(modules=defaultModules, repeats=3, nSlowest=5, maxSecs=None):
+    """Time importing each module and print a table of the results, with the
+    slowest modules each one imports.
+
+    Parameters
+    ----------
+    modules : list of str
+        Modules to import.
+    repeats : int
+        Number of times to import each module. The fastest time is reported,
+        the others being slowed down by the rest of the system.
+    nSlowest : int
+        Number of the slowest modules imported to list for each.
+    maxSecs : float or None
+        Time limit for importing each module.
+
+    Returns
+    -------
+    tuple
+        `(results, tooSlow)`, where `results` is `{module: secs}`, missing
+        modules which couldn't be imported, and `tooSlow` lists the modules
+        taking longer than `maxSecs`.
+
+    """
+    results = {}
+    tooSlow = []
+    header = "{:<24}{:>12}".format('module', 'import (ms)')
+    print(header)
+    print('-' * len(header))
+    for module in modules:
+        try:
+            measures = [measureImportTime(module) for _ in range(repeats)]
+        except RuntimeError as err:
+            print("{:<24}{:>12}  {}".format(module, 'n/a', err))
+            continue
+        secs, times = min(measures, key=lambda measure: measure[0])
+        results[module] = secs
+        print("{:<24}{:>12.0f}".format(module, secs * 1000.))
+        # other than the module itself and the packages containing it
+        slowest = sorted(
+            (t for t in times if not module.startswith(t[0])),
+            key=lambda t: t[1], reverse=True)[:nSlowest]
+        for name, selfSecs, _ in slowest:
+            print("    {:<40}{:>8.0f}".format(name, selfSecs * 1000.))
+        if maxSecs is not None and secs > maxSecs:
+            tooSlow.append(module)
+
+    if tooSlow:
+        print("Importing {} took longer than {} s".format(
+            ', '.join(tooSlow), maxSecs))
+    return results, tooSlow
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', default=defaultModules)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--max', type=float, default=None, dest='maxSecs',
+                        help="fail if an import takes longer (in seconds)")
+    args = parser.parse_args()
+    _, tooSlow = run(args.modules, args.repeats, maxSecs=args.maxSecs)
+    sys.exit(1 if tooSlow else 0)
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare the time taken to tesselate shapes with the GLU tesselator, NumPy
+ear clipping and the tesselation cache used by `ShapeStim`.
+
+Run with::
+
+    python -m psychopy.tests.benchmarks.tesselation
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+import timeit
+import numpy as np
+
+from psychopy.tools.mathtools import triangulatePolygon
+from psychopy.visual import shape
+
+
+def _regularPolygon(nVerts, radii=1.0):
+    th = np.linspace(0, 2 * np.pi, nVerts, endpoint=False)
+    return np.column_stack((radii * np.cos(th), radii * np.sin(th)))
+
+
+def getShapes():
+    """Shapes to benchmark as a dict of `{name: vertices}`."""
+    np.random.seed(12345)
+    return {
+        'rectangle (4)': np.array(shape.knownShapes['rectangle'], float),
+        'cross (12)': np.array(shape.knownShapes['cross'], float),
+        'star (20)': _regularPolygon(20, np.where(np.arange(20) % 2, .4, 1.)),
+        'circle (64)': _regularPolygon(64),
+        'circle (256)': _regularPolygon(256),
+        'random (200)': _regularPolygon(200, np.random.uniform(.3, 1., 200)),
+    }
+
+
+def run(repeats=50):
+    """Time each method and print a table of milliseconds per shape.
+
+    Returns
+    -------
+    dict
+        Times in ms as `{shapeName: (glu, earClip, cached)}`, where `glu` is
+        `None` if the GLU tesselator is not available.
+
+    """
+    results = {}
+    header = "{:<16}{:>12}{:>12}{:>12}".format(
+        'shape', 'GLU', 'ear clip', 'cached')
+    print(header)
+    print('-' * len(header))
+    for name, verts in getShapes().items():
+        if shape.haveGLUTesselator:
+            glu = timeit.timeit(
+                lambda: shape._tesselateGLU([verts]), number=repeats)
+            glu = glu / repeats * 1000.
+        else:
+            glu = None
+        earClip = timeit.timeit(
+            lambda: triangulatePolygon(verts), number=repeats)
+        earClip = earClip / repeats * 1000.
+        shape.getTesselation([verts])  # make sure it's in the cache
+        cached = timeit.timeit(
+            lambda: shape.getTesselation([verts]), number=repeats)
+        cached = cached / repeats * 1000.
+        results[name] = (glu, earClip, cached)
+
+        gluStr = 'n/a' if glu is None else "{:.3f}".format(glu)
+        print("{:<16}{:>12}{:>12.3f}{:>12.3f}".format(
+            name, gluStr, earClip, cached))
+
+    shape.clearTesselationCache()
+    return results
+
+
+if __name__ == "__main__":
+    run()
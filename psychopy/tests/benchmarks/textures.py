@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Compare loading images from PNG, JPEG and compressed DDS files: the time to
+load each file into data ready for the graphics card, the time to upload it
+and the video memory it uses.
+
+Run with::
+
+    python -m psychopy.tests.benchmarks.textures
+
+Upload times are only measured if a window can be opened.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+import ctypes
+import os
+import tempfile
+import timeit
+import numpy as np
+from PIL import Image
+import pyglet.gl as GL
+
+from psychopy.tools.imagetools import compressImage, writeDDS, readDDS
+from psychopy.visual.basevisual import (_uploadTexture,
+                                        _uploadCompressedTexture)
+from psychopy.visual.preloader import _decodeImage
+
+
+def makeImage(size=2048, seed=12345):
+    """A smooth random RGB image, to stand in for a photograph."""
+    rng = np.random.RandomState(seed)
+    small = rng.randint(0, 256, (size // 32, size // 32, 3)).astype(np.uint8)
+    im = Image.fromarray(small).resize((size, size), Image.BICUBIC)
+    noise = rng.normal(0, 8, (size, size, 3))
+    return Image.fromarray(
+        np.clip(np.asarray(im) + noise, 0, 255).astype(np.uint8))
+
+
+def _loadImage(fileName):
+    # converted to texture data as ImageStim does for image files
+    return _decodeImage(fileName)
+
+
+def _uploadImage(data):
+    texID = GL.GLuint()
+    GL.glGenTextures(1, ctypes.byref(texID))
+    _uploadTexture(texID, data[0], data[1], data[2], data[3], True, False)
+    GL.glFinish()
+    GL.glDeleteTextures(1, texID)
+
+
+def _uploadCompressed(image):
+    texID = GL.GLuint()
+    GL.glGenTextures(1, ctypes.byref(texID))
+    _uploadCompressedTexture(texID, image, True, False)
+    GL.glFinish()
+    GL.glDeleteTextures(1, texID)
+
+
+def run(size=2048, repeats=5, win=None):
+    """Time loading and uploading an image stored in each format and print a
+    table of the results.
+
+    Parameters
+    ----------
+    size : int
+        Width and height of the image.
+    repeats : int
+        Number of times to repeat each measurement.
+    win : :class:`~psychopy.visual.Window` or None
+        Window to upload to. `None` opens one if possible.
+
+    Returns
+    -------
+    dict
+        `{format: (fileKB, loadMs, uploadMs, videoKB)}`, where `uploadMs` is
+        `None` if no window could be opened.
+
+    """
+    if win is None:
+        try:
+            from psychopy import visual
+            win = visual.Window([64, 64], autoLog=False)
+        except Exception:
+            win = None
+
+    im = makeImage(size)
+    folder = tempfile.mkdtemp()
+    files = {
+        'PNG': os.path.join(folder, 'image.png'),
+        'JPEG': os.path.join(folder, 'image.jpg'),
+        'DDS (DXT1)': os.path.join(folder, 'image.dds')}
+    im.save(files['PNG'])
+    im.save(files['JPEG'], quality=90)
+    writeDDS(files['DDS (DXT1)'], compressImage(im))
+
+    results = {}
+    header = "{:<12}{:>12}{:>12}{:>12}{:>12}".format(
+        'format', 'file (KB)', 'load (ms)', 'upload (ms)', 'video (KB)')
+    print("{0}x{0} image".format(size))
+    print(header)
+    print('-' * len(header))
+    for name, fileName in files.items():
+        if fileName.endswith('.dds'):
+            load, upload = readDDS, _uploadCompressed
+        else:
+            load, upload = _loadImage, _uploadImage
+        loadMs = timeit.timeit(
+            lambda: load(fileName), number=repeats) / repeats * 1000.
+        data = load(fileName)
+        if fileName.endswith('.dds'):
+            videoKB = data.nBytes / 1024.
+        else:
+            videoKB = data[0].nbytes * 4 / 3 / 1024.  # with mipmaps
+        if win is not None:
+            uploadMs = timeit.timeit(
+                lambda: upload(data), number=repeats) / repeats * 1000.
+            uploadStr = "{:.2f}".format(uploadMs)
+        else:
+            uploadMs = None
+            uploadStr = 'n/a'
+        fileKB = os.path.getsize(fileName) / 1024.
+        results[name] = (fileKB, loadMs, uploadMs, videoKB)
+        print("{:<12}{:>12.0f}{:>12.2f}{:>12}{:>12.0f}".format(
+            name, fileKB, loadMs, uploadStr, videoKB))
+
+    for fileName in files.values():
+        os.remove(fileName)
+    os.rmdir(folder)
+    return results
+
+
+if __name__ == "__main__":
+    run()
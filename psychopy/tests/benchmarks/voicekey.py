@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Time detecting the onset and offset of speech in a corpus of WAV files with
+the streaming voice-keys, in one process and in one process per core, and
+compare it with the duration of the audio.
+
+Run with::
+
+    python -m psychopy.tests.benchmarks.voicekey
+
+The corpus is synthetic: a vowel-like harmonic sound with a random onset and
+duration in quiet noise, so the errors in the times found are reported too.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+import soundfile as sf
+
+from psychopy.voicekey.streaming import detect_files
+
+
+def makeUtterance(duration, sampleRateHz, rng):
+    """A vowel-like sound: harmonics of a wavering pitch, faded in and out."""
+    t = np.arange(int(duration * sampleRateHz)) / sampleRateHz
+    f0 = rng.uniform(100, 220) * (1 + 0.05 * np.sin(2 * np.pi * 3 * t))
+    phase = 2 * np.pi * np.cumsum(f0) / sampleRateHz
+    sound = sum(np.sin(k * phase) / k for k in range(1, 12))
+    fade = np.minimum(1.0, np.minimum(t, duration - t) / 0.01)
+    return 0.3 * sound * fade
+
+
+def makeCorpus(folder, nFiles=64, duration=3.0, sampleRateHz=44100,
+               seed=12345):
+    """Write `nFiles` WAV files to `folder`.
+
+    Returns
+    -------
+    list
+        `(fileName, onset, offset)` of each file.
+
+    """
+    rng = np.random.RandomState(seed)
+    corpus = []
+    for i in range(nFiles):
+        signal = rng.normal(0, 0.002, int(duration * sampleRateHz))
+        onset = rng.uniform(0.3, 1.0)
+        offset = onset + rng.uniform(0.4, duration - onset - 0.5)
+        start = int(onset * sampleRateHz)
+        utterance = makeUtterance(offset - onset, sampleRateHz, rng)
+        signal[start:start + len(utterance)] += utterance
+        fileName = os.path.join(folder, 'utterance{:03d}.wav'.format(i))
+        sf.write(fileName, signal, sampleRateHz, subtype='PCM_16')
+        corpus.append((fileName, onset, offset))
+
+    return corpus
+
+
+def run(nFiles=64, duration=3.0, nWorkers=None):
+    """Time detection over a corpus and print a table of the results.
+
+    Parameters
+    ----------
+    nFiles : int
+        Number of files in the corpus.
+    duration : float
+        Duration of each file in seconds.
+    nWorkers : int or None
+        Number of processes to compare with one. `None` uses one per core.
+
+    Returns
+    -------
+    dict
+        `{nWorkers: (secs, timesRealTime)}`.
+
+    """
+    if nWorkers is None:
+        nWorkers = os.cpu_count() or 1
+
+    folder = tempfile.mkdtemp()
+    try:
+        corpus = makeCorpus(folder, nFiles, duration)
+        fileNames = [fileName for fileName, _, _ in corpus]
+        audioSecs = nFiles * duration
+
+        results = {}
+        header = "{:<10}{:>12}{:>16}{:>16}{:>16}".format(
+            'processes', 'time (s)', 'x real time', 'onset err (ms)',
+            'offset err (ms)')
+        print("{} files of {} s".format(nFiles, duration))
+        print(header)
+        print('-' * len(header))
+        for workers in sorted({1, nWorkers}):
+            t0 = time.perf_counter()
+            found = detect_files(fileNames, nworkers=workers)
+            secs = time.perf_counter() - t0
+
+            onsetErr = [abs(r['onset'] - onset) * 1000.
+                        for r, (_, onset, _) in zip(found, corpus)
+                        if r['onset'] is not None]
+            offsetErr = [abs(r['offset'] - offset) * 1000.
+                         for r, (_, _, offset) in zip(found, corpus)
+                         if r['offset'] is not None]
+            results[workers] = (secs, audioSecs / secs)
+            print("{:<10}{:>12.2f}{:>16.0f}{:>16.1f}{:>16.1f}".format(
+                workers, secs, audioSecs / secs,
+                np.median(onsetErr) if onsetErr else float('nan'),
+                np.median(offsetErr) if offsetErr else float('nan')))
+    finally:
+        shutil.rmtree(folder)
+
+    return results
+
+
+if __name__ == "__main__":
+    run()
@@ -100,6 +100,53 @@ class TestExperimentHandler():
             contents = f.read()
         assert contents == "mutable,\n[1],\n[9999],\n"
 
+    def test_addDataWhenReady(self):
+        from concurrent.futures import Future
+
+        exp = data.ExperimentHandler(
+            name='testExp',
+            savePickle=False,
+            saveWideText=True,
+            dataFileName=self.tmpDir + 'pending'
+            )
+
+        futures = [Future(), Future()]
+        for future in futures:
+            exp.addData('resp', 'key')
+            exp.addDataWhenReady('script', future)
+            exp.nextEntry()
+        assert not exp.waitForPendingData(timeout=0)
+
+        # added to the rows they were for, once ready
+        futures[1].set_result('yes')
+        futures[0].set_exception(ValueError('failed'))
+        assert exp.waitForPendingData(timeout=0)
+        exp.saveAsWideText(exp.dataFileName + '.csv', delim=',')
+        with io.open(exp.dataFileName + '.csv', 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == "resp,script,\nkey,ValueError: failed,\nkey,yes,\n"
+
+    def test_close_with_pending_data(self, monkeypatch):
+        from concurrent.futures import Future
+        from psychopy.data import experiment
+
+        monkeypatch.setattr(experiment, 'PENDING_DATA_TIMEOUT', 0.1)
+        exp = data.ExperimentHandler(
+            name='testExp',
+            savePickle=False,
+            saveWideText=True,
+            dataFileName=self.tmpDir + 'neverReady'
+            )
+        exp.addData('resp', 'key')
+        exp.addDataWhenReady('script', Future())  # never ready
+        exp.nextEntry()
+
+        # saves what's there rather than waiting forever
+        exp.close()
+        with io.open(exp.dataFileName + '.csv', 'r', encoding='utf-8-sig') as f:
+            contents = f.read()
+        assert contents == "resp,script,\nkey,,\n"
+
     def test_unicode_conditions(self):
         fileName = self.tmpDir + 'unicode_conds'
 
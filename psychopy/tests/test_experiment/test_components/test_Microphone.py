@@ -0,0 +1,42 @@
+from . import _TestDisabledMixin, _TestBaseComponentsMixin
+from psychopy.experiment import Experiment
+from psychopy.experiment.loops import TrialHandler
+from psychopy.experiment.routines import Routine
+from psychopy.experiment.components.microphone import MicrophoneComponent
+
+
+class TestMicrophoneComponent(_TestBaseComponentsMixin, _TestDisabledMixin):
+    """
+    Test that Microphone components have the correct params and write as expected.
+    """
+
+    def setup_method(self):
+        # Make blank experiment
+        self.exp = Experiment()
+        # Make blank routine
+        self.routine = Routine(name="testRoutine", exp=self.exp)
+        self.exp.addRoutine("testRoutine", self.routine)
+        self.exp.flow.addRoutine(self.routine, 0)
+        # Add loop around routine
+        self.loop = TrialHandler(exp=self.exp, name="testLoop")
+        self.exp.flow.addLoop(self.loop, 0, -1)
+        # Make Microphone component
+        self.comp = MicrophoneComponent(exp=self.exp, parentName="testRoutine", name="testMic")
+        self.routine.addComponent(self.comp)
+
+    def test_transcribe_in_background(self):
+        """
+        Transcripts should be made in the background and added to the data once ready, rather than holding up the
+        next routine.
+        """
+        self.comp.params['transcribe'].val = True
+        script = self.exp.writeScript(target="PsychoPy")
+        assert "queue=True" in script
+        assert "thisExp.addDataWhenReady('testMic.script', testMicScript)" in script
+        assert "testLoop.addData('testMic.script'" not in script
+
+        # no queue without transcription
+        self.comp.params['transcribe'].val = False
+        script = self.exp.writeScript(target="PsychoPy")
+        assert "queue=True" not in script
+        assert "'testMic.script'" not in script
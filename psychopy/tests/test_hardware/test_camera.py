@@ -0,0 +1,104 @@
+import os
+import time
+
+import pytest
+
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+from psychopy.hardware import camera
+
+movieFile = os.path.join(TESTS_DATA_PATH, 'testMovie.mp4')
+
+
+def test_frame_ring_buffer():
+    ring = camera.FrameRingBuffer(4)
+    assert ring.read() is None
+    ring.write([b'\x01\x02', b'\x03\x04'], 'first')
+    frame, info = ring.read()
+    assert list(frame) == [1, 2, 3, 4] and info == 'first'
+    assert not frame.flags.writeable
+    assert ring.read() is None  # nothing new
+
+    # the frame being read isn't written over, older ones are dropped
+    for value in range(5, 10):
+        ring.write([bytes([value]) * 4], value)
+    assert list(frame) == [1, 2, 3, 4]
+    assert ring.read()[1] == 9
+    assert ring.nWritten == 6 and ring.nDropped == 4
+
+
+@pytest.mark.parametrize('spill', [False, True])
+def test_recorded_samples_reader(tmp_path, spill):
+    import threading
+    import types
+    import numpy as np
+    from psychopy.sound.microphone import RecordingBuffer
+
+    spillFile = str(tmp_path / 'mic.wav') if spill else None
+    recording = RecordingBuffer(sampleRateHz=1000, channels=1,
+                                maxRecordingSize=4, spillFile=spillFile)
+    mic = types.SimpleNamespace(recording=recording,
+                                _pollLock=threading.RLock())
+    reader = camera._RecordedSamplesReader(mic)
+
+    # the camera reads the samples as they come in, leaving the recording
+    # (a ring buffer goes round more than twice)
+    nSamples = 2500 if spill else 900
+    signal = np.arange(nSamples, dtype=np.float32)[:, None] / nSamples
+    parts = []
+    for start in range(0, len(signal), 70):
+        assert not recording.write(signal[start:start + 70])
+        parts.append(reader.read())
+        time.sleep(0.002)
+    assert np.array_equal(np.concatenate(parts), signal)
+    assert not len(reader.read())
+    recording.close()
+    assert np.allclose(recording.getSegment().samples, signal, atol=1e-6)
+
+
+def test_virtual_camera():
+    pytest.importorskip('ffpyplayer')
+    pytest.importorskip('imageio_ffmpeg')
+    cam = camera.Camera(movieFile)
+    assert cam._cameraInfo.cameraAPI == camera.CAMERA_API_VIRTUAL
+    cam.open()
+    try:
+        frames = set()
+        startTime = time.time()
+        while time.time() - startTime < 0.5:
+            frame = cam.getVideoFrame()
+            frames.add(id(frame))
+            time.sleep(0.01)
+        assert len(frames) > 5
+        assert frame.size == (352, 288)
+        assert frame.colorData.size == 352 * 288 * 3
+    finally:
+        cam.close()
+
+    report = cam.getLatencyReport()
+    assert report['copy']['n'] >= len(frames)
+    assert report['wait']['mean'] >= 0.0
+    assert report['display']['n'] == 0  # never drawn
+
+
+def test_render_video(tmp_path):
+    imageio_ffmpeg = pytest.importorskip('imageio_ffmpeg')
+    import wave
+    import numpy as np
+
+    audioFile = str(tmp_path / 'audio.wav')
+    with wave.open(audioFile, 'wb') as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(8000)
+        f.writeframes(np.zeros(8000, dtype='<i2').tobytes())
+
+    # the video stream is copied, not encoded again
+    outFile = str(tmp_path / 'out.mkv')
+    nBytes = camera.renderVideo(outFile, movieFile, audioFile)
+    assert nBytes == os.path.getsize(outFile)
+    inMeta = next(imageio_ffmpeg.read_frames(movieFile))
+    outMeta = next(imageio_ffmpeg.read_frames(outFile))
+    assert outMeta['codec'] == inMeta['codec']
+    assert outMeta['size'] == inMeta['size']
+    assert outMeta['audio_codec'] is not None
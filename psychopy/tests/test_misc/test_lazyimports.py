@@ -0,0 +1,68 @@
+import subprocess
+import sys
+
+from psychopy import visual, hardware
+
+
+def _importedModules(module):
+    """Names of the modules loaded by importing `module` in a new
+    interpreter."""
+    code = "import sys, {}; print('\\n'.join(sys.modules))".format(module)
+    out = subprocess.check_output([sys.executable, '-c', code],
+                                  universal_newlines=True)
+    return set(out.split())
+
+
+def test_visual_lazy():
+    modules = _importedModules('psychopy.visual')
+    assert 'psychopy.visual.form' not in modules
+    assert 'psychopy.visual.slider' not in modules
+    assert 'psychopy.visual.stim3d' not in modules
+
+    from psychopy.visual import Slider, TextBox2
+    assert Slider.__module__ == 'psychopy.visual.slider'
+    assert visual.TextBox2 is TextBox2
+    assert 'Slider' in dir(visual)
+    # submodules are imported on first use too
+    assert visual.textbox2.TextBox2 is TextBox2
+
+
+def test_visual_star_import():
+    namespace = {}
+    exec("from psychopy.visual import *", namespace)
+    assert namespace['GratingStim'] is visual.GratingStim
+    assert namespace['Circle'] is visual.Circle
+    assert namespace['Window'] is visual.Window
+    assert 'GratingStim' in visual.__all__
+
+
+def test_visual_all_lazy():
+    # listing the names doesn't import them
+    code = ("import sys, psychopy.visual as visual; "
+            "assert 'Slider' in visual.__all__; "
+            "print('imported', 'psychopy.visual.slider' in sys.modules)")
+    out = subprocess.check_output([sys.executable, '-c', code],
+                                  universal_newlines=True)
+    assert 'imported False' in out
+
+
+def test_hardware_lazy():
+    modules = _importedModules('psychopy.hardware')
+    assert 'psychopy.hardware.eyetracker' not in modules
+    assert hardware.eyetracker.__name__ == 'psychopy.hardware.eyetracker'
+
+
+def test_sound_backend_lazy():
+    modules = _importedModules('psychopy.sound')
+    assert not any(name.startswith('psychopy.sound.backend_')
+                   for name in modules)
+
+
+def test_sound_no_backend():
+    # no audio lib is an AttributeError, so `hasattr()` works
+    code = ("from psychopy import prefs; prefs.hardware['audioLib'] = []; "
+            "from psychopy import sound; "
+            "print('hasSound', hasattr(sound, 'Sound'))")
+    out = subprocess.check_output([sys.executable, '-c', code],
+                                  universal_newlines=True)
+    assert 'hasSound False' in out
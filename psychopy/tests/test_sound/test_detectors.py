@@ -0,0 +1,81 @@
+"""Tests for the detectors of events in streamed audio."""
+
+import numpy as np
+import pytest
+
+from psychopy.sound.detectors import RMSThresholdDetector, VoiceOnsetDetector
+
+SAMPLE_RATE = 16000
+START_TIME = 100.0  # capture time of the first sample
+
+
+def _makeSignal(bursts, duration=1.0):
+    """Quiet noise with 1 kHz tones between the `(start, end)` times given."""
+    rng = np.random.default_rng(1)
+    t = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    signal = rng.normal(scale=0.001, size=len(t))
+    for start, end in bursts:
+        inBurst = (t >= start) & (t < end)
+        signal[inBurst] += 0.5 * np.sin(2 * np.pi * 1000 * t[inBurst])
+    return signal.astype(np.float32)[:, None]
+
+
+def _stream(detector, signal, blockSizes):
+    """Pass a signal to a detector in blocks, as polled from a microphone."""
+    offset = 0
+    for blockSize in blockSizes:
+        block = signal[offset:offset + blockSize]
+        detector.process(block, SAMPLE_RATE, START_TIME + offset / SAMPLE_RATE)
+        offset += blockSize
+    detector.process(signal[offset:], SAMPLE_RATE,
+                     START_TIME + offset / SAMPLE_RATE)
+
+
+@pytest.mark.parametrize('blockSize', [17, 160, 4000])
+def test_voice_onset(blockSize):
+    signal = _makeSignal([(0.4, 0.7)])
+    onsets = []
+    detector = VoiceOnsetDetector(
+        callback=lambda detector, eventTime: onsets.append(eventTime))
+    _stream(detector, signal, [blockSize] * (len(signal) // blockSize))
+
+    assert len(onsets) == 1 and detector.events == onsets
+    assert detector.eventTime - START_TIME == pytest.approx(0.4, abs=0.005)
+
+    detector.reset()
+    assert detector.eventTime is None
+
+
+def test_rms_threshold():
+    signal = _makeSignal([(0.2, 0.3), (0.6, 0.65)])
+    detector = RMSThresholdDetector(threshold=0.1, windowSecs=0.01)
+    _stream(detector, signal, [1000] * 9)
+
+    eventTimes = np.array(detector.events) - START_TIME
+    assert np.allclose(eventTimes, [0.2, 0.6], atol=0.011)
+
+
+@pytest.mark.parametrize('blockSec', [0.01, 0.3, 2.0])
+def test_streaming_voicekey_file(tmp_path, blockSec):
+    sf = pytest.importorskip('soundfile')
+    from psychopy.voicekey.streaming import detect_files
+
+    fileName = str(tmp_path / 'utterance.wav')
+    sf.write(fileName, _makeSignal([(0.4, 0.7)], duration=1.2)[:, 0],
+             SAMPLE_RATE)
+    result, = detect_files([fileName], nworkers=1, block_sec=blockSec)
+    assert result['duration'] == pytest.approx(1.2)
+    assert result['onset'] == pytest.approx(0.4, abs=0.005)
+    assert result['offset'] == pytest.approx(0.7, abs=0.01)
+
+
+def test_streaming_voicekey_clip():
+    from psychopy.sound import AudioClip
+    from psychopy.voicekey.streaming import StreamingOnsetVoiceKey
+
+    clip = AudioClip(_makeSignal([(0.4, 0.7)]), sampleRateHz=SAMPLE_RATE)
+    vk = StreamingOnsetVoiceKey()
+    assert vk.process_clip(clip) == [vk.event_time]
+    assert vk.event_onset == pytest.approx(0.4, abs=0.005)
+    assert len(vk.power_bp) == len(vk.zcross) == 500
+    assert vk.baseline >= 1 and not vk.bad_baseline
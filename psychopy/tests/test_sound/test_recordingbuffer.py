@@ -0,0 +1,56 @@
+"""Tests for the ring buffer mode of `RecordingBuffer`."""
+
+import time
+
+import numpy as np
+import pytest
+import soundfile as sf
+
+from psychopy.sound.microphone import RecordingBuffer
+
+# a second of mono audio at 1 kHz fits in the buffer
+SAMPLE_RATE = 1000
+SIGNAL = (np.arange(5500, dtype=np.float32)[:, None] / 10000.0)
+
+
+def _record(recording, blockSize=100, interval=0.0):
+    for start in range(0, len(SIGNAL), blockSize):
+        assert not recording.write(SIGNAL[start:start + blockSize])
+        time.sleep(interval)  # as if polling a microphone
+
+
+def test_ring_keeps_latest_samples():
+    recording = RecordingBuffer(
+        sampleRateHz=SAMPLE_RATE, channels=1, maxRecordingSize=4,
+        loopback=True)
+    _record(recording, blockSize=300)
+    assert recording.totalSamples == 1000
+    assert recording.nSamplesWritten == len(SIGNAL)
+    assert recording.loopCount == 5
+    assert not recording.isFull
+
+    # segments wrapping around the end of the buffer
+    segment = recording.getSegment(4.6, 5.4).samples
+    assert np.array_equal(segment, SIGNAL[4600:5400])
+    assert np.array_equal(recording.getSegment().samples, SIGNAL[-1000:])
+
+
+@pytest.mark.parametrize('ext', ['wav', 'flac'])
+def test_ring_spills_to_disk(tmp_path, ext):
+    spillFile = str(tmp_path / ('recording.' + ext))
+    recording = RecordingBuffer(
+        sampleRateHz=SAMPLE_RATE, channels=1, maxRecordingSize=4,
+        spillFile=spillFile)
+    assert recording.loopback
+    # not plain WAV, which can't hold recordings of more than 4 GB
+    assert recording._spillWriter._file.format == 'W64'
+    _record(recording, interval=0.01)
+
+    # segment spanning samples on disk and in memory
+    segment = recording.getSegment(0.5, 5.0).samples
+    assert np.allclose(segment, SIGNAL[500:5000], atol=1e-6)
+
+    recording.close()
+    assert np.allclose(recording.getSegment().samples, SIGNAL, atol=1e-6)
+    assert (tmp_path / ('recording.' + ext)).is_file()
+    assert sf.info(spillFile).format == {'wav': 'W64', 'flac': 'FLAC'}[ext]
@@ -0,0 +1,86 @@
+"""Tests for the cache of synthesized sounds."""
+
+import numpy as np
+import pytest
+
+from psychopy.sound import AudioClip
+from psychopy.sound._base import _SoundBase, _getNoteFreq, _getToneSamples
+from psychopy.sound.synthesis import (SynthesisCache, getSynthesisCache,
+                                      preSynthesize)
+from psychopy.tools.audiotools import sinetone, whiteNoise
+
+
+def test_cache_bounded():
+    cache = SynthesisCache(maxBytes=3 * 800)
+    for key in 'abc':
+        cache.get(key, lambda: np.zeros(100))
+    assert len(cache) == 3 and cache.nBytes == 3 * 800
+
+    cache.get('a', lambda: pytest.fail("'a' should be cached"))
+    cache.get('d', lambda: np.zeros(100))  # drops 'b', used least recently
+    assert 'b' not in cache and 'a' in cache and 'd' in cache
+    assert (cache.hits, cache.misses) == (1, 4)
+
+    samples = cache.get('e', lambda: np.zeros(1000))  # too big to keep
+    assert 'e' not in cache and not samples.flags.writeable
+
+    cache.maxBytes = 800
+    assert list(cache._entries) == ['d']
+    cache.clear()
+    assert len(cache) == 0 and cache.nBytes == 0
+
+
+def test_audioclip_cached():
+    getSynthesisCache().clear()
+    clip = AudioClip.sine(0.5, 440, channels=1)
+    again = AudioClip.sine(0.5, 440, channels=2)
+    assert len(getSynthesisCache()) == 1
+    expected = sinetone(0.5, 440)
+    assert np.array_equal(clip.samples, expected)
+    assert np.array_equal(again.samples, np.tile(expected, (1, 2)))
+
+    # clips get their own samples
+    clip.samples[:] = 0
+    assert np.array_equal(AudioClip.sine(0.5, 440, channels=1).samples,
+                          expected)
+
+    noise = AudioClip.whiteNoise(0.1, channels=1, seed=1)
+    assert np.array_equal(noise.samples,
+                          whiteNoise(0.1, seed=1).astype(np.float32))
+    assert np.array_equal(AudioClip.whiteNoise(0.1, seed=1).samples[:, 1],
+                          noise.samples[:, 0])
+
+
+def test_tone_samples_copied():
+    class _InPlaceSound(_SoundBase):
+        sampleRate = 44100
+
+        def _setSndFromArray(self, thisArray):
+            thisArray *= 0.5  # e.g. applying the volume in place
+            self._snd = thisArray
+
+    getSynthesisCache().clear()
+    expected = _getToneSamples(440, 0.1, 44100, hamming=True).copy()
+    for _ in range(2):
+        _InPlaceSound()._setSndFromFreq(440, 0.1)
+    assert np.array_equal(_getToneSamples(440, 0.1, 44100, hamming=True),
+                          expected)
+
+
+def test_preSynthesize(tmp_path):
+    fileName = str(tmp_path / 'conditions.csv')
+    with open(fileName, 'w') as f:
+        f.write("tone,dur\n440,0.2\nA,0.2\n600,0.3\nding.wav,0.2\n")
+
+    cache = getSynthesisCache()
+    cache.clear()
+    assert preSynthesize(fileName, soundKey='tone', secs='dur',
+                         sampleRateHz=44100) == 2  # 'A' is 440 Hz
+    misses = cache.misses
+    samples = _getToneSamples(600, 0.3, 44100, hamming=True)
+    assert cache.misses == misses and len(samples) == int(0.3 * 44100)
+    assert _getNoteFreq('A', 5) == 880
+
+    with pytest.raises(KeyError):
+        preSynthesize([{'tone': 440}], soundKey='tone', secs='dur',
+                      sampleRateHz=44100)
@@ -0,0 +1,37 @@
+"""Tests for transcribing clips in background processes."""
+
+import numpy as np
+import pytest
+
+from psychopy.sound import AudioClip
+from psychopy.sound.transcribe import TranscriptionQueue
+
+
+def test_queue_results_in_order():
+    queue = TranscriptionQueue(nWorkers=1, batchSize=3, warmUp=())
+    clip = AudioClip(np.zeros((4800, 1), dtype=np.float32), sampleRateHz=48000)
+    # engines which don't exist fail in the worker, the error is passed back
+    futures = [queue.submit(clip, engine='engine{}'.format(i))
+               for i in range(5)]
+    for i, future in enumerate(futures):
+        with pytest.raises(ValueError, match='engine{}'.format(i)):
+            future.result(timeout=60)
+
+    queue.close()
+    with pytest.raises(RuntimeError):
+        queue.submit(clip)
+
+
+def test_queue_worker_exits(tmp_path, monkeypatch):
+    from psychopy.sound import _transcribeworker
+    script = tmp_path / 'exits.py'
+    script.write_text("import sys; sys.exit(3)\n")
+    monkeypatch.setattr(_transcribeworker, '__file__', str(script))
+
+    queue = TranscriptionQueue(nWorkers=1, warmUp=())
+    clip = AudioClip(np.zeros((4800, 1), dtype=np.float32), sampleRateHz=48000)
+    future = queue.submit(clip)
+    # the clip fails, rather than waiting for a process which never connects
+    with pytest.raises(RuntimeError, match='exited with code 3'):
+        future.result(timeout=30)
+    queue.close(timeout=5)
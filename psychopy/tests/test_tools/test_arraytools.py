@@ -100,3 +100,17 @@ def test_val2array():
             case['ans'],
             equal_nan=True
         )
+
+
+def test_createLumPattern_cached():
+    clearPatternCache()
+    gauss = createLumPattern('gauss', 64, None, {'sd': 3})
+    assert gauss.shape == (64, 64)
+    # later calls come from the cache, but each caller gets its own copy
+    gauss[:] = 0
+    again = createLumPattern('gauss', 64, None, {'sd': 3, 'fringeWidth': 0.5})
+    assert again.max() > 0.9
+    # only parameters used by the pattern make a difference
+    assert createLumPattern('gauss', 64, None, {'sd': 2}).sum() != again.sum()
+    with pytest.raises(ValueError):
+        createLumPattern('gauss', 64, None, None)
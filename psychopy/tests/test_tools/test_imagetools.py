@@ -55,3 +55,52 @@ def test_image2array():
     assert numpy.array_equal(
         image2array(imgL), arrL
     )
+
+
+@pytest.mark.imagetools
+@pytest.mark.parametrize('size', [(64, 64), (40, 24), (5, 3)])
+@pytest.mark.parametrize('withAlpha', [False, True])
+def test_compressed_images(tmp_path, size, withAlpha):
+    img = image.open(str(resources / "testimage.jpg")).convert("RGBA")
+    arr = numpy.array(img.resize(size))
+    if withAlpha:
+        arr[:, :, 3] = numpy.linspace(0, 255, size[0])[None, :]
+    compressed = compressImage(arr)
+    assert compressed.fourCC == ('DXT5' if withAlpha else 'DXT1')
+    assert compressed.levels[-1][:2] == (1, 1)
+
+    # the file decodes (with PIL) to nearly the original image
+    fileName = tmp_path / "img.dds"
+    writeDDS(fileName, compressed)
+    decoded = numpy.array(image.open(str(fileName)).convert("RGBA"), float)
+    assert decoded.shape == arr.shape
+    assert numpy.abs(decoded - arr).mean() < 10
+
+    # flipping the compressed blocks flips the decoded image
+    writeDDS(tmp_path / "flipped.dds", readDDS(fileName, flip=True))
+    flipped = numpy.array(image.open(str(tmp_path / "flipped.dds")).convert(
+        "RGBA"), float)
+    assert numpy.array_equal(flipped, decoded[::-1])
+    # mipmaps stop at the first level that can't be flipped by whole blocks
+    assert all(h <= 4 or h % 4 == 0
+               for _, h, _ in readDDS(fileName, flip=True).levels)
+
+    # files are only converted again when the image changes
+    img.resize(size).save(tmp_path / "img.png")
+    ddsFile, = compressImageFiles([tmp_path / "img.png"])
+    mtime = Path(ddsFile).stat().st_mtime_ns
+    compressImageFiles([tmp_path / "img.png"])
+    assert Path(ddsFile).stat().st_mtime_ns == mtime
+
+
+@pytest.mark.imagetools
+def test_flip_compressed_uneven_height(tmp_path):
+    # 766 rows don't line up with the blocks of 4 rows
+    arr = numpy.zeros((766, 8, 4), numpy.uint8)
+    arr[:, :, 3] = 255
+    arr[:383, :, 0] = 255
+    fileName = tmp_path / "img.dds"
+    writeDDS(fileName, compressImage(arr))
+    assert readDDS(fileName, flip=False).size == (8, 766)
+    with pytest.raises(ValueError, match="height of 766"):
+        readDDS(fileName, flip=True)
@@ -684,5 +684,49 @@ def test_alignTo():
     assert np.allclose(out, target)
 
 
+def test_triangulatePolygon():
+    """Test ear clipping triangulation `triangulatePolygon`. Triangles must
+    exactly cover the polygon, so their summed area is the polygon's area.
+
+    """
+    def _triArea(tris):
+        tris = tris.reshape((-1, 3, 2))
+        a = tris[:, 1] - tris[:, 0]
+        b = tris[:, 2] - tris[:, 0]
+        return np.sum(np.abs(a[:, 0] * b[:, 1] - a[:, 1] * b[:, 0])) / 2.
+
+    def _polyArea(verts):
+        x, y = verts[:, 0], verts[:, 1]
+        return np.abs(np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)) / 2.
+
+    # concave 'L' in both winding orders
+    verts = np.array([(0, 0), (2, 0), (2, 1), (1, 1), (1, 2), (0, 2)], float)
+    for poly in (verts, verts[::-1]):
+        tris = triangulatePolygon(poly)
+        assert tris.shape[1] == 2 and tris.shape[0] % 3 == 0
+        assert np.isclose(_triArea(tris), 3.0)
+
+    # convex and star shaped polygons
+    np.random.seed(12345)
+    for nVerts in (3, 4, 17, 200):
+        th = np.linspace(0, 2 * np.pi, nVerts, endpoint=False)
+        for r in (np.ones(nVerts), np.random.uniform(0.5, 1.0, nVerts)):
+            poly = np.column_stack((r * np.cos(th), r * np.sin(th)))
+            tris = triangulatePolygon(poly)
+            assert tris.shape[0] == 3 * (nVerts - 2)
+            assert np.isclose(_triArea(tris), _polyArea(poly))
+
+    # comb with many reflex vertices, closing vertex repeated
+    comb = [(0., -1.)]
+    for i in range(20):
+        comb += [(i, 0.), (i + 0.5, 1.)]
+    comb += [(20., 0.), (20., -1.), (0., -1.)]
+    assert np.isclose(_triArea(triangulatePolygon(comb)), 30.0)
+
+    # degenerate input gives no triangles
+    assert triangulatePolygon([(0, 0), (1, 1)]).shape == (0, 2)
+    assert triangulatePolygon([(0, 0), (1, 0), (2, 0)]).shape == (0, 2)
+
+
 if __name__ == "__main__":
     pytest.main()
@@ -0,0 +1,82 @@
+import time
+from pathlib import Path
+
+import pytest
+
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+from psychopy.visual.movies.players import _decoderworker
+from psychopy.visual.movies.players.decoderpool import MovieDecoderPool
+
+movieFile = str(Path(TESTS_DATA_PATH) / 'testMovie.mp4')
+
+
+class _Parent:
+    """Stands in for the `MovieStim` playing the movie."""
+    loop = False
+    _noAudio = True
+    _useYUV = True
+    win = None
+
+    def __init__(self, pool):
+        self._decoderPool = pool
+
+
+def test_movies_share_workers():
+    pytest.importorskip('ffpyplayer')
+    from psychopy.visual.movies.players.ffpyplayer_player import FFPyPlayer
+
+    pool = MovieDecoderPool(nWorkers=2)
+    try:
+        players = []
+        for _ in range(3):
+            player = FFPyPlayer(_Parent(pool))
+            player.load(movieFile)
+            players.append(player)
+        assert len(pool._workers) == 2
+        assert pool.nMovies == 3
+
+        for player in players:
+            assert player.getMetadata().size == (352, 288)
+            frame = player.getMovieFrame()
+            assert frame.colorFormat == 'yuv420p'
+            y, u, v = frame.colorData
+            assert y.size == 352 * 288 and u.size == v.size == 176 * 144
+            player.play()
+
+        time.sleep(0.5)
+        for player in players:
+            assert player.getMovieFrame().frameIndex > 0
+            player.unload()
+        assert pool.nMovies == 0
+    finally:
+        pool.close()
+
+
+def test_begin_worker_exited():
+    pool = MovieDecoderPool(nWorkers=1)
+    try:
+        stream = pool.openMovie(movieFile, {'paused': True})
+        pool._workers[0].proc.kill()
+        pool._workers[0].proc.wait()
+        # fails rather than waiting for the first frame forever
+        with pytest.raises(RuntimeError, match='exited'):
+            stream.begin()
+        assert pool.nMovies == 0
+    finally:
+        pool.close()
+
+
+def test_worker_exits(tmp_path, monkeypatch):
+    script = tmp_path / 'exits.py'
+    script.write_text("import sys; sys.exit(3)\n")
+    monkeypatch.setattr(_decoderworker, '__file__', str(script))
+
+    pool = MovieDecoderPool(nWorkers=1)
+    try:
+        # fails rather than waiting for the process to connect forever
+        with pytest.raises(RuntimeError, match='exited with code 3'):
+            pool.openMovie(movieFile, {})
+        assert pool.nMovies == 0 and not pool._workers
+    finally:
+        pool.close()
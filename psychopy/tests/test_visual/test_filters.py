@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+from psychopy.visual import filters
+
+
+def test_cached_kernels():
+    filters.clearFilterCache()
+    lp = filters.butter2d_lp((32, 48), 0.2, n=2)
+    assert lp.shape == (32, 48)
+    # kernels are cached, but callers get their own copy
+    lp[:] = 0
+    assert filters.butter2d_lp((32, 48), 0.2, n=2).max() > 0.99
+    assert filters._butterworthLowpass.cache_info().hits >= 1
+    assert np.allclose(filters.butter2d_hp((32, 48), 0.2, n=2),
+                       1 - filters.butter2d_lp((32, 48), 0.2, n=2))
+    with pytest.raises(ValueError):
+        filters.butter2d_bp((32, 48), 0.1, 1.5, 2)
+    with pytest.raises(ValueError):
+        filters.butter2d_hp((32, 48), 0.1, 2.5)
+
+
+@pytest.mark.parametrize('backend', ['numpy', 'scipy'])
+def test_batched_filtering(backend):
+    pytest.importorskip(backend)
+    np.random.seed(1)
+    noise = np.random.rand(4, 64, 64)
+    kernel = filters.butter2d_bp((64, 64), 0.05, 0.2, 3)
+    filters.setFFTBackend(backend, workers=-1)
+    try:
+        assert filters.getFFTBackend() == backend
+        batched = filters.applyFilter(noise, kernel)
+        stacked = filters.imifft(filters.imfft(noise) * kernel)
+        for image, got, got2 in zip(noise, batched, stacked):
+            single = filters.imifft(filters.imfft(image) * kernel)
+            assert np.allclose(got, single)
+            assert np.allclose(got2, single)
+    finally:
+        filters.setFFTBackend('numpy')
+    with pytest.raises(ValueError):
+        filters.setFFTBackend('notAnFFT')
+
+
+def test_cached_gratings_and_masks():
+    filters.clearFilterCache()
+    grating = filters.makeGrating(64, ori=30, cycles=3, gratType='sqr')
+    grating[:] = 0
+    assert filters.makeGrating(64, ori=30, cycles=3, gratType='sqr').max() == 1
+    mask = filters.makeMask(64, 'raisedCosine', radius=[1, 0.5],
+                            center=np.array([0.1, 0]))
+    mask[:] = 0
+    assert filters.makeMask(64, 'raisedCosine', radius=[1, 0.5],
+                            center=(0.1, 0)).max() == 1
+    assert filters._makeMask.cache_info().hits == 1
@@ -0,0 +1,57 @@
+import os
+
+import numpy as np
+from PIL import Image
+
+from psychopy import visual
+from psychopy.visual.framecapture import MovieFrameWriter
+
+
+def test_writer_image_sequence(tmp_path):
+    """Frames are flipped, stripped of alpha and named like saveMovieFrames.
+    """
+    fileName = str(tmp_path / 'frame.png')
+    writer = MovieFrameWriter(fileName, (8, 4))
+    writer.start()
+    for i in range(12):
+        frame = np.zeros((4, 8, 4), dtype=np.uint8)
+        frame[0, :, 0] = 255  # bottom row is red
+        frame[..., 1] = i
+        writer.put(frame.ravel())
+    assert writer.close() == 12
+
+    names = sorted(os.listdir(str(tmp_path)))
+    assert names == ['frame%02d.png' % (i + 1) for i in range(12)]
+    im = np.array(Image.open(str(tmp_path / 'frame05.png')))
+    assert im.shape == (4, 8, 3)
+    assert tuple(im[-1, 0]) == (255, 4, 0)
+    assert tuple(im[0, 0]) == (0, 4, 0)
+
+
+class TestMovieFrameStream:
+
+    @classmethod
+    def setup_class(cls):
+        cls.win = visual.Window([64, 64], pos=[50, 50], allowGUI=False,
+                                autoLog=False)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.win.close()
+
+    def test_stream_frames(self, tmp_path):
+        fileName = str(tmp_path / 'stream.png')
+        rect = visual.Rect(self.win, size=(1, 1), fillColor='red')
+        self.win.startMovieFrameStream(fileName, nBuffers=3)
+        for _ in range(5):
+            rect.draw()
+            self.win.flip()
+            assert self.win.getMovieFrame() is None
+        assert len(self.win.movieFrames) == 0
+        assert self.win.stopMovieFrameStream() == 5
+        assert len(os.listdir(str(tmp_path))) == 5
+
+        # regular capturing is used again once the stream is stopped
+        self.win.getMovieFrame()
+        assert len(self.win.movieFrames) == 1
+        self.win.movieFrames = []
@@ -0,0 +1,82 @@
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from psychopy.tests.utils import TESTS_DATA_PATH
+from psychopy.visual.movies import framestore
+
+pytest.importorskip('imageio_ffmpeg')
+
+movieFile = str(Path(TESTS_DATA_PATH) / 'testMovie.mp4')
+
+
+def test_rgb_frames():
+    store = framestore.MovieFrameStore(movieFile)
+    assert store.size == (352, 288)
+    assert store.nFrames == 237
+    frame = store.getFrameData(10)
+    assert frame.shape == (352 * 288 * 3,)
+    assert not frame.flags.writeable
+    # frame times are exact
+    for index in (0, 1, 100, 236):
+        movieTime = store.movieTimeFromFrameIndex(index)
+        assert store.frameIndexFromMovieTime(movieTime) == index
+    assert store.frameIndexFromMovieTime(store.duration) == store.nFrames
+
+
+def test_yuv_frames_cached(tmp_path):
+    store = framestore.MovieFrameStore(
+        movieFile, size=(65, 48), colorFormat='yuv420p', cacheDir=tmp_path)
+    assert store.size == (64, 48)
+    y, u, v = store.getFrameData(5)
+    assert y.size == 64 * 48 and u.size == v.size == 32 * 24
+    assert Path(store.cacheFile).is_file()
+
+    # decoded again from the cache file
+    cached = framestore.MovieFrameStore(
+        movieFile, size=(65, 48), colorFormat='yuv420p', cacheDir=tmp_path)
+    assert cached.cacheFile == store.cacheFile
+    assert cached.nFrames == store.nFrames
+    assert np.array_equal(cached.getFrameData(5)[0], y)
+
+
+def test_stores_shared():
+    framestore.clearFrameStores()
+    store = framestore.getFrameStore(movieFile, size=(32, 32))
+    assert framestore.getFrameStore(movieFile, size=(32, 32)) is store
+    assert framestore.getFrameStore(movieFile) is not store
+    framestore.clearFrameStores()
+    assert framestore.getFrameStore(movieFile, size=(32, 32)) is not store
+
+
+def _fakeReader(nFrames, fps, duration):
+    """Replacement for `imageio_ffmpeg.read_frames` giving 4x2 RGB frames."""
+    def readFrames(*args, **kwargs):
+        yield {'size': (4, 2), 'fps': fps, 'duration': duration}
+        for i in range(nFrames):
+            yield bytes([i]) * (4 * 2 * 3)
+    return readFrames
+
+
+def test_no_frame_rate(monkeypatch, tmp_path):
+    import imageio_ffmpeg
+    monkeypatch.setattr(imageio_ffmpeg, 'read_frames', _fakeReader(5, 0, 0.5))
+    store = framestore.MovieFrameStore(movieFile, cacheDir=tmp_path)
+    assert store.frameRate == 10.0
+    assert store.frameInterval == pytest.approx(0.1)
+    assert store.duration == pytest.approx(0.5)
+
+    monkeypatch.setattr(imageio_ffmpeg, 'read_frames', _fakeReader(5, 0, 0))
+    with pytest.raises(RuntimeError, match="no frame rate"):
+        framestore.MovieFrameStore(movieFile)
+
+
+@pytest.mark.parametrize('cached', [False, True])
+def test_no_frames(monkeypatch, tmp_path, cached):
+    import imageio_ffmpeg
+    monkeypatch.setattr(imageio_ffmpeg, 'read_frames', _fakeReader(0, 25, 0))
+    with pytest.raises(RuntimeError, match="No frames"):
+        framestore.MovieFrameStore(
+            movieFile, cacheDir=tmp_path if cached else None)
+    assert not list(tmp_path.iterdir())
@@ -1,6 +1,9 @@
 from pathlib import Path
 
+import numpy
+
 from psychopy import visual, colors, core
+from psychopy.tools import imagetools
 from .test_basevisual import _TestUnitsMixin
 from psychopy.tests.test_experiment.test_component_compile_python import _TestBoilerplateMixin
 from .. import utils
@@ -47,6 +50,19 @@ class TestImage(_TestUnitsMixin, _TestBoilerplateMixin):
         # self.win.getMovieFrame(buffer='back').save(Path(utils.TESTS_DATA_PATH) / "test_image_flip_anchor_horiz.png")
         utils.compareScreenshot("test_image_flip_anchor_horiz.png", self.win, crit=7)
 
+    def test_uneven_dds(self, tmp_path):
+        """
+        Check that a DDS file which can't be flipped by whole blocks is loaded uncompressed
+        """
+        arr = numpy.zeros((766, 8, 4), numpy.uint8)
+        arr[:, :, 3] = 255
+        fileName = tmp_path / "uneven.dds"
+        imagetools.writeDDS(fileName, imagetools.compressImage(arr))
+        self.obj.image = str(fileName)
+        assert self.obj._origSize == (8, 766)
+        self.obj.draw()
+        self.win.flip()
+
     def test_aspect_ratio(self):
         """
         Test that images set with one or both dimensions as None maintain their aspect ratio
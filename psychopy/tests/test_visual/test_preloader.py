@@ -0,0 +1,78 @@
+from pathlib import Path
+
+import pytest
+import pyglet.gl as GL
+
+from psychopy import visual
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+
+class TestImagePreloader:
+
+    @classmethod
+    def setup_class(cls):
+        cls.win = visual.Window([128, 128], pos=[50, 50], allowGUI=False,
+                                autoLog=False)
+        cls.images = [str(Path(TESTS_DATA_PATH) / 'testimage.jpg'),
+                      'default.png']
+
+    @classmethod
+    def teardown_class(cls):
+        cls.win.close()
+
+    def setup_method(self):
+        self.win.textureCache.clear()
+
+    @pytest.mark.parametrize('usePBO', [False, True])
+    def test_preloaded_images_shown(self, usePBO):
+        conditions = [{'image': image} for image in self.images]
+        preloader = visual.ImagePreloader(self.win, conditions, usePBO=usePBO)
+        preloader.wait()
+        assert preloader.nPending == 0
+        assert all(preloader.isReady(image) for image in self.images)
+
+        # the stimulus uses the uploaded textures without loading the files
+        stim = visual.ImageStim(self.win, autoLog=False)
+        nMisses = self.win.textureCache.nMisses
+        for image in self.images:
+            preloader.setImage(stim, image)
+            stim.draw()
+            self.win.flip()
+        assert self.win.textureCache.nMisses == nMisses
+        preloader.close()
+
+    def test_set_image_waits(self):
+        preloader = visual.ImagePreloader(self.win, self.images[:1])
+        stim = visual.ImageStim(self.win, autoLog=False)
+        preloader.setImage(stim, self.images[0])
+        assert preloader.nPending == 0
+        loaded = visual.ImageStim(self.win, image=self.images[0],
+                                  autoLog=False)
+        assert loaded._texID.value == stim._texID.value
+        preloader.close()
+
+    def test_loaded_while_decoding(self):
+        # a stimulus loading the image first keeps its texture
+        preloader = visual.ImagePreloader(self.win, self.images[:1])
+        stim = visual.ImageStim(self.win, image=self.images[0], autoLog=False)
+        preloader.wait()
+        assert GL.glIsTexture(stim._texID.value)
+        cached = self.win.textureCache.get(preloader._getKey(self.images[0]))
+        assert cached.id.value == stim._texID.value and cached.nUsers == 1
+        stim.draw()
+        self.win.flip()
+        preloader.close()
+
+    def test_del_defers_buffer_deletion(self):
+        preloader = visual.ImagePreloader(self.win, self.images[:1],
+                                          usePBO=True)
+        preloader.wait()
+        pixelBuffer = preloader._pixelBuffer
+        assert GL.glIsBuffer(pixelBuffer)
+        # garbage collection only queues the buffer for the next flip
+        nCalls = len(self.win._toCall)
+        preloader.__del__()
+        assert len(self.win._toCall) == nCalls + 1
+        assert GL.glIsBuffer(pixelBuffer)
+        self.win.flip()
+        assert not GL.glIsBuffer(pixelBuffer)
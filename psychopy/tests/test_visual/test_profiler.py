@@ -0,0 +1,116 @@
+import json
+
+from psychopy import visual
+from psychopy.visual import profiler
+
+
+class TestDrawProfiler:
+
+    @classmethod
+    def setup_class(cls):
+        cls.win = visual.Window([128, 128], pos=[50, 50], allowGUI=False,
+                                autoLog=False)
+        cls.rect = visual.Rect(cls.win, name='rect', units='pix',
+                               size=(32, 32))
+        cls.text = visual.TextStim(cls.win, name='text', text='hello')
+
+    @classmethod
+    def teardown_class(cls):
+        cls.win.close()
+
+    def test_records_draws(self):
+        self.win.profileDraws = True
+        self.win.drawProfiler.clear()
+        self.win.drawProfiler.routine = 'trial'
+        self.text.autoDraw = True
+        for _ in range(5):
+            self.rect.draw()
+            self.win.flip()
+        self.text.autoDraw = False
+        self.win.profileDraws = False
+
+        report = self.win.drawProfiler.getReport()
+        names = [row['name'] for row in report]
+        assert 'rect' in names and 'text' in names
+        for row in report:
+            assert row['routine'] == 'trial'
+            assert row['nDraws'] == 5
+            assert row['nFrames'] == 5
+            assert row['cpuMean'] >= 0
+        assert len(self.win.drawProfiler.frames) == 5
+
+        # nothing should be recorded once disabled
+        self.rect.draw()
+        self.win.flip()
+        assert len(self.win.drawProfiler.frames) == 5
+
+    def test_unwrapped_when_disabled(self):
+        self.win.profileDraws = True
+        assert hasattr(visual.TextStim.draw, '_profilerOriginal')
+        self.win.profileDraws = False
+        assert not hasattr(visual.TextStim.draw, '_profilerOriginal')
+
+    def test_exports(self, tmp_path):
+        self.win.profileDraws = True
+        self.win.drawProfiler.clear()
+        self.rect.draw()
+        self.win.flip()
+        self.win.profileDraws = False
+
+        prof = self.win.drawProfiler
+        prof.saveCSV(str(tmp_path / 'draws.csv'))
+        with open(str(tmp_path / 'draws.csv')) as f:
+            assert f.readline().startswith('routine,name,className')
+
+        prof.saveJSON(str(tmp_path / 'draws.json'), events=True)
+        with open(str(tmp_path / 'draws.json')) as f:
+            data = json.load(f)
+        assert data['report'][0]['name'] == 'rect'
+        assert len(data['events']) == 1
+
+        prof.saveTrace(str(tmp_path / 'trace.json'))
+        with open(str(tmp_path / 'trace.json')) as f:
+            trace = json.load(f)
+        complete = [ev for ev in trace['traceEvents'] if ev['ph'] == 'X']
+        assert complete[0]['name'] == 'rect'
+
+
+def test_nested_draws():
+    """Stimuli drawn by other stimuli are recorded below their parent, and
+    base class draws called through super() are not counted twice."""
+
+    class _Win:
+        _drawProfiler = None
+
+    class _Parent(visual.basevisual.MinimalStim):
+        def __init__(self, win, name, children=()):
+            self.win = win
+            self.children = children
+            super().__init__(name=name)
+
+        def draw(self):
+            for child in self.children:
+                child.draw()
+
+    class _Child(_Parent):
+        def draw(self):
+            super().draw()
+
+    win = _Win()
+    win._drawProfiler = prof = profiler.DrawProfiler(gpuTiming=False)
+    parent = _Parent(win, 'parent', children=[_Child(win, 'child')])
+    prof.enabled = True
+    try:
+        for _ in range(3):
+            parent.draw()
+            prof._endFrame()
+    finally:
+        prof.enabled = False
+
+    report = {row['name']: row for row in prof.getReport()}
+    assert report['parent']['nDraws'] == 3
+    assert report['child']['nDraws'] == 3
+    assert report['child']['cpuTotal'] <= report['parent']['cpuTotal']
+    depths = {ev[2]: (ev[4], ev[5]) for ev in prof.events}
+    assert depths['child'] == (1, 'parent')
+    assert depths['parent'] == (0, '')
@@ -0,0 +1,56 @@
+from psychopy import visual
+import psychopy.tools.gltools as gltools
+import psychopy.visual.shaders as shaders
+
+
+class TestShaderRegistry:
+
+    @classmethod
+    def setup_class(cls):
+        cls.win = visual.Window([128, 128], pos=[50, 50], allowGUI=False,
+                                autoLog=False)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.win.close()
+
+    def test_uniform_locations_cached(self):
+        prog = self.win._shaders['signedTexMask']
+        loc = shaders.getUniformLocation(prog, b"mask")
+        assert loc >= 0
+        assert shaders.getUniformLocation(prog, b"mask") == loc
+        assert (int(prog), b"mask") in gltools._uniformLocations
+        assert shaders.getUniformLocation(prog, b"notAUniform") == -1
+        # names as `str` share the entries of `bytes` names
+        nLocations = len(gltools._uniformLocations)
+        assert shaders.getUniformLocation(prog, "mask") == loc
+        assert len(gltools._uniformLocations) == nLocations
+
+        shaders.forgetProgram(prog)
+        assert (int(prog), b"mask") not in gltools._uniformLocations
+
+    def test_program_binary_cache(self):
+        if not shaders.haveProgramBinary():
+            return  # nothing to test with this driver
+        shaders.clearProgramCache()
+        prog1 = shaders.compileProgram(
+            shaders.vertSimple, shaders.fragSignedColorTexMask)
+        key = shaders._getProgramKey(
+            shaders.vertSimple, shaders.fragSignedColorTexMask)
+        # second time round the program comes from the stored binary
+        prog2 = shaders._loadProgramBinary(key)
+        assert prog2 is not None and prog2 != prog1
+        assert shaders.getUniformLocation(prog2, b"texture") >= 0
+
+
+def test_close_forgets_locations():
+    win = visual.Window([128, 128], pos=[50, 50], allowGUI=False,
+                        autoLog=False)
+    progs = [win._shaders['imageStim'], win._shaders['stim3d_phong'][(0, True)]]
+    for prog in progs:
+        shaders.getUniformLocation(prog, b"texture")
+        assert (int(prog), b"texture") in gltools._uniformLocations
+    win.close()
+    # the next window's programs may get the same handles
+    assert not any(int(prog) == key[0] for prog in progs
+                   for key in gltools._uniformLocations)
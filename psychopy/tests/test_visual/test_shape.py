@@ -21,3 +21,29 @@ class TestShape(_TestColorMixin, _TestUnitsMixin, _TestBoilerplateMixin):
         self.fillUsed = True
         # Shape has no foreground color
         self.foreUsed = False
+
+
+def test_tesselation_cache():
+    from psychopy.visual import shape
+
+    shape.clearTesselationCache()
+    cross = [shape.knownShapes['cross']]
+    tris = shape.getTesselation(cross)
+    assert tris.shape == (30, 2)
+    assert not tris.flags.writeable
+    # same vertices give the cached result
+    assert shape.getTesselation(cross) is tris
+    # ear clipping covers the same area
+    clipped = shape.getTesselation(cross, tesselator='earclip')
+    assert clipped is not tris and clipped.shape == (30, 2)
+
+    # least recently used results are dropped first
+    oldSize = shape.tesselationCacheSize
+    shape.tesselationCacheSize = 2
+    try:
+        shape.getTesselation([shape.knownShapes['arrow']])
+        assert len(shape._tesselationCache) == 2
+        assert shape.getTesselation(cross) is not tris
+    finally:
+        shape.tesselationCacheSize = oldSize
+        shape.clearTesselationCache()
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from psychopy import visual
+
+
+class TestShapeBatch:
+
+    @classmethod
+    def setup_class(cls):
+        cls.win = visual.Window([128, 128], pos=[50, 50], allowGUI=False,
+                                autoLog=False)
+
+    @classmethod
+    def teardown_class(cls):
+        cls.win.close()
+
+    def _makeShapes(self):
+        return [
+            visual.Rect(self.win, units='pix', size=(40, 30), pos=(-30, 20),
+                        fillColor='red', lineColor='white', lineWidth=3),
+            visual.Circle(self.win, units='pix', radius=20, pos=(-10, 10),
+                          fillColor='blue', lineColor=None, opacity=0.5),
+            visual.ShapeStim(self.win, units='pix', vertices='cross',
+                             size=50, pos=(30, -30), fillColor='green',
+                             lineColor='yellow'),
+            visual.Line(self.win, units='pix', start=(-60, -60),
+                        end=(60, -50), lineColor='white', lineWidth=2),
+        ]
+
+    def _render(self, drawFunc):
+        self.win.flip()
+        drawFunc()
+        frame = np.array(self.win._getFrame(buffer='back'), dtype=float)
+        self.win.flip()
+        return frame
+
+    def test_matches_individual_draws(self):
+        shapes = self._makeShapes()
+        batch = visual.ShapeBatch(self.win, shapes)
+        assert len(batch) == len(shapes)
+
+        def drawEach():
+            for shape in shapes:
+                shape.draw()
+
+        expected = self._render(drawEach)
+        got = self._render(batch.draw)
+        # allow for small differences in line rasterisation
+        assert np.mean(np.abs(got - expected)) < 1.0
+
+        # geometry is only rebuilt when a shape has moved
+        vertices = batch._vertices
+        batch.draw()
+        assert batch._vertices is vertices
+        shapes[0].pos = (0, 0)
+        batch.draw()
+        assert batch._vertices is not vertices
+
+    def test_draw_calls_merged(self):
+        discs = [visual.Circle(self.win, units='pix', radius=4,
+                               pos=(x, y), fillColor='red', lineColor=None)
+                 for x in range(-50, 50, 10) for y in range(-50, 50, 10)]
+        batch = visual.ShapeBatch(self.win, discs)
+        batch.draw()
+        assert len(batch._runs) == 1
+
+        for disc in discs:
+            disc.lineColor = 'white'
+        batch.draw()
+        assert len(batch._runs) == 2 * len(discs)
+        batch.strictOrder = False
+        batch.draw()
+        assert len(batch._runs) == 2
+
+    def test_only_shapes(self):
+        text = visual.TextStim(self.win, text='nope', autoLog=False)
+        batch = visual.ShapeBatch(self.win)
+        with pytest.raises(TypeError):
+            batch.append(text)
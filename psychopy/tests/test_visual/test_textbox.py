@@ -1,3 +1,5 @@
+import os
+import shutil
 from pathlib import Path
 
 import numpy as np
@@ -435,6 +437,43 @@ class Test_textbox(_TestColorMixin, _TestUnitsMixin, _TestBoilerplateMixin):
         noFontTextbox = TextBox2(self.win, "", font="Raleway Dots", bold=True)
         assert (self.error.alerts[0].code == 4325)
 
+    def test_incremental_layout(self):
+        if self.textbox._lineBreaking != 'default':
+            return
+        self.textbox.text = "A PsychoPy zealot knows a smidge of wx,\nbut "
+        # typing only lays out the last line again...
+        for char in "JavaScript is the question, supercalifragilistic":
+            self.textbox.text += char
+        assert len(self.textbox._lineLenChars) > 3
+        typed = self.textbox.vertices.copy()
+        typedLines = list(self.textbox._lineLenChars)
+        # ...but gives the same result as laying it all out from scratch
+        self.textbox._textLayout = None
+        self.textbox._layout()
+        assert np.allclose(self.textbox.vertices, typed)
+        assert self.textbox._lineLenChars == typedLines
+
+    def test_atlas_too_small(self):
+        from psychopy.visual.textbox2 import fontmanager
+
+        fontPath = FontManager().getFontsMatching("Open Sans")[0].path
+        atlas = fontmanager.GlyphAtlas(128, maxPages=2)
+        self.textbox.font = fontmanager.GLFont(fontPath, 30, atlas=atlas)
+        # more glyphs than the atlas holds, some are evicted by the layout
+        self.textbox.text = (
+            "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789")
+        assert atlas.generation > 0
+        assert self.textbox._atlasGeneration == atlas.generation
+
+        # ...but it isn't laid out again each time it's drawn
+        nLayouts = []
+        layoutGlyphs = self.textbox._layoutGlyphs
+        self.textbox._layoutGlyphs = lambda: (nLayouts.append(1),
+                                              layoutGlyphs())
+        self.textbox.draw()
+        self.textbox.draw()
+        assert not nLayouts
+
 
 def test_font_manager():
         # Create a font manager
@@ -449,6 +488,115 @@ def test_font_manager():
         assert bool(mgr.getFontNamesSimilar("Hanalei"))
 
 
+def test_glyph_cache(tmp_path):
+    from psychopy import prefs
+    from psychopy.visual.textbox2 import fontmanager
+
+    cacheDir = prefs.paths['cache']
+    prefs.paths['cache'] = str(tmp_path)
+    try:
+        mgr = FontManager()
+        fontInfo = mgr.getFontsMatching("Open Sans")[0]
+        font = fontmanager.GLFont(fontInfo.path, 20)
+        assert not font.loadFromCache()
+        font.fetch("Cached glyphs")
+        assert font._cacheStale
+        assert font.saveToCache()
+        assert not font._cacheStale
+
+        # a new font of the same file and size gets identical glyphs
+        loaded = fontmanager.GLFont(fontInfo.path, 20)
+        assert loaded.loadFromCache()
+        assert set(loaded.glyphs) == set(font.glyphs)
+        for charcode, glyph in font.glyphs.items():
+            assert loaded.glyphs[charcode].texcoords == glyph.texcoords
+            assert loaded.glyphs[charcode].offset == glyph.offset
+        assert np.array_equal(loaded.atlas.pages[0].data,
+                              font.atlas.pages[0].data)
+        # other sizes aren't affected
+        assert not fontmanager.GLFont(fontInfo.path, 21).loadFromCache()
+
+        fontmanager.clearGlyphCache()
+        assert not fontmanager.GLFont(fontInfo.path, 20).loadFromCache()
+    finally:
+        prefs.paths['cache'] = cacheDir
+
+
+def test_font_index(tmp_path, monkeypatch):
+    from psychopy import prefs
+    from psychopy.visual.textbox2 import fontmanager
+
+    opened = []
+    Face = fontmanager.ft.Face
+
+    def countingFace(path, *args, **kwargs):
+        opened.append(path)
+        return Face(path, *args, **kwargs)
+
+    monkeypatch.setattr(fontmanager.ft, 'Face', countingFace)
+    cacheDir = prefs.paths['cache']
+    prefs.paths['cache'] = str(tmp_path)
+    try:
+        monkeypatch.setattr(FontManager, '_fontIndex',
+                            fontmanager._FontIndex())
+        FontManager()
+        assert opened
+        assert os.path.isfile(fontmanager._getFontIndexFileName())
+
+        # the next session doesn't need to open any files...
+        del opened[:]
+        monkeypatch.setattr(FontManager, '_fontIndex',
+                            fontmanager._FontIndex())
+        mgr = FontManager()
+        assert not opened
+        fontInfo = mgr.getFontsMatching("Open Sans")[0]
+        assert fontInfo.family == "Open Sans"
+        assert not fontInfo.monospace
+
+        # ...unless they are new or have changed
+        fontFile = tmp_path / "copy.ttf"
+        shutil.copy(fontInfo.path, fontFile)
+        mgr.addFontFile(fontFile)
+        mgr.addFontFile(fontFile)
+        assert opened == [str(fontFile)]
+        os.utime(fontFile, ns=(0, 10 ** 9))
+        mgr.addFontFile(fontFile)
+        assert opened == [str(fontFile)] * 2
+    finally:
+        prefs.paths['cache'] = cacheDir
+
+
+def test_shared_glyph_atlas():
+    from psychopy.visual.textbox2 import fontmanager
+
+    mgr = FontManager()
+    fontPath = mgr.getFontsMatching("Open Sans")[0].path
+    atlas = fontmanager.GlyphAtlas(256, maxPages=2)
+    small = fontmanager.GLFont(fontPath, 12, atlas=atlas)
+    large = fontmanager.GLFont(fontPath, 60, atlas=atlas)
+    small.fetch("PsychoPy")
+    large.fetch("PsychoPy")
+    # both sizes share a single texture
+    assert len(atlas.pages) == 1
+    assert atlas.generation == 0
+
+    # once the pages are full the least recently used one is recycled...
+    large.fetch("abcdefghijklmnopqrstuvwxyz0123456789")
+    assert len(atlas.pages) == 2
+    assert atlas.generation > 0
+    assert len(large.glyphs) < 36
+    # ...and the glyphs still in the atlas are intact
+    for font in (small, large):
+        reference = fontmanager.GLFont(fontPath, font.size)
+        for charcode, glyph in font.glyphs.items():
+            refGlyph = reference[charcode]
+            x, y, w, h = atlas.getRegion(glyph)
+            rx, ry, rw, rh = reference.atlas.getRegion(refGlyph)
+            assert np.array_equal(
+                atlas.pages[glyph.page].data[y:y + h, x:x + w],
+                reference.atlas.pages[0].data[ry:ry + rh, rx:rx + rw])
+
+
 @pytest.mark.uax14
 class Test_uax14_textbox(Test_textbox):
     """Runs the same tests as for Test_textbox, but with the textbox set to uax14 line breaking"""
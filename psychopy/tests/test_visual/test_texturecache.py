@@ -0,0 +1,95 @@
+import ctypes
+from pathlib import Path
+
+import numpy as np
+
+from psychopy import visual
+from psychopy.tests.utils import TESTS_DATA_PATH
+
+
+class TestTextureCache:
+
+    @classmethod
+    def setup_class(cls):
+        cls.win = visual.Window([128, 128], pos=[50, 50], allowGUI=False,
+                                autoLog=False)
+        cls.image1 = str(Path(TESTS_DATA_PATH) / 'testimage.jpg')
+        cls.image2 = 'default.png'  # from the app resources
+
+    @classmethod
+    def teardown_class(cls):
+        cls.win.close()
+
+    def setup_method(self):
+        self.win.textureCache.clear()
+        self.win.textureCache.maxBytes = 256 * 1024 ** 2
+
+    def _getCached(self, texID):
+        """The cached texture with name `texID`."""
+        cached, = [cached for cached in self.win.textureCache._textures.values()
+                   if cached.id.value == texID.value]
+        return cached
+
+    def _getImageTextures(self):
+        """The cached textures of image files, rather than patterns."""
+        return [cached for cached in self.win.textureCache._textures.values()
+                if cached.origSize is not None]
+
+    def test_images_shared(self):
+        cache = self.win.textureCache
+        stim1 = visual.ImageStim(self.win, image=self.image1, autoLog=False)
+        stim2 = visual.ImageStim(self.win, image=self.image1, autoLog=False)
+        assert stim1._texID.value == stim2._texID.value
+        assert self._getCached(stim1._texID).nUsers == 2
+        assert stim1._origSize == stim2._origSize
+
+        # switching back to an image seen before needs no upload
+        stim1.image = self.image2
+        assert stim1._texID.value != stim2._texID.value
+        assert self._getCached(stim2._texID).nUsers == 1
+        nMisses, nTextures = cache.nMisses, len(cache)
+        stim1.image = self.image1
+        assert cache.nMisses == nMisses and len(cache) == nTextures
+        assert stim1._texID.value == stim2._texID.value
+        assert self._getCached(stim1._texID).nUsers == 2
+        stim1.draw()
+
+        # arrays aren't cached, the stimulus gets its own texture back
+        stim2.image = np.zeros((16, 16))
+        assert stim2._texID.value != stim1._texID.value
+        assert ctypes.addressof(stim2._texID) not in stim2._cachedTextures
+        stim2.draw()
+        self.win.flip()
+
+    def test_lru_eviction(self):
+        cache = self.win.textureCache
+        stim = visual.ImageStim(self.win, image=self.image1, autoLog=False)
+        stim.image = self.image2
+        assert len(self._getImageTextures()) == 2
+        # textures still in use are never deleted, e.g. the stimulus' mask
+        cache.maxBytes = 1
+        cached, = self._getImageTextures()
+        assert cached.nUsers == 1
+        assert stim._texID.value == cached.id.value
+        assert len(cache) == 2
+        stim.image = np.zeros((16, 16))
+        assert not self._getImageTextures()
+
+    def test_patterns_shared(self):
+        cache = self.win.textureCache
+        gratings = [visual.GratingStim(self.win, tex='sin', mask='gauss',
+                                       autoLog=False) for _ in range(10)]
+        # textures are made when the gratings are first drawn
+        for grating in gratings:
+            grating.draw()
+        self.win.flip()
+        # one texture for the gratings and one for the masks
+        assert len(cache) == 2
+        assert len({grating._maskID.value for grating in gratings}) == 1
+        assert len({grating._texID.value for grating in gratings}) == 1
+        # different mask parameters make a different texture
+        gratings[0].maskParams = {'sd': 5}
+        gratings[0].draw()
+        self.win.flip()
+        assert gratings[0]._maskID.value != gratings[1]._maskID.value
+        assert len(cache) == 3
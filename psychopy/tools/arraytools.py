@@ -15,7 +15,10 @@ __all__ = ["createXYs",
            "shuffleArray",
            "val2array",
            "array2pointer",
-           "createLumPattern"]
+           "createLumPattern",
+           "clearPatternCache"]
+
+from functools import lru_cache
 
 import numpy
 import ctypes
@@ -330,23 +333,52 @@ def createLumPattern(patternType, res, texParams=None, maskParams=None):
     else:
         raise TypeError('parameter `maskParams` must be type `dict` or `None`')
 
-    # correct `makeRadialMatrix` from filters, duplicated her to avoid importing
-    # all of visual to test this function out
-    def _makeRadialMatrix(matrixSize, center=(0.0, 0.0), radius=1.0):
-        if type(radius) in [int, float]:
-            radius = [radius, radius]
+    # patterns are cached by the parameters they use, return a copy the caller
+    # can modify
+    if patternType in (None, "none", "None", "color"):
+        patternType = None
+    sd = fringeWidth = None
+    if patternType == "gauss":
+        try:
+            sd = allMaskParams['sd']
+        except KeyError:
+            raise ValueError(
+                "Mask parameter 'sd' not provided but is required by "
+                "`mode='gauss'`")
+    elif patternType == "raisedCos":
+        fringeWidth = allMaskParams['fringeWidth']
+
+    return _makeLumPattern(patternType, res, sd, fringeWidth).copy()
+
+
+def clearPatternCache():
+    """Forget the patterns cached by `createLumPattern`."""
+    _makeLumPattern.cache_clear()
+    _makeRadialMatrix.cache_clear()
 
-        # NB need to add one step length because
-        yy, xx = numpy.mgrid[0:matrixSize, 0:matrixSize]
-        xx = ((1.0 - 2.0 / matrixSize * xx) + center[0]) / radius[0]
-        yy = ((1.0 - 2.0 / matrixSize * yy) + center[1]) / radius[1]
-        rad = numpy.sqrt(numpy.power(xx, 2) + numpy.power(yy, 2))
 
-        return rad
+# correct `makeRadialMatrix` from filters, duplicated her to avoid importing
+# all of visual to test this function out
+@lru_cache(maxsize=32)
+def _makeRadialMatrix(matrixSize):
+    # NB need to add one step length because
+    yy, xx = numpy.mgrid[0:matrixSize, 0:matrixSize]
+    xx = 1.0 - 2.0 / matrixSize * xx
+    yy = 1.0 - 2.0 / matrixSize * yy
+    rad = numpy.sqrt(numpy.power(xx, 2) + numpy.power(yy, 2))
+    rad.flags.writeable = False
 
+    return rad
+
+
+@lru_cache(maxsize=32)
+def _makeLumPattern(patternType, res, sd, fringeWidth):
+    """Generate a pattern for `createLumPattern`, cached by the parameters
+    which affect it.
+    """
     # here is where we generate textures
     pi = numpy.pi
-    if patternType in (None, "none", "None", "color"):
+    if patternType is None:
         res = 1
         intensity = numpy.ones([res, res], numpy.float32)
     elif patternType == "sin":
@@ -386,13 +418,7 @@ def createLumPattern(patternType, res, texParams=None, maskParams=None):
     elif patternType == "gauss":
         rad = _makeRadialMatrix(res)
         # 3sd.s by the edge of the stimulus
-        try:
-            maskStdev = allMaskParams['sd']
-        except KeyError:
-            raise ValueError(
-                "Mask parameter 'sd' not provided but is required by "
-                "`mode='gauss'`")
-
+        maskStdev = sd
         invVar = (1.0 / maskStdev) ** 2.0
         intensity = numpy.exp(-rad ** 2.0 / (2.0 * invVar)) * 2 - 1
     elif patternType == "cross":
@@ -415,7 +441,7 @@ def createLumPattern(patternType, res, texParams=None, maskParams=None):
         intensity = numpy.zeros_like(rad)
         intensity[numpy.where(rad < 1)] = 1
 
-        maskFringeWidth = allMaskParams['fringeWidth']
+        maskFringeWidth = fringeWidth
         raisedCosIdx = numpy.where(
             [numpy.logical_and(rad <= 1, rad >= 1 - maskFringeWidth)])[1:]
 
@@ -454,6 +480,7 @@ def createLumPattern(patternType, res, texParams=None, maskParams=None):
     else:
         raise ValueError("invalid keyword or value for parameter `patternType`")
 
+    intensity.flags.writeable = False
     return intensity
 
 
@@ -32,8 +32,6 @@ __all__ = [
 
 import os
 import numpy as np
-from scipy.io import wavfile
-from scipy import signal
 
 # pydub is needed for saving and loading MP3 files among others
 # _has_pydub = True
@@ -102,6 +100,7 @@ def array2wav(filename, samples, freq=48000):
     clipData = np.asarray(samples * (MAX_16BITS_SIGNED - 1), dtype=np.int16)
 
     # write out file
+    from scipy.io import wavfile  # slow to import, only import if needed
     wavfile.write(filename, freq, clipData)
 
 
@@ -133,6 +132,7 @@ def wav2array(filename, normalize=True):
             "Cannot find WAV file `{}` to open.".format(filename))
 
     # read the file
+    from scipy.io import wavfile
     freq, samples = wavfile.read(filename, mmap=False)
 
     # transpose samples
@@ -209,6 +209,7 @@ def squaretone(duration, freqHz, dutyCycle=0.5, gain=0.8,
     nsamp = sampleRateHz * duration
     samples = np.arange(nsamp, dtype=np.float32)
     samples[:] = 2 * np.pi * samples[:] * freqHz / sampleRateHz
+    from scipy import signal  # slow to import, only import if needed
     samples[:] = signal.square(samples, duty=dutyCycle)
 
     if gain != 1.0:
@@ -248,6 +249,7 @@ def sawtone(duration, freqHz, peak=0.5, gain=0.8,
     nsamp = sampleRateHz * duration
     samples = np.arange(nsamp, dtype=np.float32)
     samples[:] = 2 * np.pi * samples[:] * freqHz / sampleRateHz
+    from scipy import signal
     samples[:] = signal.sawtooth(samples, width=peak)
 
     if gain != 1.0:
@@ -256,7 +258,7 @@ def sawtone(duration, freqHz, peak=0.5, gain=0.8,
     return samples.reshape(-1, 1)
 
 
-def whiteNoise(duration=1.0, sampleRateHz=SAMPLE_RATE_48kHz):
+def whiteNoise(duration=1.0, sampleRateHz=SAMPLE_RATE_48kHz, seed=None):
     """Generate gaussian white noise.
 
     Parameters
@@ -265,6 +267,9 @@ def whiteNoise(duration=1.0, sampleRateHz=SAMPLE_RATE_48kHz):
         Length of the sound in seconds.
     sampleRateHz : int
         Samples rate of the audio for playback.
+    seed : int or None
+        Seed for the random samples, so the same noise can be generated again.
+        If `None`, the global NumPy random state is used.
 
     Returns
     -------
@@ -272,7 +277,8 @@ def whiteNoise(duration=1.0, sampleRateHz=SAMPLE_RATE_48kHz):
         Nx1 array containing samples for the sound.
 
     """
-    samples = np.random.randn(int(duration * sampleRateHz)).reshape(-1, 1)
+    rng = np.random if seed is None else np.random.RandomState(seed)
+    samples = rng.randn(int(duration * sampleRateHz)).reshape(-1, 1)
 
     # clip range
     samples = samples.clip(-1, 1)
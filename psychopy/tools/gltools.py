@@ -29,6 +29,9 @@ __all__ = [
     'getInfoLog',
     'getUniformLocations',
     'getAttribLocations',
+    'getUniformLocation',
+    'getAttribLocation',
+    'forgetProgram',
     'createQueryObject',
     'QueryObjectInfo',
     'beginQuery',
@@ -105,6 +108,12 @@ from psychopy.visual.helpers import setColor, findImageFile
 
 _thisPlatform = platform.system()
 
+# (program, name) -> location, see `getUniformLocation`/`getAttribLocation`.
+# Handles are only unique within a GL context, so entries are removed by
+# `forgetProgram` whenever a program is deleted or its window is closed.
+_uniformLocations = {}
+_attribLocations = {}
+
 # create a query counter to get absolute GPU time
 
 QUERY_COUNTER = None  # prevent genQueries from being called
@@ -492,6 +501,7 @@ def deleteObject(obj):
         GL.glDeleteShader(obj)
     elif GL.glIsProgram(obj):
         GL.glDeleteProgram(obj)
+        forgetProgram(obj)  # its handle can be reused by a new program
     else:
         raise ValueError('Cannot delete, not a program or shader object.')
 
@@ -508,6 +518,7 @@ def deleteObjectARB(obj):
 
     """
     GL.glDeleteObjectARB(obj)
+    forgetProgram(obj)  # no-op for shaders, which have no cached locations
 
 
 def attachShader(program, shader):
@@ -957,6 +968,85 @@ def getAttribLocations(program, builtins=False):
 
     return attribLoc
 
+
+def getUniformLocation(program, name):
+    """Get the location of a uniform variable in a shader program.
+
+    Locations can't change once a program is linked, so they are only queried
+    from the driver the first time and cached after that. Use this instead of
+    `glGetUniformLocation` in `draw()` methods.
+
+    Parameters
+    ----------
+    program : int
+        Program handle.
+    name : str or bytes
+        Name of the uniform.
+
+    Returns
+    -------
+    int
+        Uniform location, `-1` if the program has no active uniform `name`.
+
+    """
+    name = name if type(name) is bytes else bytes(name, 'utf-8')
+    key = (int(getattr(program, 'value', program)), name)
+    try:
+        return _uniformLocations[key]
+    except KeyError:
+        pass
+    loc = GL.glGetUniformLocation(program, name)
+    _uniformLocations[key] = loc
+
+    return loc
+
+
+def getAttribLocation(program, name):
+    """Get the location of a vertex attribute in a shader program, cached like
+    :func:`getUniformLocation`.
+
+    Parameters
+    ----------
+    program : int
+        Program handle.
+    name : str or bytes
+        Name of the attribute.
+
+    Returns
+    -------
+    int
+        Attribute location, `-1` if the program has no active attribute `name`.
+
+    """
+    name = name if type(name) is bytes else bytes(name, 'utf-8')
+    key = (int(getattr(program, 'value', program)), name)
+    try:
+        return _attribLocations[key]
+    except KeyError:
+        pass
+    loc = GL.glGetAttribLocation(program, name)
+    _attribLocations[key] = loc
+
+    return loc
+
+
+def forgetProgram(program):
+    """Remove the cached locations of a program. This is called when deleting
+    it with :func:`deleteObject`, call it when deleting a program otherwise or
+    closing the window it belongs to.
+
+    Parameters
+    ----------
+    program : int
+        Program handle.
+
+    """
+    program = int(getattr(program, 'value', program))
+    for cache in (_uniformLocations, _attribLocations):
+        for key in [key for key in cache if key[0] == program]:
+            del cache[key]
+
+
 # -----------------------------------
 # GL Query Objects
 # -----------------------------------
@@ -12,6 +12,9 @@ try:
 except ImportError:
     import Image
 
+import struct
+from pathlib import Path
+
 import numpy
 
 from psychopy.tools.typetools import float_uint8
@@ -63,3 +66,352 @@ def makeImageAuto(inarray):
     array from -1:1 to 0:255 and converts to PIL image format.
     """
     return image2array(float_uint8(inarray))
+
+
+# -----------------------------------------------------------------------------
+# GPU-compressed images
+#
+# Images can be stored as S3TC (DXT1/BC1, DXT3/BC2 and DXT5/BC3) compressed
+# DDS files, which are uploaded to the graphics card without decoding and use
+# a quarter (DXT1: an eighth) of the video memory of RGBA images.
+#
+
+# bytes per 4x4 block for each compression format
+_ddsBlockBytes = {'DXT1': 8, 'DXT3': 16, 'DXT5': 16}
+# DXGI formats of the DX10 DDS header extension which are S3TC formats
+_dxgiFormats = {71: 'DXT1', 72: 'DXT1', 74: 'DXT3', 75: 'DXT3', 77: 'DXT5',
+                78: 'DXT5'}
+
+
+class CompressedImage:
+    """An image compressed for the graphics card, with its mipmaps.
+
+    Parameters
+    ----------
+    size : tuple
+        Width and height of the image in pixels.
+    fourCC : str
+        Compression format, `'DXT1'`, `'DXT3'` or `'DXT5'`.
+    levels : list
+        Compressed data of each mipmap level as `(width, height, data)`, where
+        `data` is a 1D `uint8` array, largest level first.
+
+    """
+    def __init__(self, size, fourCC, levels):
+        self.size = tuple(size)
+        self.fourCC = fourCC
+        self.levels = levels
+
+    @property
+    def nBytes(self):
+        """Size of the compressed data of all levels."""
+        return sum(data.nbytes for _, _, data in self.levels)
+
+
+def _imageBlocks(rgba):
+    """Split an RGBA array, padded to a multiple of 4 pixels, into 4x4 blocks
+    of shape (nBlocks, 16, 4), in the order they are stored.
+    """
+    h, w = rgba.shape[:2]
+    padH, padW = -h % 4, -w % 4
+    if padH or padW:
+        rgba = numpy.pad(rgba, ((0, padH), (0, padW), (0, 0)), mode='edge')
+        h, w = rgba.shape[:2]
+    blocks = rgba.reshape(h // 4, 4, w // 4, 4, 4).swapaxes(1, 2)
+    return blocks.reshape(-1, 16, 4)
+
+
+def _encodeColorBlocks(rgb):
+    """Encode blocks of RGB pixels (nBlocks, 16, 3) as BC1 color blocks."""
+    rgb = rgb.astype(numpy.float32)
+    # endpoints are the extremes of the pixels along the principal axis
+    mean = rgb.mean(axis=1, keepdims=True)
+    centred = rgb - mean
+    cov = numpy.einsum('nki,nkj->nij', centred, centred)
+    axis = numpy.ones((len(rgb), 3), numpy.float32)
+    for _ in range(4):  # power iteration
+        axis = numpy.einsum('nij,nj->ni', cov, axis)
+        axis /= numpy.maximum(
+            numpy.linalg.norm(axis, axis=1, keepdims=True), 1e-6)
+    proj = numpy.einsum('nki,ni->nk', centred, axis)
+    ends = mean + axis[:, None, :] * numpy.stack(
+        [proj.max(axis=1), proj.min(axis=1)], axis=1)[:, :, None]
+    ends = numpy.clip(ends, 0, 255)
+
+    # quantise to 5:6:5 bits
+    scale = numpy.array([31, 63, 31], numpy.float32)
+    q = numpy.round(ends * scale / 255.).astype(numpy.uint16)
+    packed = (q[..., 0] << 11) | (q[..., 1] << 5) | q[..., 2]
+    swap = packed[:, 0] < packed[:, 1]  # first endpoint must be the larger
+    packed[swap] = packed[swap][:, ::-1]
+    q[swap] = q[swap][:, ::-1]
+
+    # palette of the decoder, from the quantised endpoints
+    q = q.astype(numpy.float32)
+    ends = numpy.stack([q[..., 0] * 255. / 31, q[..., 1] * 255. / 63,
+                        q[..., 2] * 255. / 31], axis=-1)
+    palette = numpy.stack([
+        ends[:, 0], ends[:, 1],
+        (2 * ends[:, 0] + ends[:, 1]) / 3.,
+        (ends[:, 0] + 2 * ends[:, 1]) / 3.], axis=1)
+    dist = ((rgb[:, :, None, :] - palette[:, None, :, :]) ** 2).sum(axis=-1)
+    indices = dist.argmin(axis=-1).astype(numpy.uint32)
+    indices[packed[:, 0] == packed[:, 1]] = 0
+    bits = (indices << (2 * numpy.arange(16, dtype=numpy.uint32))).sum(
+        axis=1, dtype=numpy.uint32)
+
+    out = numpy.empty(len(rgb), [('c0', '<u2'), ('c1', '<u2'), ('bits', '<u4')])
+    out['c0'] = packed[:, 0]
+    out['c1'] = packed[:, 1]
+    out['bits'] = bits
+    return out.view(numpy.uint8).reshape(-1, 8)
+
+
+def _encodeAlphaBlocks(alpha):
+    """Encode blocks of alpha values (nBlocks, 16) as BC3 alpha blocks."""
+    alpha = alpha.astype(numpy.float32)
+    a0 = alpha.max(axis=1)
+    a1 = alpha.min(axis=1)
+    weights = numpy.arange(1, 7, dtype=numpy.float32) / 7.
+    palette = numpy.concatenate([
+        a0[:, None], a1[:, None],
+        a0[:, None] * (1 - weights) + a1[:, None] * weights], axis=1)
+    indices = numpy.abs(alpha[:, :, None] - palette[:, None, :]).argmin(
+        axis=-1).astype(numpy.uint64)
+    indices[a0 == a1] = 0
+    bits = (indices << (3 * numpy.arange(16, dtype=numpy.uint64))).sum(
+        axis=1, dtype=numpy.uint64)
+
+    out = numpy.empty((len(alpha), 8), numpy.uint8)
+    out[:, 0] = a0
+    out[:, 1] = a1
+    out[:, 2:] = bits.astype('<u8').view(numpy.uint8).reshape(-1, 8)[:, :6]
+    return out
+
+
+def compressImage(image, mipmaps=True, fourCC=None):
+    """Compress an image for the graphics card.
+
+    Parameters
+    ----------
+    image : :class:`~PIL.Image.Image`, ndarray or str
+        The image, an RGB(A) `uint8` array or an image file.
+    mipmaps : bool
+        Also compress the smaller mipmap levels, which make the image look
+        smoother when drawn smaller than its size.
+    fourCC : str or None
+        `'DXT1'` (8 bits per pixel, no transparency) or `'DXT5'` (8 bits per
+        pixel with transparency). `None` picks `'DXT5'` for images with
+        transparency, otherwise `'DXT1'`.
+
+    Returns
+    -------
+    CompressedImage
+        The compressed image, first row at the top.
+
+    """
+    if isinstance(image, numpy.ndarray):
+        image = Image.fromarray(image)
+    elif not isinstance(image, Image.Image):
+        image = Image.open(image)
+    image = image.convert('RGBA')
+    if fourCC is None:
+        alpha = numpy.asarray(image)[:, :, 3]
+        fourCC = 'DXT1' if alpha.min() == 255 else 'DXT5'
+    if fourCC not in ('DXT1', 'DXT5'):
+        raise ValueError("Can only compress to DXT1 or DXT5, not "
+                         "{}".format(fourCC))
+
+    width, height = image.size
+    levels = []
+    while True:
+        w = max(1, width >> len(levels))
+        h = max(1, height >> len(levels))
+        level = image if (w, h) == image.size else image.resize(
+            (w, h), Image.BOX)
+        blocks = _imageBlocks(numpy.asarray(level))
+        data = _encodeColorBlocks(blocks[:, :, :3])
+        if fourCC == 'DXT5':
+            data = numpy.hstack([_encodeAlphaBlocks(blocks[:, :, 3]), data])
+        levels.append((w, h, data.ravel()))
+        if not mipmaps or (w == 1 and h == 1):
+            break
+
+    return CompressedImage(image.size, fourCC, levels)
+
+
+def flipCompressedImage(image):
+    """Flip a compressed image upside down, without decompressing it.
+
+    The blocks of 4x4 pixels are flipped as a whole, so only levels with a
+    height that is a multiple of 4 (or less than 4) can be flipped. The
+    mipmap chain is cut short at the first level that can't be.
+
+    Parameters
+    ----------
+    image : CompressedImage
+        The image to flip.
+
+    Returns
+    -------
+    CompressedImage
+        The flipped image.
+
+    Raises
+    ------
+    ValueError
+        If the height of the image is more than 4 and not a multiple of 4.
+
+    """
+    width, height = image.size
+    if height > 4 and height % 4:
+        raise ValueError(
+            "Can't flip a compressed image with a height of {} pixels, only "
+            "heights that are a multiple of 4 can be flipped".format(height))
+    blockBytes = _ddsBlockBytes[image.fourCC]
+    levels = []
+    for w, h, data in image.levels:
+        if h > 4 and h % 4:
+            break  # rows of this level don't line up with the blocks
+        nRows = (h + 3) // 4
+        blocks = data.reshape(nRows, -1, blockBytes)[::-1].copy()
+        # order of the rows of pixels within each block
+        rows = list(range(min(h, 4)))[::-1] + list(range(min(h, 4), 4))
+        colorRows = blocks[:, :, blockBytes - 4:]
+        colorRows[:] = colorRows[:, :, rows]
+        if image.fourCC == 'DXT3':
+            alphaRows = blocks[:, :, :8].reshape(nRows, -1, 4, 2)
+            alphaRows[:] = alphaRows[:, :, rows]
+        elif image.fourCC == 'DXT5':
+            # 16 3-bit indices after the two reference values, 12 bits a row
+            bits = numpy.zeros(blocks.shape[:2] + (8,), numpy.uint8)
+            bits[:, :, :6] = blocks[:, :, 2:8]
+            bits = bits.view('<u8')[:, :, 0]
+            flipped = numpy.zeros_like(bits)
+            for dst, src in enumerate(rows):
+                flipped |= ((bits >> numpy.uint64(12 * src)) &
+                            numpy.uint64(0xFFF)) << numpy.uint64(12 * dst)
+            blocks[:, :, 2:8] = flipped[:, :, None].view(numpy.uint8)[:, :, :6]
+        levels.append((w, h, blocks.ravel()))
+
+    return CompressedImage(image.size, image.fourCC, levels)
+
+
+def writeDDS(filename, image):
+    """Save a compressed image as a DDS file.
+
+    Parameters
+    ----------
+    filename : str or Path
+        File to write.
+    image : CompressedImage
+        The image, first row at the top (as returned by
+        :func:`compressImage`).
+
+    """
+    width, height = image.size
+    flags = 0x1 | 0x2 | 0x4 | 0x1000 | 0x80000  # caps, size, format, linear
+    caps = 0x1000  # texture
+    if len(image.levels) > 1:
+        flags |= 0x20000  # mipmap count
+        caps |= 0x400000 | 0x8  # mipmap, complex
+    header = struct.pack(
+        '<4s7I44s8I5I', b'DDS ', 124, flags, height, width,
+        image.levels[0][2].nbytes, 0, len(image.levels), b'\0' * 44,
+        32, 0x4, struct.unpack('<I', image.fourCC.encode('ascii'))[0],
+        0, 0, 0, 0, 0, caps, 0, 0, 0, 0)
+    with open(filename, 'wb') as f:
+        f.write(header)
+        for _, _, data in image.levels:
+            f.write(data.tobytes())
+
+
+def readDDS(filename, flip=True):
+    """Load a compressed image from a DDS file.
+
+    Only S3TC (DXT1, DXT3 and DXT5, or BC1-3) compressed files are supported.
+
+    Parameters
+    ----------
+    filename : str or Path
+        File to read.
+    flip : bool
+        Flip the image to put the first row at the bottom, as OpenGL expects.
+
+    Returns
+    -------
+    CompressedImage
+        The image.
+
+    """
+    with open(filename, 'rb') as f:
+        raw = f.read()
+    if raw[:4] != b'DDS ' or len(raw) < 128:
+        raise ValueError("{} is not a DDS file".format(filename))
+    header = struct.unpack_from('<31I', raw, 4)
+    height, width, nLevels = header[2], header[3], max(1, header[6])
+    if not header[1] & 0x20000:
+        nLevels = 1
+    fourCC = raw[84:88].decode('ascii', 'replace')
+    offset = 128
+    if fourCC == 'DX10':
+        fourCC = _dxgiFormats.get(struct.unpack_from('<I', raw, 128)[0])
+        offset += 20
+    if fourCC not in _ddsBlockBytes:
+        raise ValueError("Unsupported DDS format in {}, only DXT1, DXT3 and "
+                         "DXT5 can be loaded".format(filename))
+
+    blockBytes = _ddsBlockBytes[fourCC]
+    levels = []
+    for level in range(nLevels):
+        w = max(1, width >> level)
+        h = max(1, height >> level)
+        nBytes = ((w + 3) // 4) * ((h + 3) // 4) * blockBytes
+        if offset + nBytes > len(raw):
+            break  # truncated mipmap chain, use the levels we have
+        data = numpy.frombuffer(raw, numpy.uint8, nBytes, offset)
+        levels.append((w, h, data))
+        offset += nBytes
+    if not levels:
+        raise ValueError("{} contains no image data".format(filename))
+
+    image = CompressedImage((width, height), fourCC, levels)
+    return flipCompressedImage(image) if flip else image
+
+
+def compressImageFiles(fileNames, folder=None, mipmaps=True, overwrite=False):
+    """Convert image files to compressed DDS files for fast loading.
+
+    `ImageStim` loads DDS files directly onto the graphics card, without
+    decoding them, so converting the images of an experiment beforehand
+    saves loading time and video memory.
+
+    Parameters
+    ----------
+    fileNames : list
+        Image files to convert.
+    folder : str, Path or None
+        Folder to save the DDS files in. `None` saves them next to the images.
+    mipmaps : bool
+        Include mipmaps.
+    overwrite : bool
+        Convert images even if the DDS file is newer than the image.
+
+    Returns
+    -------
+    list
+        The DDS files, in the order of `fileNames`.
+
+    """
+    ddsFiles = []
+    for fileName in fileNames:
+        fileName = Path(fileName)
+        ddsFile = fileName.with_suffix('.dds')
+        if folder is not None:
+            ddsFile = Path(folder) / ddsFile.name
+        if (overwrite or not ddsFile.exists() or
+                ddsFile.stat().st_mtime < fileName.stat().st_mtime):
+            writeDDS(ddsFile, compressImage(fileName, mipmaps=mipmaps))
+        ddsFiles.append(str(ddsFile))
+
+    return ddsFiles
@@ -64,7 +64,8 @@ __all__ = ['normalize',
            'articulate',
            'forwardProject',
            'reverseProject',
-           'lensCorrectionSpherical']
+           'lensCorrectionSpherical',
+           'triangulatePolygon']
 
 
 import numpy as np
@@ -3982,6 +3983,125 @@ def lensCorrectionSpherical(xys, coefK=1.0, aspect=1.0, out=None, dtype=None):
     return toReturn
 
 
+def triangulatePolygon(verts, dtype=None):
+    """Triangulate a simple polygon by ear clipping.
+
+    Pure NumPy alternative to the GLU tessellator used by
+    :class:`~psychopy.visual.ShapeStim`. Each pass finds all 'ears' (convex
+    vertices whose triangle with both neighbours contains no other vertex) at
+    once and clips a set of non-adjacent ones, so convex polygons only need
+    about `log2(N)` passes.
+
+    Parameters
+    ----------
+    verts : array_like
+        Nx2 vertices of the polygon, in either winding order. The polygon
+        must be simple (not self-intersecting) and have no holes. Repeated
+        consecutive vertices and a closing vertex equal to the first are
+        ignored.
+    dtype : dtype or str, optional
+        Data type for computations can either be 'float32' or 'float64'. If
+        `None`, 'float64' is used by default.
+
+    Returns
+    -------
+    ndarray
+        Mx2 array of vertices where each consecutive three make a triangle.
+        Empty if `verts` has fewer than three distinct vertices.
+
+    Raises
+    ------
+    ValueError
+        If the polygon could not be triangulated, usually because it is self
+        intersecting.
+
+    Examples
+    --------
+    Triangulate a concave 'L' shape::
+
+        verts = [(0, 0), (2, 0), (2, 1), (1, 1), (1, 2), (0, 2)]
+        tris = triangulatePolygon(verts)
+        nTriangles = tris.shape[0] // 3
+
+    """
+    dtype = np.float64 if dtype is None else np.dtype(dtype).type
+    verts = np.asarray(verts, dtype=dtype)
+    if verts.ndim != 2 or verts.shape[1] != 2:
+        raise ValueError("Vertices must be an Nx2 array.")
+
+    # drop repeated vertices, including the first one repeated at the end
+    keep = np.any(verts != np.roll(verts, 1, axis=0), axis=1)
+    if not np.any(keep):
+        return np.zeros((0, 2), dtype=dtype)
+    verts = verts[keep]
+    nVerts = verts.shape[0]
+    if nVerts < 3:
+        return np.zeros((0, 2), dtype=dtype)
+
+    # work with counter-clockwise vertices
+    x, y = verts[:, 0], verts[:, 1]
+    area = np.dot(x, np.roll(y, -1)) - np.dot(np.roll(x, -1), y)
+    idx = np.arange(nVerts) if area >= 0.0 else np.arange(nVerts)[::-1]
+    eps = np.finfo(dtype).eps * np.max(np.abs(verts)) ** 2 * 16
+
+    def _cross(o, a, b):
+        # z of (a - o) x (b - o), last axis holds xy
+        return ((a[..., 0] - o[..., 0]) * (b[..., 1] - o[..., 1]) -
+                (a[..., 1] - o[..., 1]) * (b[..., 0] - o[..., 0]))
+
+    tris = []
+    while idx.shape[0] > 3:
+        prevIdx = np.roll(idx, 1)
+        nextIdx = np.roll(idx, -1)
+        a, b, c = verts[prevIdx], verts[idx], verts[nextIdx]
+        turn = _cross(a, b, c)
+        convex = turn > eps
+        collinear = np.abs(turn) <= eps  # removed without a triangle
+
+        # a convex vertex is an ear if no other vertex is strictly inside the
+        # triangle it forms with its neighbours, only non-convex vertices
+        # can be
+        isEar = convex.copy()
+        candidates = np.flatnonzero(convex)
+        blockers = b[~convex]
+        if candidates.size and blockers.shape[0]:
+            ta = a[candidates][:, np.newaxis, :]
+            tb = b[candidates][:, np.newaxis, :]
+            tc = c[candidates][:, np.newaxis, :]
+            p = blockers[np.newaxis, :, :]
+            inside = ((_cross(ta, tb, p) > eps) &
+                      (_cross(tb, tc, p) > eps) &
+                      (_cross(tc, ta, p) > eps))
+            isEar[candidates] = ~np.any(inside, axis=1)
+
+        remove = isEar | collinear
+        if not np.any(remove):
+            raise ValueError(
+                "Could not triangulate polygon, is it self-intersecting?")
+
+        # only clip non-adjacent vertices, every other one in each run
+        pos = np.arange(idx.shape[0])
+        runStart = remove & ~np.roll(remove, 1)
+        runStart = np.maximum.accumulate(np.where(runStart, pos, 0))
+        remove &= (pos - runStart) % 2 == 0
+        if remove[0] and remove[-1]:
+            remove[-1] = False
+
+        clip = remove & ~collinear
+        tris.append(np.column_stack(
+            (prevIdx[clip], idx[clip], nextIdx[clip])))
+        idx = idx[~remove]
+
+    if idx.shape[0] == 3 and \
+            np.abs(_cross(verts[idx[0]], verts[idx[1]], verts[idx[2]])) > eps:
+        tris.append(idx[np.newaxis, :])
+
+    if not tris:
+        return np.zeros((0, 2), dtype=dtype)
+
+    return verts[np.concatenate(tris).ravel()]
+
+
 class infrange():
     """
     Similar to base Python `range`, but allowing the step to be a float or even
@@ -27,7 +27,8 @@ __all__ = [
     'getKeyboards',
     'getSerialPorts',
     # 'getParallelPorts',
-    'systemProfilerMacOS'
+    'systemProfilerMacOS',
+    'startWorkerProcess'
 ]
 
 # Keep imports to a minimum here! We don't want to import the whole stack to
@@ -800,5 +801,90 @@ def systemProfilerMacOS(dataTypes=None, detailLevel='basic', timeout=180):
     return systemProfilerRet.decode("utf-8")  # convert to string
 
 
+def startWorkerProcess(script, args=(), timeout=30.0):
+    """Run a Python script in a new process and connect to it.
+
+    Unlike `multiprocessing`, this doesn't re-run the experiment script in the
+    new process. The script is sent the address to connect to and a key to
+    authenticate with, followed by `args`, pickled on `stdin`::
+
+        address, authkey, *args = pickle.load(sys.stdin.buffer)
+        conn = multiprocessing.connection.Client(address, authkey=authkey)
+
+    Parameters
+    ----------
+    script : str
+        Python script to run.
+    args : tuple
+        Picklable values sent to the script after the address and key.
+    timeout : float
+        Longest time to wait for the process to connect in seconds.
+
+    Returns
+    -------
+    tuple
+        The process (`subprocess.Popen`) and the connection to it
+        (`multiprocessing.connection.Connection`).
+
+    Raises
+    ------
+    RuntimeError
+        If the process exits, or doesn't connect within `timeout`. The
+        process is killed if it's still running.
+
+    """
+    import os
+    import pickle
+    import socket
+    import time
+    from multiprocessing.connection import (
+        Connection, AuthenticationError, answer_challenge, deliver_challenge)
+
+    authkey = os.urandom(32)
+    proc = None
+    try:
+        with socket.socket() as server:
+            server.bind(('127.0.0.1', 0))
+            server.listen(1)
+            # check the process is still running while waiting for it, it
+            # exits without connecting if it can't start
+            server.settimeout(0.1)
+            proc = sp.Popen([sys.executable, script], stdin=sp.PIPE)
+            proc.stdin.write(pickle.dumps(
+                (server.getsockname(), authkey) + tuple(args)))
+            proc.stdin.close()
+
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    sock, _ = server.accept()
+                    break
+                except socket.timeout:
+                    if proc.poll() is not None:
+                        raise RuntimeError(
+                            "Worker process exited with code {} before "
+                            "connecting.".format(proc.returncode))
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(
+                            "Worker process didn't connect within {} s.".format(
+                                timeout))
+
+        sock.setblocking(True)
+        conn = Connection(sock.detach())
+        try:  # as `multiprocessing.connection.Listener.accept()`
+            deliver_challenge(conn, authkey)
+            answer_challenge(conn, authkey)
+        except (EOFError, OSError, AuthenticationError) as err:
+            conn.close()
+            raise RuntimeError(
+                "Worker process failed to connect: {}".format(err))
+    except Exception:
+        if proc is not None and proc.poll() is None:
+            proc.kill()
+        raise
+
+    return proc, conn
+
+
 if __name__ == "__main__":
     pass
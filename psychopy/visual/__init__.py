@@ -9,6 +9,7 @@
 """
 
 import sys
+import importlib
 if sys.platform == 'win32':
     from pyglet.libs import win32  # pyglet patch for ANACONDA install
     from ctypes import *
@@ -33,91 +34,118 @@ from .basevisual import BaseVisualStim
 from .helpers import pointInPolygon, polygonsOverlap
 from .image import ImageStim
 from .text import TextStim
-from .form import Form
-from .brush import Brush
-from .textbox2.textbox2 import TextBox2
-from .button import ButtonStim
-from .roi import ROI
-from .target import TargetStim
 # window, should always be loaded first
 from .window import Window, getMsPerFrame, openWindows
 
-# needed for backwards-compatibility
-
-# need absolute imports within lazyImports
-
-# A newer alternative lib is apipkg but then we have to specify all the vars
-# that will be included, not just the lazy ones? Syntax is:
-# import apipkg
-# apipkg.initpkg(__name__, {
-#        'GratingStim': "psychopy.visual.grating:GratingStim",
-# })
-
 from psychopy.constants import STOPPED, FINISHED, PLAYING, NOT_STARTED
 
-lazyImports = """
-# stimuli derived from object or MinimalStim
-from psychopy.visual.aperture import Aperture  # uses BaseShapeStim, ImageStim
-from psychopy.visual.custommouse import CustomMouse
-from psychopy.visual.elementarray import ElementArrayStim
-from psychopy.visual.ratingscale import RatingScale
-from psychopy.visual.slider import Slider
-from psychopy.visual.simpleimage import SimpleImageStim
-
-# stimuli derived from BaseVisualStim
-from psychopy.visual.dot import DotStim
-from psychopy.visual.grating import GratingStim
-from psychopy.visual.secondorder import EnvelopeGrating
-from psychopy.visual.movies import MovieStim
-from psychopy.visual.movie2 import MovieStim2
-from psychopy.visual.movie3 import MovieStim3
-from psychopy.visual.vlcmoviestim import VlcMovieStim
-from psychopy.visual.shape import BaseShapeStim
-
-# stimuli derived from GratingStim
-from psychopy.visual.bufferimage import BufferImageStim
-from psychopy.visual.patch import PatchStim
-from psychopy.visual.radial import RadialStim
-from psychopy.visual.noise import NoiseStim
-
-# stimuli derived from BaseShapeStim
-from psychopy.visual.shape import ShapeStim
-
-# stimuli derived from ShapeStim
-from psychopy.visual.line import Line
-from psychopy.visual.polygon import Polygon
-from psychopy.visual.rect import Rect
-from psychopy.visual.pie import Pie
-from psychopy.visual.button import CheckBoxStim
-
-# stimuli derived from Polygon
-from psychopy.visual.circle import Circle
-
-# stimuli derived from TextBox
-from psychopy.visual.textbox import TextBox
-from psychopy.visual.dropdown import DropDownCtrl
-
-# rift support 
-from psychopy.visual.rift import Rift
-
-# VisualSystemHD support
-from psychopy.visual.nnlvs import VisualSystemHD
-
-# 3D stimuli support
-from psychopy.visual.panorama import PanoramicImageStim
-from psychopy.visual.stim3d import LightSource
-from psychopy.visual.stim3d import SceneSkybox
-from psychopy.visual.stim3d import BlinnPhongMaterial
-from psychopy.visual.stim3d import RigidBodyPose
-from psychopy.visual.stim3d import BoundingBox
-from psychopy.visual.stim3d import SphereStim
-from psychopy.visual.stim3d import BoxStim
-from psychopy.visual.stim3d import PlaneStim
-from psychopy.visual.stim3d import ObjMeshStim
+# Everything else is imported the first time it is used, so that importing
+# psychopy.visual doesn't import every stimulus and its dependencies. Maps the
+# name of each class to the module defining it.
+lazyImports = {
+    # stimuli derived from object or MinimalStim
+    'Aperture': 'psychopy.visual.aperture',  # uses BaseShapeStim, ImageStim
+    'CustomMouse': 'psychopy.visual.custommouse',
+    'ElementArrayStim': 'psychopy.visual.elementarray',
+    'RatingScale': 'psychopy.visual.ratingscale',
+    'Slider': 'psychopy.visual.slider',
+    'SimpleImageStim': 'psychopy.visual.simpleimage',
+    'Form': 'psychopy.visual.form',
+    'Brush': 'psychopy.visual.brush',
+    'ROI': 'psychopy.visual.roi',
+
+    # stimuli derived from BaseVisualStim
+    'DotStim': 'psychopy.visual.dot',
+    'GratingStim': 'psychopy.visual.grating',
+    'EnvelopeGrating': 'psychopy.visual.secondorder',
+    'MovieStim': 'psychopy.visual.movies',
+    'MovieStim2': 'psychopy.visual.movie2',
+    'MovieStim3': 'psychopy.visual.movie3',
+    'VlcMovieStim': 'psychopy.visual.vlcmoviestim',
+    'BaseShapeStim': 'psychopy.visual.shape',
+    'TextBox2': 'psychopy.visual.textbox2.textbox2',
+    'ButtonStim': 'psychopy.visual.button',
+
+    # stimuli derived from GratingStim
+    'BufferImageStim': 'psychopy.visual.bufferimage',
+    'PatchStim': 'psychopy.visual.patch',
+    'RadialStim': 'psychopy.visual.radial',
+    'NoiseStim': 'psychopy.visual.noise',
+
+    # stimuli derived from BaseShapeStim
+    'ShapeStim': 'psychopy.visual.shape',
+
+    # stimuli derived from ShapeStim
+    'Line': 'psychopy.visual.line',
+    'Polygon': 'psychopy.visual.polygon',
+    'Rect': 'psychopy.visual.rect',
+    'Pie': 'psychopy.visual.pie',
+    'CheckBoxStim': 'psychopy.visual.button',
+
+    # stimuli derived from Polygon
+    'Circle': 'psychopy.visual.circle',
+    'TargetStim': 'psychopy.visual.target',
+
+    # batched drawing of shapes
+    'ShapeBatch': 'psychopy.visual.shapebatch',
+
+    # loading images in the background
+    'ImagePreloader': 'psychopy.visual.preloader',
+
+    # stimuli derived from TextBox
+    'TextBox': 'psychopy.visual.textbox',
+    'DropDownCtrl': 'psychopy.visual.dropdown',
+
+    # rift support
+    'Rift': 'psychopy.visual.rift',
+
+    # VisualSystemHD support
+    'VisualSystemHD': 'psychopy.visual.nnlvs',
+
+    # 3D stimuli support
+    'PanoramicImageStim': 'psychopy.visual.panorama',
+    'LightSource': 'psychopy.visual.stim3d',
+    'SceneSkybox': 'psychopy.visual.stim3d',
+    'BlinnPhongMaterial': 'psychopy.visual.stim3d',
+    'RigidBodyPose': 'psychopy.visual.stim3d',
+    'BoundingBox': 'psychopy.visual.stim3d',
+    'SphereStim': 'psychopy.visual.stim3d',
+    'BoxStim': 'psychopy.visual.stim3d',
+    'PlaneStim': 'psychopy.visual.stim3d',
+    'ObjMeshStim': 'psychopy.visual.stim3d',
+}
+
+
+# provided by the psychopy-visionscience plugin, which might not be installed
+_pluginImports = ('EnvelopeGrating', 'NoiseStim')
+
+# names imported by `from psychopy.visual import *`, the lazy ones are only
+# imported then
+__all__ = [
+    'event', 'filters', 'gamma', 'BaseVisualStim', 'pointInPolygon',
+    'polygonsOverlap', 'ImageStim', 'TextStim', 'Window', 'getMsPerFrame',
+    'openWindows', 'STOPPED', 'FINISHED', 'PLAYING', 'NOT_STARTED']
+__all__ += [name for name in lazyImports if name not in _pluginImports]
+
+
+def __getattr__(name):
+    """Import classes (and submodules) of `psychopy.visual` on first use."""
+    if name in lazyImports:
+        module = importlib.import_module(lazyImports[name])
+        value = globals()[name] = getattr(module, name)
+        return value
+    if not name.startswith('_'):
+        # e.g. `visual.textbox2`, which earlier versions always imported
+        fullName = '{}.{}'.format(__name__, name)
+        try:
+            return importlib.import_module(fullName)
+        except ModuleNotFoundError as err:
+            if err.name != fullName:
+                raise
+    raise AttributeError(
+        "module {!r} has no attribute {!r}".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(lazyImports))
 
-"""
-try:
-    from psychopy.contrib.lazy_import import lazy_import
-    lazy_import(globals(), lazyImports)
-except Exception:
-    exec(lazyImports)
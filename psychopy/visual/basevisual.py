@@ -44,9 +44,12 @@ from psychopy.visual.helpers import (pointInPolygon, polygonsOverlap,
                                      setColor, findImageFile)
 from psychopy.tools.typetools import float_uint8
 from psychopy.tools.arraytools import makeRadialMatrix, createLumPattern
+from psychopy.tools.imagetools import readDDS
 from psychopy.tools.colorspacetools import dkl2rgb, lms2rgb  # pylint: disable=W0611
 
 from . import globalVars
+from . import profiler as _profiler
+from . import texturecache as _texturecache
 
 import numpy
 from numpy import pi
@@ -99,6 +102,11 @@ class MinimalStim:
                    "Set autoLog to True only at the end of __init__())")
             logging.warning(msg % self.__class__.__name__)
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # classes created while draw profiling is active need wrapping too
+        _profiler._onNewStimClass(cls)
+
     def __str__(self, complete=False):
         """
         """
@@ -935,6 +943,253 @@ class ContainerMixin:
         return polygonsOverlap(self, polygon)
 
 
+def _imageToIntensity(im, pixFormat, dataType, forcePOW2, name=None):
+    """Convert an image to the intensity array of a texture.
+
+    Parameters
+    ----------
+    im : :class:`~PIL.Image.Image`
+        The image, already flipped so the first row is at the bottom.
+    pixFormat : :class:`~pyglet.gl.GLenum` or int
+        Pixel format of the texture, `GL_ALPHA` or `GL_RGB`.
+    dataType : :class:`~pyglet.gl.GLenum` or int
+        `GL_UNSIGNED_BYTE` or `GL_FLOAT`.
+    forcePOW2 : bool
+        Resize the image to a square power-of-two.
+    name : str or None
+        Name of the image, for messages.
+
+    Returns
+    -------
+    tuple
+        The intensity array, whether the image was luminance and the data type
+        of the array.
+
+    """
+    # is it 1D?
+    if im.size[0] == 1 or im.size[1] == 1:
+        logging.error("Only 2D textures are supported at the moment")
+    else:
+        maxDim = max(im.size)
+        powerOf2 = int(2**numpy.ceil(numpy.log2(maxDim)))
+        if forcePOW2 and (im.size[0] != powerOf2 or im.size[1] != powerOf2):
+            if globalVars.nImageResizes < reportNImageResizes:
+                msg = ("Image '%s' was not a square power-of-two ' "
+                       "'image. Linearly interpolating to be %ix%i")
+                logging.warning(msg % (name, powerOf2, powerOf2))
+                globalVars.nImageResizes += 1
+                im = im.resize([powerOf2, powerOf2], Image.BILINEAR)
+            elif globalVars.nImageResizes == reportNImageResizes:
+                logging.warning("Multiple images have needed resizing"
+                                " - I'll stop bothering you!")
+                im = im.resize([powerOf2, powerOf2], Image.BILINEAR)
+
+    # is it Luminance or RGB?
+    if pixFormat == GL.GL_ALPHA and im.mode != 'L':
+        # we have RGB and need Lum
+        wasLum = True
+        im = im.convert("L")  # force to intensity (need if was rgb)
+    elif im.mode == 'L':  # we have lum and no need to change
+        wasLum = True
+        dataType = GL.GL_FLOAT
+    elif pixFormat == GL.GL_RGB:
+        # we want RGB and might need to convert from CMYK or Lm
+        # texture = im.tostring("raw", "RGB", 0, -1)
+        im = im.convert("RGBA")
+        wasLum = False
+    else:
+        raise ValueError('cannot determine if image is luminance or RGB')
+
+    if dataType == GL.GL_FLOAT:
+        # convert from ubyte to float
+        # much faster to avoid division 2/255
+        intensity = numpy.array(im).astype(
+            numpy.float32) * 0.0078431372549019607 - 1.0
+    else:
+        intensity = numpy.array(im)
+
+    return intensity, wasLum, dataType
+
+
+def _makeTextureData(intensity, wasLum, wasImage, pixFormat, dataType,
+                     glVendor=''):
+    """Make the array to upload for a texture from its intensity array.
+
+    Returns
+    -------
+    tuple
+        The data array, and the internal format, pixel format and data type to
+        upload it with.
+
+    """
+    if pixFormat == GL.GL_RGB and wasLum and dataType == GL.GL_FLOAT:
+        # grating stim on good machine
+        # keep as float32 -1:1
+        if (sys.platform != 'darwin' and
+                glVendor.startswith('nvidia')):
+            # nvidia under win/linux might not support 32bit float
+            # could use GL_LUMINANCE32F_ARB here but check shader code?
+            internalFormat = GL.GL_RGB16F_ARB
+        else:
+            # we've got a mac or an ATI card and can handle
+            # 32bit float textures
+            # could use GL_LUMINANCE32F_ARB here but check shader code?
+            internalFormat = GL.GL_RGB32F_ARB
+        # initialise data array as a float
+        data = numpy.ones((intensity.shape[0], intensity.shape[1], 3),
+                          numpy.float32)
+        data[:, :, 0] = intensity  # R
+        data[:, :, 1] = intensity  # G
+        data[:, :, 2] = intensity  # B
+    elif (pixFormat == GL.GL_RGB and
+            wasLum and
+            dataType != GL.GL_FLOAT):
+        # was a lum image: stick with ubyte for speed
+        internalFormat = GL.GL_RGB
+        # initialise data array as a float
+        data = numpy.ones((intensity.shape[0], intensity.shape[1], 3),
+                          numpy.ubyte)
+        data[:, :, 0] = intensity  # R
+        data[:, :, 1] = intensity  # G
+        data[:, :, 2] = intensity  # B
+    elif pixFormat == GL.GL_RGB and dataType == GL.GL_FLOAT:
+        # probably a custom rgb array or rgb image
+        internalFormat = GL.GL_RGB32F_ARB
+        data = intensity
+    elif pixFormat == GL.GL_RGB:
+        # not wasLum, not useShaders  - an RGB bitmap with no shader
+        #  optionsintensity.min()
+        internalFormat = GL.GL_RGB
+        data = intensity  # float_uint8(intensity)
+    elif pixFormat == GL.GL_ALPHA:
+        internalFormat = GL.GL_ALPHA
+        dataType = GL.GL_UNSIGNED_BYTE
+        if wasImage:
+            data = intensity
+        else:
+            data = float_uint8(intensity)
+    else:
+        raise ValueError("invalid or unsupported `pixFormat`")
+
+    # check for RGBA textures
+    if len(data.shape) > 2 and data.shape[2] == 4:
+        if pixFormat == GL.GL_RGB:
+            pixFormat = GL.GL_RGBA
+        if internalFormat == GL.GL_RGB:
+            internalFormat = GL.GL_RGBA
+        elif internalFormat == GL.GL_RGB32F_ARB:
+            internalFormat = GL.GL_RGBA32F_ARB
+
+    return data, internalFormat, pixFormat, dataType
+
+
+def _uploadTexture(id, data, internalFormat, pixFormat, dataType, interpolate,
+                   wrapping, pixelBuffer=None):
+    """Upload texture data to texture `id`.
+
+    If a pixel buffer object is given the data are copied into it and the
+    texture is filled from the buffer, letting the driver transfer the data
+    asynchronously.
+    """
+    texture = data.ctypes  # serialise
+    if pixelBuffer is not None:
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, pixelBuffer)
+        GL.glBufferData(
+            GL.GL_PIXEL_UNPACK_BUFFER, data.nbytes, None, GL.GL_STREAM_DRAW)
+        bufferPtr = GL.glMapBuffer(GL.GL_PIXEL_UNPACK_BUFFER, GL.GL_WRITE_ONLY)
+        ctypes.memmove(bufferPtr, data.ctypes.data, data.nbytes)
+        GL.glUnmapBuffer(GL.GL_PIXEL_UNPACK_BUFFER)
+        texture = None  # read from the start of the bound buffer
+
+    # bind the texture in openGL
+    GL.glEnable(GL.GL_TEXTURE_2D)
+    GL.glBindTexture(GL.GL_TEXTURE_2D, id)  # bind that name to the target
+    # makes the texture map wrap (this is actually default anyway)
+    if wrapping:
+        GL.glTexParameteri(
+            GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_REPEAT)
+        GL.glTexParameteri(
+            GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_REPEAT)
+    else:
+        GL.glTexParameteri(
+            GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_CLAMP)
+        GL.glTexParameteri(
+            GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_CLAMP)
+    # data from PIL/numpy is packed, but default for GL is 4 bytes
+    GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+    # important if using bits++ because GL_LINEAR
+    # sometimes extrapolates to pixel vals outside range
+    if interpolate:
+        GL.glTexParameteri(
+            GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
+        # GL_GENERATE_MIPMAP was only available from OpenGL 1.4
+        GL.glTexParameteri(
+            GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR)
+        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_GENERATE_MIPMAP,
+                           GL.GL_TRUE)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, internalFormat,
+                        data.shape[1], data.shape[0], 0,
+                        pixFormat, dataType, texture)
+    else:
+        GL.glTexParameteri(
+            GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_NEAREST)
+        GL.glTexParameteri(
+            GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_NEAREST)
+        GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, internalFormat,
+                        data.shape[1], data.shape[0], 0,
+                        pixFormat, dataType, texture)
+
+    GL.glTexEnvi(GL.GL_TEXTURE_ENV, GL.GL_TEXTURE_ENV_MODE,
+                 GL.GL_MODULATE)  # ?? do we need this - think not!
+    # unbind our texture so that it doesn't affect other rendering
+    GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+    if pixelBuffer is not None:
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, 0)
+
+
+# OpenGL formats of compressed textures
+_compressedFormats = {
+    'DXT1': GL.GL_COMPRESSED_RGBA_S3TC_DXT1_EXT,
+    'DXT3': GL.GL_COMPRESSED_RGBA_S3TC_DXT3_EXT,
+    'DXT5': GL.GL_COMPRESSED_RGBA_S3TC_DXT5_EXT}
+
+
+def haveCompressedTextures():
+    """`True` if the graphics card can use S3TC (DXT) compressed textures,
+    which `ImageStim` then loads from DDS files without decoding them.
+    """
+    return bool(GL.gl_info.have_extension(
+        'GL_EXT_texture_compression_s3tc'))
+
+
+def _uploadCompressedTexture(id, image, interpolate, wrapping):
+    """Upload a :class:`~psychopy.tools.imagetools.CompressedImage`, with
+    its mipmaps, to texture `id`.
+    """
+    GL.glEnable(GL.GL_TEXTURE_2D)
+    GL.glBindTexture(GL.GL_TEXTURE_2D, id)
+    wrap = GL.GL_REPEAT if wrapping else GL.GL_CLAMP
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, wrap)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, wrap)
+    nLevels = len(image.levels)
+    if interpolate:
+        minFilter = (GL.GL_LINEAR_MIPMAP_LINEAR if nLevels > 1 else
+                     GL.GL_LINEAR)
+        magFilter = GL.GL_LINEAR
+    else:
+        minFilter = magFilter = GL.GL_NEAREST
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, minFilter)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, magFilter)
+    GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAX_LEVEL, nLevels - 1)
+    internalFormat = _compressedFormats[image.fourCC]
+    for level, (width, height, data) in enumerate(image.levels):
+        GL.glCompressedTexImage2D(
+            GL.GL_TEXTURE_2D, level, internalFormat, width, height, 0,
+            data.nbytes, data.ctypes)
+    GL.glTexEnvi(GL.GL_TEXTURE_ENV, GL.GL_TEXTURE_ENV_MODE, GL.GL_MODULATE)
+    GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+
 class TextureMixin:
     """Mixin class for visual stim that have textures.
 
@@ -977,7 +1232,6 @@ class TextureMixin:
             tex = None
 
         # Create an intensity texture, ranging -1:1.0
-        notSqr = False  # most of the options will be creating a sqr texture
         wasImage = False  # change this if image loading works
         interpolate = stim.interpolate
         if dataType is None:
@@ -986,6 +1240,11 @@ class TextureMixin:
             else:
                 dataType = GL.GL_UNSIGNED_BYTE
 
+        # textures made from image files and named patterns are shared through
+        # the window's cache
+        cache = self._getTextureCache(id, stim)
+        cacheKey = None
+
         # Fill out unspecified portions of maskParams with default values
         if maskParams is None:
             maskParams = {}
@@ -1032,6 +1291,18 @@ class TextureMixin:
                 res = 1
                 wrapping = True  # override any wrapping setting for None
 
+            if cache is not None:
+                # stimuli with the same pattern share one texture
+                cacheKey = ('pattern', tex, res, pixFormat, dataType,
+                            forcePOW2, bool(interpolate), wrapping)
+                if tex == 'gauss':
+                    cacheKey += (allMaskParams['sd'],)
+                elif tex == 'raisedCos':
+                    cacheKey += (allMaskParams['fringeWidth'],)
+                cached = cache.get(cacheKey)
+                if cached is not None:
+                    return self._useCachedTexture(id, stim, cached)
+
             # compute array of intensity value for desired pattern
             intensity = createLumPattern(tex, res, None, allMaskParams)
             wasLum = True
@@ -1044,6 +1315,28 @@ class TextureMixin:
                     logging.error(msg % (tex, os.path.abspath(tex)))
                     logging.flush()
                     raise IOError(msg % (tex, os.path.abspath(tex)))
+                if cache is not None:
+                    # mask parameters only apply to named patterns
+                    cacheKey = cache.getKey(filename, pixFormat, dataType,
+                                            forcePOW2, bool(interpolate),
+                                            wrapping)
+                    cached = cache.get(cacheKey) if cacheKey else None
+                    if cached is not None:
+                        return self._useCachedTexture(id, stim, cached)
+                if (pixFormat == GL.GL_RGB and
+                        str(filename).lower().endswith('.dds') and
+                        haveCompressedTextures()):
+                    try:
+                        image = readDDS(filename)
+                    except ValueError as err:
+                        # e.g. a height that can't be flipped by whole blocks
+                        logging.warning(
+                            "%s, loading %s uncompressed instead" % (
+                                err, filename))
+                    else:
+                        return self._createCompressedTexture(
+                            image, id, stim, interpolate, wrapping, cache,
+                            cacheKey)
                 try:
                     im = Image.open(filename)
                     im = im.transpose(Image.FLIP_TOP_BOTTOM)
@@ -1080,108 +1373,12 @@ class TextureMixin:
             # at this point we have a valid im
             stim._origSize = im.size
             wasImage = True
-            # is it 1D?
-            if im.size[0] == 1 or im.size[1] == 1:
-                logging.error("Only 2D textures are supported at the moment")
-            else:
-                maxDim = max(im.size)
-                powerOf2 = int(2**numpy.ceil(numpy.log2(maxDim)))
-                if im.size[0] != powerOf2 or im.size[1] != powerOf2:
-                    if not forcePOW2:
-                        notSqr = True
-                    elif globalVars.nImageResizes < reportNImageResizes:
-                        msg = ("Image '%s' was not a square power-of-two ' "
-                               "'image. Linearly interpolating to be %ix%i")
-                        logging.warning(msg % (tex, powerOf2, powerOf2))
-                        globalVars.nImageResizes += 1
-                        im = im.resize([powerOf2, powerOf2], Image.BILINEAR)
-                    elif globalVars.nImageResizes == reportNImageResizes:
-                        logging.warning("Multiple images have needed resizing"
-                                        " - I'll stop bothering you!")
-                        im = im.resize([powerOf2, powerOf2], Image.BILINEAR)
-
-            # is it Luminance or RGB?
-            if pixFormat == GL.GL_ALPHA and im.mode != 'L':
-                # we have RGB and need Lum
-                wasLum = True
-                im = im.convert("L")  # force to intensity (need if was rgb)
-            elif im.mode == 'L':  # we have lum and no need to change
-                wasLum = True
-                dataType = GL.GL_FLOAT
-            elif pixFormat == GL.GL_RGB:
-                # we want RGB and might need to convert from CMYK or Lm
-                # texture = im.tostring("raw", "RGB", 0, -1)
-                im = im.convert("RGBA")
-                wasLum = False
-            else:
-                raise ValueError('cannot determine if image is luminance or RGB')
-
-            if dataType == GL.GL_FLOAT:
-                # convert from ubyte to float
-                # much faster to avoid division 2/255
-                intensity = numpy.array(im).astype(
-                    numpy.float32) * 0.0078431372549019607 - 1.0
-            else:
-                intensity = numpy.array(im)
-
-        if pixFormat == GL.GL_RGB and wasLum and dataType == GL.GL_FLOAT:
-            # grating stim on good machine
-            # keep as float32 -1:1
-            if (sys.platform != 'darwin' and
-                    stim.win.glVendor.startswith('nvidia')):
-                # nvidia under win/linux might not support 32bit float
-                # could use GL_LUMINANCE32F_ARB here but check shader code?
-                internalFormat = GL.GL_RGB16F_ARB
-            else:
-                # we've got a mac or an ATI card and can handle
-                # 32bit float textures
-                # could use GL_LUMINANCE32F_ARB here but check shader code?
-                internalFormat = GL.GL_RGB32F_ARB
-            # initialise data array as a float
-            data = numpy.ones((intensity.shape[0], intensity.shape[1], 3),
-                              numpy.float32)
-            data[:, :, 0] = intensity  # R
-            data[:, :, 1] = intensity  # G
-            data[:, :, 2] = intensity  # B
-        elif (pixFormat == GL.GL_RGB and
-                wasLum and
-                dataType != GL.GL_FLOAT):
-            # was a lum image: stick with ubyte for speed
-            internalFormat = GL.GL_RGB
-            # initialise data array as a float
-            data = numpy.ones((intensity.shape[0], intensity.shape[1], 3),
-                              numpy.ubyte)
-            data[:, :, 0] = intensity  # R
-            data[:, :, 1] = intensity  # G
-            data[:, :, 2] = intensity  # B
-        elif pixFormat == GL.GL_RGB and dataType == GL.GL_FLOAT:
-            # probably a custom rgb array or rgb image
-            internalFormat = GL.GL_RGB32F_ARB
-            data = intensity
-        elif pixFormat == GL.GL_RGB:
-            # not wasLum, not useShaders  - an RGB bitmap with no shader
-            #  optionsintensity.min()
-            internalFormat = GL.GL_RGB
-            data = intensity  # float_uint8(intensity)
-        elif pixFormat == GL.GL_ALPHA:
-            internalFormat = GL.GL_ALPHA
-            dataType = GL.GL_UNSIGNED_BYTE
-            if wasImage:
-                data = intensity
-            else:
-                data = float_uint8(intensity)
-        else:
-            raise ValueError("invalid or unsupported `pixFormat`")
+            intensity, wasLum, dataType = _imageToIntensity(
+                im, pixFormat, dataType, forcePOW2, name=tex)
 
-        # check for RGBA textures
-        if len(data.shape) > 2 and data.shape[2] == 4:
-            if pixFormat == GL.GL_RGB:
-                pixFormat = GL.GL_RGBA
-            if internalFormat == GL.GL_RGB:
-                internalFormat = GL.GL_RGBA
-            elif internalFormat == GL.GL_RGB32F_ARB:
-                internalFormat = GL.GL_RGBA32F_ARB
-        texture = data.ctypes  # serialise
+        data, internalFormat, pixFormat, dataType = _makeTextureData(
+            intensity, wasLum, wasImage, pixFormat, dataType,
+            glVendor=stim.win.glVendor)
 
         # Create the pixel buffer object which will serve as the texture memory
         # store. First we compute the number of bytes used to store the texture.
@@ -1207,51 +1404,100 @@ class TextureMixin:
                 GL.GL_STREAM_DRAW)  # one-way app -> GL
             GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, 0)
 
-        # bind the texture in openGL
-        GL.glEnable(GL.GL_TEXTURE_2D)
-        GL.glBindTexture(GL.GL_TEXTURE_2D, id)  # bind that name to the target
-        # makes the texture map wrap (this is actually default anyway)
-        if wrapping:
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_REPEAT)
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_REPEAT)
-        else:
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_CLAMP)
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_CLAMP)
-        # data from PIL/numpy is packed, but default for GL is 4 bytes
-        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
-        # important if using bits++ because GL_LINEAR
-        # sometimes extrapolates to pixel vals outside range
-        if interpolate:
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_LINEAR)
-            # GL_GENERATE_MIPMAP was only available from OpenGL 1.4
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_LINEAR)
-            GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_GENERATE_MIPMAP,
-                               GL.GL_TRUE)
-            GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, internalFormat,
-                            data.shape[1], data.shape[0], 0,
-                            pixFormat, dataType, texture)
-        else:
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MAG_FILTER, GL.GL_NEAREST)
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D, GL.GL_TEXTURE_MIN_FILTER, GL.GL_NEAREST)
-            GL.glTexImage2D(GL.GL_TEXTURE_2D, 0, internalFormat,
-                            data.shape[1], data.shape[0], 0,
-                            pixFormat, dataType, texture)
-
-        GL.glTexEnvi(GL.GL_TEXTURE_ENV, GL.GL_TEXTURE_ENV_MODE,
-                     GL.GL_MODULATE)  # ?? do we need this - think not!
-        # unbind our texture so that it doesn't affect other rendering
-        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        texID = self._getUploadTexture(id, stim, cache, cacheKey)
+        _uploadTexture(texID, data, internalFormat, pixFormat, dataType,
+                       interpolate, wrapping)
+        if cacheKey:
+            # mipmaps add a third to the size of the texture
+            nBytes = data.nbytes * 4 // 3 if interpolate else data.nbytes
+            origSize = stim._origSize if wasImage else None
+            cached = cache.add(cacheKey, texID, nBytes, wasLum, origSize)
+            self._useCachedTexture(id, stim, cached)
 
         return wasLum
 
+    def _createCompressedTexture(self, image, id, stim, interpolate,
+                                 wrapping, cache=None, cacheKey=None):
+        """Upload a compressed image, read from a DDS file and flipped,
+        straight into texture `id`.
+
+        Returns
+        -------
+        bool
+            Whether the image was a luminance image, always `False`.
+
+        """
+        stim._origSize = image.size
+        texID = self._getUploadTexture(id, stim, cache, cacheKey)
+        _uploadCompressedTexture(texID, image, interpolate, wrapping)
+        if cacheKey:
+            cached = cache.add(cacheKey, texID, image.nBytes, False, image.size)
+            self._useCachedTexture(id, stim, cached)
+
+        return False
+
+    def _getUploadTexture(self, id, stim, cache, cacheKey):
+        """Get the texture to upload the new image of texture `id` to."""
+        if cacheKey:
+            # upload to a texture owned by the cache, shared with the stimulus
+            texID = GL.GLuint()
+            GL.glGenTextures(1, ctypes.byref(texID))
+            return texID
+        if cache is not None:
+            # stop sharing a cached texture, the new one is the stimulus' own
+            self._releaseCachedTexture(id, stim)
+
+        return id
+
+    def _getTextureCache(self, id, stim):
+        """Get the texture cache to use for texture `id` of `stim`, or `None`
+        if its textures can't be shared.
+        """
+        if not _texturecache.useTextureCache or not isinstance(id, GL.GLuint):
+            return None
+        return getattr(getattr(stim, 'win', None), 'textureCache', None)
+
+    def _useCachedTexture(self, id, stim, cached):
+        """Make texture name `id` of `stim` refer to a cached texture.
+
+        The name the stimulus generated itself is kept, and restored by
+        `_releaseCachedTexture()` when the stimulus stops using the cached
+        texture.
+
+        Returns
+        -------
+        bool
+            Whether the cached texture was made from a luminance image.
+
+        """
+        cachedTextures = stim.__dict__.setdefault('_cachedTextures', {})
+        ownID, previous = cachedTextures.get(
+            ctypes.addressof(id), (id.value, None))
+        if previous is not cached:
+            stim.win.textureCache.acquire(cached)
+            if previous is not None:
+                stim.win.textureCache.release(previous)
+            cachedTextures[ctypes.addressof(id)] = (ownID, cached)
+        if id.value != cached.id.value:
+            id.value = cached.id.value
+            stim._needUpdate = True  # display lists bind the texture by name
+        if cached.origSize is not None:
+            stim._origSize = cached.origSize
+
+        return cached.wasLum
+
+    def _releaseCachedTexture(self, id, stim):
+        """Stop texture name `id` of `stim` referring to a cached texture."""
+        cachedTextures = stim.__dict__.get('_cachedTextures')
+        if not cachedTextures:
+            return
+        ownID, cached = cachedTextures.pop(ctypes.addressof(id), (None, None))
+        if cached is None:
+            return
+        id.value = ownID
+        stim._needUpdate = True
+        stim.win.textureCache.release(cached)
+
     def clearTextures(self):
         """Clear all textures associated with the stimulus.
 
@@ -1259,9 +1505,11 @@ class TextureMixin:
         of your stimulus, so doesn't need calling explicitly by the user.
         """
         if hasattr(self, '_texID'):
+            self._releaseCachedTexture(self._texID, self)
             GL.glDeleteTextures(1, self._texID)
 
         if hasattr(self, '_maskID'):
+            self._releaseCachedTexture(self._maskID, self)
             GL.glDeleteTextures(1, self._maskID)
 
         if hasattr(self, '_pixBuffID'):
@@ -33,6 +33,7 @@ from psychopy.tools.monitorunittools import convertToPix
 from psychopy.visual.helpers import setColor
 from psychopy.visual.basevisual import MinimalStim, TextureMixin, ColorMixin
 from . import globalVars
+from . import shaders as _shaders
 
 import numpy
 
@@ -531,9 +532,9 @@ class ElementArrayStim(MinimalStim, TextureMixin, ColorMixin):
         _prog = self.win._progSignedTexMask
         GL.glUseProgram(_prog)
         # set the texture to be texture unit 0
-        GL.glUniform1i(GL.glGetUniformLocation(_prog, b"texture"), 0)
+        GL.glUniform1i(_shaders.getUniformLocation(_prog, b"texture"), 0)
         # mask is texture unit 1
-        GL.glUniform1i(GL.glGetUniformLocation(_prog, b"mask"), 1)
+        GL.glUniform1i(_shaders.getUniformLocation(_prog, b"mask"), 1)
 
         # bind textures
         GL.glActiveTexture(GL.GL_TEXTURE1)
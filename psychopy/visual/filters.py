@@ -9,9 +9,69 @@
 # Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
 # Distributed under the terms of the GNU General Public License (GPL).
 
+import os
+from functools import lru_cache
+
 import numpy
 from numpy.fft import fft2, ifft2, fftshift, ifftshift
 
+# library computing FFTs, see `setFFTBackend()`
+_fftBackend = 'numpy'
+_fftWorkers = None
+_scipyFFT = None
+_pyfftwFFT = None
+
+
+def setFFTBackend(backend='numpy', workers=None):
+    """Choose the library computing the FFTs of `imfft`, `imifft`, `conv2d`
+    and `applyFilter`.
+
+    :Parameters:
+        backend : str
+            `'numpy'` (default), `'scipy'` (`scipy.fft`) or `'pyfftw'`. The
+            latter two can use several threads, which speeds up filtering
+            large images or stacks of images.
+        workers : int or None
+            Number of threads used by the `'scipy'` and `'pyfftw'` backends,
+            -1 for one per CPU. `None` uses one.
+
+    """
+    global _fftBackend, _fftWorkers, _scipyFFT, _pyfftwFFT
+    if backend == 'scipy':
+        import scipy.fft
+        _scipyFFT = scipy.fft
+    elif backend == 'pyfftw':
+        import pyfftw
+        import pyfftw.interfaces.numpy_fft
+        pyfftw.interfaces.cache.enable()  # keep plans between calls
+        _pyfftwFFT = pyfftw.interfaces.numpy_fft
+    elif backend != 'numpy':
+        raise ValueError("FFT backend must be 'numpy', 'scipy' or 'pyfftw', "
+                         "not {}".format(repr(backend)))
+    _fftBackend = backend
+    _fftWorkers = workers
+
+
+def getFFTBackend():
+    """Name of the library computing FFTs, see `setFFTBackend`."""
+    return _fftBackend
+
+
+def _fft2(X, inverse=False):
+    """2D FFT (or inverse) over the last two axes, with the current backend.
+    """
+    if _fftBackend == 'scipy':
+        func = _scipyFFT.ifft2 if inverse else _scipyFFT.fft2
+        return func(X, workers=_fftWorkers)
+    elif _fftBackend == 'pyfftw':
+        threads = _fftWorkers or 1
+        if threads < 0:
+            threads = os.cpu_count() or 1
+        func = _pyfftwFFT.ifft2 if inverse else _pyfftwFFT.fft2
+        return func(X, threads=threads)
+
+    return ifft2(X) if inverse else fft2(X)
+
 
 def makeGrating(res,
                 ori=0.0,  # in degrees
@@ -40,6 +100,14 @@ def makeGrating(res,
         a square numpy array of size resXres
 
     """
+    # gratings are cached by their parameters, return a copy the caller can
+    # modify
+    return _makeGrating(res, ori, cycles, phase, gratType, contr).copy()
+
+
+@lru_cache(maxsize=32)
+def _makeGrating(res, ori, cycles, phase, gratType, contr):
+    """Generate a grating for `makeGrating`."""
     # to prevent the sinusoid ever being exactly at zero (for sqr wave):
     tiny = 0.0000000000001
     ori *= -numpy.pi / 180.
@@ -73,6 +141,7 @@ def makeGrating(res,
         # # todo: opened it, now what?
         raise ValueError("Invalid value for parameter `gratType`.")
 
+    intensity.flags.writeable = False
     return intensity
 
 
@@ -120,6 +189,22 @@ def makeMask(matrixSize, shape='circle', radius=1.0, center=(0.0, 0.0),
             range: 2x1 tuple or list (default=[-1,1])
                 The minimum and maximum value in the mask matrix
     """
+    # masks are cached by their parameters, return a copy the caller can
+    # modify
+    return _makeMask(matrixSize, shape, _asKey(radius), _asKey(center),
+                     _asKey(range), fringeWidth).copy()
+
+
+def _asKey(value):
+    """Make a list or array parameter hashable, for use as a cache key."""
+    if isinstance(value, (list, tuple, numpy.ndarray)):
+        return tuple(numpy.ravel(value).tolist())
+    return value
+
+
+@lru_cache(maxsize=32)
+def _makeMask(matrixSize, shape, radius, center, range, fringeWidth):
+    """Generate a mask for `makeMask`."""
     rad = makeRadialMatrix(matrixSize, center, radius)
     if shape == 'ramp':
         outArray = 1 - rad
@@ -170,7 +255,9 @@ def makeMask(matrixSize, shape='circle', radius=1.0, center=(0.0, 0.0),
         raise ValueError('Unknown value for shape argument %s' % shape)
     mag = range[1] - range[0]
     offset = range[0]
-    return outArray * mag + offset
+    outArray = outArray * mag + offset
+    outArray.flags.writeable = False
+    return outArray
 
 
 def makeRadialMatrix(matrixSize, center=(0.0, 0.0), radius=1.0):
@@ -279,25 +366,88 @@ def conv2d(smaller, larger):
     has dimensions of size 2**n
 
     Actually right now the matrices must be the same size (will sort out
-    padding issues another day!)
+    padding issues another day!). Either can also be a stack of matrices
+    (N x H x W), which are all convolved in one call.
     """
-    smallerFFT = fft2(smaller)
-    largerFFT = fft2(larger)
+    smallerFFT = _fft2(smaller)
+    largerFFT = _fft2(larger)
 
-    invFFT = ifft2(smallerFFT * largerFFT)
+    invFFT = _fft2(smallerFFT * largerFFT, inverse=True)
     return invFFT.real
 
 
 def imfft(X):
-    """Perform 2D FFT on an image and center low frequencies
+    """Perform 2D FFT on an image (or a N x H x W stack of images) and center
+    low frequencies
     """
-    return fftshift(fft2(X))
+    return fftshift(_fft2(X), axes=(-2, -1))
 
 
 def imifft(X):
-    """Inverse 2D FFT with decentering
+    """Inverse 2D FFT with decentering, of an image or a stack of images
     """
-    return numpy.abs(ifft2(ifftshift(X)))
+    return numpy.abs(_fft2(ifftshift(X, axes=(-2, -1)), inverse=True))
+
+
+def applyFilter(images, kernel):
+    """Filter an image, or a stack of images, with a centered frequency
+    domain filter such as those from `butter2d_lp`.
+
+    A stack of images (N x H x W) is filtered in a single FFT call, much
+    faster than filtering the images one by one.
+
+    :Parameters:
+        images : numpy.ndarray
+            An image (H x W) or a stack of images (N x H x W).
+        kernel : numpy.ndarray
+            Filter kernel (H x W), centered as returned by the `butter2d_*`
+            functions.
+
+    :Returns:
+        numpy.ndarray
+            The filtered images, same shape as `images`.
+
+    """
+    # shifting the kernel once is cheaper than shifting every spectrum
+    spectra = _fft2(images) * ifftshift(kernel)
+    return numpy.abs(_fft2(spectra, inverse=True))
+
+
+@lru_cache(maxsize=32)
+def _butterworthRadius(rows, cols):
+    """Distance of each frequency from the center, cached by size."""
+    x = numpy.linspace(-0.5, 0.5, cols)
+    y = numpy.linspace(-0.5, 0.5, rows)
+    radius = numpy.sqrt((x**2)[numpy.newaxis] + (y**2)[:, numpy.newaxis])
+    radius.flags.writeable = False
+    return radius
+
+
+@lru_cache(maxsize=32)
+def _butterworthLowpass(rows, cols, cutoff, n):
+    """Lowpass Butterworth kernel, cached by size and parameters."""
+    radius = _butterworthRadius(rows, cols)
+    f = 1 / (1.0 + (radius/cutoff)**(2 * n))   # The filter
+    f.flags.writeable = False
+    return f
+
+
+def _checkButterworth(cutoff, n):
+    if not 0 < cutoff <= 1.0:
+        raise ValueError('Cutoff frequency must be between 0 and 1.0')
+
+    if not isinstance(n, int):
+        raise ValueError('n must be an integer >= 1')
+
+
+def clearFilterCache():
+    """Forget the gratings, masks and filter kernels cached by `makeGrating`,
+    `makeMask` and the `butter2d_*` functions."""
+    _makeGrating.cache_clear()
+    _makeMask.cache_clear()
+    _butterworthRadius.cache_clear()
+    _butterworthLowpass.cache_clear()
+    _butterworthElliptic.cache_clear()
 
 
 def butter2d_lp(size, cutoff, n=3):
@@ -316,22 +466,11 @@ def butter2d_lp(size, cutoff, n=3):
            numpy.ndarray
              filter kernel in 2D centered
        """
-    if not 0 < cutoff <= 1.0:
-        raise ValueError('Cutoff frequency must be between 0 and 1.0')
-
-    if not isinstance(n, int):
-        raise ValueError('n must be an integer >= 1')
-
+    _checkButterworth(cutoff, n)
     rows, cols = size
 
-    x = numpy.linspace(-0.5, 0.5, cols)
-    y = numpy.linspace(-0.5, 0.5, rows)
-
-    # An array with every pixel = radius relative to center
-    radius = numpy.sqrt((x**2)[numpy.newaxis] + (y**2)[:, numpy.newaxis])
-
-    f = 1 / (1.0 + (radius/cutoff)**(2 * n))   # The filter
-    return f
+    # kernels are cached, return a copy the caller can modify
+    return _butterworthLowpass(int(rows), int(cols), cutoff, n).copy()
 
 
 def butter2d_bp(size, cutin, cutoff, n):
@@ -354,7 +493,12 @@ def butter2d_bp(size, cutin, cutoff, n):
 
     """
 
-    return butter2d_lp(size, cutoff, n) - butter2d_lp(size, cutin, n)
+    _checkButterworth(cutin, n)
+    _checkButterworth(cutoff, n)
+    rows, cols = int(size[0]), int(size[1])
+
+    return (_butterworthLowpass(rows, cols, cutoff, n) -
+            _butterworthLowpass(rows, cols, cutin, n))
 
 
 def butter2d_hp(size, cutoff, n=3):
@@ -374,7 +518,8 @@ def butter2d_hp(size, cutoff, n=3):
             filter kernel in 2D centered
 
     """
-    return 1.0 - butter2d_lp(size, cutoff, n)
+    _checkButterworth(cutoff, n)
+    return 1.0 - _butterworthLowpass(int(size[0]), int(size[1]), cutoff, n)
 
 
 def butter2d_lp_elliptic(size, cutoff_x, cutoff_y, n=3,
@@ -407,13 +552,22 @@ def butter2d_lp_elliptic(size, cutoff_x, cutoff_y, n=3,
 
     rows, cols = size
 
+    # kernels are cached, return a copy the caller can modify
+    return _butterworthElliptic(int(rows), int(cols), cutoff_x, cutoff_y, n,
+                                alpha, offset_x, offset_y).copy()
+
+
+@lru_cache(maxsize=32)
+def _butterworthElliptic(rows, cols, cutoff_x, cutoff_y, n, alpha, offset_x,
+                         offset_y):
+    """Elliptic lowpass Butterworth kernel, cached by size and parameters."""
     # this time we start up with 2D arrays for easy broadcasting
-    x = (numpy.linspace(-0.5, 0.5, int(cols)) - offset_x)[numpy.newaxis]
-    y = (numpy.linspace(-0.5, 0.5, int(rows)) - offset_y)[:, numpy.newaxis]
+    x = (numpy.linspace(-0.5, 0.5, cols) - offset_x)[numpy.newaxis]
+    y = (numpy.linspace(-0.5, 0.5, rows) - offset_y)[:, numpy.newaxis]
 
     x2 = (x * numpy.cos(alpha) - y * numpy.sin(-alpha))
     y2 = (x * numpy.sin(-alpha) + y * numpy.cos(alpha))
 
     f = 1 / (1+((x2/(cutoff_x))**2+(y2/(cutoff_y))**2)**n)
-
+    f.flags.writeable = False
     return f
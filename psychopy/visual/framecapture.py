@@ -0,0 +1,261 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Asynchronous capture of window frames to movie or image files.
+
+Reading pixels back from the GPU with `glReadPixels` stalls the render thread
+until all pending drawing commands have completed and the data has been copied
+to client memory. Here read-backs are issued into a ring of pixel buffer
+objects (PBOs) instead, so the transfer happens in the background and the data
+of a frame is only mapped a few frames later when it is certainly available.
+Frames are then handed to a writer thread which streams them straight into the
+movie encoder (or image files), rather than being kept in memory.
+
+These classes are used by :py:meth:`~psychopy.visual.Window.startMovieFrameStream`
+and normally don't need to be used directly.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'MovieFrameWriter',
+    'AsyncFrameReader'
+]
+
+import os
+import ctypes
+import threading
+import queue
+import numpy as np
+import pyglet.gl as GL
+from psychopy import logging
+
+# file extensions written as videos by moviepy (ffmpeg)
+movieFileTypes = ('.mpg', '.mpeg', '.mp4', '.mov', '.mkv', '.avi')
+
+
+class MovieFrameWriter(threading.Thread):
+    """Thread which encodes frames to a file as they arrive.
+
+    Videos are written with the same moviepy ffmpeg writer used by
+    :py:meth:`~psychopy.visual.Window.saveMovieFrames`, animated GIFs with
+    imageio. Any other extension is saved as a numbered series of images using
+    Pillow.
+
+    Parameters
+    ----------
+    fileName : str
+        Output file, the extension determines the type of file(s) created.
+    size : tuple or list
+        Width and height of the frames in pixels.
+    codec : str
+        Codec used for video files.
+    fps : int
+        Frame rate of the video or GIF.
+    maxQueueSize : int
+        Maximum number of frames waiting to be encoded. When the encoder falls
+        behind, :py:meth:`put` blocks until there is room rather than letting
+        memory grow.
+
+    """
+    def __init__(self, fileName, size, codec='libx264', fps=30,
+                 maxQueueSize=30):
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self.fileName = fileName
+        self.size = (int(size[0]), int(size[1]))
+        self.codec = codec
+        self.fps = fps
+        self.nFramesWritten = 0
+        self._fileRoot, self._fileExt = os.path.splitext(fileName)
+        self._fileExt = self._fileExt.lower()
+        self._queue = queue.Queue(maxsize=maxQueueSize)
+        self._writer = None
+        self._error = None
+
+    def put(self, frame):
+        """Queue a frame for writing.
+
+        Parameters
+        ----------
+        frame : ndarray
+            RGBA pixel data as returned by `glReadPixels` (bottom row first),
+            either flat or with shape `(height, width, 4)`.
+
+        """
+        if self._error is not None:
+            raise RuntimeError(
+                "Movie writer failed: {}".format(self._error))
+        self._queue.put(frame)
+
+    def close(self):
+        """Write any remaining frames and close the file. Blocks until done.
+
+        Returns
+        -------
+        int
+            Number of frames written.
+
+        """
+        self._queue.put(None)
+        self.join()
+        if self._error is not None:
+            logging.error("Error writing movie frames to {}: {}".format(
+                self.fileName, self._error))
+
+        return self.nFramesWritten
+
+    def _openWriter(self):
+        if self._fileExt in movieFileTypes:
+            from moviepy.video.io.ffmpeg_writer import FFMPEG_VideoWriter
+            self._writer = FFMPEG_VideoWriter(
+                self.fileName, self.size, self.fps, codec=self.codec)
+        elif self._fileExt == '.gif':
+            import imageio
+            self._writer = imageio.get_writer(
+                self.fileName, mode='I', duration=1.0 / self.fps)
+
+    def _writeFrame(self, frame):
+        width, height = self.size
+        # flip vertically and drop alpha, pixels arrive bottom row first
+        frame = np.ascontiguousarray(
+            np.reshape(frame, (height, width, 4))[::-1, :, :3])
+        if self._fileExt in movieFileTypes:
+            self._writer.write_frame(frame)
+        elif self._fileExt == '.gif':
+            self._writer.append_data(frame)
+        else:
+            from PIL import Image
+            # numbered with a fixed width for now, renamed when closing
+            Image.fromarray(frame).save(self._tempFileName(self.nFramesWritten))
+        self.nFramesWritten += 1
+
+    def _tempFileName(self, frameN):
+        return "%s_%06d%s" % (self._fileRoot, frameN + 1, self._fileExt)
+
+    def _closeWriter(self):
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        elif self._fileExt not in movieFileTypes + ('.gif',):
+            # match the names used by `Window.saveMovieFrames()`
+            if self.nFramesWritten == 1:
+                os.replace(self._tempFileName(0), self.fileName)
+                return
+            frmc = int(np.ceil(np.log10(self.nFramesWritten + 1)))
+            nameFormat = "%s%%0%dd%s" % (self._fileRoot, frmc, self._fileExt)
+            for frameN in range(self.nFramesWritten):
+                os.replace(self._tempFileName(frameN), nameFormat % (frameN + 1))
+
+    def run(self):
+        try:
+            self._openWriter()
+            while True:
+                frame = self._queue.get()
+                if frame is None:
+                    break
+                self._writeFrame(frame)
+        except Exception as err:
+            self._error = err
+            # keep consuming so the render thread never blocks on `put`
+            while self._queue.get() is not None:
+                pass
+        finally:
+            try:
+                self._closeWriter()
+            except Exception as err:
+                self._error = self._error or err
+
+
+class AsyncFrameReader:
+    """Read back window frames through a ring of pixel buffer objects.
+
+    Each call to :py:meth:`capture` starts a transfer of the current read
+    buffer into the next PBO of the ring. Once the ring is full, the oldest PBO
+    (which was filled `nBuffers - 1` captures ago) is mapped, copied and passed
+    to `callback`. If pixel buffer objects are not supported, pixels are read
+    synchronously instead.
+
+    Parameters
+    ----------
+    size : tuple or list
+        Width and height of the region to capture, in pixels.
+    callback : callable
+        Called with a flat `uint8` RGBA array (bottom row first) for each frame.
+    nBuffers : int
+        Number of PBOs in the ring. More buffers give the GPU more time to
+        complete transfers at the cost of a longer delay before frames are
+        handed to `callback`.
+
+    """
+    def __init__(self, size, callback, nBuffers=3):
+        self.size = (int(size[0]), int(size[1]))
+        self.callback = callback
+        self.nBuffers = max(1, int(nBuffers))
+        self._nBytes = self.size[0] * self.size[1] * 4
+        self._pending = []  # PBOs with transfers in flight, oldest first
+        self._free = []
+
+        self.usePBO = bool(
+            GL.gl_info.have_extension('GL_ARB_pixel_buffer_object') or
+            GL.gl_info.have_version(2, 1))
+        if self.usePBO:
+            for _ in range(self.nBuffers):
+                pbo = GL.GLuint()
+                GL.glGenBuffers(1, ctypes.byref(pbo))
+                GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+                GL.glBufferData(GL.GL_PIXEL_PACK_BUFFER, self._nBytes, None,
+                                GL.GL_STREAM_READ)
+                self._free.append(pbo)
+            GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+
+    def capture(self, left=0, bottom=0):
+        """Start reading pixels from the current read buffer."""
+        width, height = self.size
+        GL.glPixelStorei(GL.GL_PACK_ALIGNMENT, 1)
+        if not self.usePBO:
+            frame = np.empty((self._nBytes,), dtype=np.uint8)
+            GL.glReadPixels(left, bottom, width, height, GL.GL_RGBA,
+                            GL.GL_UNSIGNED_BYTE,
+                            frame.ctypes.data_as(ctypes.POINTER(GL.GLubyte)))
+            self.callback(frame)
+            return
+
+        if not self._free:  # ring is full, retrieve the oldest frame first
+            self._retrieve()
+        pbo = self._free.pop(0)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+        # returns immediately, the copy happens asynchronously
+        GL.glReadPixels(left, bottom, width, height, GL.GL_RGBA,
+                        GL.GL_UNSIGNED_BYTE, 0)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        self._pending.append(pbo)
+
+    def _retrieve(self):
+        """Map the oldest pending PBO and pass a copy of its data on."""
+        pbo = self._pending.pop(0)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, pbo)
+        bufferPtr = GL.glMapBuffer(GL.GL_PIXEL_PACK_BUFFER, GL.GL_READ_ONLY)
+        bufferArray = np.ctypeslib.as_array(
+            ctypes.cast(bufferPtr, ctypes.POINTER(GL.GLubyte)),
+            shape=(self._nBytes,))
+        frame = bufferArray.copy()  # must copy before unmapping
+        GL.glUnmapBuffer(GL.GL_PIXEL_PACK_BUFFER)
+        GL.glBindBuffer(GL.GL_PIXEL_PACK_BUFFER, 0)
+        self._free.append(pbo)
+        self.callback(frame)
+
+    def flush(self):
+        """Retrieve all frames still in flight."""
+        while self._pending:
+            self._retrieve()
+
+    def close(self):
+        """Retrieve outstanding frames and free the PBOs."""
+        self.flush()
+        for pbo in self._free:
+            GL.glDeleteBuffers(1, ctypes.byref(pbo))
+        self._free = []
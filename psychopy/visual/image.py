@@ -27,6 +27,7 @@ from psychopy import logging, colors, layout
 
 from psychopy.tools.attributetools import attributeSetter, setAttribute
 from psychopy.visual.basevisual import BaseVisualStim
+import psychopy.visual.shaders as _shaders
 from psychopy.visual.basevisual import (ContainerMixin, ColorMixin,
                                         TextureMixin)
 
@@ -74,6 +75,7 @@ class ImageStim(BaseVisualStim, ContainerMixin, ColorMixin, TextureMixin):
         GL.glGenTextures(1, ctypes.byref(self._maskID))
         self._pixbuffID = GL.GLuint()
         GL.glGenBuffers(1, ctypes.byref(self._pixbuffID))
+        self._lastMovieFrame = None  # camera frame in the texture
         self.__dict__['maskParams'] = maskParams
         self.__dict__['mask'] = mask
         # Not pretty (redefined later) but it works!
@@ -133,17 +135,17 @@ class ImageStim(BaseVisualStim, ContainerMixin, ColorMixin, TextureMixin):
             _prog = self.win._progSignedTexMask
             GL.glUseProgram(_prog)
             # set the texture to be texture unit 0
-            GL.glUniform1i(GL.glGetUniformLocation(_prog, b"texture"), 0)
+            GL.glUniform1i(_shaders.getUniformLocation(_prog, b"texture"), 0)
             # mask is texture unit 1
-            GL.glUniform1i(GL.glGetUniformLocation(_prog, b"mask"), 1)
+            GL.glUniform1i(_shaders.getUniformLocation(_prog, b"mask"), 1)
         else:
             # for an rgb image there is no recoloring
             _prog = self.win._progImageStim
             GL.glUseProgram(_prog)
             # set the texture to be texture unit 0
-            GL.glUniform1i(GL.glGetUniformLocation(_prog, b"texture"), 0)
+            GL.glUniform1i(_shaders.getUniformLocation(_prog, b"texture"), 0)
             # mask is texture unit 1
-            GL.glUniform1i(GL.glGetUniformLocation(_prog, b"mask"), 1)
+            GL.glUniform1i(_shaders.getUniformLocation(_prog, b"mask"), 1)
 
         # mask
         GL.glActiveTexture(GL.GL_TEXTURE1)
@@ -278,14 +280,23 @@ class ImageStim(BaseVisualStim, ContainerMixin, ColorMixin, TextureMixin):
         'viewfinder' of sorts for the camera to view a live video stream on a
         window.
 
+        Frames are only uploaded once. If the frame has timestamps (see
+        `Camera.getLatencyReport()`), the times it was uploaded and shown are
+        added to them.
+
         Parameters
         ----------
-        movieSrc : `~psychopy.hardware.camera.Camera`
-            Movie source object.
+        movieSrc : `~psychopy.visual.movies.frame.MovieFrame`
+            Most recent frame from the camera.
 
         """
+        if movieSrc is self._lastMovieFrame:
+            return  # already in the texture
+
         # get the most recent video frame and extract color data
         colorData = movieSrc.colorData
+        if colorData is None:
+            return
 
         # get the size of the movie frame and compute the buffer size
         vidWidth, vidHeight = movieSrc.size
@@ -354,6 +365,13 @@ class ImageStim(BaseVisualStim, ContainerMixin, ColorMixin, TextureMixin):
         GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
         GL.glDisable(GL.GL_TEXTURE_2D)
 
+        self._lastMovieFrame = movieSrc
+
+        timestamps = movieSrc.userData
+        if isinstance(timestamps, dict) and 'tFetch' in timestamps:
+            timestamps['tUpload'] = logging.defaultClock.getTime()
+            self.win.timeOnFlip(timestamps, 'tFlip')
+
     @attributeSetter
     def image(self, value):
         """The image file to be presented (most formats supported).
@@ -365,8 +383,14 @@ class ImageStim(BaseVisualStim, ContainerMixin, ColorMixin, TextureMixin):
 
         If passing a numpy array to the image attribute, the size attribute of
         ImageStim must be set explicitly.
+
+        DDS files compressed with DXT1, DXT3 or DXT5 are uploaded to the
+        graphics card without decoding, using less video memory; see
+        :func:`~psychopy.tools.imagetools.compressImageFiles` to convert
+        images.
         """
         self.__dict__['image'] = self._imName = value
+        self._lastMovieFrame = None
 
         # If given a color array, get it in rgb1
         if isinstance(value, colors.Color):
@@ -18,6 +18,7 @@ from pathlib import Path
 from psychopy import prefs
 from psychopy.tools.filetools import pathToString, defaultStim
 from psychopy.visual.basevisual import BaseVisualStim, ContainerMixin, ColorMixin
+import psychopy.visual.shaders as _shaders
 from psychopy.constants import FINISHED, NOT_STARTED, PAUSED, PLAYING, STOPPED
 
 from .players import getMoviePlayer
@@ -38,6 +39,16 @@ FFPYPLAYER_STATUS_PAUSED = 'paused'
 
 PREFERRED_VIDEO_LIB = 'ffpyplayer'
 
+# Have the decoder provide frames as planar YUV 4:2:0 and convert them to RGB
+# in a shader, rather than converting every frame to RGB on the CPU. This
+# halves the data copied and uploaded per frame. Only used if the window
+# supports shaders.
+convertYUVOnGPU = True
+
+# number of pixel buffers frames are uploaded through in turn, so that copying
+# a frame never waits for the upload of the previous one to finish
+PIXEL_BUFFER_COUNT = 2
+
 
 # ------------------------------------------------------------------------------
 # Classes
@@ -76,6 +87,19 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
         the movie is done. Default is `False`.
     autoStart : bool
         Automatically begin playback of the video when `flip()` is called.
+    preload : bool or dict
+        Decode all the frames of the movie when it's loaded and play it from
+        memory, so frames are never late and seeking is exact (see
+        :class:`~psychopy.visual.movies.framestore.MovieFrameStore`). Suits
+        short clips, which are played without sound. Pass a `dict` to set the
+        `size` to scale the frames to or a `cacheDir` to decode them into,
+        e.g. `preload={'size': (640, 360)}`. If set, `movieLib` is ignored.
+    decoderPool : bool or MovieDecoderPool
+        Decode the movie in a pool of worker processes rather than a thread of
+        its own, which is faster when showing many movies at once (see
+        :class:`~psychopy.visual.movies.players.decoderpool.MovieDecoderPool`).
+        `True` uses the pool shared by all movies. Only used with the
+        `'ffpyplayer'` library.
 
     """
     def __init__(self,
@@ -100,7 +124,9 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
                  depth=0.0,
                  noAudio=False,
                  interpolate=True,
-                 autoStart=True):
+                 autoStart=True,
+                 preload=False,
+                 decoderPool=None):
 
         # # check if we have the VLC lib
         # if not haveFFPyPlayer:
@@ -140,8 +166,19 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
         self.interpolate = interpolate
         self._texFilterNeedsUpdate = True
         self._metadata = NULL_MOVIE_METADATA
-        self._pixbuffId = GL.GLuint(0)
-        self._textureId = GL.GLuint(0)
+        self._pixbuffIds = []  # ring of pixel buffers
+        self._pixbuffIndex = 0
+        self._textureIds = []  # one texture, or one for each YUV plane
+        self._planeSizes = []
+        self._texColorFormat = None
+        self._uploadedFrame = None  # frame presently in the textures
+        self._useYUV = convertYUVOnGPU and win._haveShaders
+
+        # options for decoding the whole movie in advance, used by the player
+        self._preload = preload
+        if preload:
+            movieLib = 'predecoded'
+        self._decoderPool = decoderPool
 
         # get the player interface for the desired `movieLib` and instance it
         self._player = getMoviePlayer(movieLib)(self)
@@ -243,8 +280,9 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
 
         """
         self._player.stop(log=log)
-        self._player.unload()
         self._freeBuffers()  # free buffer before creating a new one
+        self._recentFrame = None
+        self._player.unload()
         self._isLoaded = False
 
     @property
@@ -253,8 +291,13 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
         as a video texture. However, you must periodically call
         `updateVideoFrame` to keep this up to date.
 
+        If frames are converted from YUV on the GPU (see `convertYUVOnGPU`) this
+        texture only holds the luminance (Y) plane of the frame.
+
         """
-        return self._textureId
+        if not self._textureIds:
+            return GL.GLuint(0)
+        return self._textureIds[0]
 
     def updateVideoFrame(self):
         """Update the present video frame. The next call to `draw()` will make
@@ -643,61 +686,75 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
         """
         try:
             # delete buffers and textures if previously created
-            if self._pixbuffId.value > 0:
-                GL.glDeleteBuffers(1, self._pixbuffId)
-                self._pixbuffId = GL.GLuint()
-
-            # delete the old texture if present
-            if self._textureId.value > 0:
-                GL.glDeleteTextures(1, self._textureId)
-                self._textureId = GL.GLuint()
+            for pixbuffId in self._pixbuffIds:
+                GL.glDeleteBuffers(1, pixbuffId)
+            for textureId in self._textureIds:
+                GL.glDeleteTextures(1, textureId)
 
         except TypeError:  # can happen when unloading or shutting down
             pass
 
-    def _setupTextureBuffers(self):
-        """Setup texture buffers which hold frame data. This creates a 2D
-        RGB texture and pixel buffer. The pixel buffer serves as the store for
-        texture color data. Each frame, the pixel buffer memory is mapped and
-        frame data is copied over to the GPU from the decoder.
+        self._pixbuffIds = []
+        self._textureIds = []
+        self._planeSizes = []
+        self._texColorFormat = None
+        self._uploadedFrame = None
+
+    def _setupTextureBuffers(self, colorFormat=None):
+        """Setup texture buffers which hold frame data. This creates a ring of
+        pixel buffers and the textures for the frame: a single RGB texture, or
+        one luminance texture for each plane of a YUV 4:2:0 frame (the color
+        planes being half the width and height of the frame). Each new frame is
+        copied into the next pixel buffer in the ring, which the textures are
+        then updated from.
 
         This is called every time a video file is loaded. The `_freeBuffers`
         method is called in this routine prior to creating new buffers, so it's
         safe to call this right after loading a new movie without having to
         `_freeBuffers` first.
 
+        Parameters
+        ----------
+        colorFormat : str or None
+            Format of the frames, either `'rgb8'` or `'yuv420p'`. If `None`,
+            the format requested from the player is used.
+
         """
+        self._freeBuffers()
+
+        if colorFormat is None:
+            colorFormat = 'yuv420p' if self._useYUV else 'rgb8'
+
         # get the size of the movie frame and compute the buffer size
         vidWidth, vidHeight = self._player.getMetadata().size
-        nBufferBytes = vidWidth * vidHeight * 3
-
-        # Create the pixel buffer object which will serve as the texture memory
-        # store. Pixel data will be copied to this buffer each frame.
-        GL.glGenBuffers(1, ctypes.byref(self._pixbuffId))
-        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, self._pixbuffId)
-        GL.glBufferData(
-            GL.GL_PIXEL_UNPACK_BUFFER,
-            nBufferBytes * ctypes.sizeof(GL.GLubyte),
-            None,
-            GL.GL_STREAM_DRAW)  # one-way app -> GL
+        if colorFormat == 'yuv420p':
+            chromaSize = ((vidWidth + 1) // 2, (vidHeight + 1) // 2)
+            self._planeSizes = [(vidWidth, vidHeight), chromaSize, chromaSize]
+            texFormat, texInternalFormat = GL.GL_LUMINANCE, GL.GL_LUMINANCE8
+            texWrap = GL.GL_CLAMP_TO_EDGE  # don't blend the border into color
+            nChannels = 1
+        else:
+            self._planeSizes = [(vidWidth, vidHeight)]
+            texFormat, texInternalFormat = GL.GL_RGB, GL.GL_RGB8
+            texWrap = GL.GL_CLAMP
+            nChannels = 3
+        self._texColorFormat = colorFormat
+        nBufferBytes = sum(w * h for w, h in self._planeSizes) * nChannels
+
+        # Create the pixel buffer objects which will serve as the texture
+        # memory store. Pixel data will be copied to one of them each frame.
+        for _ in range(PIXEL_BUFFER_COUNT):
+            pixbuffId = GL.GLuint()
+            GL.glGenBuffers(1, ctypes.byref(pixbuffId))
+            GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, pixbuffId)
+            GL.glBufferData(
+                GL.GL_PIXEL_UNPACK_BUFFER,
+                nBufferBytes * ctypes.sizeof(GL.GLubyte),
+                None,
+                GL.GL_STREAM_DRAW)  # one-way app -> GL
+            self._pixbuffIds.append(pixbuffId)
         GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, 0)
-
-        # Create a texture which will hold the data streamed to the pixel
-        # buffer. Only one texture needs to be allocated.
-        GL.glEnable(GL.GL_TEXTURE_2D)
-        GL.glGenTextures(1, ctypes.byref(self._textureId))
-        GL.glBindTexture(GL.GL_TEXTURE_2D, self._textureId)
-        GL.glTexImage2D(
-            GL.GL_TEXTURE_2D,
-            0,
-            GL.GL_RGB8,
-            vidWidth, vidHeight,  # frame dims in pixels
-            0,
-            GL.GL_RGB,
-            GL.GL_UNSIGNED_BYTE,
-            None)
-
-        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        self._pixbuffIndex = 0
 
         # setup texture filtering
         if self.interpolate:
@@ -705,31 +762,65 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
         else:
             texFilter = GL.GL_NEAREST
 
-        GL.glTexParameteri(
-            GL.GL_TEXTURE_2D,
-            GL.GL_TEXTURE_MAG_FILTER,
-            texFilter)
-        GL.glTexParameteri(
-            GL.GL_TEXTURE_2D,
-            GL.GL_TEXTURE_MIN_FILTER,
-            texFilter)
-        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, GL.GL_CLAMP)
-        GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, GL.GL_CLAMP)
+        # Create textures which will hold the data streamed to the pixel
+        # buffers.
+        GL.glEnable(GL.GL_TEXTURE_2D)
+        GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
+        for planeWidth, planeHeight in self._planeSizes:
+            textureId = GL.GLuint()
+            GL.glGenTextures(1, ctypes.byref(textureId))
+            GL.glBindTexture(GL.GL_TEXTURE_2D, textureId)
+            GL.glTexImage2D(
+                GL.GL_TEXTURE_2D,
+                0,
+                texInternalFormat,
+                planeWidth, planeHeight,  # plane dims in pixels
+                0,
+                texFormat,
+                GL.GL_UNSIGNED_BYTE,
+                None)
+            GL.glTexParameteri(
+                GL.GL_TEXTURE_2D,
+                GL.GL_TEXTURE_MAG_FILTER,
+                texFilter)
+            GL.glTexParameteri(
+                GL.GL_TEXTURE_2D,
+                GL.GL_TEXTURE_MIN_FILTER,
+                texFilter)
+            GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_S, texWrap)
+            GL.glTexParameteri(GL.GL_TEXTURE_2D, GL.GL_TEXTURE_WRAP_T, texWrap)
+            self._textureIds.append(textureId)
         GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
         GL.glDisable(GL.GL_TEXTURE_2D)
+        self._texFilterNeedsUpdate = False
 
         GL.glFlush()  # make sure all buffers are ready
 
     def _pixelTransfer(self):
         """Copy pixel data from video frame to texture.
+
+        Nothing is copied if the textures already hold the frame.
         """
-        # get the size of the movie frame and compute the buffer size
-        vidWidth, vidHeight = self._player.getMetadata().size
+        frame = self._recentFrame
+        if frame is self._uploadedFrame or frame.colorData is None:
+            return
 
-        nBufferBytes = vidWidth * vidHeight * 3
+        # the player may not provide the format requested
+        if frame.colorFormat != self._texColorFormat:
+            self._setupTextureBuffers(frame.colorFormat)
 
-        # bind pixel unpack buffer
-        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, self._pixbuffId)
+        if self._texColorFormat == 'yuv420p':
+            planes, texFormat, nChannels = frame.colorData, GL.GL_LUMINANCE, 1
+        else:
+            planes, texFormat, nChannels = (frame.colorData,), GL.GL_RGB, 3
+        planeBytes = [w * h * nChannels for w, h in self._planeSizes]
+        nBufferBytes = sum(planeBytes)
+
+        # bind the next pixel unpack buffer in the ring, the GPU may still be
+        # reading the previous one
+        pixbuffId = self._pixbuffIds[self._pixbuffIndex]
+        self._pixbuffIndex = (self._pixbuffIndex + 1) % len(self._pixbuffIds)
+        GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, pixbuffId)
 
         # Free last storage buffer before mapping and writing new frame
         # data. This allows the GPU to process the extant buffer in VRAM
@@ -750,44 +841,48 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
             ctypes.cast(bufferPtr, ctypes.POINTER(GL.GLubyte)),
             shape=(nBufferBytes,))
 
-        # copy data
-        bufferArray[:] = self._recentFrame.colorData[:]
+        # copy data, one plane after another
+        offsets = np.cumsum([0] + planeBytes[:-1])
+        for plane, offset, nBytes in zip(planes, offsets, planeBytes):
+            bufferArray[offset:offset + nBytes] = plane[:nBytes]
 
         # Very important that we unmap the buffer data after copying, but
-        # keep the buffer bound for setting the texture.
+        # keep the buffer bound for setting the textures.
         GL.glUnmapBuffer(GL.GL_PIXEL_UNPACK_BUFFER)
 
-        # bind the texture in OpenGL
+        # copy the PBO to the textures, this returns before the transfer is
+        # done
         GL.glEnable(GL.GL_TEXTURE_2D)
         GL.glActiveTexture(GL.GL_TEXTURE0)
-        GL.glBindTexture(GL.GL_TEXTURE_2D, self._textureId)
-
-        # copy the PBO to the texture
         GL.glPixelStorei(GL.GL_UNPACK_ALIGNMENT, 1)
-        GL.glTexSubImage2D(
-            GL.GL_TEXTURE_2D, 0, 0, 0,
-            vidWidth, vidHeight,
-            GL.GL_RGB,
-            GL.GL_UNSIGNED_BYTE,
-            0)  # point to the presently bound buffer
-
-        # update texture filtering only if needed
-        if self._texFilterNeedsUpdate:
-            if self.interpolate:
-                texFilter = GL.GL_LINEAR
-            else:
-                texFilter = GL.GL_NEAREST
-
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D,
-                GL.GL_TEXTURE_MAG_FILTER,
-                texFilter)
-            GL.glTexParameteri(
-                GL.GL_TEXTURE_2D,
-                GL.GL_TEXTURE_MIN_FILTER,
-                texFilter)
-
-            self._texFilterNeedsUpdate = False
+        for textureId, (planeWidth, planeHeight), offset in zip(
+                self._textureIds, self._planeSizes, offsets):
+            GL.glBindTexture(GL.GL_TEXTURE_2D, textureId)
+            GL.glTexSubImage2D(
+                GL.GL_TEXTURE_2D, 0, 0, 0,
+                planeWidth, planeHeight,
+                texFormat,
+                GL.GL_UNSIGNED_BYTE,
+                int(offset))  # offset into the presently bound buffer
+
+            # update texture filtering only if needed
+            if self._texFilterNeedsUpdate:
+                if self.interpolate:
+                    texFilter = GL.GL_LINEAR
+                else:
+                    texFilter = GL.GL_NEAREST
+
+                GL.glTexParameteri(
+                    GL.GL_TEXTURE_2D,
+                    GL.GL_TEXTURE_MAG_FILTER,
+                    texFilter)
+                GL.glTexParameteri(
+                    GL.GL_TEXTURE_2D,
+                    GL.GL_TEXTURE_MIN_FILTER,
+                    texFilter)
+
+        self._texFilterNeedsUpdate = False
+        self._uploadedFrame = frame
 
         # important to unbind the PBO
         GL.glBindBuffer(GL.GL_PIXEL_UNPACK_BUFFER, 0)
@@ -798,9 +893,14 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
         """Draw the video frame to the window.
 
         This is called by the `draw()` method to blit the video to the display
-        window.
+        window. YUV frames are converted to RGB by a shader as they are drawn.
 
         """
+        if not self._textureIds:
+            return
+
+        isYUV = self._texColorFormat == 'yuv420p'
+
         # make sure that textures are on and GL_TEXTURE0 is active
         GL.glEnable(GL.GL_TEXTURE_2D)
         GL.glActiveTexture(GL.GL_TEXTURE0)
@@ -825,8 +925,20 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
         )
         GL.glPushAttrib(GL.GL_ENABLE_BIT)
 
-        GL.glActiveTexture(GL.GL_TEXTURE0)
-        GL.glBindTexture(GL.GL_TEXTURE_2D, self._textureId)
+        if isYUV:
+            _prog = self.win._shaders['yuv420']
+            GL.glUseProgram(_prog)
+            # one texture unit for each plane, all use the same coordinates
+            for unit, (textureId, name) in enumerate(
+                    zip(self._textureIds, (b"yTexture", b"uTexture",
+                                           b"vTexture"))):
+                GL.glActiveTexture(GL.GL_TEXTURE0 + unit)
+                GL.glBindTexture(GL.GL_TEXTURE_2D, textureId)
+                GL.glUniform1i(_shaders.getUniformLocation(_prog, name), unit)
+            GL.glActiveTexture(GL.GL_TEXTURE0)
+        else:
+            GL.glActiveTexture(GL.GL_TEXTURE0)
+            GL.glBindTexture(GL.GL_TEXTURE_2D, self._textureIds[0])
         GL.glPushClientAttrib(GL.GL_CLIENT_VERTEX_ARRAY_BIT)
 
         # 2D texture array, 3D vertex array
@@ -836,6 +948,11 @@ class MovieStim(BaseVisualStim, ColorMixin, ContainerMixin):
         GL.glPopAttrib()
         GL.glPopMatrix()
 
+        if isYUV:
+            GL.glUseProgram(0)
+            for unit in reversed(range(len(self._textureIds))):
+                GL.glActiveTexture(GL.GL_TEXTURE0 + unit)
+                GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
         GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
         GL.glDisable(GL.GL_TEXTURE_2D)
 
@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Store all the frames of a movie clip, decoded in advance.
+
+Decoding a movie while it plays can make frames late, and seeking in a
+compressed stream only finds the nearest key frame. For short clips it is
+better to decode every frame once, when the clip is loaded, and play it back
+from memory. A :class:`MovieFrameStore` holds the decoded frames either in RAM
+or in a file memory-mapped from a cache folder, which then also saves decoding
+the clip again in later sessions.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'MovieFrameStore',
+    'getFrameStore',
+    'clearFrameStores'
+]
+
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+from psychopy import logging
+from psychopy.tools.filetools import pathToString
+
+# frame stores shared by all movies, see `getFrameStore`
+_frameStores = {}
+
+
+def _getPlaneSizes(size, colorFormat):
+    """Sizes `(w, h)` of the planes of a frame with format `colorFormat`."""
+    width, height = size
+    if colorFormat == 'yuv420p':
+        chromaSize = ((width + 1) // 2, (height + 1) // 2)
+        return [(width, height), chromaSize, chromaSize]
+
+    return [(width, height)]
+
+
+class MovieFrameStore:
+    """All the frames of a movie clip, decoded when the store is created.
+
+    Frames are decoded with `imageio-ffmpeg`, at the frame rate of the clip.
+    Frame `i` is shown from `i / frameRate` seconds into the clip, so that
+    finding the frame for any time, and seeking to it, is exact.
+
+    Parameters
+    ----------
+    filename : str or Path
+        Movie file.
+    size : tuple or None
+        Size `(w, h)` to scale the frames to, to save memory. `None` keeps the
+        size of the clip. Frames stored as `'yuv420p'` are rounded down to an
+        even size.
+    colorFormat : str
+        Format to store the frames in, either `'rgb8'` or `'yuv420p'` (which
+        takes half the memory).
+    cacheDir : str, Path or None
+        Folder to keep the decoded frames in, as a file which is memory-mapped
+        rather than read into RAM. A clip which was decoded into the folder
+        before (with the same size and format) isn't decoded again. `None`
+        keeps the frames in RAM.
+
+    """
+    def __init__(self, filename, size=None, colorFormat='rgb8',
+                 cacheDir=None):
+        if colorFormat not in ('rgb8', 'yuv420p'):
+            raise ValueError(
+                "Frames can be stored as 'rgb8' or 'yuv420p', not {!r}".format(
+                    colorFormat))
+
+        self.filename = os.path.abspath(pathToString(filename))
+        self.colorFormat = colorFormat
+        self.cacheFile = None
+
+        cacheName = None
+        if cacheDir is not None:
+            cacheDir = pathToString(cacheDir)
+            os.makedirs(cacheDir, exist_ok=True)
+            cacheName = os.path.join(
+                cacheDir, self._getCacheKey(self.filename, size, colorFormat))
+            if self._loadCache(cacheName):
+                return
+
+        self._decode(size, cacheName)
+
+    @staticmethod
+    def _getCacheKey(filename, size, colorFormat):
+        stat = os.stat(filename)
+        key = json.dumps([filename, stat.st_mtime_ns, stat.st_size,
+                          None if size is None else list(size), colorFormat])
+        return hashlib.sha1(key.encode('utf-8')).hexdigest()
+
+    @property
+    def nFrames(self):
+        """Number of frames in the clip (`int`)."""
+        return len(self._frames)
+
+    @property
+    def frameInterval(self):
+        """Time each frame is shown for in seconds (`float`)."""
+        return 1.0 / self.frameRate
+
+    @property
+    def duration(self):
+        """Duration of the clip in seconds (`float`)."""
+        return self.nFrames / self.frameRate
+
+    @property
+    def nBytes(self):
+        """Size of the decoded frames in bytes (`int`)."""
+        return self._frames.nbytes
+
+    def _setFrames(self, frames, size, frameRate):
+        self.size = tuple(int(x) for x in size)
+        self.frameRate = float(frameRate)
+        self._frames = frames
+        # offsets of the planes within each frame
+        nChannels = 3 if self.colorFormat == 'rgb8' else 1
+        self._planes = []
+        offset = 0
+        for width, height in _getPlaneSizes(self.size, self.colorFormat):
+            nBytes = width * height * nChannels
+            self._planes.append((offset, offset + nBytes))
+            offset += nBytes
+
+    def _decode(self, size, cacheName=None):
+        """Decode all the frames of the clip."""
+        import imageio_ffmpeg
+
+        if self.colorFormat == 'rgb8':
+            pixFormat, bitsPerPixel = 'rgb24', 24
+            scale = None if size is None else '{}:{}'.format(*size)
+        else:
+            # the color planes are half the width and height of the frame, so
+            # keep these even for frames to be a whole number of bytes
+            pixFormat, bitsPerPixel = 'yuv420p', 12
+            if size is None:
+                scale = 'trunc(iw/2)*2:trunc(ih/2)*2'
+            else:
+                scale = '{}:{}'.format(*(int(x) // 2 * 2 for x in size))
+        outputParams = [] if scale is None else ['-vf', 'scale=' + scale]
+        reader = imageio_ffmpeg.read_frames(
+            self.filename, pix_fmt=pixFormat, bits_per_pixel=bitsPerPixel,
+            output_params=outputParams)
+        meta = next(reader)
+
+        logging.info("Decoding all frames of movie {}".format(self.filename))
+        if cacheName is None:
+            data = bytearray()
+            for frame in reader:
+                data += frame
+        else:
+            # write to a temporary file so an unfinished file is never used
+            with open(cacheName + '.tmp', 'wb') as f:
+                for frame in reader:
+                    f.write(frame)
+
+        planeSizes = _getPlaneSizes(meta['size'], self.colorFormat)
+        nChannels = 3 if self.colorFormat == 'rgb8' else 1
+        frameBytes = sum(w * h for w, h in planeSizes) * nChannels
+        if cacheName is None:
+            nFrames = len(data) // frameBytes
+        else:
+            nFrames = os.path.getsize(cacheName + '.tmp') // frameBytes
+            if not nFrames:
+                os.remove(cacheName + '.tmp')  # can't be memory-mapped
+        if not nFrames:
+            raise RuntimeError(
+                "No frames could be decoded from movie {}".format(
+                    self.filename))
+
+        frameRate = meta.get('fps') or 0.0
+        if not frameRate > 0:
+            # no frame rate in the stream, use the average instead
+            duration = meta.get('duration') or 0.0
+            if not duration > 0:
+                raise RuntimeError(
+                    "Movie {} has no frame rate or duration, can't tell "
+                    "when to show its frames".format(self.filename))
+            frameRate = nFrames / duration
+
+        if cacheName is None:
+            frames = np.frombuffer(data, dtype=np.uint8).reshape(
+                (-1, frameBytes))
+            frames.flags.writeable = False
+        else:
+            os.replace(cacheName + '.tmp', cacheName + '.frames')
+            with open(cacheName + '.json', 'w') as f:
+                json.dump({'filename': self.filename,
+                           'size': list(meta['size']),
+                           'frameRate': frameRate,
+                           'nFrames': nFrames,
+                           'colorFormat': self.colorFormat}, f)
+            frames = np.memmap(cacheName + '.frames', dtype=np.uint8,
+                               mode='r', shape=(nFrames, frameBytes))
+            self.cacheFile = cacheName + '.frames'
+
+        self._setFrames(frames, meta['size'], frameRate)
+
+    def _loadCache(self, cacheName):
+        """Use frames decoded into the cache folder before, if there are any.
+        """
+        try:
+            with open(cacheName + '.json', 'r') as f:
+                info = json.load(f)
+            planeSizes = _getPlaneSizes(info['size'], self.colorFormat)
+            nChannels = 3 if self.colorFormat == 'rgb8' else 1
+            frameBytes = sum(w * h for w, h in planeSizes) * nChannels
+            if not (info['nFrames'] > 0 and info['frameRate'] > 0):
+                return False  # decode again
+            frames = np.memmap(cacheName + '.frames', dtype=np.uint8,
+                               mode='r', shape=(info['nFrames'], frameBytes))
+        except (OSError, ValueError, KeyError):
+            return False
+
+        self.cacheFile = cacheName + '.frames'
+        self._setFrames(frames, info['size'], info['frameRate'])
+        logging.info("Using frames of movie {} decoded to {}".format(
+            self.filename, self.cacheFile))
+        return True
+
+    def frameIndexFromMovieTime(self, movieTime):
+        """Index of the frame to show at a time in the clip (`int`). This may
+        be past the last frame."""
+        # allow for rounding errors in times computed from frame indices
+        return max(0, math.floor(movieTime * self.frameRate + 1e-6))
+
+    def movieTimeFromFrameIndex(self, frameIndex):
+        """Time in the clip a frame is first shown (`float`)."""
+        return frameIndex / self.frameRate
+
+    def getFrameData(self, frameIndex):
+        """Color data of a frame.
+
+        Returns
+        -------
+        ndarray or tuple
+            The RGB data of the frame, or a tuple of its Y, U and V planes if
+            stored as `'yuv420p'`. These are read-only views of the store.
+
+        """
+        frame = self._frames[frameIndex]
+        if self.colorFormat == 'rgb8':
+            return frame
+
+        return tuple(frame[start:end] for start, end in self._planes)
+
+
+def getFrameStore(filename, size=None, colorFormat='rgb8', cacheDir=None):
+    """Get the frames of a movie clip, decoding them if they haven't been
+    already.
+
+    Stores are shared, so that showing a clip again (or in several stimuli)
+    doesn't decode it again. Use :func:`clearFrameStores` to free them.
+
+    Parameters are as for :class:`MovieFrameStore`.
+
+    Returns
+    -------
+    MovieFrameStore
+
+    """
+    filename = os.path.abspath(pathToString(filename))
+    key = (MovieFrameStore._getCacheKey(filename, size, colorFormat),
+           None if cacheDir is None else os.path.abspath(pathToString(cacheDir)))
+    store = _frameStores.get(key)
+    if store is None:
+        store = _frameStores[key] = MovieFrameStore(
+            filename, size=size, colorFormat=colorFormat, cacheDir=cacheDir)
+
+    return store
+
+
+def clearFrameStores():
+    """Forget the frame stores kept by :func:`getFrameStore`, freeing their
+    memory once no movie is using them. Files in cache folders are kept."""
+    _frameStores.clear()
+
+
+if __name__ == "__main__":
+    pass
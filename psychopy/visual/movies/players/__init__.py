@@ -15,7 +15,8 @@ from ._base import BaseMoviePlayer
 
 # Players available, you must update this list to make players discoverable by
 # the `MovieStim` class when the user specifies `movieLib`.
-_players = {'Null': None}
+from .predecoded_player import PreDecodedPlayer
+_players = {'Null': None, 'predecoded': PreDecodedPlayer}
 PREFERRED_VIDEO_LIB = 'ffpyplayer'
 
 
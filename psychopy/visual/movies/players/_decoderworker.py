@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Worker process of the movie decoder pool, see `decoderpool.py`.
+
+This is run as a script by the pool, so that starting it doesn't import
+PsychoPy (or re-run the experiment script, as `multiprocessing` would), and
+must only import the standard library, NumPy and FFPyPlayer. The pool sends
+the address to connect to on `stdin`. Each worker plays several movies with
+FFPyPlayer, and copies each frame into shared memory when it's due to be shown
+by the next flip of the window.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+import math
+import pickle
+import sys
+import time
+
+import numpy as np
+
+# Layout of the shared memory for each movie: a header, then a ring of slots
+# each holding the planes of one frame one after another. The worker writes
+# frames to the slots in turn, changing `seq` (the number of frames written)
+# last. The latest frame is then in slot `seq % FRAME_SLOTS`, and won't be
+# written to again until two more frames have been.
+FRAME_HEADER = np.dtype([
+    ('seq', '<i8'),
+    ('frameIndex', '<i8'),
+    ('loopCount', '<i8'),
+    ('finished', '<i8'),
+    ('pts', '<f8')])
+FRAME_SLOTS = 3
+
+# longest time to wait for commands while movies are paused
+POLL_INTERVAL = 0.004
+
+# longest time to wait for the frame at a position sought
+SEEK_TIMEOUT = 0.1
+
+
+def getFrameSlots(buf, frameBytes):
+    """Views of the header and frame slots in a movie's shared memory.
+
+    Parameters
+    ----------
+    buf : memoryview
+        Buffer of the shared memory.
+    frameBytes : int
+        Size of a frame in bytes.
+
+    Returns
+    -------
+    tuple
+        `(header, slots)`, a record array of length 1 and a
+        `(FRAME_SLOTS, frameBytes)` array.
+
+    """
+    header = np.ndarray((1,), dtype=FRAME_HEADER, buffer=buf)
+    slots = np.ndarray((FRAME_SLOTS, frameBytes), dtype=np.uint8, buffer=buf,
+                       offset=FRAME_HEADER.itemsize)
+    return header, slots
+
+
+def getSharedMemoryBytes(frameBytes):
+    """Size of the shared memory needed for frames of `frameBytes` bytes."""
+    return FRAME_HEADER.itemsize + FRAME_SLOTS * frameBytes
+
+
+def attachSharedMemory(name):
+    """Open shared memory created by the pool. This process doesn't own it, so
+    it mustn't be deleted when this process exits."""
+    from multiprocessing import resource_tracker, shared_memory
+    shm = shared_memory.SharedMemory(name=name)
+    try:
+        resource_tracker.unregister(shm._name, 'shared_memory')
+    except Exception:  # no resource tracker on Windows
+        pass
+    return shm
+
+
+class _Movie:
+    """A movie played by this worker."""
+    def __init__(self, player):
+        self.player = player
+        self.metadata = {}
+        self.frameInterval = 0.004
+        self.duration = 0.0
+        self.shm = None
+        self.header = self.slots = None
+        self.planeSlices = []
+        self.pending = None  # next frame `(image, pts, dueTime)`
+        self.loopCount = 0
+        self.finished = False
+
+    def warmUp(self):
+        """Get the first frame and the metadata of the movie, and pause it.
+        """
+        player = self.player
+        player.set_mute(True)
+        player.set_pause(False)
+
+        frameData, val = None, ''
+        while frameData is None or val == 'not ready':
+            frameData, val = player.get_frame(show=True)
+            if val == 'eof':
+                break
+            time.sleep(self.frameInterval)
+
+        if frameData is None:
+            raise RuntimeError("Cannot play movie, no frames could be decoded.")
+
+        self.metadata = player.get_metadata()
+        numer, denom = self.metadata['frame_rate']
+        if not numer or not denom:
+            raise RuntimeError(
+                "Cannot play movie. Failed to acquire metadata from video "
+                "stream!")
+        self.frameInterval = denom / float(numer)
+        self.duration = self.metadata['duration']
+
+        player.set_pause(True)
+        player.set_mute(False)
+        player.set_volume(player.get_volume())
+
+        image, pts = frameData
+        self.pending = (image, pts, time.monotonic())
+        planeBytes = [len(plane) for plane in image.to_bytearray() if plane]
+        offsets = np.cumsum([0] + planeBytes)
+        self.planeSlices = [slice(start, end)
+                            for start, end in zip(offsets[:-1], offsets[1:])]
+
+        return {'metadata': self.metadata,
+                'size': tuple(image.get_size()),
+                'pixelFormat': image.get_pixel_format(),
+                'planeBytes': planeBytes}
+
+    def attach(self, shmName):
+        self.shm = attachSharedMemory(shmName)
+        frameBytes = self.planeSlices[-1].stop
+        self.header, self.slots = getFrameSlots(self.shm.buf, frameBytes)
+
+    def publish(self, image, pts):
+        """Copy a frame to the next slot in shared memory."""
+        header = self.header
+        seq = int(header['seq'][0]) + 1
+        slot = self.slots[seq % FRAME_SLOTS]
+        planes = [plane for plane in image.to_bytearray() if plane]
+        for plane, planeSlice in zip(planes, self.planeSlices):
+            slot[planeSlice] = np.frombuffer(plane, dtype=np.uint8)
+
+        header['frameIndex'] = int(math.floor(pts / self.frameInterval)) - 1
+        header['loopCount'] = self.loopCount
+        header['pts'] = pts
+        header['finished'] = 0
+        header['seq'] = seq  # last, so the frame is complete when seen
+
+        # is the next frame the last? increment the number of loops then
+        if pts + self.frameInterval * 1.5 >= self.duration:
+            self.loopCount += 1
+
+    def decode(self, now):
+        """Get the next frame from the player, unless one is waiting to be
+        shown already."""
+        if self.pending is not None or self.header is None:
+            return
+        frameData, val = self.player.get_frame()
+        if val == 'eof':
+            if not self.finished:
+                self.finished = True
+                self.header['finished'] = 1
+        elif frameData is not None and val != 'paused':
+            self.finished = False
+            image, pts = frameData
+            dueTime = now + val if isinstance(val, float) else now
+            self.pending = (image, pts, dueTime)
+
+    def seek(self, pts, relative=False, pause=None):
+        """Seek to a position and hand over the frame there, so it's shown
+        next even if the movie is paused."""
+        player = self.player
+        wasPaused = player.get_pause() if pause is None else pause
+        player.set_pause(False)
+        player.set_mute(True)
+        player.seek(pts, relative=relative, accurate=True)
+        self.pending = None
+
+        frameData = None
+        giveUpTime = time.monotonic() + SEEK_TIMEOUT
+        while frameData is None and time.monotonic() < giveUpTime:
+            frameData, val = player.get_frame(show=True)
+            if val == 'eof':
+                break
+            if frameData is None:
+                time.sleep(0.0025)
+
+        player.set_mute(False)
+        player.set_pause(wasPaused)
+        if frameData is not None and self.header is not None:
+            self.publish(*frameData)
+
+    def close(self):
+        self.player.close_player()
+        self.header = self.slots = None
+        if self.shm is not None:
+            self.shm.close()
+            self.shm = None
+
+
+def _runCommand(movies, op, movieId, value):
+    """Run a command from the pool, returning the value to reply with."""
+    if op == 'open':
+        from ffpyplayer.player import MediaPlayer
+        filename, ffOpts, libOpts = value
+        movie = _Movie(MediaPlayer(filename, ff_opts=ffOpts, lib_opts=libOpts))
+        info = movie.warmUp()
+        movies[movieId] = movie
+        return info
+
+    movie = movies[movieId]
+    player = movie.player
+    if op == 'attach':
+        movie.attach(value)
+        # hand over the first frame now, so errors copying it are replied with
+        if movie.pending is not None:
+            image, pts, _ = movie.pending
+            movie.pending = None
+            movie.publish(image, pts)
+    elif op == 'play':
+        player.set_pause(False)
+    elif op == 'pause':
+        player.set_pause(True)
+    elif op == 'seek':
+        pts, relative = value
+        movie.seek(pts, relative)
+    elif op == 'stop':  # stop playback, return to start
+        movie.loopCount = 0
+        movie.seek(0.0, pause=True)
+    elif op == 'volume':
+        player.set_volume(float(value))
+    elif op == 'mute':
+        player.set_mute(bool(value))
+    elif op == 'getVolume':
+        return player.get_volume()
+    elif op == 'close':
+        del movies[movieId]
+        movie.close()
+    else:
+        raise ValueError("Unknown decoder command {!r}".format(op))
+
+
+def run(conn, deadline):
+    """Play movies as commanded through `conn` until told to shut down.
+
+    Parameters
+    ----------
+    conn : multiprocessing.connection.Connection
+        Connection to the pool. Commands are `(op, movieId, value)` and each is
+        replied to with `(True, result)` or `(False, errorMessage)`.
+    deadline : ndarray
+        Array holding the `time.monotonic()` time of the next flip of the
+        window, shared with the pool.
+
+    """
+    movies = {}
+    while True:
+        # Frames due to be shown by the next flip are copied to shared memory
+        # now, earliest first, so they are there when the window draws.
+        now = time.monotonic()
+        flipTime = max(float(deadline[0]), now)
+        due = sorted((movie.pending[2], movieId)
+                     for movieId, movie in movies.items()
+                     if movie.pending is not None and movie.header is not None)
+        for dueTime, movieId in due:
+            if dueTime > flipTime:
+                break
+            movie = movies[movieId]
+            image, pts, _ = movie.pending
+            movie.pending = None
+            movie.publish(image, pts)
+
+        for movie in movies.values():
+            movie.decode(now)
+
+        # wait for commands until the next frame is due for a flip
+        timeout = POLL_INTERVAL
+        for movie in movies.values():
+            if movie.pending is not None:
+                timeout = min(timeout, movie.pending[2] - flipTime)
+        if not conn.poll(max(timeout, 0.0)):
+            continue
+
+        while conn.poll():
+            try:
+                op, movieId, value = conn.recv()
+            except EOFError:  # the pool has gone
+                op = 'shutdown'
+            if op == 'shutdown':
+                for movie in movies.values():
+                    movie.close()
+                return
+            try:
+                result = (True, _runCommand(movies, op, movieId, value))
+            except Exception as err:
+                result = (False, "{}: {}".format(type(err).__name__, err))
+            conn.send(result)
+
+
+if __name__ == "__main__":
+    from multiprocessing.connection import Client
+
+    address, authkey, deadlineName = pickle.load(sys.stdin.buffer)
+    conn = Client(address, authkey=authkey)
+    deadlineShm = attachSharedMemory(deadlineName)
+    try:
+        run(conn, np.ndarray((1,), dtype='<f8', buffer=deadlineShm.buf))
+    finally:
+        conn.close()
@@ -0,0 +1,519 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Pool of processes decoding movies for `MovieStim`.
+
+Each movie played by `FFPyPlayer` normally gets its own reader thread and
+FFmpeg decoder, all in the experiment's process. When many movies are shown
+at once these compete with each other and the drawing code for the
+interpreter lock and the processor cores. A :class:`MovieDecoderPool` plays
+movies in a fixed number of worker processes instead, each playing several
+movies, and limits the number of threads FFmpeg uses to decode each one.
+
+Workers hand frames over through shared memory when they are due to be shown
+by the next flip of the window, and movies are controlled as before through
+the `FFPyPlayer` interface. Use a pool by passing `decoderPool=True` (for the
+shared pool, see :func:`getDecoderPool`) or a pool of your own to `MovieStim`.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'MovieDecoderPool',
+    'PooledMovieStream',
+    'getDecoderPool',
+    'closeDecoderPools'
+]
+
+import atexit
+import os
+import subprocess
+import threading
+import time
+
+import numpy as np
+
+import psychopy.logging as logging
+from psychopy.constants import NOT_STARTED
+from . import _decoderworker
+from ._decoderworker import getFrameSlots, getSharedMemoryBytes
+
+# pools to close on exit
+_pools = []
+
+# pool shared by movies which don't specify one
+_defaultPool = None
+
+# shared memory of closed movies whose frames were still in use
+_unclosedMemory = []
+
+# longest time to wait for the first frame of a movie in seconds
+FIRST_FRAME_TIMEOUT = 5.0
+
+
+def _closeSharedMemory(shm=None):
+    """Close shared memory, or keep it to close later if frames in it are
+    still in use. Memory kept before is closed too if it can be now."""
+    if shm is not None:
+        _unclosedMemory.append(shm)
+    for shm in list(_unclosedMemory):
+        try:
+            shm.close()
+        except BufferError:
+            continue
+        _unclosedMemory.remove(shm)
+
+
+class _SharedFrameImage:
+    """Frame in shared memory, looking like the `ffpyplayer.pic.Image` objects
+    `FFPyPlayer` gets from its reader thread."""
+    __slots__ = ['_planes', '_size', '_pixelFormat']
+
+    def __init__(self, planes, size, pixelFormat):
+        self._planes = planes
+        self._size = size
+        self._pixelFormat = pixelFormat
+
+    def get_size(self):
+        return self._size
+
+    def get_pixel_format(self):
+        return self._pixelFormat
+
+    def to_bytearray(self):
+        return self._planes
+
+
+class _WorkerProcess:
+    """A decoder process and the connection commands are sent through.
+
+    Parameters
+    ----------
+    deadlineName : str
+        Name of the shared memory holding the time of the next flip.
+    timeout : float
+        Longest time to wait for the process to connect in seconds.
+
+    """
+    def __init__(self, deadlineName, timeout=30.0):
+        from psychopy.tools.systemtools import startWorkerProcess
+
+        self.proc, self.conn = startWorkerProcess(
+            _decoderworker.__file__, (deadlineName,), timeout)
+
+        self.nMovies = 0
+        self._lock = threading.Lock()
+
+    def request(self, op, movieId=None, value=None):
+        """Send a command and wait for the reply."""
+        with self._lock:
+            try:
+                self.conn.send((op, movieId, value))
+                ok, result = self.conn.recv()
+            except (EOFError, OSError):
+                raise RuntimeError("Movie decoder process has exited.")
+
+        if not ok:
+            raise RuntimeError("Movie decoder error: " + result)
+        return result
+
+    def shutdown(self, timeout=2.0):
+        try:
+            with self._lock:
+                self.conn.send(('shutdown', None, None))
+        except (EOFError, OSError):
+            pass
+        try:
+            self.proc.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+        self.conn.close()
+
+
+class MovieDecoderPool:
+    """Pool of processes decoding movies.
+
+    Movies are given to the process playing the fewest, starting a new one
+    while there are fewer than `nWorkers`. Workers hand over each frame when
+    it's due to be shown by the next flip of the window (see
+    :meth:`setFlipDeadline`), playing the movies whose frames are due soonest
+    first. Requires Python 3.8 or later.
+
+    Parameters
+    ----------
+    nWorkers : int or None
+        Largest number of worker processes. `None` uses one less than the
+        number of processor cores, up to 4.
+    threadsPerMovie : int
+        Number of threads FFmpeg may use to decode each movie. FFmpeg normally
+        uses one for each core, for every movie.
+
+    Examples
+    --------
+    Play sixteen movies using four processes::
+
+        pool = MovieDecoderPool(nWorkers=4)
+        tiles = [MovieStim(win, name, decoderPool=pool, ...)
+                 for name in movieFiles]
+
+    """
+    def __init__(self, nWorkers=None, threadsPerMovie=1):
+        from multiprocessing import shared_memory
+
+        if nWorkers is None:
+            nWorkers = min(4, (os.cpu_count() or 2) - 1)
+        self.nWorkers = max(1, int(nWorkers))
+        self.threadsPerMovie = int(threadsPerMovie)
+
+        self._workers = []
+        self._nStarting = 0  # workers being started
+        self._nextMovieId = 0
+        self._lock = threading.Condition()
+
+        # time of the next flip, shared with the workers
+        self._deadlineShm = shared_memory.SharedMemory(create=True, size=8)
+        self._deadline = np.ndarray(
+            (1,), dtype='<f8', buffer=self._deadlineShm.buf)
+        self._deadline[0] = 0.0
+
+        _pools.append(self)
+
+    @property
+    def nMovies(self):
+        """Number of movies being played by the pool (`int`)."""
+        return sum(worker.nMovies for worker in self._workers)
+
+    def setFlipDeadline(self, secsToFlip):
+        """Set when the window will next flip. Frames are handed over when
+        they are to be shown by then.
+
+        Parameters
+        ----------
+        secsToFlip : float
+            Time from now until the next flip in seconds.
+
+        """
+        self._deadline[0] = time.monotonic() + secsToFlip
+
+    def openMovie(self, filename, ffOpts):
+        """Open a movie to be played by the pool.
+
+        Parameters
+        ----------
+        filename : str
+            Movie file.
+        ffOpts : dict
+            Options for `ffpyplayer.player.MediaPlayer`.
+
+        Returns
+        -------
+        PooledMovieStream
+            Stream to control the movie and get its frames with. Call its
+            `begin` method to start decoding.
+
+        """
+        with self._lock:
+            while True:
+                if self._deadlineShm is None:
+                    raise RuntimeError("Movie decoder pool has been closed.")
+                idle = [w for w in self._workers if not w.nMovies]
+                if idle:
+                    worker = idle[0]
+                elif len(self._workers) + self._nStarting < self.nWorkers:
+                    worker = None  # start one below
+                    self._nStarting += 1
+                    deadlineName = self._deadlineShm.name
+                elif self._workers:
+                    worker = min(self._workers, key=lambda w: w.nMovies)
+                else:  # wait for the workers being started
+                    self._lock.wait()
+                    continue
+                break
+            if worker is not None:
+                worker.nMovies += 1
+            movieId = self._nextMovieId
+            self._nextMovieId += 1
+
+        if worker is None:
+            # started without the lock, so other movies can be opened and
+            # closed meanwhile
+            try:
+                worker = _WorkerProcess(deadlineName)
+            finally:
+                with self._lock:
+                    self._nStarting -= 1
+                    self._lock.notify_all()
+            with self._lock:
+                isClosed = self._deadlineShm is None
+                if not isClosed:
+                    worker.nMovies += 1
+                    self._workers.append(worker)
+            if isClosed:
+                worker.shutdown()
+                raise RuntimeError("Movie decoder pool has been closed.")
+
+        libOpts = {'threads': str(self.threadsPerMovie)}
+        return PooledMovieStream(
+            self, worker, movieId, filename, ffOpts, libOpts)
+
+    def _releaseMovie(self, worker):
+        with self._lock:
+            worker.nMovies -= 1
+
+    def close(self):
+        """Stop all the worker processes. Movies can't be played by the pool
+        afterwards."""
+        with self._lock:
+            for worker in self._workers:
+                worker.shutdown()
+            self._workers = []
+            if self._deadlineShm is not None:
+                self._deadline = None
+                self._deadlineShm.close()
+                self._deadlineShm.unlink()
+                self._deadlineShm = None
+
+        if self in _pools:
+            _pools.remove(self)
+
+
+class PooledMovieStream:
+    """A movie played by a :class:`MovieDecoderPool`.
+
+    This has the interface of the reader thread `FFPyPlayer` uses otherwise,
+    `MovieStreamThreadFFPyPlayer`. Get one from
+    :meth:`MovieDecoderPool.openMovie`.
+
+    """
+    def __init__(self, pool, worker, movieId, filename, ffOpts, libOpts):
+        self._pool = pool
+        self._worker = worker
+        self._movieId = movieId
+        self._filename = filename
+        self._ffOpts = dict(ffOpts)
+        self._libOpts = libOpts
+
+        self._shm = None
+        self._header = self._slots = None
+        self._info = None
+        self._lastSeq = 0
+        self._isReady = False
+
+    def _request(self, op, value=None):
+        return self._worker.request(op, self._movieId, value)
+
+    @property
+    def isFinished(self):
+        """Is the movie done playing (`bool`)? This is `True` if the movie
+        stream is at EOF.
+        """
+        return self._header is not None and bool(self._header['finished'][0])
+
+    @property
+    def isReady(self):
+        """`True` if the stream is ready (`bool`).
+        """
+        return self._isReady
+
+    def begin(self):
+        """Open the movie in the worker process. This will block until it has
+        the first frame.
+        """
+        from multiprocessing import shared_memory
+
+        try:
+            self._info = self._request(
+                'open', (self._filename, self._ffOpts, self._libOpts))
+        except RuntimeError:
+            self._pool._releaseMovie(self._worker)
+            self._worker = None
+            raise
+
+        frameBytes = sum(self._info['planeBytes'])
+        self._shm = shared_memory.SharedMemory(
+            create=True, size=getSharedMemoryBytes(frameBytes))
+        self._header, self._slots = getFrameSlots(self._shm.buf, frameBytes)
+        self._header[0] = 0
+        try:
+            self._request('attach', self._shm.name)
+
+            # the worker hands over the first frame before replying, but don't
+            # wait forever for it if that fails
+            giveUpTime = time.monotonic() + FIRST_FRAME_TIMEOUT
+            while not self._header['seq'][0]:
+                if self._worker.proc.poll() is not None:
+                    raise RuntimeError("Movie decoder process has exited.")
+                if time.monotonic() > giveUpTime:
+                    raise RuntimeError(
+                        "Movie decoder didn't hand over the first frame of "
+                        "`{}`.".format(self._filename))
+                time.sleep(0.001)
+        except RuntimeError:
+            self.shutdown()
+            raise
+        self._isReady = True
+
+    def play(self):
+        """Start playing the video from the stream.
+        """
+        self._request('play')
+
+    def pause(self):
+        """Pause the video.
+        """
+        self._request('pause')
+
+    def seek(self, pts, relative=False):
+        """Seek to a position in the video.
+        """
+        self._request('seek', (pts, relative))
+
+    def stop(self):
+        """Stop playback, reset the movie to the beginning.
+        """
+        self._request('stop')
+
+    def shutdown(self):
+        """Close the movie and free its shared memory.
+        """
+        if self._worker is None:
+            return
+
+        try:
+            self._request('close')
+        except RuntimeError as err:
+            logging.warning(str(err))
+        self._pool._releaseMovie(self._worker)
+        self._worker = None
+
+        if self._shm is not None:
+            self._header = self._slots = None
+            self._shm.unlink()  # freed once closed
+            _closeSharedMemory(self._shm)
+            self._shm = None
+        self._isReady = False
+
+    def join(self, timeout=None):
+        """Does nothing, there is no thread to wait for."""
+        pass
+
+    def isDone(self):
+        """Check if the video is done playing.
+
+        Returns
+        -------
+        bool
+            Is the video done?
+
+        """
+        return self._worker is None
+
+    def getVolume(self):
+        """Get the current volume level."""
+        if self._worker is not None:
+            return self._request('getVolume')
+
+        return 0.0
+
+    def setVolume(self, volume):
+        """Set the volume for the video.
+
+        Parameters
+        ----------
+        volume : float
+            New volume level, ranging between 0 and 1.
+
+        """
+        self._request('volume', volume)
+
+    def setMute(self, mute):
+        """Mute or unmute the video.
+
+        Parameters
+        ----------
+        mute : bool
+            Mute state. If `True`, audio will be muted.
+
+        """
+        self._request('mute', mute)
+
+    def getRecentFrame(self):
+        """Get the most recent frame handed over by the worker.
+
+        Returns
+        -------
+        StreamData or None
+            Frame data, whose `frameImage` holds a copy of the frame. Returns
+            `None` if there is no new frame since the last call.
+
+        """
+        from .ffpyplayer_player import StreamData, StreamStatus
+
+        if self._header is None:
+            return None
+
+        while True:
+            header = self._header[0].copy()
+            seq = int(header['seq'])
+            if seq == self._lastSeq:
+                return None
+
+            # Copied, as the worker writes to the slot again once it has
+            # written the others. If it started to while copying, the copy
+            # may be torn, so copy the latest frame instead.
+            slot = self._slots[seq % _decoderworker.FRAME_SLOTS]
+            planes = []
+            offset = 0
+            for nBytes in self._info['planeBytes']:
+                planes.append(slot[offset:offset + nBytes].copy())
+                offset += nBytes
+            if self._header['seq'][0] - seq < _decoderworker.FRAME_SLOTS - 1:
+                break
+        self._lastSeq = seq
+
+        return StreamData(
+            self._info['metadata'],
+            _SharedFrameImage(
+                planes, self._info['size'], self._info['pixelFormat']),
+            StreamStatus(
+                status=NOT_STARTED,
+                streamTime=float(header['pts']),
+                frameIndex=int(header['frameIndex']),
+                loopCount=int(header['loopCount'])),
+            u'ffpyplayer')
+
+
+def getDecoderPool():
+    """Get the decoder pool shared by movies, creating it on first use.
+
+    Returns
+    -------
+    MovieDecoderPool
+
+    """
+    global _defaultPool
+    if _defaultPool is None:
+        _defaultPool = MovieDecoderPool()
+
+    return _defaultPool
+
+
+def closeDecoderPools():
+    """Close all decoder pools, stopping their worker processes. This is called
+    when Python exits.
+    """
+    global _defaultPool
+    for pool in list(_pools):
+        pool.close()
+    _defaultPool = None
+    _closeSharedMemory()
+
+
+atexit.register(closeDecoderPools)
+
+
+if __name__ == "__main__":
+    pass
@@ -743,6 +743,19 @@ class FFPyPlayer(BaseMoviePlayer):
         if hasattr(self.parent, '_noAudio'):
             self._lastPlayerOpts['an'] = self.parent._noAudio
 
+        # have the decoder provide YUV frames for the parent to convert to RGB,
+        # which saves converting them on the CPU
+        if getattr(self.parent, '_useYUV', False):
+            self._lastPlayerOpts['out_fmt'] = 'yuv420p'
+
+        # decoder pool to play the movie in, if any
+        self._pool = getattr(self.parent, '_decoderPool', None)
+        if self._pool is True:
+            from .decoderpool import getDecoderPool
+            self._pool = getDecoderPool()
+        elif not self._pool:
+            self._pool = None
+
         # status flags
         self._status = NOT_STARTED
 
@@ -755,10 +768,6 @@ class FFPyPlayer(BaseMoviePlayer):
         self._lastFrame = None
         self._frameIndex = -1
 
-        # open the media player
-        handle = MediaPlayer(self._filename, ff_opts=self._lastPlayerOpts)
-        handle.set_pause(True)
-
         # Pull the first frame to get metadata. NB - `_enqueueFrame` should be
         # able to do this but the logic in there depends on having access to
         # metadata first. That may be rewritten at some point to reduce all of
@@ -766,8 +775,17 @@ class FFPyPlayer(BaseMoviePlayer):
         #
         self._status = NOT_STARTED
 
-        # hand off the player interface to the thread
-        self._tStream = MovieStreamThreadFFPyPlayer(handle)
+        if self._pool is not None:
+            # have a process of the pool play the movie
+            self._tStream = self._pool.openMovie(
+                self._filename, self._lastPlayerOpts)
+        else:
+            # open the media player
+            handle = MediaPlayer(self._filename, ff_opts=self._lastPlayerOpts)
+            handle.set_pause(True)
+
+            # hand off the player interface to the thread
+            self._tStream = MovieStreamThreadFFPyPlayer(handle)
         self._tStream.begin()
 
         # make sure we have metadata
@@ -818,6 +836,7 @@ class FFPyPlayer(BaseMoviePlayer):
 
         self._filename = u""
         self._frameIndex = -1
+        self._lastFrame = NULL_MOVIE_FRAME_INFO
         self._handle = None  # reset
 
     # @property
@@ -1333,8 +1352,16 @@ class FFPyPlayer(BaseMoviePlayer):
         self._streamTime = streamStatus.streamTime  # stream time for the camera
 
         # if we have a new frame, update the frame information
-        videoBuffer = frameImage.to_bytearray()[0]
-        videoFrameArray = np.frombuffer(videoBuffer, dtype=np.uint8)
+        if frameImage.get_pixel_format() == 'yuv420p':
+            # separate Y, U and V planes
+            colorFormat = 'yuv420p'
+            videoFrameArray = tuple(
+                np.frombuffer(plane, dtype=np.uint8)
+                for plane in frameImage.to_bytearray()[:3])
+        else:
+            colorFormat = 'rgb8'
+            videoBuffer = frameImage.to_bytearray()[0]
+            videoFrameArray = np.frombuffer(videoBuffer, dtype=np.uint8)
 
         # provide the last frame
         self._lastFrame = MovieFrame(
@@ -1342,6 +1369,7 @@ class FFPyPlayer(BaseMoviePlayer):
             absTime=self._streamTime,
             displayTime=self.metadata.frameInterval,
             size=frameImage.get_size(),
+            colorFormat=colorFormat,
             colorData=videoFrameArray,
             audioChannels=0,  # not populated yet ...
             audioSamples=None,
@@ -1361,6 +1389,14 @@ class FFPyPlayer(BaseMoviePlayer):
         """
         self._assertMediaPlayer()
 
+        # tell the pool when the frame is needed by
+        if self._pool is not None:
+            try:
+                self._pool.setFlipDeadline(
+                    self.parent.win.getFutureFlipTime(clock='now'))
+            except (AttributeError, IndexError):  # frame rate unknown
+                pass
+
         # check if the stream reader thread is present and alive, if not the
         # movie is finished
         self._enqueueFrame()
@@ -0,0 +1,484 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Player which plays movies from frames decoded in advance.
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = ['PreDecodedPlayer']
+
+import psychopy.logging as logging
+from psychopy.core import getTime
+from psychopy.constants import FINISHED, NOT_STARTED, PAUSED, PLAYING, STOPPED
+from psychopy.tools.filetools import pathToString
+from ._base import BaseMoviePlayer
+from ..metadata import MovieMetadata, NULL_MOVIE_METADATA
+from ..frame import MovieFrame, NULL_MOVIE_FRAME_INFO
+from ..framestore import getFrameStore
+
+
+class PreDecodedPlayer(BaseMoviePlayer):
+    """Player for `MovieStim` which decodes all the frames of a clip when it's
+    loaded, see :class:`~psychopy.visual.movies.framestore.MovieFrameStore`.
+
+    Each time a frame is requested, the player shows the frame for the time
+    since playback started, so frames are never late because of decoding and
+    seeking goes exactly to the requested frame. Clips are only decoded once
+    however many times (or stimuli) they are played by. Movies are played
+    without sound.
+
+    Options for the frame store (`size` and `cacheDir`) are taken from the
+    `preload` argument of the parent `MovieStim`.
+
+    """
+    _movieLib = 'predecoded'
+
+    def __init__(self, parent):
+        self._filename = u""
+
+        self.parent = parent
+
+        self._store = None
+        self._storeOpts = {}
+        if isinstance(getattr(self.parent, '_preload', None), dict):
+            self._storeOpts.update(self.parent._preload)
+        # frames are stored in the format the parent uploads
+        if getattr(self.parent, '_useYUV', False):
+            self._storeOpts['colorFormat'] = 'yuv420p'
+        else:
+            self._storeOpts['colorFormat'] = 'rgb8'
+
+        self._lastFrame = NULL_MOVIE_FRAME_INFO
+        self._metadata = NULL_MOVIE_METADATA
+        self._loopCount = 0
+
+        # movie time is `getTime() - self._startTime` while playing, and
+        # `self._movieTime` otherwise
+        self._startTime = 0.0
+        self._movieTime = 0.0
+
+        # status flags
+        self._status = NOT_STARTED
+
+    def start(self, log=True):
+        """Get ready to play the movie from the start.
+        """
+        self._assertMediaPlayer()
+
+        self._lastFrame = NULL_MOVIE_FRAME_INFO
+        self._loopCount = 0
+        self._movieTime = 0.0
+        self._status = NOT_STARTED
+
+    def load(self, pathToMovie):
+        """Load a movie file from disk, decoding all its frames unless they
+        were decoded before.
+
+        Parameters
+        ----------
+        pathToMovie : str
+            Path to movie file. Must be a format that FFMPEG supports.
+
+        """
+        self._filename = pathToString(pathToMovie)
+        self._store = getFrameStore(self._filename, **self._storeOpts)
+        self._metadata = MovieMetadata(
+            mediaPath=self._filename,
+            duration=self._store.duration,
+            frameRate=self._store.frameRate,
+            size=self._store.size,
+            pixelFormat=self._store.colorFormat,
+            movieLib=self._movieLib,
+            userData=None)
+
+        self.start()
+
+    def unload(self):
+        """Unload the movie. The decoded frames are kept for playing it again,
+        see :func:`~psychopy.visual.movies.framestore.clearFrameStores`.
+        """
+        self._store = None
+        self._filename = u""
+        self._metadata = NULL_MOVIE_METADATA
+        self._lastFrame = NULL_MOVIE_FRAME_INFO
+
+    @property
+    def isLoaded(self):
+        return self._store is not None
+
+    @property
+    def metadata(self):
+        """Most recent metadata (`MovieMetadata`).
+        """
+        return self.getMetadata()
+
+    def getMetadata(self):
+        """Get metadata from the movie stream.
+
+        Returns
+        -------
+        MovieMetadata
+            Movie metadata object. If no movie is loaded, `NULL_MOVIE_METADATA`
+            is returned.
+
+        """
+        return self._metadata
+
+    def _assertMediaPlayer(self):
+        """Ensure a movie is loaded. Raises a `RuntimeError` if not.
+        """
+        if self._store is not None:
+            return
+
+        raise RuntimeError(
+            "Calling this class method requires a successful call to "
+            "`load` first.")
+
+    @property
+    def status(self):
+        """Player status flag (`int`).
+        """
+        return self._status
+
+    @property
+    def isPlaying(self):
+        """`True` if the video is presently playing (`bool`)."""
+        return self.status == PLAYING
+
+    @property
+    def isNotStarted(self):
+        """`True` if the video has not be started yet (`bool`). This status is
+        given after a video is loaded and play has yet to be called.
+        """
+        return self.status == NOT_STARTED
+
+    @property
+    def isStopped(self):
+        """`True` if the movie has been stopped.
+        """
+        return self.status == STOPPED
+
+    @property
+    def isPaused(self):
+        """`True` if the movie has been paused.
+        """
+        return self.status == PAUSED
+
+    @property
+    def isFinished(self):
+        """`True` if the video is finished (`bool`).
+        """
+        return self.status == FINISHED
+
+    def _getMovieTime(self):
+        """Time in the movie now, which may be past its end (`float`)."""
+        if self._status == PLAYING:
+            return getTime() - self._startTime
+
+        return self._movieTime
+
+    def _setMovieTime(self, movieTime):
+        movieTime = min(max(movieTime, 0.0), self._store.duration)
+        self._movieTime = movieTime
+        self._startTime = getTime() - movieTime
+
+    def play(self, log=False):
+        """Start or continue a paused movie from current position. A finished
+        or stopped movie is played from the beginning.
+
+        Parameters
+        ----------
+        log : bool
+            Log the play event.
+
+        Returns
+        -------
+        int
+            Frame index playback started at.
+
+        """
+        self._assertMediaPlayer()
+
+        if self._status == PLAYING:
+            return self.frameIndex
+
+        if self._status in (FINISHED, STOPPED):
+            self._loopCount = 0
+            self._movieTime = 0.0
+        self._setMovieTime(self._movieTime)
+        self._status = PLAYING
+
+        if log:
+            logging.exp("Movie {} playing from {:.3f} s".format(
+                self._filename, self._movieTime))
+
+        return self._store.frameIndexFromMovieTime(self._movieTime)
+
+    def stop(self, log=False):
+        """Stop the movie. Calling `play()` afterwards plays it from the
+        beginning.
+
+        Parameters
+        ----------
+        log : bool
+            Log the stop event.
+
+        """
+        self._status = STOPPED
+        self._movieTime = 0.0
+
+    def pause(self, log=False):
+        """Pause the current point in the movie. The image of the last frame
+        will persist on-screen until `play()` or `stop()` are called.
+
+        Parameters
+        ----------
+        log : bool
+            Log this event.
+
+        """
+        self._assertMediaPlayer()
+
+        if self._status == PLAYING:
+            self._setMovieTime(self._getMovieTime())
+            self._status = PAUSED
+
+        return False
+
+    def seek(self, timestamp, log=False):
+        """Seek to the frame shown at a time in the movie. Seeking is exact,
+        the frame is shown at the next draw whether or not the movie is playing.
+
+        Parameters
+        ----------
+        timestamp : float
+            Time in seconds.
+        log : bool
+            Log the seek event.
+
+        """
+        self._assertMediaPlayer()
+
+        self._setMovieTime(timestamp)
+        if self._status == FINISHED:
+            self._status = PAUSED
+
+        return self._movieTime
+
+    def rewind(self, seconds=5, log=False):
+        """Rewind the video.
+
+        Parameters
+        ----------
+        seconds : float
+            Time in seconds to rewind from the current position. Default is 5
+            seconds.
+        log : bool
+            Log this event.
+
+        Returns
+        -------
+        float
+            Timestamp after rewinding the video.
+
+        """
+        return self.seek(self.pts - seconds, log=log)
+
+    def fastForward(self, seconds=5, log=False):
+        """Fast-forward the video.
+
+        Parameters
+        ----------
+        seconds : float
+            Time in seconds to fast forward from the current position. Default
+            is 5 seconds.
+        log : bool
+            Log this event.
+
+        Returns
+        -------
+        float
+            Timestamp after fast forwarding the video.
+
+        """
+        return self.seek(self.pts + seconds, log=log)
+
+    def replay(self, autoStart=False, log=False):
+        """Replay the movie from the beginning.
+
+        Parameters
+        ----------
+        autoStart : bool
+            Start playback immediately. If `False`, you must call `play()`
+            afterwards to initiate playback.
+        log : bool
+            Log this event.
+
+        """
+        self._assertMediaPlayer()
+
+        self.start(log=log)
+        if autoStart:
+            self.play(log=log)
+
+    # --------------------------------------------------------------------------
+    # Audio stream control methods
+    #
+    # Movies are played without sound.
+    #
+
+    @property
+    def muted(self):
+        """`True` if the audio is muted, which it always is (`bool`).
+        """
+        return True
+
+    @muted.setter
+    def muted(self, value):
+        pass
+
+    def volumeUp(self, amount):
+        """Does nothing, movies are played without sound."""
+        return self.volume
+
+    def volumeDown(self, amount):
+        """Does nothing, movies are played without sound."""
+        return self.volume
+
+    @property
+    def volume(self):
+        """Volume for the audio track, always `0.0` (`float`)."""
+        return 0.0
+
+    @volume.setter
+    def volume(self, value):
+        pass
+
+    @property
+    def loopCount(self):
+        """Number of loops completed since playback started (`int`).
+        """
+        return self._loopCount
+
+    # --------------------------------------------------------------------------
+    # Timing related methods
+    #
+
+    @property
+    def pts(self):
+        """Presentation timestamp for the current movie frame in seconds
+        (`float`). A value of `-1.0` is invalid.
+        """
+        if self._store is None or self._lastFrame is NULL_MOVIE_FRAME_INFO:
+            return -1.0
+
+        return self._lastFrame.absTime
+
+    def movieTimeFromFrameIndex(self, frameIdx):
+        """Get the movie time a frame with a given index is presented at.
+
+        Parameters
+        ----------
+        frameIdx : int
+            Frame index.
+
+        """
+        self._assertMediaPlayer()
+
+        return self._store.movieTimeFromFrameIndex(frameIdx)
+
+    def frameIndexFromMovieTime(self, movieTime):
+        """Get the frame index of a given movie time.
+
+        Parameters
+        ----------
+        movieTime : float
+            Timestamp in movie time to convert to a frame index.
+
+        Returns
+        -------
+        int
+            Frame index that should be presented at the specified movie time.
+
+        """
+        self._assertMediaPlayer()
+
+        return self._store.frameIndexFromMovieTime(movieTime)
+
+    @property
+    def isSeekable(self):
+        """Is seeking allowed for the video stream (`bool`)? Always `True`.
+        """
+        return True
+
+    @property
+    def frameInterval(self):
+        """Duration a single frame is to be presented in seconds (`float`).
+        """
+        return self.metadata.frameInterval
+
+    @property
+    def frameIndex(self):
+        """Current frame index (`int`). A value of `-1` means no frame has been
+        shown yet.
+        """
+        return self._lastFrame.frameIndex
+
+    def getPercentageComplete(self):
+        """Provides a value between 0.0 and 100.0, indicating the amount of the
+        movie that has been already played (`float`).
+        """
+        return (max(self.pts, 0.0) / self.metadata.duration) * 100.0
+
+    # --------------------------------------------------------------------------
+    # Methods for getting video frames
+    #
+
+    def getMovieFrame(self):
+        """Get the movie frame scheduled to be displayed at the current time.
+
+        A new `MovieFrame` is only made when the frame to show changes, so
+        `MovieStim` doesn't upload the same frame again.
+
+        Returns
+        -------
+        `~psychopy.visual.movies.frame.MovieFrame`
+            Current movie frame.
+
+        """
+        self._assertMediaPlayer()
+
+        store = self._store
+        frameIndex = store.frameIndexFromMovieTime(self._getMovieTime())
+        if frameIndex >= store.nFrames:
+            if self.parent.loop:
+                nLoops, frameIndex = divmod(frameIndex, store.nFrames)
+                self._loopCount += nLoops
+                self._startTime += nLoops * store.duration
+            else:
+                frameIndex = store.nFrames - 1
+                self._movieTime = store.duration
+                self._status = FINISHED
+
+        if frameIndex != self._lastFrame.frameIndex:
+            self._lastFrame = MovieFrame(
+                frameIndex=frameIndex,
+                absTime=store.movieTimeFromFrameIndex(frameIndex),
+                displayTime=store.frameInterval,
+                size=store.size,
+                colorFormat=store.colorFormat,
+                colorData=store.getFrameData(frameIndex),
+                audioChannels=0,
+                audioSamples=None,
+                metadata=self._metadata,
+                movieLib=self._movieLib,
+                userData=None)
+
+        return self._lastFrame
+
+
+if __name__ == "__main__":
+    pass
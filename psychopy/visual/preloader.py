@@ -0,0 +1,278 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Decode image files in the background, ready for ImageStim to show without
+stalling the frame loop."""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = ['ImagePreloader']
+
+import ctypes
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from PIL import Image
+
+# Ensure setting pyglet.options['debug_gl'] to False is done prior to any
+# other calls to pyglet or pyglet submodules, otherwise it may not get picked
+# up by the pyglet GL engine and have no effect.
+import pyglet
+pyglet.options['debug_gl'] = False
+GL = pyglet.gl
+
+from psychopy import logging
+from psychopy.visual.basevisual import (_imageToIntensity, _makeTextureData,
+                                        _uploadTexture)
+from psychopy.visual.helpers import findImageFile
+
+# texture parameters used by ImageStim for images
+_pixFormat = GL.GL_RGB
+_dataType = GL.GL_UNSIGNED_BYTE
+_forcePOW2 = False
+_wrapping = False
+
+
+def _decodeImage(filename, glVendor=''):
+    """Load an image file and convert it to texture data, as ImageStim would.
+
+    Runs in the worker threads (or processes) of an :class:`ImagePreloader`.
+    """
+    with Image.open(filename) as im:
+        im = im.transpose(Image.FLIP_TOP_BOTTOM)
+    intensity, wasLum, dataType = _imageToIntensity(
+        im, _pixFormat, _dataType, _forcePOW2, name=filename)
+    data, internalFormat, pixFormat, dataType = _makeTextureData(
+        intensity, wasLum, True, _pixFormat, dataType, glVendor=glVendor)
+
+    return data, internalFormat, pixFormat, dataType, wasLum, im.size
+
+
+class ImagePreloader:
+    """Decode upcoming images in the background and upload them when needed.
+
+    Builder's static periods can load an image during an ISI, but decoding
+    still happens on the main thread, and rapid streams of images have no ISI
+    to hide it in. An `ImagePreloader` decodes and converts image files in a
+    pool of worker threads (or processes). On the render thread the ready
+    buffers are uploaded in one step into the window's texture cache (see
+    :mod:`~psychopy.visual.texturecache`), so that setting the image of an
+    :class:`~psychopy.visual.ImageStim` to one of the files then needs no
+    decoding or upload at all.
+
+    Call :meth:`update` once per frame (or whenever convenient) to upload any
+    images that have been decoded, and use :meth:`setImage` to set the image
+    of a stimulus, which waits for the image if it isn't ready yet.
+
+    Uploaded images stay in the texture cache until they are evicted, so
+    preload only as far ahead as fits in the cache's budget
+    (`win.textureCache.maxBytes`).
+
+    Parameters
+    ----------
+    win : :class:`~psychopy.visual.Window`
+        Window the images will be shown in.
+    images : list or None
+        Image files to start decoding, or a conditions list (e.g. from
+        :func:`~psychopy.data.importConditions`) holding the files in column
+        `key`.
+    key : str
+        Column of conditions holding the image files.
+    interpolate : bool
+        Must match `interpolate` of the stimuli showing the images, otherwise
+        they can't use the preloaded textures.
+    nWorkers : int or None
+        Number of workers decoding images. `None` lets
+        :mod:`concurrent.futures` decide.
+    useProcesses : bool
+        Decode in worker processes rather than threads. Image decoding
+        mostly releases the GIL, so threads are usually enough and avoid
+        copying the decoded images between processes.
+    usePBO : bool
+        Upload through a pixel buffer object, letting the driver transfer the
+        data to the graphics card asynchronously.
+
+    Examples
+    --------
+    Show a rapid stream of images without dropping frames::
+
+        conditions = data.importConditions('rsvp.csv')
+        preloader = visual.ImagePreloader(win, conditions, key='image')
+        stim = visual.ImageStim(win)
+        for trial in conditions:
+            preloader.setImage(stim, trial['image'])
+            for frameN in range(6):
+                stim.draw()
+                win.flip()
+                preloader.update(maxUploads=1)
+
+    """
+    def __init__(self, win, images=None, key='image', interpolate=False,
+                 nWorkers=None, useProcesses=False, usePBO=False):
+        self.win = win
+        self.key = key
+        self.interpolate = interpolate
+        self.usePBO = usePBO
+        if useProcesses:
+            self._pool = ProcessPoolExecutor(nWorkers)
+        else:
+            self._pool = ThreadPoolExecutor(
+                nWorkers, thread_name_prefix='ImagePreloader')
+        self._pending = OrderedDict()  # cache key -> future
+        self._pixelBuffer = None
+        if images is not None:
+            self.preload(images)
+
+    def __del__(self):
+        # no GL calls during garbage collection, the buffer is deleted by the
+        # window on its next flip when the context is current
+        try:
+            self._stopDecoding()
+            if self._pixelBuffer is not None:
+                self.win.callOnFlip(
+                    GL.glDeleteBuffers, 1, self._pixelBuffer)
+                self._pixelBuffer = None
+        except Exception:
+            pass
+
+    @property
+    def nPending(self):
+        """Number of images still to be uploaded."""
+        return len(self._pending)
+
+    def _getKey(self, image, interpolate=None):
+        """Key of an image in the texture cache, or `None` if not a file."""
+        if not isinstance(image, (str, Path)):
+            return None
+        filename = findImageFile(image, checkResources=True)
+        if not filename:
+            return None
+        if interpolate is None:
+            interpolate = self.interpolate
+        return self.win.textureCache.getKey(
+            filename, _pixFormat, _dataType, _forcePOW2, bool(interpolate),
+            _wrapping)
+
+    def preload(self, images):
+        """Start decoding images.
+
+        Parameters
+        ----------
+        images : str, Path or list
+            An image file, a list of them, or a conditions list holding them
+            in column `key`.
+
+        """
+        if isinstance(images, (str, Path, dict)):
+            images = [images]
+        for image in images:
+            if isinstance(image, dict):
+                image = image.get(self.key)
+            key = self._getKey(image)
+            if key is None:
+                if image not in (None, '', 'None', 'none'):
+                    logging.warning(
+                        "ImagePreloader couldn't find image {}".format(image))
+                continue
+            if key in self._pending or key in self.win.textureCache:
+                continue
+            self._pending[key] = self._pool.submit(
+                _decodeImage, key[0], self.win.glVendor)
+
+    def isReady(self, image):
+        """`True` if the image has been uploaded and can be shown at once."""
+        return self._getKey(image) in self.win.textureCache
+
+    def update(self, maxUploads=None):
+        """Upload images which have finished decoding.
+
+        Must be called from the thread that draws to the window.
+
+        Parameters
+        ----------
+        maxUploads : int or None
+            Upload at most this many images, to limit the time spent.
+
+        Returns
+        -------
+        int
+            Number of images uploaded.
+
+        """
+        nUploaded = 0
+        for key, future in list(self._pending.items()):
+            if maxUploads is not None and nUploaded >= maxUploads:
+                break
+            if future.done():
+                self._upload(key)
+                nUploaded += 1
+
+        return nUploaded
+
+    def wait(self, timeout=None):
+        """Wait for all pending images to be decoded, then upload them."""
+        wait(list(self._pending.values()), timeout=timeout)
+        self.update()
+
+    def _upload(self, key):
+        """Upload a decoded image into the window's texture cache."""
+        future = self._pending.pop(key)
+        try:
+            data, internalFormat, pixFormat, dataType, wasLum, origSize = \
+                future.result()
+        except Exception as err:
+            logging.error("ImagePreloader failed to load {}: {}".format(
+                key[0], err))
+            return
+        if key in self.win.textureCache:
+            return  # a stimulus loaded the image while it was being decoded
+
+        if self.usePBO and self._pixelBuffer is None:
+            self._pixelBuffer = GL.GLuint()
+            GL.glGenBuffers(1, ctypes.byref(self._pixelBuffer))
+        texID = GL.GLuint()
+        GL.glGenTextures(1, ctypes.byref(texID))
+        _uploadTexture(texID, data, internalFormat, pixFormat, dataType,
+                       self.interpolate, _wrapping,
+                       pixelBuffer=self._pixelBuffer)
+        # mipmaps add a third to the size of the texture
+        nBytes = data.nbytes * 4 // 3 if self.interpolate else data.nbytes
+        self.win.textureCache.add(key, texID, nBytes, wasLum, origSize)
+
+    def setImage(self, stim, image, log=None):
+        """Set the image of a stimulus, using the preloaded texture.
+
+        If the image is still being decoded this waits for it, and images
+        which weren't preloaded are loaded as usual.
+
+        Parameters
+        ----------
+        stim : :class:`~psychopy.visual.ImageStim`
+            The stimulus.
+        image : str, Path or Any
+            The image, as for `ImageStim.image`.
+        log : bool or None
+            Whether to log the change.
+
+        """
+        key = self._getKey(image, interpolate=stim.interpolate)
+        if key in self._pending:
+            self._upload(key)
+        stim.setImage(image, log=log)
+
+    def _stopDecoding(self):
+        """Cancel pending images and shut down the worker pool."""
+        for future in self._pending.values():
+            future.cancel()
+        self._pending.clear()
+        self._pool.shutdown(wait=False)
+
+    def close(self):
+        """Stop decoding images and delete the pixel buffer."""
+        self._stopDecoding()
+        if self._pixelBuffer is not None:
+            GL.glDeleteBuffers(1, self._pixelBuffer)
+            self._pixelBuffer = None
@@ -0,0 +1,425 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Per-stimulus draw-time profiling for windows.
+
+The profiler is opt-in. When enabled on a window (see
+:py:attr:`~psychopy.visual.Window.profileDraws`) the `draw()` method of every
+stimulus class derived from `MinimalStim` is wrapped so that the CPU time
+spent issuing its drawing commands (and, where the driver supports timer
+queries, the GPU time spent executing them) is recorded. Results are collected
+per frame by :py:meth:`~psychopy.visual.Window.flip` and can be summarised or
+exported for viewing as a flame chart.
+
+Examples
+--------
+Profile the stimuli drawn during a trial routine::
+
+    win.profileDraws = True
+    win.drawProfiler.routine = 'trial'
+    for frameN in range(120):
+        grating.draw()
+        fixation.draw()
+        win.flip()
+    win.profileDraws = False
+
+    win.drawProfiler.saveCSV('drawTimes.csv')
+    win.drawProfiler.saveTrace('drawTimes.json')  # open in chrome://tracing
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'DrawProfiler',
+    'instrumentStimClasses',
+    'restoreStimClasses'
+]
+
+import csv
+import json
+import time
+import functools
+from collections import OrderedDict
+
+# number of profilers currently enabled, draw methods are only wrapped while
+# this is non-zero
+_nActiveProfilers = 0
+# classes whose `draw` method has been replaced, mapped to the original
+_instrumented = {}
+
+# names of the fields stored for each profiled draw call
+eventFields = ('frame', 'routine', 'name', 'className', 'depth', 'parent',
+               'start', 'cpu', 'gpu')
+
+
+def _profiledDraw(drawFunc):
+    """Wrap a `draw` method so its calls are recorded by the profiler attached
+    to the stimulus' window (if any).
+    """
+    @functools.wraps(drawFunc)
+    def draw(self, *args, **kwargs):
+        profiler = getattr(getattr(self, 'win', None), '_drawProfiler', None)
+        if profiler is None or not profiler.enabled:
+            return drawFunc(self, *args, **kwargs)
+        return profiler._profileDraw(self, drawFunc, args, kwargs)
+
+    draw._profilerOriginal = drawFunc
+    return draw
+
+
+def _instrumentClass(cls):
+    """Wrap the `draw` method defined by `cls` itself (not inherited)."""
+    drawFunc = cls.__dict__.get('draw', None)
+    if drawFunc is None or not callable(drawFunc) or cls in _instrumented:
+        return
+    if hasattr(drawFunc, '_profilerOriginal'):  # already wrapped
+        return
+    _instrumented[cls] = drawFunc
+    setattr(cls, 'draw', _profiledDraw(drawFunc))
+
+
+def _iterSubclasses(cls):
+    """Yield all (direct and indirect) subclasses of `cls`."""
+    seen = set()
+    toVisit = list(cls.__subclasses__())
+    while toVisit:
+        subclass = toVisit.pop()
+        if subclass in seen:
+            continue
+        seen.add(subclass)
+        yield subclass
+        toVisit.extend(subclass.__subclasses__())
+
+
+def instrumentStimClasses():
+    """Wrap the `draw` method of all stimulus classes so they can be profiled.
+
+    Classes defined (or lazily imported) after this is called are wrapped when
+    they are created. Calls are counted, the wrappers are only removed once
+    :func:`restoreStimClasses` has been called as many times as this function.
+
+    """
+    global _nActiveProfilers
+    from psychopy.visual.basevisual import MinimalStim
+    _nActiveProfilers += 1
+    for cls in _iterSubclasses(MinimalStim):
+        _instrumentClass(cls)
+
+
+def restoreStimClasses():
+    """Remove the wrappers installed by :func:`instrumentStimClasses` when no
+    profiler needs them anymore.
+    """
+    global _nActiveProfilers
+    _nActiveProfilers = max(0, _nActiveProfilers - 1)
+    if _nActiveProfilers:
+        return
+    for cls, drawFunc in _instrumented.items():
+        setattr(cls, 'draw', drawFunc)
+    _instrumented.clear()
+
+
+def _onNewStimClass(cls):
+    """Called by `MinimalStim.__init_subclass__` for every new stimulus class.
+    """
+    if _nActiveProfilers:
+        _instrumentClass(cls)
+
+
+def _haveTimerQuery():
+    """Check whether the current GL context supports timer queries."""
+    try:
+        import pyglet.gl as GL
+        return bool(GL.gl_info.have_extension('GL_ARB_timer_query') or
+                    GL.gl_info.have_version(3, 3))
+    except Exception:
+        return False
+
+
+class DrawProfiler:
+    """Record time spent drawing each stimulus, frame by frame.
+
+    You would not normally create this yourself, set
+    :py:attr:`~psychopy.visual.Window.profileDraws` to `True` and use
+    :py:attr:`~psychopy.visual.Window.drawProfiler` instead.
+
+    Parameters
+    ----------
+    gpuTiming : bool
+        Also measure the time the GPU spends executing the commands of each
+        top-level draw using `GL_TIME_ELAPSED` query objects. Ignored if the
+        driver does not support timer queries. Timer queries can't be nested,
+        so stimuli drawn by other stimuli (eg. the items of a `Form`) only get
+        GPU times attributed to their parent.
+    maxFrames : int or None
+        Keep at most this many frames of data, older frames are discarded.
+        `None` keeps everything.
+
+    """
+    def __init__(self, gpuTiming=True, maxFrames=None):
+        self.gpuTiming = gpuTiming
+        self.maxFrames = maxFrames
+        self.routine = ''
+        self._enabled = False
+        self._haveGPUTiming = None  # checked on the first profiled draw
+        self._queryPool = []
+        self._pendingQueries = []
+        self._stack = []
+        self._t0 = time.perf_counter()
+        self.clear()
+
+    @property
+    def enabled(self):
+        """`True` if draw calls are currently being recorded."""
+        return self._enabled
+
+    @enabled.setter
+    def enabled(self, value):
+        value = bool(value)
+        if value == self._enabled:
+            return
+        self._enabled = value
+        if value:
+            instrumentStimClasses()
+        else:
+            restoreStimClasses()
+
+    @property
+    def routine(self):
+        """Label (`str`) attached to subsequent draw calls, normally the name
+        of the Builder routine currently running. Used to group the report.
+        """
+        return self._routine
+
+    @routine.setter
+    def routine(self, value):
+        self._routine = '' if value is None else str(value)
+
+    @property
+    def haveGPUTiming(self):
+        """`True` if GPU times are being recorded (`None` until the first
+        profiled draw)."""
+        return self._haveGPUTiming
+
+    def clear(self):
+        """Discard all recorded data."""
+        self.events = []  # completed frames, one tuple per draw call
+        self.frames = []  # (frameIndex, flipTime, nDraws, cpuTotal) per frame
+        self._frameEvents = []
+        self._frameIndex = 0
+
+    def _profileDraw(self, stim, drawFunc, args, kwargs):
+        """Call `drawFunc` and record how long it took."""
+        stack = self._stack
+        if stack and stack[-1] is stim:
+            # base class draw called from the subclass through super()
+            return drawFunc(stim, *args, **kwargs)
+
+        if self._haveGPUTiming is None:
+            self._haveGPUTiming = self.gpuTiming and _haveTimerQuery()
+
+        depth = len(stack)
+        parent = getattr(stack[-1], 'name', '') if stack else ''
+        query = None
+        if depth == 0 and self._haveGPUTiming:
+            query = self._beginGPUQuery()
+
+        stack.append(stim)
+        t0 = time.perf_counter()
+        try:
+            return drawFunc(stim, *args, **kwargs)
+        finally:
+            t1 = time.perf_counter()
+            stack.pop()
+            if query is not None:
+                self._endGPUQuery(query, len(self._frameEvents))
+            self._frameEvents.append([
+                self._frameIndex, self._routine,
+                getattr(stim, 'name', ''), stim.__class__.__name__,
+                depth, parent, t0 - self._t0, t1 - t0, None])
+
+    def _beginGPUQuery(self):
+        from psychopy.tools import gltools
+        if self._queryPool:
+            query = self._queryPool.pop()
+        else:
+            query = gltools.createQueryObject()
+        gltools.beginQuery(query)
+        return query
+
+    def _endGPUQuery(self, query, eventIndex):
+        from psychopy.tools import gltools
+        gltools.endQuery(query)
+        self._pendingQueries.append((eventIndex, query))
+
+    def _endFrame(self, flipTime=None):
+        """Finish the current frame. Called by `Window.flip()` after the
+        buffers have been swapped, this is where the GPU query results are
+        collected (which may block until the GPU is done).
+        """
+        if self._pendingQueries:
+            from psychopy.tools import gltools
+            for eventIndex, query in self._pendingQueries:
+                self._frameEvents[eventIndex][-1] = \
+                    gltools.getQuery(query) * 1e-9
+                self._queryPool.append(query)
+            self._pendingQueries = []
+
+        cpuTotal = sum(ev[7] for ev in self._frameEvents if ev[4] == 0)
+        self.frames.append(
+            (self._frameIndex, flipTime, len(self._frameEvents), cpuTotal))
+        self.events.extend(tuple(ev) for ev in self._frameEvents)
+        self._frameEvents = []
+        self._frameIndex += 1
+
+        if self.maxFrames is not None and len(self.frames) > self.maxFrames:
+            firstFrame = self.frames[-self.maxFrames][0]
+            del self.frames[:-self.maxFrames]
+            iFirst = 0
+            while iFirst < len(self.events) and \
+                    self.events[iFirst][0] < firstFrame:
+                iFirst += 1
+            del self.events[:iFirst]
+
+    def getReport(self, groupBy=('routine', 'name')):
+        """Summarise the recorded draw times.
+
+        Parameters
+        ----------
+        groupBy : list or tuple of str
+            Event fields used to group draw calls. By default draws are grouped
+            per stimulus within each routine. Use `('routine',)` to get the
+            time spent per routine.
+
+        Returns
+        -------
+        list of dict
+            One entry per group, sorted by total CPU time (largest first). Times
+            are in milliseconds, GPU fields are `None` if no GPU times were
+            recorded for the group.
+
+        """
+        for field in groupBy:
+            if field not in eventFields:
+                raise ValueError(
+                    "Unknown field '{}', must be one of {}".format(
+                        field, eventFields))
+        indices = [eventFields.index(field) for field in groupBy]
+        groups = OrderedDict()
+        for ev in self.events:
+            if 'name' not in groupBy and ev[4] > 0:
+                continue  # avoid counting nested draws twice
+            key = tuple(ev[i] for i in indices)
+            groups.setdefault(key, []).append(ev)
+
+        report = []
+        for key, evs in groups.items():
+            cpu = [ev[7] for ev in evs]
+            gpu = [ev[8] for ev in evs if ev[8] is not None]
+            row = OrderedDict(zip(groupBy, key))
+            if 'name' in groupBy:
+                row['className'] = evs[0][3]
+            row['nDraws'] = len(evs)
+            row['nFrames'] = len(set(ev[0] for ev in evs))
+            row['cpuTotal'] = sum(cpu) * 1000.0
+            row['cpuMean'] = row['cpuTotal'] / len(cpu)
+            row['cpuMax'] = max(cpu) * 1000.0
+            row['gpuMean'] = sum(gpu) * 1000.0 / len(gpu) if gpu else None
+            row['gpuMax'] = max(gpu) * 1000.0 if gpu else None
+            report.append(row)
+        report.sort(key=lambda row: row['cpuTotal'], reverse=True)
+
+        return report
+
+    def saveCSV(self, fileName, groupBy=('routine', 'name')):
+        """Save the report returned by :py:meth:`getReport` as a CSV file."""
+        report = self.getReport(groupBy=groupBy)
+        fieldNames = list(report[0].keys()) if report else list(groupBy)
+        with open(fileName, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=fieldNames)
+            writer.writeheader()
+            writer.writerows(report)
+
+    def saveJSON(self, fileName, groupBy=('routine', 'name'), events=False):
+        """Save the report as JSON.
+
+        Parameters
+        ----------
+        fileName : str
+            File to write.
+        groupBy : list or tuple of str
+            Passed to :py:meth:`getReport`.
+        events : bool
+            Also store every individual draw call and the per-frame totals.
+
+        """
+        data = {'report': self.getReport(groupBy=groupBy)}
+        if events:
+            data['fields'] = eventFields
+            data['events'] = self.events
+            data['frames'] = self.frames
+        with open(fileName, 'w') as f:
+            json.dump(data, f, indent=1)
+
+    def getTrace(self):
+        """Get the recorded draw calls in the Trace Event Format.
+
+        The result can be viewed as a flame chart in `chrome://tracing`,
+        Perfetto or speedscope. Each routine is shown as its own thread, nested
+        draws are shown below the stimulus that drew them.
+
+        Returns
+        -------
+        dict
+
+        """
+        routines = []
+        traceEvents = []
+        for ev in self.events:
+            frame, routine, name, className, depth, parent, start, cpu, gpu = ev
+            if routine not in routines:
+                routines.append(routine)
+                traceEvents.append({
+                    'name': 'thread_name', 'ph': 'M', 'pid': 1,
+                    'tid': routines.index(routine),
+                    'args': {'name': routine or 'default'}})
+            args = {'frame': frame, 'className': className}
+            if gpu is not None:
+                args['gpu_ms'] = gpu * 1000.0
+            traceEvents.append({
+                'name': name, 'cat': className, 'ph': 'X', 'pid': 1,
+                'tid': routines.index(routine),
+                'ts': start * 1e6, 'dur': cpu * 1e6, 'args': args})
+
+        return {'traceEvents': traceEvents, 'displayTimeUnit': 'ms'}
+
+    def saveTrace(self, fileName):
+        """Save the draw calls as a JSON trace file (see :py:meth:`getTrace`).
+        """
+        with open(fileName, 'w') as f:
+            json.dump(self.getTrace(), f)
+
+    def saveFoldedStacks(self, fileName):
+        """Save draw times in the 'folded stacks' format used by
+        `flamegraph.pl` and speedscope, one line per call path with the
+        exclusive time in microseconds.
+        """
+        totals = OrderedDict()
+        path = []
+        # visit calls in the order they started so parents precede children
+        for ev in sorted(self.events, key=lambda ev: (ev[6], ev[4])):
+            routine, name, depth, cpu = ev[1], ev[2], ev[4], ev[7]
+            del path[depth:]
+            path.append(name)
+            key = ';'.join([routine or 'default'] + path)
+            totals[key] = totals.get(key, 0.0) + cpu
+            if depth > 0:  # exclude time spent in children from the parent
+                parentKey = key.rsplit(';', 1)[0]
+                totals[parentKey] = totals.get(parentKey, 0.0) - cpu
+
+        with open(fileName, 'w') as f:
+            for key, t in totals.items():
+                f.write("{} {}\n".format(key, int(round(max(t, 0.0) * 1e6))))
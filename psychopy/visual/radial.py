@@ -28,6 +28,7 @@ from psychopy import logging
 from psychopy.tools.arraytools import val2array
 from psychopy.tools.attributetools import attributeSetter, setAttribute
 from psychopy.visual.grating import GratingStim
+import psychopy.visual.shaders as _shaders
 
 try:
     from PIL import Image
@@ -397,9 +398,9 @@ class RadialStim(GratingStim):
         prog = self.win._progSignedTexMask1D
         GL.glUseProgram(prog)
         # set the texture to be texture unit 0
-        GL.glUniform1i(GL.glGetUniformLocation(prog, b"texture"), 0)
+        GL.glUniform1i(_shaders.getUniformLocation(prog, b"texture"), 0)
         # mask is texture unit 1
-        GL.glUniform1i(GL.glGetUniformLocation(prog, b"mask"), 1)
+        GL.glUniform1i(_shaders.getUniformLocation(prog, b"mask"), 1)
 
         # set pointers to visible textures
         GL.glClientActiveTexture(GL.GL_TEXTURE0)
@@ -510,9 +511,9 @@ class RadialStim(GratingStim):
         # setup the shaderprogram
         GL.glUseProgram(self.win._progSignedTexMask1D)
         # set the texture to be texture unit 0
-        GL.glUniform1i(GL.glGetUniformLocation(
+        GL.glUniform1i(_shaders.getUniformLocation(
             self.win._progSignedTexMask1D, b"texture"), 0)
-        GL.glUniform1i(GL.glGetUniformLocation(
+        GL.glUniform1i(_shaders.getUniformLocation(
             self.win._progSignedTexMask1D, b"mask"), 1)  # mask is texture unit 1
 
         # set pointers to visible textures
@@ -8,9 +8,22 @@
 """shaders programs for either pyglet or pygame
 """
 
+import os
+import hashlib
 import pyglet.gl as GL
 import psychopy.tools.gltools as gltools
+from psychopy import logging
 from ctypes import c_int, c_char_p, c_char, cast, POINTER, byref
+# cached locations, kept by `gltools` which deletes programs
+from psychopy.tools.gltools import (
+    getUniformLocation, getAttribLocation, forgetProgram)
+
+# Set to `False` to always compile programs from source, rather than using
+# program binaries stored by previous sessions.
+useProgramBinaryCache = True
+
+# `None` until checked in a valid GL context
+_haveProgramBinary = None
 
 
 class Shader:
@@ -67,9 +80,7 @@ class Shader:
         GL.glUseProgram(0)
 
     def setFloat(self, name, value):
-        if type(name) is not bytes:
-            name = bytes(name, 'utf-8')
-        loc = GL.glGetUniformLocation(self.handle, name)
+        loc = getUniformLocation(self.handle, name)
         if not hasattr(value, '__len__'):
             GL.glUniform1f(loc, value)
         elif len(value) in range(1, 5):
@@ -85,9 +96,7 @@ class Shader:
                              .format(name, len(value)))
 
     def setInt(self, name, value):
-        if type(name) is not bytes:
-            name = bytes(name, 'utf-8')
-        loc = GL.glGetUniformLocation(self.handle, name)
+        loc = getUniformLocation(self.handle, name)
         if not hasattr(value, '__len__'):
             GL.glUniform1i(loc, value)
         elif len(value) in range(1, 5):
@@ -103,9 +112,124 @@ class Shader:
                              .format(name, len(value)))
 
 
+def _getProgramCacheDir():
+    from psychopy import prefs
+    return os.path.join(prefs.paths['cache'], 'shaders')
+
+
+def _getProgramKey(vertexSource, fragmentSource):
+    """Hash identifying a program built from the given sources with the current
+    driver. Binaries are only valid for the driver that produced them."""
+    h = hashlib.sha1()
+    for item in (GL.gl_info.get_vendor(), GL.gl_info.get_renderer(),
+                 GL.gl_info.get_version(), vertexSource, fragmentSource):
+        if isinstance(item, (list, tuple)):
+            item = ''.join(item)
+        h.update((item or '').encode('utf-8') + b'\0')
+
+    return h.hexdigest()
+
+
+def haveProgramBinary():
+    """Check whether the driver can save and load program binaries
+    (`GL_ARB_get_program_binary`). Requires a current GL context."""
+    global _haveProgramBinary
+    if _haveProgramBinary is None:
+        try:
+            supported = (GL.gl_info.have_extension('GL_ARB_get_program_binary')
+                         or GL.gl_info.have_version(4, 1))
+            if supported:
+                nFormats = GL.GLint(0)
+                GL.glGetIntegerv(GL.GL_NUM_PROGRAM_BINARY_FORMATS,
+                                 byref(nFormats))
+                supported = nFormats.value > 0
+        except Exception:
+            supported = False
+        _haveProgramBinary = bool(supported)
+
+    return _haveProgramBinary
+
+
+def _loadProgramBinary(key):
+    """Create a program from a cached binary, returns `None` if there isn't a
+    usable one."""
+    fileName = os.path.join(_getProgramCacheDir(), key + '.bin')
+    if not os.path.isfile(fileName):
+        return None
+    try:
+        with open(fileName, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return None
+
+    binaryFormat = int.from_bytes(data[:4], 'little')
+    binary = data[4:]
+    program = GL.glCreateProgram()
+    GL.glProgramBinary(program, binaryFormat,
+                       (GL.GLubyte * len(binary)).from_buffer_copy(binary),
+                       len(binary))
+    status = GL.GLint()
+    GL.glGetProgramiv(program, GL.GL_LINK_STATUS, byref(status))
+    if not status.value:
+        # rejected, eg. after a driver update, it gets rebuilt from source
+        GL.glDeleteProgram(program)
+        forgetProgram(program)
+        try:
+            os.remove(fileName)
+        except OSError:
+            pass
+        return None
+
+    return program
+
+
+def _saveProgramBinary(program, key):
+    """Store the binary of a linked program for future sessions."""
+    length = GL.GLint(0)
+    GL.glGetProgramiv(program, GL.GL_PROGRAM_BINARY_LENGTH, byref(length))
+    if length.value <= 0:
+        return
+    binary = (GL.GLubyte * length.value)()
+    binaryFormat = GL.GLenum(0)
+    nWritten = GL.GLsizei(0)
+    GL.glGetProgramBinary(program, length.value, byref(nWritten),
+                          byref(binaryFormat), binary)
+
+    cacheDir = _getProgramCacheDir()
+    fileName = os.path.join(cacheDir, key + '.bin')
+    try:
+        os.makedirs(cacheDir, exist_ok=True)
+        tmpFileName = fileName + '.%d.tmp' % os.getpid()
+        with open(tmpFileName, 'wb') as f:
+            f.write(int(binaryFormat.value).to_bytes(4, 'little'))
+            f.write(bytes(binary)[:nWritten.value])
+        os.replace(tmpFileName, fileName)  # atomic, other sessions may read
+    except OSError as err:
+        logging.debug("Couldn't save shader program binary: {}".format(err))
+
+
+def clearProgramCache():
+    """Delete all program binaries stored on disk."""
+    cacheDir = _getProgramCacheDir()
+    if not os.path.isdir(cacheDir):
+        return
+    for fileName in os.listdir(cacheDir):
+        if fileName.endswith('.bin'):
+            try:
+                os.remove(os.path.join(cacheDir, fileName))
+            except OSError:
+                pass
+
+
 def compileProgram(vertexSource=None, fragmentSource=None):
     """Create and compile a vertex and fragment shader pair from their sources.
 
+    If the driver supports `GL_ARB_get_program_binary`, the linked program is
+    stored on disk (keyed by the driver and a hash of the sources) and loaded
+    directly the next time the same program is requested, skipping
+    compilation. Set `psychopy.visual.shaders.useProgramBinaryCache = False` to
+    disable this.
+
     Parameters
     ----------
     vertexSource, fragmentSource : str or list of str
@@ -117,7 +241,16 @@ def compileProgram(vertexSource=None, fragmentSource=None):
         Program object handle.
 
     """
+    useCache = useProgramBinaryCache and haveProgramBinary()
+    if useCache:
+        key = _getProgramKey(vertexSource, fragmentSource)
+        program = _loadProgramBinary(key)
+        if program is not None:
+            forgetProgram(program)  # a handle deleted without forgetting it
+            return program
+
     program = gltools.createProgramObjectARB()
+    forgetProgram(program)
 
     vertexShader = fragmentShader = None
     if vertexSource:
@@ -129,6 +262,9 @@ def compileProgram(vertexSource=None, fragmentSource=None):
             fragmentSource, GL.GL_FRAGMENT_SHADER_ARB)
         gltools.attachObjectARB(program, fragmentShader)
 
+    if useCache:
+        GL.glProgramParameteri(
+            program, GL.GL_PROGRAM_BINARY_RETRIEVABLE_HINT, GL.GL_TRUE)
     gltools.linkProgramObjectARB(program)
     # gltools.validateProgramARB(program)
 
@@ -139,6 +275,9 @@ def compileProgram(vertexSource=None, fragmentSource=None):
         gltools.detachObjectARB(program, fragmentShader)
         gltools.deleteObjectARB(fragmentShader)
 
+    if useCache:
+        _saveProgramBinary(program, key)
+
     return program
 
 
@@ -271,6 +410,20 @@ fragImageStim_adding = '''
         gl_FragColor.rgb = (textureFrag.rgb*2.0-1.0)*(gl_Color.rgb*2.0-1.0)/2.0;
     }
     '''
+# movie frames as separate Y, U and V planes (4:2:0), converted to RGB using
+# the BT.601 limited range coefficients, as FFmpeg does by default
+fragYUV420 = '''
+    uniform sampler2D yTexture, uTexture, vTexture;
+    void main() {
+        float y = 1.164383 * (texture2D(yTexture, gl_TexCoord[0].st).r - 0.062745);
+        float u = texture2D(uTexture, gl_TexCoord[0].st).r - 0.501961;
+        float v = texture2D(vTexture, gl_TexCoord[0].st).r - 0.501961;
+        gl_FragColor.rgb = vec3(y + 1.596027 * v,
+                                y - 0.391762 * u - 0.812968 * v,
+                                y + 2.017232 * u);
+        gl_FragColor.a = gl_Color.a;
+    }
+    '''
 # in every case our vertex shader is simple (we don't transform coords)
 vertSimple = """
     void main() {
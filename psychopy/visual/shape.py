@@ -8,6 +8,7 @@
 # Distributed under the terms of the GNU General Public License (GPL)
 
 import copy
+import collections
 import numpy
 
 # Ensure setting pyglet.options['debug_gl'] to False is done prior to any
@@ -26,15 +27,30 @@ from psychopy.colors import Color
 from psychopy.tools.attributetools import (attributeSetter,  # logAttrib,
                                            setAttribute)
 from psychopy.tools.arraytools import val2array
+from psychopy.tools.mathtools import triangulatePolygon
 from psychopy.visual.basevisual import (BaseVisualStim, ColorMixin,
                                         ContainerMixin, WindowMixin)
 # from psychopy.visual.helpers import setColor
 import psychopy.visual
-from psychopy.contrib import tesselate
 
 pyglet.options['debug_gl'] = False
 GL = pyglet.gl
 
+try:
+    from psychopy.contrib import tesselate
+    haveGLUTesselator = True
+except Exception as err:
+    # no GLU library, fall back to ear clipping which can't fill shapes that
+    # are self-crossing or have holes
+    logging.warning("GLU tesselator unavailable ({}), complex ShapeStim "
+                    "vertices may not be filled correctly".format(err))
+    tesselate = None
+    haveGLUTesselator = False
+
+# maximum number of tesselation results kept, set to 0 to disable caching
+tesselationCacheSize = 256
+_tesselationCache = collections.OrderedDict()
+
 
 knownShapes = {
     "triangle": [
@@ -92,6 +108,101 @@ knownShapes = {
 knownShapes['square'] = knownShapes['rectangle']
 
 
+if haveGLUTesselator:
+    TesselateError = tesselate.TesselateError
+else:
+    class TesselateError(Exception):
+        pass
+
+
+def _tesselateGLU(loops, windingRule=None):
+    """Tesselate with the GLU tesselator, returns an Nx2 array of triangle
+    vertices."""
+    GL.glPushMatrix()  # seemed to help at one point, superfluous?
+    if windingRule:
+        GL.gluTessProperty(tesselate.tess, GL.GLU_TESS_WINDING_RULE,
+                           windingRule)
+    try:
+        tessVertices = tesselate.tesselate(loops)
+    finally:
+        GL.glPopMatrix()
+        if windingRule:
+            GL.gluTessProperty(tesselate.tess, GL.GLU_TESS_WINDING_RULE,
+                               tesselate.default_winding_rule)
+
+    return numpy.array(tessVertices, float).reshape((-1, 2))
+
+
+def getTesselation(loops, windingRule=None, tesselator='glu'):
+    """Get triangles filling the shape made by one or more loops of vertices.
+
+    Results are kept in a least-recently-used cache keyed by the vertices, so
+    stimuli which cycle through a set of shapes only pay for tesselating each
+    of them once. The size of the cache is set by the module attribute
+    `tesselationCacheSize`.
+
+    Parameters
+    ----------
+    loops : list
+        List of loops, each an Nx2 array_like of vertices.
+    windingRule : GLenum or None
+        GLU winding rule, `None` uses `GLU_TESS_WINDING_ODD`.
+    tesselator : str
+        Either 'glu' to use the GLU tesselator or 'earclip' to use
+        :func:`~psychopy.tools.mathtools.triangulatePolygon`. Ear clipping is
+        only used for shapes made of a single loop with the odd or non-zero
+        winding rule, as these are the same for simple polygons. It is also
+        used when the GLU tesselator is not available.
+
+    Returns
+    -------
+    ndarray
+        Mx2 array of vertices, every three make a triangle. The array is read
+        only as it may be shared with other stimuli.
+
+    """
+    loops = [numpy.asarray(loop, dtype=float) for loop in loops]
+    key = (tesselator, windingRule, tuple(loop.shape for loop in loops),
+           b''.join(loop.tobytes() for loop in loops))
+    try:
+        tessVertices = _tesselationCache[key]
+        _tesselationCache.move_to_end(key)
+        return tessVertices
+    except KeyError:
+        pass
+
+    useEarClip = (tesselator == 'earclip' or not haveGLUTesselator) and \
+        len(loops) == 1 and \
+        windingRule in (None, GL.GLU_TESS_WINDING_ODD,
+                        GL.GLU_TESS_WINDING_NONZERO)
+    tessVertices = None
+    if useEarClip:
+        try:
+            tessVertices = triangulatePolygon(loops[0])
+        except ValueError as err:
+            if not haveGLUTesselator:
+                raise TesselateError(str(err))
+    if tessVertices is None:
+        if not haveGLUTesselator:
+            raise TesselateError(
+                "Shapes with holes, multiple loops or a winding rule need "
+                "the GLU tesselator, which is not available.")
+        tessVertices = _tesselateGLU(loops, windingRule)
+
+    tessVertices.flags.writeable = False
+    if tesselationCacheSize > 0:
+        _tesselationCache[key] = tessVertices
+        while len(_tesselationCache) > tesselationCacheSize:
+            _tesselationCache.popitem(last=False)
+
+    return tessVertices
+
+
+def clearTesselationCache():
+    """Remove all tesselation results kept by :func:`getTesselation`."""
+    _tesselationCache.clear()
+
+
 class BaseShapeStim(BaseVisualStim, ColorMixin, ContainerMixin):
     """Create geometric (vector) shapes by defining vertex locations.
 
@@ -397,6 +508,13 @@ class ShapeStim(BaseShapeStim):
     tessellator winding rule (default: GLU_TESS_WINDING_ODD). This is relevant
     only for self-crossing or multi-loop shapes. Cannot be set dynamically.
 
+    Tesselation results are cached (see
+    :func:`~psychopy.visual.shape.getTesselation`), so switching back to
+    vertices used before is fast. Setting the class attribute
+    `ShapeStim.tesselator = 'earclip'` uses a NumPy ear clipping algorithm
+    instead of GLU for simple polygons; it is also used when GLU is not
+    available.
+
     See Coder demo > stimuli > shapes.py
 
     Changed Nov 2015: v1.84.00. Now allows filling of complex shapes. This
@@ -487,6 +605,9 @@ class ShapeStim(BaseShapeStim):
     """
     # Author: Jeremy Gray, November 2015, using psychopy.contrib.tesselate
 
+    # 'glu' or 'earclip', see `getTesselation()`
+    tesselator = 'glu'
+
     def __init__(self,
                  win,
                  units='',
@@ -568,26 +689,19 @@ class ShapeStim(BaseShapeStim):
         if self.closeShape:
             # convert original vertices to triangles (= tesselation) if
             # possible. (not possible if closeShape is False, don't even try)
-            GL.glPushMatrix()  # seemed to help at one point, superfluous?
-            if self.windingRule:
-                GL.gluTessProperty(tesselate.tess, GL.GLU_TESS_WINDING_RULE,
-                                   self.windingRule)
             if hasattr(newVertices[0][0], '__iter__'):
                 loops = newVertices
             else:
                 loops = [newVertices]
-            tessVertices = tesselate.tesselate(loops)
-            GL.glPopMatrix()
-            if self.windingRule:
-                GL.gluTessProperty(tesselate.tess, GL.GLU_TESS_WINDING_RULE,
-                                   tesselate.default_winding_rule)
+            tessVertices = getTesselation(
+                loops, self.windingRule, self.tesselator)
 
-        if not self.closeShape or tessVertices == []:
+        if not self.closeShape or not len(tessVertices):
             # probably got a line if tesselate returned []
             initVertices = newVertices
             self.closeShape = False
         elif len(tessVertices) % 3:
-            raise tesselate.TesselateError("Could not properly tesselate")
+            raise TesselateError("Could not properly tesselate")
         else:
             initVertices = tessVertices
         self.__dict__['_tesselVertices'] = numpy.array(initVertices, float)
@@ -0,0 +1,355 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Draw many shape stimuli (ShapeStim, Rect, Circle, Polygon, Line...) with
+a few OpenGL calls."""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = ['ShapeBatch']
+
+import numpy
+
+# Ensure setting pyglet.options['debug_gl'] to False is done prior to any
+# other calls to pyglet or pyglet submodules, otherwise it may not get picked
+# up by the pyglet GL engine and have no effect.
+import pyglet
+pyglet.options['debug_gl'] = False
+GL = pyglet.gl
+
+from psychopy import logging
+from psychopy.tools.attributetools import attributeSetter
+from psychopy.visual.basevisual import MinimalStim
+from psychopy.visual.shape import BaseShapeStim, ShapeStim
+
+# primitive types of the parts each shape is split into
+_FILL = 0
+_BORDER = 1
+
+
+class ShapeBatch(MinimalStim):
+    """Draw a collection of shape stimuli in a few OpenGL calls.
+
+    Drawing each shape on its own means a matrix push/pop, shader and texture
+    setup and at least one `glDrawArrays` call per shape, which makes routines
+    with hundreds of shapes (search arrays, grids, forms) CPU-bound. A
+    `ShapeBatch` concatenates the (already tessellated) vertices of all its
+    shapes into shared arrays and draws fills with `GL_TRIANGLES` and borders
+    with `GL_LINES`, using per-vertex colours so that each shape keeps its own
+    fill color, line color and opacity.
+
+    The shapes remain normal stimuli; change their `pos`, `ori`, `size`,
+    colors etc. as usual. Vertex arrays are only rebuilt when the geometry of
+    a shape has changed, colors are gathered on every draw.
+
+    Shapes are drawn in the order they were added. Draw the batch itself (or
+    set `batch.autoDraw = True`) rather than drawing the shapes or setting
+    their `autoDraw`, otherwise they will be drawn twice.
+
+    Parameters
+    ----------
+    win : :class:`~psychopy.visual.Window`
+        Window the shapes are drawn to.
+    shapes : list
+        Shape stimuli (anything derived from
+        :class:`~psychopy.visual.shape.BaseShapeStim`) to add to the batch.
+    strictOrder : bool
+        If `True` (default) the fill and border of each shape are drawn before
+        the next shape, exactly as when drawing the shapes one by one. Only
+        consecutive parts with the same primitive and line settings are merged
+        into a single call, so shapes with borders need two calls each. If
+        `False`, all fills are drawn first and then all borders (grouped by
+        `lineWidth` and `interpolate`), which needs only a couple of calls
+        in total but lets borders of earlier shapes show on top of
+        overlapping fills of later ones.
+    name : str
+        Name of the batch, used for logging.
+    autoLog : bool
+        Whether changes to the batch should be logged automatically.
+
+    Examples
+    --------
+    Draw a search array of 400 discs with one fill call::
+
+        discs = [visual.Circle(win, radius=5, pos=pos, units='pix',
+                               fillColor='red', lineColor=None)
+                 for pos in positions]
+        batch = visual.ShapeBatch(win, discs)
+        batch.draw()
+
+    """
+    def __init__(self,
+                 win,
+                 shapes=(),
+                 strictOrder=True,
+                 name=None,
+                 autoLog=None):
+        # what local vars are defined (these are the init params) for use by
+        # __repr__
+        self._initParams = dir()
+        self._initParams.remove('self')
+        super(ShapeBatch, self).__init__(name=name, autoLog=False)
+
+        self.win = win
+        self.__dict__['depth'] = 0
+        self.__dict__['strictOrder'] = strictOrder
+        self.shapes = []
+        for shape in shapes:
+            self.append(shape)
+
+        # geometry cache, rebuilt when any of the shapes has changed
+        self._signature = None
+        self._vertices = None  # all vertices, fills and borders, in pixels
+        self._parts = []  # (nVertices, key) for each part of each shape
+        self._runs = []  # [first, count, key] for each draw call
+        self._order = None  # indices into `_parts` for the order drawn
+        self._counts = None  # number of vertices of each part, as drawn
+        self._shapeParts = []  # keeps the arrays in `_signature` alive
+
+        # set autoLog now that params have been initialised
+        wantLog = autoLog is None and self.win.autoLog
+        self.__dict__['autoLog'] = autoLog or wantLog
+        if self.autoLog:
+            logging.exp("Created %s = %s" % (self.name, str(self)))
+
+    def __len__(self):
+        return len(self.shapes)
+
+    def __iter__(self):
+        return iter(self.shapes)
+
+    def __contains__(self, shape):
+        return shape in self.shapes
+
+    @attributeSetter
+    def strictOrder(self, value):
+        """Whether the fill and border of each shape are drawn before the
+        next shape (`True`), or all fills are drawn before all borders
+        (`False`, fewer draw calls).
+        """
+        self.__dict__['strictOrder'] = value
+        self._signature = None
+
+    def append(self, shape):
+        """Add a shape to the end of the batch.
+
+        Parameters
+        ----------
+        shape : :class:`~psychopy.visual.shape.BaseShapeStim`
+            Shape to add, it is drawn on top of the shapes already present.
+
+        """
+        if not isinstance(shape, BaseShapeStim):
+            raise TypeError(
+                "ShapeBatch can only contain shape stimuli, not {}".format(
+                    type(shape).__name__))
+        if shape.win is not self.win:
+            raise ValueError(
+                "Shape `{}` belongs to a different window than the batch "
+                "`{}`".format(shape.name, self.name))
+        if getattr(shape, 'autoDraw', False):
+            logging.warning(
+                "Shape `{}` has autoDraw set and will be drawn twice when "
+                "drawing batch `{}`".format(shape.name, self.name))
+        self.shapes.append(shape)
+        self._signature = None
+
+    def extend(self, shapes):
+        """Add several shapes to the end of the batch."""
+        for shape in shapes:
+            self.append(shape)
+
+    def remove(self, shape):
+        """Remove a shape from the batch."""
+        self.shapes.remove(shape)
+        self._signature = None
+
+    def clear(self):
+        """Remove all shapes from the batch."""
+        self.shapes = []
+        self._signature = None
+
+    def _getParts(self, shape):
+        """Get the vertices, in pixels, and color of the fill and border of
+        a shape, as they would be drawn by the shape's own `draw` method.
+        """
+        parts = []
+        vertsPix = shape.verticesPix
+        nVerts = vertsPix.shape[0]
+        if isinstance(shape, ShapeStim):
+            # `verticesPix` are already tessellated into triangles
+            if shape.closeShape and nVerts > 2 and shape._fillColor != None:
+                parts.append((_FILL, vertsPix, None, shape._fillColor))
+            borderPix = shape._borderPix
+        else:
+            # convex polygon, send it as a triangle fan
+            if nVerts > 2 and shape._fillColor != None:
+                parts.append((_FILL, vertsPix, 'fan', shape._fillColor))
+            borderPix = vertsPix
+
+        if shape._borderColor != None and shape.lineWidth:
+            loop = 'loop' if shape.closeShape else 'strip'
+            parts.append((_BORDER, borderPix, loop, shape._borderColor))
+
+        return parts
+
+    @staticmethod
+    def _triangulateFan(verts):
+        """Triangles equivalent to drawing `verts` as a `GL_POLYGON`."""
+        nTris = verts.shape[0] - 2
+        idx = numpy.empty((nTris, 3), dtype=int)
+        idx[:, 0] = 0
+        idx[:, 1] = numpy.arange(1, nTris + 1)
+        idx[:, 2] = idx[:, 1] + 1
+        return verts[idx.ravel()]
+
+    @staticmethod
+    def _segments(verts, loop):
+        """Line segments equivalent to drawing `verts` as a `GL_LINE_LOOP`
+        (if `loop`) or `GL_LINE_STRIP`."""
+        if loop and verts.shape[0] > 2:
+            ends = numpy.roll(verts, -1, axis=0)
+            starts = verts
+        else:
+            ends = verts[1:]
+            starts = verts[:-1]
+        return numpy.stack((starts, ends), axis=1).reshape((-1, 2))
+
+    def _rebuild(self, shapeParts, signature):
+        """Concatenate the geometry of all shapes and work out the draw calls.
+        """
+        vertices = []
+        parts = []
+        for shape, thisParts in zip(self.shapes, shapeParts):
+            interpolate = bool(shape.interpolate)
+            for primitive, verts, mode, color in thisParts:
+                if mode == 'fan':
+                    verts = self._triangulateFan(verts)
+                elif mode in ('loop', 'strip'):
+                    verts = self._segments(verts, mode == 'loop')
+                if primitive == _FILL:
+                    key = (_FILL, interpolate, 0.0)
+                else:
+                    key = (_BORDER, interpolate, float(shape.lineWidth))
+                vertices.append(verts)
+                parts.append((verts.shape[0], key))
+
+        if self.strictOrder:
+            order = list(range(len(parts)))
+        else:
+            # stable sort, keeps the drawing order within each group
+            order = sorted(range(len(parts)), key=lambda ii: parts[ii][1])
+
+        runs = []
+        first = 0
+        for ii in order:
+            nVerts, key = parts[ii]
+            if runs and runs[-1][2] == key:
+                runs[-1][1] += nVerts
+            else:
+                runs.append([first, nVerts, key])
+            first += nVerts
+
+        if vertices:
+            self._vertices = numpy.ascontiguousarray(
+                numpy.concatenate([vertices[ii] for ii in order]),
+                dtype=numpy.float64)
+        else:
+            self._vertices = numpy.zeros((0, 2))
+        self._parts = parts
+        self._order = numpy.asarray(order, dtype=int)
+        self._counts = numpy.asarray(
+            [parts[ii][0] for ii in order], dtype=int)
+        self._runs = runs
+        self._shapeParts = shapeParts
+        self._signature = signature
+
+    def _updateGeometry(self):
+        """Gather the parts of every shape, rebuilding the vertex array if
+        anything about the geometry has changed. Returns the colors of the
+        parts in the order they were gathered."""
+        shapeParts = []
+        signature = []
+        colors = []
+        for shape in self.shapes:
+            thisParts = self._getParts(shape)
+            shapeParts.append(thisParts)
+            # new vertex arrays are created whenever a shape is updated so
+            # checking their identity is enough to detect changes
+            signature.append(
+                (bool(shape.interpolate), shape.lineWidth) +
+                tuple((part[0], id(part[1]), part[2]) for part in thisParts))
+            for part in thisParts:
+                colors.append(part[3].render('rgba1'))
+
+        if signature != self._signature:
+            self._rebuild(shapeParts, signature)
+
+        return colors
+
+    def draw(self, win=None):
+        """Draw all the shapes in the batch.
+
+        You must call this method after every `win.flip()` if you want the
+        shapes to appear on that frame and then update the screen again.
+        """
+        if win is None:
+            win = self.win
+        self._selectWindow(win)
+
+        colors = self._updateGeometry()
+        if not self._runs:
+            return
+
+        # one color per vertex, in the order the parts are drawn
+        colors = numpy.asarray(colors, dtype=numpy.float64)
+        colors = numpy.ascontiguousarray(
+            numpy.repeat(colors[self._order], self._counts, axis=0))
+
+        GL.glPushMatrix()
+        win.setScale('pix')
+        if win._haveShaders:
+            GL.glUseProgram(win._progSignedFrag)
+
+        # load Null textures into multitexteureARB - or they modulate glColor
+        GL.glActiveTexture(GL.GL_TEXTURE0)
+        GL.glEnable(GL.GL_TEXTURE_2D)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+        GL.glActiveTexture(GL.GL_TEXTURE1)
+        GL.glEnable(GL.GL_TEXTURE_2D)
+        GL.glBindTexture(GL.GL_TEXTURE_2D, 0)
+
+        GL.glVertexPointer(2, GL.GL_DOUBLE, 0, self._vertices.ctypes)
+        GL.glColorPointer(4, GL.GL_DOUBLE, 0, colors.ctypes)
+        GL.glEnableClientState(GL.GL_VERTEX_ARRAY)
+        GL.glEnableClientState(GL.GL_COLOR_ARRAY)
+
+        interpolate = lineWidth = None
+        for first, count, (primitive, runInterp, runWidth) in self._runs:
+            if runInterp != interpolate:
+                if runInterp:
+                    GL.glEnable(GL.GL_LINE_SMOOTH)
+                    GL.glEnable(GL.GL_MULTISAMPLE)
+                else:
+                    GL.glDisable(GL.GL_LINE_SMOOTH)
+                    GL.glDisable(GL.GL_MULTISAMPLE)
+                interpolate = runInterp
+            if primitive == _FILL:
+                GL.glDrawArrays(GL.GL_TRIANGLES, first, count)
+            else:
+                if runWidth != lineWidth:
+                    GL.glLineWidth(runWidth)
+                    lineWidth = runWidth
+                GL.glDrawArrays(GL.GL_LINES, first, count)
+
+        GL.glDisableClientState(GL.GL_COLOR_ARRAY)
+        GL.glDisableClientState(GL.GL_VERTEX_ARRAY)
+        if win._haveShaders:
+            GL.glUseProgram(0)
+        GL.glPopMatrix()
+
+    def _selectWindow(self, win):
+        """Switch drawing to the specified window."""
+        win._setCurrent()
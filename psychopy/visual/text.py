@@ -28,6 +28,7 @@ from psychopy import logging
 # (JWP has no idea why!)
 from psychopy.tools.monitorunittools import cm2pix, deg2pix, convertToPix
 from psychopy.tools.attributetools import attributeSetter, setAttribute
+import psychopy.visual.shaders as _shaders
 from psychopy.visual.basevisual import (BaseVisualStim, ForeColorMixin,
                                         ContainerMixin, WindowMixin)
 from psychopy.colors import Color
@@ -717,7 +718,7 @@ class TextStim(BaseVisualStim, ForeColorMixin, ContainerMixin):
         #       desiredRGB.ctypes.data_as(ctypes.POINTER(ctypes.c_float)))
         #  # set the texture to be texture unit 0
         GL.glUniform3f(
-            GL.glGetUniformLocation(self.win._progSignedTexFont, b"rgb"),
+            _shaders.getUniformLocation(self.win._progSignedTexFont, b"rgb"),
             *self._foreColor.render('rgb1'))
 
         # should text have a depth or just on top?
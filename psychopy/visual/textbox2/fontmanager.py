@@ -16,7 +16,11 @@
 #
 import re
 import sys, os
+import json
 import math
+import atexit
+import hashlib
+import weakref
 import numpy as np
 import ctypes
 import freetype as ft
@@ -66,6 +70,24 @@ _weightMap = {
 
 supportedExtensions = ['ttf', 'otf', 'ttc', 'dfont', 'truetype']
 
+# Set to `False` to always rasterise glyphs with freetype, rather than loading
+# the glyph atlases stored by previous sessions.
+useGlyphCache = True
+_glyphCacheVersion = 2  # increase when the way glyphs are rendered changes
+_fontFileHashes = {}  # path -> ((mtime, size), sha1 of the file contents)
+
+# Set to `False` to open every font file found when the FontManager starts,
+# rather than reusing the details of files indexed by previous sessions.
+useFontIndex = True
+_fontIndexVersion = 1  # increase when the records stored change
+
+# Fonts created by the FontManager keep their glyphs in a texture atlas shared
+# with all other fonts, rather than one of their own. Set to `False` before
+# creating any text to give each font its own texture again.
+useSharedAtlas = True
+sharedAtlasPageSize = 1024
+sharedAtlasMaxPages = 8
+
 
 def unicode(s, fmt='utf-8'):
     """Force to unicode if bytes"""
@@ -147,6 +169,7 @@ class _TextureAtlas:
         self.nodes = [(0, 0, self.width), ]
         self.textureID = 0
         self.used = 0
+        self._dirtyRows = None  # rows changed since the last upload
         if format == 'rgb':
             self.data = np.zeros((self.height, self.width, 3),
                                  dtype=np.ubyte)
@@ -176,6 +199,18 @@ class _TextureAtlas:
             self.data[int(y):int(y + height), int(x):int(x + width), :] = data
         else:
             self.data[int(y):int(y + height), int(x):int(x + width)] = data
+        if self._dirtyRows is None:
+            self._dirtyRows = (int(y), int(y + height))
+        else:
+            self._dirtyRows = (min(self._dirtyRows[0], int(y)),
+                               max(self._dirtyRows[1], int(y + height)))
+
+    def clear(self):
+        """Remove all regions, keeping the texture to upload into."""
+        self.data[:] = 0
+        self.nodes = [(0, 0, self.width), ]
+        self.used = 0
+        self._dirtyRows = (0, self.height)
 
     def get_region(self, width, height):
         """
@@ -291,6 +326,19 @@ class _TextureAtlas:
     def upload(self):
         """Upload the local atlas data into graphics card memory
         """
+        if self.textureID and self._dirtyRows is not None:
+            # only send the rows which changed
+            top, bottom = self._dirtyRows
+            rows = np.ascontiguousarray(self.data[top:bottom])
+            glFormat = gl.GL_ALPHA if self.format == 'alpha' else gl.GL_RGB
+            gl.glBindTexture(gl.GL_TEXTURE_2D, self.textureID)
+            gl.glTexSubImage2D(gl.GL_TEXTURE_2D, 0, 0, top,
+                               self.width, bottom - top,
+                               glFormat, gl.GL_UNSIGNED_BYTE, rows.ctypes)
+            gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
+            self._dirtyRows = None
+            return
+        self._dirtyRows = None
         if not self.textureID:
             self.textureID = gl.GLuint(0)
             gl.glGenTextures(1, ctypes.byref(self.textureID))
@@ -319,6 +367,172 @@ class _TextureAtlas:
         gl.glBindTexture(gl.GL_TEXTURE_2D, 0)
 
 
+class GlyphAtlas:
+    """Glyph texture shared by several fonts and spread over pages.
+
+    Giving every font (and every size of it) a texture of its own wastes a
+    lot of memory when many of them are used, as each is mostly empty. A
+    `GlyphAtlas` packs the glyphs of all the fonts using it into a few pages
+    of `pageSize` x `pageSize` texels. Pages are added as the existing ones
+    fill up, up to `maxPages`. After that the page drawn least recently is
+    cleared to make room and the glyphs it held are dropped from their fonts,
+    to be rasterised again should they be needed. As textures are shared
+    between the GL contexts of PsychoPy windows the atlas can be used by
+    stimuli in any window.
+
+    Parameters
+    ----------
+    pageSize : int
+        Width and height of each page, rounded to a power of 2.
+    maxPages : int
+        Maximum number of pages. With a single page, glyphs which don't fit
+        raise an error rather than evicting the others.
+    format : 'alpha' or 'rgb'
+        Depth of the textures.
+    name : str
+        Name used for logging.
+
+    """
+    def __init__(self, pageSize=1024, maxPages=8, format='alpha',
+                 name='glyphs'):
+        self.pageSize = int(math.pow(2, int(math.log(pageSize, 2) + 0.5)))
+        self.maxPages = max(1, int(maxPages))
+        self.format = format
+        self.name = name
+        self.pages = []
+        # increased whenever glyphs are evicted, layouts using glyphs from
+        # an older generation need to be redone
+        self.generation = 0
+        self._lastUsed = []  # value of `_clock` when each page was last used
+        self._clock = 0
+        self._dirtyPages = set()
+        self._fonts = weakref.WeakSet()
+
+    @property
+    def width(self):
+        """Width of each page."""
+        return self.pageSize
+
+    @property
+    def height(self):
+        """Height of each page."""
+        return self.pageSize
+
+    def addFont(self, font):
+        """Register a font storing its glyphs in this atlas, so they can be
+        dropped from it when evicted."""
+        self._fonts.add(font)
+
+    def _addPage(self):
+        page = _TextureAtlas(self.pageSize, self.pageSize, format=self.format,
+                             name="{} (page {})".format(self.name,
+                                                        len(self.pages)))
+        self.pages.append(page)
+        self._lastUsed.append(self._clock)
+        return len(self.pages) - 1
+
+    def _evict(self, index):
+        logging.debug("Evicting page {} of glyph atlas {}".format(
+            index, self.name))
+        self.pages[index].clear()
+        self._dirtyPages.add(index)
+        for font in list(self._fonts):
+            font._dropPage(index)
+        self.generation += 1
+
+    def allocate(self, width, height):
+        """Reserve a region for a glyph.
+
+        Parameters
+        ----------
+        width, height : int
+            Size of the region.
+
+        Returns
+        -------
+        tuple
+            Page index and region as `(page, x, y, width, height)`. `x` is -1
+            if the glyph can't be placed.
+
+        """
+        # most recently used pages first, which keeps the glyphs of a text
+        # together
+        order = sorted(range(len(self.pages)),
+                       key=self._lastUsed.__getitem__, reverse=True)
+        for index in order:
+            x, y, w, h = self.pages[index].get_region(width, height)
+            if x >= 0:
+                self.touch((index,))
+                return index, x, y, w, h
+
+        if len(self.pages) < self.maxPages:
+            index = self._addPage()
+        elif self.maxPages > 1:
+            index = order[-1]
+            self._evict(index)
+        else:
+            return -1, -1, -1, 0, 0
+        x, y, w, h = self.pages[index].get_region(width, height)
+        self.touch((index,))
+        return index, x, y, w, h
+
+    def setRegion(self, page, region, data):
+        """Copy glyph data into an allocated region of a page."""
+        self.pages[page].set_region(region, data)
+        self._dirtyPages.add(page)
+
+    def getRegion(self, glyph):
+        """Region `(x, y, width, height)` holding a glyph in its page."""
+        u0, v0, u1, v1 = glyph.texcoords
+        x, y = int(round(u0 * self.width)), int(round(v0 * self.height))
+        return x, y, int(glyph.size[0]), int(glyph.size[1])
+
+    def touch(self, pages):
+        """Mark pages as used now, keeping them from being evicted."""
+        self._clock += 1
+        for index in pages:
+            self._lastUsed[index] = self._clock
+
+    def getTextureID(self, page):
+        """Texture of a page, uploading it first if it changed."""
+        if page in self._dirtyPages:
+            self.pages[page].upload()
+            self._dirtyPages.discard(page)
+        return self.pages[page].textureID
+
+    def upload(self):
+        """Upload all pages which changed into graphics card memory."""
+        for page in sorted(self._dirtyPages):
+            self.pages[page].upload()
+        self._dirtyPages.clear()
+
+
+# atlases shared by all fonts which use them, by texture format
+_sharedAtlases = {}
+
+
+def getSharedAtlas(format='alpha'):
+    """Get the :class:`GlyphAtlas` used by the fonts of the
+    :class:`FontManager`.
+
+    Parameters
+    ----------
+    format : 'alpha' or 'rgb'
+        Texture format of the atlas.
+
+    Returns
+    -------
+    GlyphAtlas
+
+    """
+    atlas = _sharedAtlases.get(format)
+    if atlas is None:
+        atlas = _sharedAtlases[format] = GlyphAtlas(
+            sharedAtlasPageSize, sharedAtlasMaxPages, format=format,
+            name='shared {}'.format(format))
+    return atlas
+
+
 class GLFont:
     """
     A GLFont gathers a set of glyphs for a given font filename and size.
@@ -345,16 +559,14 @@ class GLFont:
             Position of the tops of the next line's ascenders relative to this line's baseline
     """
 
-    def __init__(self, filename, size, lineSpacing=1, textureSize=2048):
+    def __init__(self, filename, size, lineSpacing=1, textureSize=2048,
+                 atlas=None):
         """
         Initialize font
 
         Parameters:
         -----------
 
-        atlas: TextureAtlas
-            Texture atlas where glyph texture will be stored
-        
         filename: str
             Font filename
 
@@ -363,9 +575,20 @@ class GLFont:
 
         lineSpacing : float
             Leading between lines, proportional to font size
+
+        textureSize : int
+            Size of the texture made for this font if no `atlas` is given
+
+        atlas: GlyphAtlas
+            Texture atlas where glyph texture will be stored, possibly shared
+            with other fonts
         """
         self.scale = 64.0
-        self.atlas = _TextureAtlas(textureSize, textureSize, format='alpha')
+        if atlas is None:
+            atlas = GlyphAtlas(textureSize, maxPages=1, format='alpha',
+                               name=os.path.basename(str(filename)))
+        self.atlas = atlas
+        self.atlas.addFont(self)
         self.format = self.atlas.format
         self.filename = filename
         self.face = ft.Face(str(filename))  # ft.Face doesn't support Pathlib yet
@@ -373,6 +596,8 @@ class GLFont:
         self.glyphs = {}
         self.info = FontInfo(filename, self.face)
         self._dirty = False
+        self._page = 0  # atlas page of the glyph added last
+        self._nCachedGlyphs = 0  # glyphs stored in the on-disk cache
         # Get metrics
         metrics = self.face.size
         self.ascender = metrics.ascender / self.scale
@@ -453,13 +678,14 @@ class GLFont:
     @property
     def textureID(self):
         """
-        Get underlying texture identity .
+        Get underlying texture identity (of the atlas page glyphs were last
+        added to, see `TextureGlyph.page` for the page of each glyph).
         """
 
         if self._dirty:
             self.atlas.upload()
         self._dirty = False
-        return self.atlas.textureID
+        return self.atlas.getTextureID(self._page)
 
     def preload(self, nMax=None):
         """
@@ -522,9 +748,9 @@ class GLFont:
             pitch = face.glyph.bitmap.pitch
 
             if self.format == 'rgb':
-                x, y, w, h = self.atlas.get_region(width / 5, rows + 2)
+                page, x, y, w, h = self.atlas.allocate(width / 5, rows + 2)
             else:
-                x, y, w, h = self.atlas.get_region(width + 2, rows + 2)
+                page, x, y, w, h = self.atlas.allocate(width + 2, rows + 2)
 
             if x < 0:
                 msg = ("Failed to fit char into font texture ({} at size {}px)"
@@ -539,7 +765,8 @@ class GLFont:
 
             if self.format == 'rgb':
                 Z = (((data / 255.0) ** 1.5) * 255).astype(np.ubyte)
-            self.atlas.set_region((x, y, w, h), data)
+            self.atlas.setRegion(page, (x, y, w, h), data)
+            self._page = page
 
             # Build glyph
             size = w, h
@@ -552,7 +779,8 @@ class GLFont:
             u1 = (x + w - 0.0) / float(self.atlas.width)
             v1 = (y + h - 0.0) / float(self.atlas.height)
             texcoords = (u0, v0, u1, v1)
-            glyph = TextureGlyph(charcode, size, offset, advance, texcoords)
+            glyph = TextureGlyph(charcode, size, offset, advance, texcoords,
+                                 page=page)
             self.glyphs[charcode] = glyph
 
             # Generate kerning
@@ -570,19 +798,130 @@ class GLFont:
         logging.debug("TextBox2 loaded {} chars with {} blanks and {} valid"
                      .format(len(charcodes), nBlanks, len(charcodes) - nBlanks))
 
+    def _dropPage(self, page):
+        """Forget glyphs stored on an atlas page which has been cleared."""
+        self.glyphs = {charcode: glyph
+                       for charcode, glyph in self.glyphs.items()
+                       if glyph.page != page}
+        self._dirty = True
+
+    @property
+    def _cacheFileName(self):
+        """Path of the file storing this font's glyphs and their metrics."""
+        return os.path.join(
+            _getGlyphCacheDir(), "{}_{:g}_{}_v{}.npz".format(
+                _getFontFileHash(self.filename), self.size, self.format,
+                _glyphCacheVersion))
+
+    @property
+    def _cacheStale(self):
+        """True if glyphs were added since the cache was loaded or saved."""
+        return len(self.glyphs) != self._nCachedGlyphs
+
     def saveToCache(self):
-        """Store the current font texture as an image file.
+        """Store the rendered glyphs and their metrics on disk.
+
+        The bitmap, offset and advance of each glyph are saved, keyed by a
+        hash of the font file, the font size and the texture format.
+        :py:meth:`loadFromCache` packs them into the atlas again, so the
+        glyphs don't need to be rasterised. This is called automatically on
+        exit for fonts which gained glyphs.
 
-        As yet we aren't storing the offset, advance and texcoords as needed to
-        retrieve the necessary chars, but it's a start!
-            (see  TextureGlyph(charcode, size, offset, advance, texcoords) )
+        Returns
+        -------
+        str or None
+            Path of the file written, or `None` if it could not be saved.
 
         """
-        from PIL import Image
-        im = Image.fromarray(self.atlas.data)
-        fname = "{}/.psychopy3/{}_{}_texture.png".format(
-            os.path.expanduser("~"), self.name, self.size)
-        im.save(fname)
+        if not self.glyphs:
+            return None
+        charcodes = list(self.glyphs)
+        glyphs = [self.glyphs[c] for c in charcodes]
+        bitmaps = []
+        for glyph in glyphs:
+            x, y, w, h = self.atlas.getRegion(glyph)
+            bitmaps.append(
+                self.atlas.pages[glyph.page].data[y:y + h, x:x + w].ravel())
+        try:
+            fileName = self._cacheFileName
+            os.makedirs(os.path.dirname(fileName), exist_ok=True)
+            tmpFileName = fileName + '.%d.tmp' % os.getpid()
+            with open(tmpFileName, 'wb') as f:
+                np.savez(
+                    f,
+                    charcodes=np.array([ord(c) for c in charcodes],
+                                       dtype=np.uint32),
+                    sizes=np.array([g.size for g in glyphs], dtype=np.float64),
+                    offsets=np.array([g.offset for g in glyphs],
+                                     dtype=np.float64),
+                    advances=np.array([g.advance for g in glyphs],
+                                      dtype=np.float64),
+                    bitmaps=np.concatenate(bitmaps).astype(np.ubyte))
+            os.replace(tmpFileName, fileName)  # atomic, other sessions may read
+        except (OSError, TypeError) as err:
+            logging.debug("Couldn't save glyph cache for {}: {}".format(
+                self.name, err))
+            return None
+
+        self._nCachedGlyphs = len(self.glyphs)
+        logging.debug("Saved {} glyphs of {} to {}".format(
+            len(glyphs), self.name, fileName))
+        return fileName
+
+    def loadFromCache(self):
+        """Load the glyphs stored by :py:meth:`saveToCache` for this font
+        file, size and format into the atlas.
+
+        Returns
+        -------
+        bool
+            `True` if the glyphs were loaded.
+
+        """
+        try:
+            fileName = self._cacheFileName
+            if not os.path.isfile(fileName):
+                return False
+            with np.load(fileName) as cached:
+                bitmaps = cached['bitmaps']
+                charcodes = cached['charcodes'].tolist()
+                sizes = cached['sizes'].tolist()
+                offsets = cached['offsets'].tolist()
+                advances = cached['advances'].tolist()
+        except Exception as err:  # corrupt or truncated files
+            logging.debug("Couldn't load glyph cache for {}: {}".format(
+                self.name, err))
+            return False
+
+        shape = (3,) if self.format == 'rgb' else ()
+        depth = 3 if self.format == 'rgb' else 1
+        start = 0
+        for i, code in enumerate(charcodes):
+            charcode = chr(code)
+            w, h = int(sizes[i][0]), int(sizes[i][1])
+            bitmap = bitmaps[start:start + w * h * depth]
+            start += w * h * depth
+            if charcode in self.glyphs:
+                continue
+            page, x, y, _, _ = self.atlas.allocate(w + 2, h + 2)
+            if x < 0:
+                break  # the atlas is full, fetch the rest when needed
+            x, y = x + 1, y + 1
+            self.atlas.setRegion(page, (x, y, w, h),
+                                 bitmap.reshape((h, w) + shape))
+            texcoords = (x / float(self.atlas.width),
+                         y / float(self.atlas.height),
+                         (x + w) / float(self.atlas.width),
+                         (y + h) / float(self.atlas.height))
+            self.glyphs[charcode] = TextureGlyph(
+                charcode, tuple(sizes[i]), tuple(offsets[i]),
+                tuple(advances[i]), texcoords, page=page)
+            self._page = page
+        self._nCachedGlyphs = len(self.glyphs)
+        self._dirty = True
+        logging.debug("Loaded {} glyphs of {} from {}".format(
+            len(charcodes), self.name, fileName))
+        return True
 
     def upload(self):
         """Upload the font data into graphics card memory.
@@ -597,7 +936,7 @@ class TextureGlyph:
     automatically by a TextureFont.
     """
 
-    def __init__(self, charcode, size, offset, advance, texcoords):
+    def __init__(self, charcode, size, offset, advance, texcoords, page=0):
         """
         Build a new texture glyph
 
@@ -618,12 +957,16 @@ class TextureGlyph:
 
         texcoords: tuple of 4 floats
             Texture coordinates of bottom-left and top-right corner
+
+        page: int
+            Page of the glyph atlas holding the glyph texture
         """
         self.charcode = charcode
         self.size = size
         self.offset = offset
         self.advance = advance
         self.texcoords = texcoords
+        self.page = page
         self.kerning = {}
 
     def get_kerning(self, charcode):
@@ -641,6 +984,152 @@ class TextureGlyph:
             return 0
 
 
+def _getGlyphCacheDir():
+    return os.path.join(prefs.paths['cache'], 'fonts')
+
+
+def _getFontFileHash(filename):
+    """SHA1 of the contents of a font file, remembered until the file's
+    modification time or size changes."""
+    filename = str(filename)
+    stat = os.stat(filename)
+    fileKey = (stat.st_mtime, stat.st_size)
+    if filename in _fontFileHashes and \
+            _fontFileHashes[filename][0] == fileKey:
+        return _fontFileHashes[filename][1]
+
+    h = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    _fontFileHashes[filename] = (fileKey, h.hexdigest())
+
+    return _fontFileHashes[filename][1]
+
+
+def clearGlyphCache():
+    """Delete all glyph atlases stored on disk."""
+    cacheDir = _getGlyphCacheDir()
+    if not os.path.isdir(cacheDir):
+        return
+    for fileName in os.listdir(cacheDir):
+        if fileName.endswith('.npz'):
+            try:
+                os.remove(os.path.join(cacheDir, fileName))
+            except OSError:
+                pass
+
+
+@atexit.register
+def _saveGlyphCaches():
+    """Store fonts which gained glyphs during this session."""
+    if not useGlyphCache or not FontManager._glFonts:
+        return
+    for glFont in list(FontManager._glFonts.values()):
+        if glFont._cacheStale:
+            glFont.saveToCache()
+
+
+def _getFontIndexFileName():
+    return os.path.join(_getGlyphCacheDir(), 'fontIndex.json')
+
+
+def clearFontIndex():
+    """Delete the index of font files stored on disk, so all fonts are read
+    again by the next session."""
+    FontManager._fontIndex = _FontIndex()
+    try:
+        os.remove(_getFontIndexFileName())
+    except OSError:
+        pass
+
+
+def _encodeName(name):
+    # freetype names are bytes, kept exactly in the index as latin-1 strings
+    return None if name is None else name.decode('latin-1')
+
+
+def _decodeName(name):
+    return None if name is None else name.encode('latin-1')
+
+
+class _FontIndex:
+    """Details of the font files seen by previous sessions.
+
+    Each entry holds the modification time and size of a file along with the
+    family and style names and :class:`FontInfo` attributes read from it (or
+    `None` for files which aren't usable fonts), so only files which are new
+    or have changed need to be opened with freetype.
+
+    """
+    def __init__(self):
+        self._entries = None  # loaded when first needed
+        self._seen = set()
+        self._changed = False
+
+    def _load(self):
+        self._entries = {}
+        try:
+            with open(_getFontIndexFileName(), 'r', encoding='utf-8') as f:
+                stored = json.load(f)
+            if stored.get('version') == _fontIndexVersion:
+                self._entries = stored['fonts']
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass  # missing or corrupt, start afresh
+
+    def get(self, fontPath, stamp):
+        """Get the record of a file, if it hasn't changed since it was stored.
+
+        Returns
+        -------
+        tuple
+            `(found, record)`, where `found` is `False` if the file needs to
+            be read.
+
+        """
+        if self._entries is None:
+            self._load()
+        self._seen.add(fontPath)
+        entry = self._entries.get(fontPath)
+        if entry is None or entry['stamp'] != stamp:
+            return False, None
+        return True, entry['record']
+
+    def set(self, fontPath, stamp, record):
+        """Store the record read from a file."""
+        if self._entries is None:
+            self._load()
+        self._seen.add(fontPath)
+        self._entries[fontPath] = {'stamp': stamp, 'record': record}
+        self._changed = True
+
+    def prune(self):
+        """Forget files which weren't looked up and no longer exist."""
+        if self._entries is None:
+            return
+        for fontPath in list(self._entries):
+            if fontPath not in self._seen and not os.path.exists(fontPath):
+                del self._entries[fontPath]
+                self._changed = True
+
+    def save(self):
+        """Write the index to disk if anything changed."""
+        if not self._changed:
+            return
+        fileName = _getFontIndexFileName()
+        try:
+            os.makedirs(os.path.dirname(fileName), exist_ok=True)
+            tmpFileName = fileName + '.%d.tmp' % os.getpid()
+            with open(tmpFileName, 'w', encoding='utf-8') as f:
+                json.dump({'version': _fontIndexVersion,
+                           'fonts': self._entries}, f)
+            os.replace(tmpFileName, fileName)  # atomic, other sessions may read
+        except (OSError, TypeError, ValueError) as err:
+            logging.debug("Couldn't save the font index: {}".format(err))
+            return
+        self._changed = False
+
+
 def findFontFiles(folders=(), recursive=True):
     """Search for font files in the folder (or system folders)
 
@@ -721,6 +1210,7 @@ class FontManager():
     _glFonts = {}
     fontStyles = []
     _fontInfos = {}  # JWP: dict of name:FontInfo objects
+    _fontIndex = _FontIndex()  # font files read by previous sessions
 
     def __init__(self, monospaceOnly=False):
         self.addFontDirectory(prefs.paths['resources'])
@@ -866,21 +1356,14 @@ class FontManager():
         """
         fi_list = set()
         if os.path.isfile(fontPath) and os.path.exists(fontPath):
-            try:
-                face = ft.Face(str(fontPath))
-            except Exception:
-                logging.warning("Font Manager failed to load file {}"
-                                .format(fontPath))
-                return
-            if face.family_name is None:
-                logging.warning("{} doesn't have valid font family name"
-                                .format(fontPath))
+            record = self._readFontFile(fontPath)
+            if record is None:
                 return
             if monospaceOnly:
-                if face.is_fixed_width:
-                    fi_list.add(self._createFontInfo(fontPath, face))
+                if record['info']['monospace']:
+                    fi_list.add(self._addFontRecord(fontPath, record))
             else:
-                fi_list.add(self._createFontInfo(fontPath, face))
+                fi_list.add(self._addFontRecord(fontPath, record))
         return fi_list
 
     def addFontFiles(self, fontPaths, monospaceOnly=False):
@@ -901,6 +1384,8 @@ class FontManager():
         for fp in fontPaths:
             self.addFontFile(fp, monospaceOnly)
         self.fontStyles.sort()
+        if useFontIndex:
+            self._fontIndex.save()
 
         return fi_list
 
@@ -950,7 +1435,10 @@ class FontManager():
         identifier = "{}_{}".format(str(fontInfo), size)
         glFont = self._glFonts.get(identifier)
         if glFont is None:
-            glFont = GLFont(fontInfo.path, size, lineSpacing=lineSpacing)
+            glFont = GLFont(fontInfo.path, size, lineSpacing=lineSpacing,
+                            atlas=getSharedAtlas() if useSharedAtlas else None)
+            if useGlyphCache:
+                glFont.loadFromCache()
             self._glFonts[identifier] = glFont
 
         return glFont
@@ -959,6 +1447,8 @@ class FontManager():
         self._fontInfos.clear()
         del self.fontStyles[:]
         fonts_found = findFontFiles()
+        if useFontIndex:
+            self._fontIndex.prune()
         self.addFontFiles(fonts_found, monospaceOnly)
 
     def booleansFromStyleName(self, style):
@@ -983,19 +1473,60 @@ class FontManager():
                 bold = _weightMap[key]
         return bold, italic
 
+    def _readFontFile(self, fontPath):
+        """Read the names and FontInfo attributes of a font file, or take them
+        from the font index if the file hasn't changed since it was indexed.
+        Returns `None` for files which can't be used."""
+        try:
+            stat = os.stat(fontPath)
+        except OSError:
+            return None
+        stamp = [stat.st_mtime_ns, stat.st_size]
+        if useFontIndex:
+            found, record = self._fontIndex.get(str(fontPath), stamp)
+            if found:
+                return record
+
+        record = None
+        try:
+            face = ft.Face(str(fontPath))
+        except Exception:
+            logging.warning("Font Manager failed to load file {}"
+                            .format(fontPath))
+        else:
+            if face.family_name is None:
+                logging.warning("{} doesn't have valid font family name"
+                                .format(fontPath))
+            else:
+                info = FontInfo(fontPath, face).asdict()
+                del info['path']
+                record = {'familyName': _encodeName(face.family_name),
+                          'styleName': _encodeName(face.style_name),
+                          'info': info}
+        if useFontIndex:
+            self._fontIndex.set(str(fontPath), stamp, record)
+        return record
+
+    def _addFontRecord(self, fp, record):
+        return self._addFontInfo(FontInfo.fromdict(fp, record['info']),
+                                 _decodeName(record['familyName']),
+                                 _decodeName(record['styleName']))
+
     def _createFontInfo(self, fp, fface):
         """"""
-        fns = (fface.family_name, fface.style_name)
+        return self._addFontInfo(FontInfo(fp, fface),
+                                 fface.family_name, fface.style_name)
+
+    def _addFontInfo(self, fi, familyName, styleName):
+        fns = (familyName, styleName)
         if fns in self.fontStyles:
             pass
         else:
-            self.fontStyles.append(
-                (fface.family_name, fface.style_name))
+            self.fontStyles.append(fns)
 
         styles_for_font_dict = FontManager._fontInfos.setdefault(
-            fface.family_name, {})
-        fonts_for_style = styles_for_font_dict.setdefault(fface.style_name, [])
-        fi = FontInfo(fp, fface)
+            familyName, {})
+        fonts_for_style = styles_for_font_dict.setdefault(styleName, [])
         fonts_for_style.append(fi)
         return fi
 
@@ -1039,3 +1570,12 @@ class FontInfo():
             if k[0] != '_':
                 d[k] = v
         return d
+
+    @classmethod
+    def fromdict(cls, fp, d):
+        """Create a FontInfo from the attributes given by :py:meth:`asdict`,
+        without opening the font file."""
+        fi = cls.__new__(cls)
+        fi.__dict__.update(d)
+        fi.path = fp
+        return fi
@@ -0,0 +1,322 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Array based text layout for TextBox2.
+
+Laying out text one character at a time in Python makes long or frequently
+changing text slow. :class:`TextLayout` instead keeps a table of glyph metrics
+(one row per distinct character) and computes pen positions, line breaks and
+the vertex, texture coordinate and colour arrays for all characters at once
+with NumPy. Only the search for line breaks loops in Python, and it does so
+once per line rather than once per character.
+
+The results are the same as the character-wise 'default' line breaking that
+TextBox2 has always used. The last layout is remembered so that when the text
+is only appended to or edited near the end (e.g. typing into an editable box)
+the lines before the change are reused and only the rest is laid out again.
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = ['TextLayout']
+
+import numpy as np
+
+# columns of the glyph metrics table
+_OFFX, _OFFY, _W, _H, _ADVX, _ADVY, _U0, _V0, _U1, _V1, _PAGE = range(11)
+
+# how each line ended
+_NEWLINE, _WORDWRAP, _HYPHEN, _END = range(4)
+
+
+def _nextIndex(mask):
+    """For each index, the first index at or after it where `mask` is True
+    (or `len(mask)` when there is none)."""
+    n = len(mask)
+    idx = np.where(mask, np.arange(n), n)
+    return np.minimum.accumulate(idx[::-1])[::-1]
+
+
+class TextLayout:
+    """Lay out text for :class:`~psychopy.visual.TextBox2` using arrays.
+
+    After calling :py:meth:`layout` the results are available as attributes:
+    `vertices` (float32, pix, 4 per character), `texcoords`, `colors`,
+    `pages` (atlas page of each glyph), `lineNs` (line number of each
+    character), `lineLenChars`, `lineWidths`, `lineBottoms`, `renderChars`
+    (hyphens added at forced line breaks) and `current` (the pen position at
+    the end of the text).
+
+    """
+    def __init__(self):
+        self._font = None
+        self._fontKey = None
+        self._rowOf = {}  # character -> row of the metrics table
+        self._metrics = np.zeros((0, 11))
+        self._last = None  # state kept for re-layout after edits
+
+    def _getRows(self, font, codes, showWhiteSpace):
+        """Rows of the metrics table for each character code, fetching any
+        glyphs not seen before."""
+        # glyphs evicted from the atlas are fetched again with new texcoords
+        fontKey = (font.size, font.height, font.ascender, showWhiteSpace,
+                   font.atlas.generation)
+        if font is not self._font or fontKey != self._fontKey:
+            self._font = font
+            self._fontKey = fontKey
+            self._rowOf = {}
+            self._metrics = np.zeros((0, 11))
+            self._last = None
+
+        uniqueCodes, inverse = np.unique(codes, return_inverse=True)
+        rows = np.empty(len(uniqueCodes), dtype=np.intp)
+        newMetrics = []
+        for n, code in enumerate(uniqueCodes.tolist()):
+            char = chr(code)
+            row = self._rowOf.get(char)
+            if row is None:
+                if char == "\n" or (showWhiteSpace and char == " "):
+                    glyph = font[u"·"]
+                else:
+                    glyph = font[char]
+                    if char == " ":
+                        # glyph size of space is smaller than actual size, so
+                        # use size of dot instead
+                        glyph.size = font[u"·"].size
+                row = len(self._rowOf)
+                self._rowOf[char] = row
+                newMetrics.append(
+                    (glyph.offset[0], glyph.offset[1],
+                     glyph.size[0], glyph.size[1],
+                     glyph.advance[0], glyph.advance[1]) +
+                    tuple(glyph.texcoords) + (glyph.page,))
+            rows[n] = row
+        if newMetrics:
+            self._metrics = np.vstack(
+                [self._metrics, np.array(newMetrics, dtype=float)])
+
+        return rows[inverse]
+
+    def layout(self, font, text, styles, rgb, lineMax, alphaCorrection=1,
+               showWhiteSpace=False, wordBreaks=" -\n"):
+        """Lay out `text` in lines no wider than `lineMax` (pix).
+
+        Parameters
+        ----------
+        font : GLFont
+            Font to lay out the text with.
+        text : str
+            Text to lay out.
+        styles : Style
+            Italic, bold and colour of each character.
+        rgb : array_like
+            Default RGBA colour of the text.
+        lineMax : float
+            Width at which lines are wrapped, in pix.
+        alphaCorrection : float
+            Factor applied to glyph widths.
+        showWhiteSpace : bool
+            Draw spaces and newlines as dots.
+        wordBreaks : str
+            Characters after which a line may be wrapped.
+
+        """
+        nChars = len(text)
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        rows = self._getRows(font, codes, showWhiteSpace)
+        ital = np.zeros(nChars, dtype=bool)
+        bold = np.zeros(nChars, dtype=bool)
+        nStyled = min(nChars, len(styles.i))
+        ital[:nStyled] = styles.i[:nStyled]
+        bold[:nStyled] = styles.b[:nStyled]
+
+        metrics = self._metrics[rows]
+        fakeItalic = np.where(ital, 0.1 * font.size, 0.0)
+        fakeBold = np.where(bold, 0.3 * font.size, 0.0)
+        isNewline = codes == ord("\n")
+        isBreak = np.isin(codes, [ord(c) for c in wordBreaks]) & ~isNewline
+        # pen position before each character (and after the last one)
+        penX = np.zeros(nChars + 1)
+        np.cumsum(metrics[:, _ADVX] + fakeBold / 2, out=penX[1:])
+        penY = np.zeros(nChars + 1)
+        np.cumsum(metrics[:, _ADVY], out=penY[1:])
+
+        # lines before the first changed character can be reused
+        settings = (lineMax, alphaCorrection, wordBreaks)
+        lines = []
+        start = (0, 0, 0.0, 0)
+        last = self._last
+        if last is not None and last['settings'] == settings:
+            nSame = min(nChars, len(last['codes']))
+            changed = np.flatnonzero(
+                (codes[:nSame] != last['codes'][:nSame]) |
+                (ital[:nSame] != last['ital'][:nSame]) |
+                (bold[:nSame] != last['bold'][:nSame]))
+            if len(changed):
+                nSame = changed[0]
+            for line in last['lines']:
+                if line[5] == _END or line[6] >= nSame:
+                    break
+                lines.append(line)
+            if lines:
+                start = lines[-1][7]
+
+        lines.extend(self._breakLines(
+            start, penX, metrics[:, _OFFX], isNewline, isBreak, lineMax))
+        firstChar = start[0]
+
+        # per character line number and horizontal shift of the line start
+        lineStarts = np.array([line[0] for line in lines], dtype=np.intp)
+        lineShifts = np.array([line[2] for line in lines])
+        counts = np.diff(np.append(lineStarts, nChars))
+        lineNs = np.repeat(np.arange(len(lines)), counts)
+        shifts = np.repeat(lineShifts, counts)
+
+        # vertices of characters from the first changed line onwards
+        sl = slice(firstChar, nChars)
+        m = metrics[sl]
+        x = penX[:-1][sl] - shifts[sl]
+        y = penY[:-1][sl] - font.ascender - lineNs[sl] * font.height
+        newline = isNewline[sl]
+        italic = np.where(newline, 0.0, fakeItalic[sl])
+        width = np.where(newline, 0.0,
+                         m[:, _W] * alphaCorrection + fakeBold[sl])
+        xTopL = x + m[:, _OFFX]
+        xTopR = xTopL + width
+        xBotL = xTopL - italic
+        xBotR = xTopR - italic
+        yTop = y + m[:, _OFFY]
+        yBot = yTop - m[:, _H]
+        newVertices = np.stack(
+            [xTopL, yTop, xBotL, yBot, xBotR, yBot, xTopR, yTop],
+            axis=1).astype(np.float32).reshape(-1, 2)
+        if firstChar:
+            vertices = np.vstack(
+                [last['vertices'][:firstChar * 4], newVertices])
+        else:
+            vertices = newVertices
+
+        texcoords = np.stack(
+            [metrics[:, _U0], metrics[:, _V0], metrics[:, _U0], metrics[:, _V1],
+             metrics[:, _U1], metrics[:, _V1], metrics[:, _U1], metrics[:, _V0]],
+            axis=1).reshape(-1, 2)
+
+        colors = np.empty((nChars, 4), dtype=np.double)
+        colors[:] = rgb
+        for n, rgb_ in enumerate(styles.c[:nChars]):
+            if len(rgb_) > 0:
+                colors[n] = rgb_  # set custom color
+
+        # ends of lines
+        self.lineLenChars = [line[4] for line in lines]
+        self.lineWidths = [line[3] for line in lines]
+        events = np.array(
+            [line[6] for line in lines if line[5] != _END], dtype=np.intp)
+
+        def penYAfter(i):
+            nLinesBefore = np.searchsorted(events, i, side='right')
+            return penY[i + 1] - font.ascender - nLinesBefore * font.height
+
+        # the bottom of a line is stored after its first character, but
+        # breaks right at the start only catch up once a character follows
+        nLeading = 0
+        while nLeading < len(events) and events[nLeading] == nLeading:
+            nLeading += 1
+        bottomAfter = np.arange(min(nLeading + 1, nChars))
+        bottomAfter = np.concatenate([bottomAfter, events[nLeading:]])
+        self.lineBottoms = penYAfter(bottomAfter).tolist()
+
+        self.renderChars = []
+        for line in lines:
+            if line[5] == _HYPHEN:
+                i = line[6]
+                self.renderChars.append({
+                    "i": i,
+                    "current": (line[3], penYAfter(i) + font.height),
+                    "glyph": font["-"]
+                })
+
+        self.current = [lines[-1][3], penYAfter(nChars - 1)
+                        if nChars else -font.ascender]
+        self.vertices = vertices
+        self.texcoords = texcoords
+        self.pages = metrics[:, _PAGE].astype(np.intp)
+        self.colors = np.repeat(colors, 4, axis=0)
+        self.lineNs = lineNs
+
+        self._last = {
+            'settings': settings,
+            'codes': codes,
+            'ital': ital,
+            'bold': bold,
+            'lines': lines,
+            'vertices': vertices,
+        }
+
+    @staticmethod
+    def _breakLines(start, penX, offsetX, isNewline, isBreak, lineMax):
+        """Find where lines end, starting from the state `start`.
+
+        Each line is recorded as a tuple of its first character, the index
+        from which wrapping is checked, the pen position at its start, its
+        width, its length in characters, how it ended, the index of the
+        character that ended it and the state at the start of the next line.
+
+        """
+        nChars = len(isNewline)
+        # characters after which the line can be wrapped (mid word)
+        canWrap = ~(isNewline | isBreak)
+        nextWrap = _nextIndex(canWrap)
+        nextNewline = _nextIndex(isNewline)
+        nBreaks = np.zeros(nChars + 1, dtype=np.intp)
+        np.cumsum(isBreak, out=nBreaks[1:])
+        lastBreak = np.maximum.accumulate(
+            np.where(isBreak, np.arange(nChars), -1))
+
+        lines = []
+        lineStart, searchStart, shift, nWords = start
+        while True:
+            if searchStart < nChars:
+                # first character taking the pen to the edge, found by
+                # bisecting the (monotonic) pen positions
+                i = np.searchsorted(penX, lineMax + shift, side='left') - 1
+                i = nextWrap[max(i, searchStart)] if i < nChars else nChars
+                newline = nextNewline[searchStart]
+            else:
+                i = newline = nChars
+
+            if i < newline:
+                nWords += nBreaks[i + 1] - nBreaks[searchStart]
+                if nWords <= 1:
+                    # a single word filling the line is split with a hyphen
+                    width = penX[i + 1] - shift
+                    nextStart = (i + 1, i + 1, penX[i + 1], 1)
+                    lines.append((lineStart, searchStart, shift, width,
+                                  i + 2 - lineStart, _HYPHEN, i, nextStart))
+                else:
+                    # move the word being written to the next line
+                    wordStart = lastBreak[i] + 1
+                    # measured from the vertices, which are float32
+                    width = float(np.float32(
+                        penX[wordStart] - shift + offsetX[wordStart]))
+                    nextStart = (wordStart, i + 1, shift + width, 1)
+                    lines.append((lineStart, searchStart, shift, width,
+                                  wordStart - lineStart, _WORDWRAP, i,
+                                  nextStart))
+            elif newline < nChars:
+                width = penX[newline + 1] - shift
+                nextStart = (newline + 1, newline + 1, penX[newline + 1], 0)
+                lines.append((lineStart, searchStart, shift, width,
+                              newline + 1 - lineStart, _NEWLINE, newline,
+                              nextStart))
+            else:
+                lines.append((lineStart, searchStart, shift,
+                              penX[nChars] - shift, nChars - lineStart, _END,
+                              nChars, None))
+                break
+            lineStart, searchStart, shift, nWords = nextStart
+
+        return lines
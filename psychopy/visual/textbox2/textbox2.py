@@ -25,12 +25,14 @@ import re
 
 from ..aperture import Aperture
 from ..basevisual import BaseVisualStim, ColorMixin, ContainerMixin, WindowMixin
+from psychopy import logging
 from psychopy.tools.attributetools import attributeSetter, setAttribute
 from psychopy.tools import mathtools as mt
 from psychopy.tools.arraytools import val2array
 from psychopy.tools.monitorunittools import convertToPix
 from psychopy.colors import Color
 from .fontmanager import FontManager, GLFont
+from .layout import TextLayout
 from .. import shaders
 from ..rect import Rect
 from ... import core, alerts, layout
@@ -218,6 +220,7 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
         self._lines = None  # np.array the line numbers for each char
         self._colors = None
         self._styles = None
+        self._textLayout = None  # created on first layout
         self.flipHoriz = flipHoriz
         self.flipVert = flipVert
         # params about positioning (after layout has occurred)
@@ -795,7 +798,24 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
     def _layout(self):
         """Layout the text, calculating the vertex locations
         """
-        
+        atlas = self.glFont.atlas
+        generation = atlas.generation
+        self._layoutGlyphs()
+        if atlas.generation != generation:
+            # glyphs fetched for this layout evicted others, maybe some it
+            # used already, so lay out again with the glyphs now in the atlas
+            generation = atlas.generation
+            self._layoutGlyphs()
+            if atlas.generation != generation:
+                logging.warning(
+                    "The text of {} needs more glyphs than the atlas of its "
+                    "font holds, some may not be drawn correctly".format(
+                        self.name))
+        # laid out again when drawn if glyphs are evicted after this
+        self._atlasGeneration = atlas.generation
+
+    def _layoutGlyphs(self):
+        """Layout the text with the glyphs in the atlas of the font."""
         rgb = self._foreColor.render('rgba1')
         font = self.glFont
 
@@ -808,6 +828,7 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
         self._colors = np.zeros((len(visible_text) * 4, 4), dtype=np.double)
         self._texcoords = np.zeros((len(visible_text) * 4, 2), dtype=np.double)
         self._glIndices = np.zeros((len(visible_text) * 4), dtype=int)
+        self._glyphPages = np.zeros(len(visible_text), dtype=int)
         self._renderChars = []
 
         # the following are used internally for layout
@@ -828,137 +849,25 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
 
         if self._lineBreaking == 'default':
 
-            wordLen = 0
-            charsThisLine = 0
-            wordsThisLine = 0
-            lineN = 0
-
-            for i, charcode in enumerate(self._text):
-                printable = True  # unless we decide otherwise
-                # handle formatting codes
-                fakeItalic = 0.0
-                fakeBold = 0.0
-                if self._styles.i[i]:
-                    fakeItalic = 0.1 * font.size
-                if self._styles.b[i]:
-                    fakeBold = 0.3 * font.size
-
-                # handle newline
-                if charcode == '\n':
-                    printable = False
-
-                # handle printable characters
-                if printable:
-                    glyph = font[charcode]
-                    if showWhiteSpace and charcode == " ":
-                        glyph = font[u"·"]
-                    elif charcode == " ":
-                        # glyph size of space is smaller than actual size, so use size of dot instead
-                        glyph.size = font[u"·"].size
-                    # Get top and bottom coords
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    # Get x mid point
-                    xMid = current[0] + glyph.offset[0] + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-                    # Get left and right corners from midpoint
-                    xBotL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeItalic - fakeBold / 2
-                    xBotR = xMid + glyph.size[0] * alphaCorrection / 2 - fakeItalic + fakeBold / 2
-                    xTopL = xMid - glyph.size[0] * alphaCorrection / 2 - fakeBold / 2
-                    xTopR = xMid + glyph.size[0] * alphaCorrection / 2 + fakeBold / 2
-
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-                else:
-                    glyph = font[u"·"]
-                    x = current[0] + glyph.offset[0]
-                    yTop = current[1] + glyph.offset[1]
-                    yBot = yTop - glyph.size[1]
-                    xBotL = x
-                    xTopL = x
-                    xBotR = x
-                    xTopR = x
-                    u0 = glyph.texcoords[0]
-                    v0 = glyph.texcoords[1]
-                    u1 = glyph.texcoords[2]
-                    v1 = glyph.texcoords[3]
-
-                theseVertices = [[xTopL, yTop], [xBotL, yBot],
-                                 [xBotR, yBot], [xTopR, yTop]]
-                texcoords = [[u0, v0], [u0, v1],
-                             [u1, v1], [u1, v0]]
-
-                vertices[i * 4:i * 4 + 4] = theseVertices
-                self._texcoords[i * 4:i * 4 + 4] = texcoords
-                # handle character color
-                rgb_ = self._styles.c[i]
-                if len(rgb_) > 0:
-                    self._colors[i*4 : i*4+4, :4] = rgb_ # set custom color
-                else:
-                    self._colors[i*4 : i*4+4, :4] = rgb # set default color
-                self._lineNs[i] = lineN
-                current[0] = current[0] + glyph.advance[0] + fakeBold / 2
-                current[1] = current[1] + glyph.advance[1]
-
-                # are we wrapping the line?
-                if charcode == "\n":
-                    lineWPix = current[0]
-                    current[0] = 0
-                    current[1] -= font.height
-                    lineN += 1
-                    charsThisLine += 1
-                    self._lineLenChars.append(charsThisLine)
-                    _lineWidths.append(lineWPix)
-                    charsThisLine = 0
-                    wordsThisLine = 0
-                elif charcode in wordBreaks:
-                    wordLen = 0
-                    charsThisLine += 1
-                    wordsThisLine += 1
-                elif printable:
-                    wordLen += 1
-                    charsThisLine += 1
-
-                # end line with auto-wrap on space
-                if current[0] >= lineMax and wordLen > 0:
-                    # move the current word to next line
-                    lineBreakPt = vertices[(i - wordLen + 1) * 4, 0]
-                    if wordsThisLine <= 1:
-                        # if whole line is just 1 word, wrap regardless of presence of wordbreak
-                        wordLen = 0
-                        charsThisLine += 1
-                        wordsThisLine += 1
-                        # add hyphen
-                        self._renderChars.append({
-                            "i": i,
-                            "current": (current[0], current[1]),
-                            "glyph": font["-"]
-                        })
-                        # store linebreak point
-                        lineBreakPt = current[0]
-                    wordWidth = current[0] - lineBreakPt
-                    # shift all chars of the word left by wordStartX
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 0] -= lineBreakPt
-                    vertices[(i - wordLen + 1) * 4: (i + 1) * 4, 1] -= font.height
-                    # update line values
-                    self._lineNs[i - wordLen + 1: i + 1] += 1
-                    self._lineLenChars.append(charsThisLine - wordLen)
-                    _lineWidths.append(lineBreakPt)
-                    lineN += 1
-                    # and set current to correct location
-                    current[0] = wordWidth
-                    current[1] -= font.height
-                    charsThisLine = wordLen
-                    wordsThisLine = 1
-
-                # have we stored the top/bottom of this line yet
-                if lineN + 1 > len(_lineBottoms):
-                    _lineBottoms.append(current[1])
-
-            # add length of this (unfinished) line
-            _lineWidths.append(current[0])
-            self._lineLenChars.append(charsThisLine)
+            # positions, line breaks etc. are computed in bulk by the layout
+            # engine, which also reuses lines unaffected by an edit
+            if self._textLayout is None:
+                self._textLayout = TextLayout()
+            textLayout = self._textLayout
+            textLayout.layout(font, visible_text, self._styles, rgb, lineMax,
+                              alphaCorrection=alphaCorrection,
+                              showWhiteSpace=showWhiteSpace,
+                              wordBreaks=wordBreaks)
+            vertices = textLayout.vertices.copy()
+            self._texcoords = textLayout.texcoords
+            self._colors = textLayout.colors
+            self._glyphPages = textLayout.pages
+            self._lineNs = textLayout.lineNs
+            self._lineLenChars = textLayout.lineLenChars
+            self._renderChars = textLayout.renderChars
+            _lineWidths = textLayout.lineWidths
+            _lineBottoms = textLayout.lineBottoms
+            current = textLayout.current
 
         elif self._lineBreaking == 'uax14':
 
@@ -973,6 +882,7 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
             y_advance_list = []
             vertices_list = []
             texcoords_list = []
+            pages_list = []
 
             # calculate width of each segments
             for this_seg in range(len(text_seg)):
@@ -1034,6 +944,7 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
                                            [u1, v1], [u1, v0]])
                     charwidth_list.append(w)
                     y_advance_list.append(glyph.advance[1])
+                    pages_list.append(glyph.page)
 
                 # append width of this segment to the list
                 segwidth_list.append(thisSegWidth)
@@ -1082,6 +993,7 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
                         else:
                             self._colors[i*4 : i*4+4, :4] = rgb # set default color
                         self._lineNs[i] = lineN
+                        self._glyphPages[i] = pages_list[i]
 
                         current[0] = current[0] + charwidth_list[i]
                         current[1] = current[1] + y_advance_list[i]
@@ -1161,6 +1073,15 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
             self._lineBottoms = np.array(_lineBottoms)
             self._lineWidths = np.array(_lineWidths)
 
+        # runs of consecutive glyphs drawn from the same atlas page
+        pages = np.asarray(self._glyphPages, dtype=int)
+        pageChanges = np.flatnonzero(np.diff(pages)) + 1
+        runStarts = np.concatenate([[0], pageChanges])
+        runEnds = np.append(pageChanges, len(pages))
+        self._pageRuns = [(int(pages[start]), int(start), int(end - start))
+                          for start, end in zip(runStarts, runEnds)
+                          if end > start]
+
         # if we had to add more glyphs to make possible then 
         if self.glFont._dirty:
             self.glFont.upload()
@@ -1184,6 +1105,9 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
         self.contentBox.win = self.win
         self.boundingBox.win = self.win
 
+        if self.glFont.atlas.generation != self._atlasGeneration:
+            # glyphs were evicted from the shared atlas since the last layout
+            self._layout()
         if self._needVertexUpdate:
             #print("Updating vertices...")
             self._updateVertices()
@@ -1227,7 +1151,6 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
         self.win.setScale('pix')
 
         gl.glActiveTexture(gl.GL_TEXTURE0)
-        gl.glBindTexture(gl.GL_TEXTURE_2D, self.glFont.textureID)
         gl.glEnable(gl.GL_TEXTURE_2D)
         gl.glDisable(gl.GL_DEPTH_TEST)
 
@@ -1243,9 +1166,12 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
         self.shader.bind()
         self.shader.setInt('texture', 0)
         self.shader.setFloat('pixel', [1.0 / 512, 1.0 / 512])
-        nVerts = (len(self._text) + len(self._renderChars)) * 4
-
-        gl.glDrawArrays(gl.GL_QUADS, 0, nVerts)
+        # the glyphs may be spread over several pages of the font atlas
+        atlas = self.glFont.atlas
+        for page, first, count in self._pageRuns:
+            gl.glBindTexture(gl.GL_TEXTURE_2D, atlas.getTextureID(page))
+            gl.glDrawArrays(gl.GL_QUADS, first * 4, count * 4)
+        atlas.touch({page for page, first, count in self._pageRuns})
         self.shader.unbind()
 
         # removed the colors and font texture
@@ -1372,6 +1298,11 @@ class TextBox2(BaseVisualStim, ContainerMixin, ColorMixin):
             self._lineNs[i-1],
             self._lineNs[i:]
         ])
+        self._glyphPages = np.hstack([
+            self._glyphPages[:i],
+            glyph.page,
+            self._glyphPages[i:]
+        ])
 
         return vertices
 
@@ -0,0 +1,213 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Cache of image textures uploaded to the graphics card.
+
+Setting the image (or mask) of a stimulus to a file used to decode, convert
+and upload the image every time, even when the same file had been shown
+before. Each window now keeps a :class:`TextureCache` of the textures made
+from image files, keyed by the file, its modification time and the way the
+texture was made. Stimuli showing the same image share one texture, and
+switching back to an image seen on an earlier trial costs no decoding or
+upload at all. Textures of named patterns (e.g. a 'gauss' or 'raisedCos'
+mask) are shared the same way, keyed by the pattern and its parameters.
+
+Textures which are no longer used by any stimulus are kept until the total
+size of the cached textures exceeds the cache's memory budget, at which point
+the least recently used ones are deleted.
+
+Examples
+--------
+Allow up to 1 GB of images to stay on the graphics card::
+
+    win.textureCache.maxBytes = 1024 ** 3
+
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+__all__ = [
+    'TextureCache',
+    'CachedTexture'
+]
+
+import os
+from collections import OrderedDict
+import pyglet.gl as GL
+from psychopy import logging
+
+# Set to `False` to always load and upload images, rather than sharing the
+# textures of images which were loaded before.
+useTextureCache = True
+# default memory budget of the texture cache of each window, in bytes
+defaultMaxBytes = 256 * 1024 ** 2
+
+
+class CachedTexture:
+    """A texture held by a :class:`TextureCache`.
+
+    Attributes
+    ----------
+    key : tuple
+        Key of the texture in the cache.
+    id : :class:`~pyglet.gl.GLuint`
+        Name of the OpenGL texture.
+    nBytes : int
+        Estimated memory used by the texture.
+    wasLum : bool
+        Whether the image was a luminance image.
+    origSize : tuple or None
+        Size of the image file in pixels, `None` for patterns.
+    nUsers : int
+        Number of stimuli currently using the texture.
+
+    """
+    __slots__ = ('key', 'id', 'nBytes', 'wasLum', 'origSize', 'nUsers')
+
+    def __init__(self, key, id, nBytes, wasLum, origSize):
+        self.key = key
+        self.id = id
+        self.nBytes = nBytes
+        self.wasLum = wasLum
+        self.origSize = origSize
+        self.nUsers = 0
+
+
+class TextureCache:
+    """Textures made from image files or patterns, shared by the stimuli of
+    a window.
+
+    Parameters
+    ----------
+    maxBytes : int or None
+        Memory budget for the cached textures. Textures not used by any
+        stimulus are deleted, least recently used first, while the total is
+        over budget. `None` uses `defaultMaxBytes`.
+
+    """
+    def __init__(self, maxBytes=None):
+        self._textures = OrderedDict()
+        self.nBytes = 0
+        self.nHits = 0
+        self.nMisses = 0
+        self.maxBytes = defaultMaxBytes if maxBytes is None else maxBytes
+
+    def __len__(self):
+        return len(self._textures)
+
+    def __contains__(self, key):
+        return key in self._textures
+
+    @property
+    def maxBytes(self):
+        """Memory budget for the cached textures, in bytes."""
+        return self._maxBytes
+
+    @maxBytes.setter
+    def maxBytes(self, value):
+        self._maxBytes = int(value)
+        self._evict()
+
+    @staticmethod
+    def getKey(filename, *params):
+        """Key of the texture made from an image file.
+
+        Parameters
+        ----------
+        filename : str or Path
+            The image file.
+        *params
+            Hashable values which affect how the texture is made.
+
+        Returns
+        -------
+        tuple or None
+            The key, or `None` if the file can't be accessed.
+
+        """
+        filename = os.path.abspath(str(filename))
+        try:
+            stat = os.stat(filename)
+        except OSError:
+            return None
+        return (filename, stat.st_mtime_ns, stat.st_size) + params
+
+    def get(self, key):
+        """Get a cached texture, or `None` if there isn't one for `key`."""
+        cached = self._textures.get(key)
+        if cached is None:
+            self.nMisses += 1
+            return None
+        self.nHits += 1
+        self._textures.move_to_end(key)
+        return cached
+
+    def add(self, key, id, nBytes, wasLum, origSize):
+        """Add a texture to the cache, which then owns it.
+
+        If the cache has a texture for `key` already which stimuli are using,
+        that is kept and the new texture is deleted.
+
+        Returns
+        -------
+        CachedTexture
+
+        """
+        existing = self._textures.get(key)
+        if existing is not None:
+            if existing.nUsers > 0:
+                GL.glDeleteTextures(1, id)
+                self._textures.move_to_end(key)
+                return existing
+            self._delete(existing)
+        cached = CachedTexture(key, id, int(nBytes), wasLum, origSize)
+        self._textures[key] = cached
+        self.nBytes += cached.nBytes
+        return cached
+
+    def acquire(self, cached):
+        """Mark a texture as being used by one more stimulus."""
+        cached.nUsers += 1
+        self._textures.move_to_end(cached.key)
+        self._evict()
+
+    def release(self, cached):
+        """Mark a texture as no longer used by a stimulus."""
+        cached.nUsers = max(0, cached.nUsers - 1)
+        self._evict()
+
+    def _delete(self, cached):
+        if self._textures.get(cached.key) is cached:
+            del self._textures[cached.key]
+            self.nBytes -= cached.nBytes
+        GL.glDeleteTextures(1, cached.id)
+
+    def _evict(self):
+        """Delete unused textures, oldest first, until within budget."""
+        if self.nBytes <= self._maxBytes:
+            return
+        for cached in list(self._textures.values()):
+            if cached.nUsers == 0:
+                logging.debug("Texture cache over budget, deleting {}".format(
+                    cached.key[:2]))
+                self._delete(cached)
+                if self.nBytes <= self._maxBytes:
+                    break
+
+    def clear(self, unusedOnly=False):
+        """Delete the cached textures.
+
+        Parameters
+        ----------
+        unusedOnly : bool
+            Only delete textures which no stimulus is using. Otherwise all are
+            deleted, and stimuli using them need their image setting again.
+
+        """
+        for cached in list(self._textures.values()):
+            if not unusedOnly or cached.nUsers == 0:
+                self._delete(cached)
+        if not unusedOnly:
+            self.nHits = self.nMisses = 0
@@ -99,6 +99,9 @@ reportNDroppedFrames = 5  # stop raising warning after this
 
 # import pyglet.gl, pyglet.window, pyglet.image, pyglet.font, pyglet.event
 from . import shaders as _shaders
+from . import profiler as _profiler
+from . import framecapture as _framecapture
+from . import texturecache as _texturecache
 try:
     from pyglet import media
     havePygletMedia = True
@@ -568,6 +571,8 @@ class Window():
         self.frameClock = core.Clock()  # from psycho/core
         self.frames = 0  # frames since last fps calc
         self.movieFrames = []  # list of captured frames (Image objects)
+        # set when captured frames are streamed to a file instead
+        self._movieFrameReader = self._movieFrameWriter = None
 
         self.recordFrameIntervals = False
         # Be able to omit the long timegap that follows each time turn it off
@@ -575,6 +580,10 @@ class Window():
         self.nDroppedFrames = 0
         self.frameIntervals = []
         self._frameTimes = deque(maxlen=1000)  # 1000 keeps overhead low
+        self.__dict__['profileDraws'] = False
+        self._drawProfiler = None  # created when `profileDraws` is enabled
+        # textures loaded from image files, shared between stimuli
+        self.textureCache = _texturecache.TextureCache()
 
         self._toDraw = []
         self._toDrawDepths = []
@@ -779,6 +788,48 @@ class Window():
             self.frameIntervals = []
             self.frameClock.reset()
 
+    @attributeSetter
+    def profileDraws(self, value):
+        """Record the time spent drawing each stimulus.
+
+        When `True`, every call to the `draw()` method of a stimulus using this
+        window is timed (CPU time and, where the driver supports timer queries,
+        GPU time). Data are collected on each :py:attr:`~Window.flip()` and are
+        available through :py:attr:`~Window.drawProfiler`. Like
+        :py:attr:`~Window.recordFrameIntervals` this adds a small overhead, so
+        only enable it while investigating dropped frames.
+
+        Examples
+        --------
+        Find out which stimulus is taking too long to draw::
+
+            win.profileDraws = True
+            # ... run some trials ...
+            win.profileDraws = False
+            for row in win.drawProfiler.getReport():
+                print(row['name'], row['cpuMean'], row['gpuMean'])
+
+        """
+        self.__dict__['profileDraws'] = value
+        if value and self._drawProfiler is None:
+            self._drawProfiler = _profiler.DrawProfiler()
+        if self._drawProfiler is not None:
+            self._drawProfiler.enabled = value
+
+    def setProfileDraws(self, value=True, log=None):
+        """Usually you can use 'win.attribute = value' syntax instead,
+        but use this method if you need to suppress the log message.
+        """
+        setAttribute(self, 'profileDraws', value, log)
+
+    @property
+    def drawProfiler(self):
+        """The :class:`~psychopy.visual.profiler.DrawProfiler` holding the
+        draw times recorded while :py:attr:`~Window.profileDraws` was `True`
+        (`None` if profiling was never enabled).
+        """
+        return self._drawProfiler
+
     def _setCurrent(self):
         """Make this window's OpenGL context current.
 
@@ -1249,6 +1300,10 @@ class Window():
                                         "occurred - I'll stop bothering you "
                                         "about them!")
 
+        # collect the draw times of this frame
+        if self._drawProfiler is not None and self._drawProfiler.enabled:
+            self._drawProfiler._endFrame(now)
+
         # log events
         for logEntry in self._toLog:
             # {'msg':msg, 'level':level, 'obj':copy.copy(obj)}
@@ -2263,6 +2318,11 @@ class Window():
         command is issued. You can issue :py:attr:`~Window.getMovieFrame()` as
         often as you like and then save them all in one go when finished.
 
+        If a stream was opened with :py:attr:`~Window.startMovieFrameStream()`
+        the frame is instead read back asynchronously and written to the
+        stream's file in the background, nothing is kept in memory and `None`
+        is returned.
+
         The back buffer will return the frame that hasn't yet been 'flipped'
         to be visible on screen but has the advantage that the mouse and any
         other overlapping windows won't get in the way.
@@ -2278,19 +2338,101 @@ class Window():
 
         Returns
         -------
-        Image
-            Buffer pixel contents as a PIL/Pillow image object.
+        Image or None
+            Buffer pixel contents as a PIL/Pillow image object, `None` if
+            streaming.
 
         """
+        if self._movieFrameReader is not None:
+            self._setReadBuffer(buffer)
+            self._movieFrameReader.capture()
+            self._restoreReadBuffer(buffer)
+            return None
+
         im = self._getFrame(buffer=buffer)
         self.movieFrames.append(im)
         return im
 
-    def _getFrame(self, rect=None, buffer='front'):
-        """Return the current Window as an image.
+    def startMovieFrameStream(self, fileName, codec='libx264', fps=30,
+                              nBuffers=3, maxQueueSize=30):
+        """Write frames captured by :py:attr:`~Window.getMovieFrame()` straight
+        to a file, without blocking the render loop.
+
+        Until :py:attr:`~Window.stopMovieFrameStream()` (or
+        :py:attr:`~Window.saveMovieFrames()`) is called, each call to
+        :py:attr:`~Window.getMovieFrame()` starts an asynchronous read-back of
+        the window into a ring of pixel buffer objects. Completed frames are
+        encoded by a background thread as they arrive, so recording every frame
+        no longer stalls the frame loop or accumulates images in memory.
+
+        Parameters
+        ----------
+        fileName : str
+            Name of file, including path. Movie files (.mp4, .mov, .mpg, ...)
+            are encoded with ffmpeg, .gif files are written as animated GIFs and
+            any other image type as a numbered series of images, as with
+            :py:attr:`~Window.saveMovieFrames()`.
+        codec : str, optional
+            The codec to be used for movie files. Default is ``libx264``.
+        fps : int, optional
+            The frame rate of the movie. Default is `30`.
+        nBuffers : int, optional
+            Number of pixel buffers used for read-back. A frame is handed to the
+            encoder `nBuffers - 1` captures after it was requested.
+        maxQueueSize : int, optional
+            Maximum number of frames waiting to be encoded. If the encoder can't
+            keep up, :py:attr:`~Window.getMovieFrame()` waits for it rather
+            than using more memory.
+
+        Examples
+        --------
+        Record a stimulus to a movie while it is presented::
+
+            win.startMovieFrameStream('stimulus.mp4', fps=60)
+            for frameN in range(600):
+                grating.phase += 0.01
+                grating.draw()
+                win.flip()
+                win.getMovieFrame()
+            win.stopMovieFrameStream()
+
         """
-        # GL.glLoadIdentity()
-        # do the reading of the pixels
+        if self._movieFrameReader is not None:
+            self.stopMovieFrameStream()
+
+        self._movieFrameWriter = _framecapture.MovieFrameWriter(
+            fileName, self.size, codec=codec, fps=fps,
+            maxQueueSize=maxQueueSize)
+        self._movieFrameWriter.start()
+        self._movieFrameReader = _framecapture.AsyncFrameReader(
+            self.size, self._movieFrameWriter.put, nBuffers=nBuffers)
+        logging.info('Streaming movie frames to %s' % fileName)
+
+    def stopMovieFrameStream(self):
+        """Finish writing the frames captured since
+        :py:attr:`~Window.startMovieFrameStream()` and close the file.
+
+        Blocks until the remaining frames have been encoded.
+
+        Returns
+        -------
+        int
+            Number of frames written.
+
+        """
+        if self._movieFrameReader is None:
+            return 0
+
+        self._movieFrameReader.close()
+        nFrames = self._movieFrameWriter.close()
+        logging.info('Wrote %i frames to %s' % (
+            nFrames, self._movieFrameWriter.fileName))
+        self._movieFrameReader = self._movieFrameWriter = None
+
+        return nFrames
+
+    def _setReadBuffer(self, buffer='front'):
+        """Select the buffer pixels are read from."""
         if buffer == 'back' and self.useFBO:
             GL.glReadBuffer(GL.GL_COLOR_ATTACHMENT0_EXT)
         elif buffer == 'back':
@@ -2303,6 +2445,18 @@ class Window():
             raise ValueError("Requested read from buffer '{}' but should be "
                              "'front' or 'back'".format(buffer))
 
+    def _restoreReadBuffer(self, buffer='front'):
+        """Rebind the framebuffer after reading from `buffer`."""
+        if self.useFBO and buffer == 'front':
+            GL.glBindFramebufferEXT(GL.GL_FRAMEBUFFER_EXT, self.frameBuffer)
+
+    def _getFrame(self, rect=None, buffer='front'):
+        """Return the current Window as an image.
+        """
+        # GL.glLoadIdentity()
+        # do the reading of the pixels
+        self._setReadBuffer(buffer)
+
         if rect:
             x, y = self.size  # of window, not image
             imType = 'RGBA'  # not tested with anything else
@@ -2330,8 +2484,7 @@ class Window():
         im = im.transpose(Image.FLIP_TOP_BOTTOM)
         im = im.convert('RGB')
 
-        if self.useFBO and buffer == 'front':
-            GL.glBindFramebufferEXT(GL.GL_FRAMEBUFFER_EXT, self.frameBuffer)
+        self._restoreReadBuffer(buffer)
         return im
 
     @property
@@ -2372,6 +2525,13 @@ class Window():
             Set this to `False` if you want the frames to be kept for
             additional calls to ``saveMovieFrames``. Default is `True`.
 
+        Notes
+        -----
+        * If frames are being streamed (see
+          :py:attr:`~Window.startMovieFrameStream()`) this finishes the stream
+          instead, the frames having already been written to the file given
+          when it was started.
+
         Examples
         --------
         Writes a series of static frames as frame001.tif, frame002.tif etc.::
@@ -2385,6 +2545,15 @@ class Window():
             myWin.saveMovieFrames('stimuli.gif')
 
         """
+        if self._movieFrameReader is not None:
+            # frames have been written as they were captured
+            streamFile = self._movieFrameWriter.fileName
+            if os.path.abspath(fileName) != os.path.abspath(streamFile):
+                logging.warning('Movie frames were streamed to %s, not '
+                                'writing them to %s' % (streamFile, fileName))
+            self.stopMovieFrameStream()
+            return
+
         fileRoot, fileExt = os.path.splitext(fileName)
         fileExt = fileExt.lower()  # easier than testing both later
         if len(self.movieFrames) == 0:
@@ -2453,6 +2622,34 @@ class Window():
         """
         self._closed = True
 
+        # finish writing any streamed movie frames while we have a context
+        if getattr(self, '_movieFrameReader', None) is not None:
+            try:
+                self.stopMovieFrameStream()
+            except Exception:
+                logging.error('Failed to finish writing movie frames')
+
+        # stop profiling so stimulus classes are restored
+        if getattr(self, '_drawProfiler', None) is not None:
+            self._drawProfiler.enabled = False
+
+        # delete cached image textures while we have a context
+        if getattr(self, 'textureCache', None) is not None:
+            try:
+                self.textureCache.clear()
+            except Exception:
+                logging.error('Failed to delete cached textures')
+
+        # forget the uniform locations of this window's shader programs, as
+        # the handles can be reused by programs of the next window's context
+        programs = [getattr(self, '_progSignedTexFont', None),
+                    getattr(self, '_progFBOtoFrame', None)]
+        for prog in getattr(self, '_shaders', {}).values():
+            programs.extend(prog.values() if isinstance(prog, dict) else [prog])
+        for prog in programs:
+            if prog is not None:
+                _shaders.forgetProgram(prog)
+
         # If iohub is running, inform it to stop using this win id
         # for mouse events
         try:
@@ -3045,6 +3242,8 @@ class Window():
             _shaders.vertSimple, _shaders.fragImageStim)
         self._shaders['imageStim_adding'] = _shaders.compileProgram(
             _shaders.vertSimple, _shaders.fragImageStim_adding)
+        self._shaders['yuv420'] = _shaders.compileProgram(
+            _shaders.vertSimple, _shaders.fragYUV420)
         self._shaders['stim3d_phong'] = {}
 
         # Create shader flags, these are used as keys to pick the appropriate
@@ -3069,20 +3268,8 @@ class Window():
             fragSrc = gltools.embedShaderSourceDefs(
                 _shaders.fragPhongLighting, srcDefs)
 
-            # build a shader program
-            prog = gltools.createProgramObjectARB()
-            vertexShader = gltools.compileShaderObjectARB(
-                vertSrc, GL.GL_VERTEX_SHADER_ARB)
-            fragmentShader = gltools.compileShaderObjectARB(
-                fragSrc, GL.GL_FRAGMENT_SHADER_ARB)
-
-            gltools.attachObjectARB(prog, vertexShader)
-            gltools.attachObjectARB(prog, fragmentShader)
-            gltools.linkProgramObjectARB(prog)
-            gltools.detachObjectARB(prog, vertexShader)
-            gltools.detachObjectARB(prog, fragmentShader)
-            gltools.deleteObjectARB(vertexShader)
-            gltools.deleteObjectARB(fragmentShader)
+            # build a shader program (or load it from the binary cache)
+            prog = _shaders.compileProgram(vertSrc, fragSrc)
 
             # set the flag
             self._shaders['stim3d_phong'][flag] = prog
@@ -9,6 +9,10 @@ Dev status: beta. Can work well in some circumstances, not widely tested.
 
 _BaseVoiceKey is the main abstract class. Subclass and override the detect()
 method. See SimpleThresholdVoiceKey or OnsetVoiceKey for examples.
+
+The voice-keys here record and analyse audio with pyo. Voice-keys which don't
+need pyo, and can be used with psychopy.sound.Microphone and AudioClip, are in
+psychopy.voicekey.streaming.
 """
 
 __version__ = 0.5
@@ -18,8 +22,11 @@ try:
     import pyo64 as pyo
     have_pyo64 = True
 except Exception:
-    import pyo
     have_pyo64 = False
+    try:
+        import pyo
+    except ImportError:
+        pyo = None  # only the streaming voice-keys can be used
 
 # pyo_server will point to a booted pyo server once pyo_init() is called:
 pyo_server = None
@@ -657,6 +664,8 @@ def pyo_init(rate=44100, nchnls=1, buffersize=32, duplex=1):
     """Start and boot a global pyo server, restarting if needed.
     """
     global pyo_server
+    if pyo is None:
+        raise VoiceKeyException('pyo is needed: `pip install pyo`')
     if rate < 16000:
         raise ValueError('sample rate must be 16000 or higher')
 
@@ -0,0 +1,344 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""Voice-keys for streamed audio, without pyo.
+
+The voice-keys in psychopy.voicekey record audio into pyo tables and process
+it a chunk at a time from pyo triggers. The voice-keys here are detectors for
+psychopy.sound.Microphone instead (see Microphone.addDetector), and can also
+be run over AudioClips and sound files. Each block of samples polled is split
+into chunks which are processed together with NumPy: the band-pass filter
+keeps its state between blocks, and the power and zero-crossings of all the
+chunks in a block are computed at once.
+
+Detection over many files can be run in parallel with detect_files().
+"""
+
+# Part of the PsychoPy library
+# Copyright (C) 2002-2018 Jonathan Peirce (C) 2019-2022 Open Science Tools Ltd.
+# Distributed under the terms of the GNU General Public License (GPL).
+
+import functools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import soundfile as sf
+
+import psychopy.logging as logging
+from psychopy.sound.detectors import (AudioEventDetector, BandpassFilter,
+                                      _getRunLengths)
+from . import T_BASELINE_ON, T_BASELINE_OFF, TOO_QUIET, VoiceKeyException
+
+# samples are scaled to the range of 16-bit integers, as in _BaseVoiceKey
+SAMPLE_SCALE = 2 ** 15
+
+
+def _find_run(is_true, run_before, length):
+    """Index in `is_true` where a run of `length` values which are `True`
+    (continuing `run_before` values from before it) is complete, or `None`,
+    and the length of the run at the end of `is_true`."""
+    runs = _getRunLengths(is_true, run_before)
+    found = np.flatnonzero(runs >= length)
+    index = int(found[0]) if len(found) else None
+    return index, int(runs[-1]) if len(runs) else run_before
+
+
+class StreamingVoiceKey(AudioEventDetector):
+    """Base class for voice-keys processing streamed audio, without pyo.
+
+    Features of each chunk are computed as by _BaseVoiceKey._process(), for a
+    whole block of chunks at a time: `power` (RMS), `power_bp` (RMS after
+    band-pass filtering) and `zcross` (zero-crossings per ms of the band-passed
+    signal). Samples are scaled to the range of 16-bit integers, so levels are
+    comparable with those of the pyo voice-keys.
+
+    Subclass and override detect(). Add the voice-key to a microphone with
+    `mic.addDetector(vk)`, or run it over a clip with `vk.process_clip(clip)`.
+
+    :Parameters:
+
+        callback: called as `callback(vk, event_time)` when the voice-key
+            trips, from the thread polling the microphone
+
+        config: kwargs dict of parameters for configuration. defaults are:
+
+            'msPerChunk': 2; duration of each analysis chunk, in ms
+
+            'low': 100, Hz, low end of bandpass; can vary for M/F speakers
+
+            'high': 3000, Hz, high end of bandpass
+
+            'threshold': 10; multiple of the baseline loudness
+
+            'baseline': 0; 0 = auto-detect; give a non-zero value to use that
+
+            'zero_crossings': True
+    """
+
+    def __init__(self, callback=None, **config):
+        self.config = {'msPerChunk': 2,
+                       'low': 100,
+                       'high': 3000,
+                       'threshold': 10,
+                       'baseline': 0,
+                       'zero_crossings': True}
+        self.config.update(config)
+        self.msPerChunk = float(self.config['msPerChunk'])
+        if not 0.65 <= self.msPerChunk <= 32:
+            msg = 'msPerChunk should be 0.65 to 32; suggested = 2'
+            raise ValueError(msg)
+        self._bandpass = None
+        AudioEventDetector.__init__(self, windowSecs=self.msPerChunk / 1000.,
+                                    callback=callback)
+
+    def reset(self):
+        """Clear the features and events, for a new recording.
+        """
+        AudioEventDetector.reset(self)
+        if self._bandpass is not None:
+            self._bandpass.reset()
+        self.start_time = None  # time of the first sample
+        self.count = 0  # chunks processed
+        self._power = []  # feature arrays, one per block
+        self._power_bp = []
+        self._zcross = []
+        self.max_bp = 0
+        self.max_bp_chunk = None
+
+        self.baseline = self.config['baseline']
+        self.bad_baseline = False
+        self._baseline_sumsq = 0.
+        self._baseline_count = 0
+
+        self.event_detected = False
+        self.event_time = 0  # time of the event in the stream's time base
+        self.event_onset = 0  # secs from the start of the recording
+        self.event_offset = 0
+
+    @property
+    def power(self):
+        """RMS of each chunk."""
+        return np.concatenate(self._power) if self._power else np.zeros(0)
+
+    @property
+    def power_bp(self):
+        """RMS of each chunk after band-pass filtering."""
+        return (np.concatenate(self._power_bp) if self._power_bp
+                else np.zeros(0))
+
+    @property
+    def zcross(self):
+        """Zero-crossings per ms of each band-pass filtered chunk."""
+        return np.concatenate(self._zcross) if self._zcross else np.zeros(0)
+
+    @property
+    def sec_per_chunk(self):
+        return self._windowSize / float(self._sampleRateHz)
+
+    def _setSampleRate(self, sampleRateHz):
+        AudioEventDetector._setSampleRate(self, sampleRateHz)
+        self._bandpass = BandpassFilter(
+            self.config['low'], self.config['high'], sampleRateHz)
+
+    def _filter(self, samples):
+        samples = samples * SAMPLE_SCALE
+        return np.column_stack((samples, self._bandpass.filter(samples)))
+
+    def _update_baseline(self, power, chunk_times):
+        """Accumulate the baseline from chunks between T_BASELINE_ON and
+        T_BASELINE_OFF, and set it once the period has been processed."""
+        sec = self.sec_per_chunk
+        in_period = ((chunk_times >= T_BASELINE_ON) &
+                     (chunk_times + sec <= T_BASELINE_OFF))
+        self._baseline_sumsq += float(np.sum(np.square(power[in_period])))
+        self._baseline_count += int(np.count_nonzero(in_period))
+        if chunk_times[-1] + sec <= T_BASELINE_OFF:
+            return
+
+        segment_power = np.sqrt(
+            self._baseline_sumsq / max(self._baseline_count, 1))
+        if segment_power < TOO_QUIET:
+            self.bad_baseline = True
+            logging.warning('Voice-key baseline period is TOO quiet; wrong '
+                            'input channel selected?')
+        self.baseline = max(segment_power, 1)
+
+    def _detect(self, windows, windowTimes):
+        raw, bp = windows[..., 0], windows[..., 1]
+        power = np.sqrt(np.mean(np.square(raw, dtype=np.float64), axis=1))
+        power_bp = np.sqrt(np.mean(np.square(bp, dtype=np.float64), axis=1))
+        self._power.append(power)
+        self._power_bp.append(power_bp)
+        if self.config['zero_crossings']:
+            crossings = np.count_nonzero(bp[:, :-1] * bp[:, 1:] < 0, axis=1)
+            self._zcross.append(crossings / self.msPerChunk)
+
+        peaks = bp.max(axis=1)
+        peak = int(np.argmax(peaks))
+        if peaks[peak] > self.max_bp:
+            self.max_bp = float(peaks[peak])
+            self.max_bp_chunk = self.count + peak
+
+        if self.start_time is None:
+            self.start_time = float(windowTimes[0])
+        chunk_times = (self.count + np.arange(len(power))) * self.sec_per_chunk
+        self.count += len(power)
+
+        # as for _BaseVoiceKey, nothing is detected before the baseline is set
+        if not self.baseline:
+            self._update_baseline(power, chunk_times)
+            if not self.baseline:
+                return []
+            after = chunk_times + self.sec_per_chunk > T_BASELINE_OFF
+            power_bp, windowTimes = power_bp[after], windowTimes[after]
+
+        if self.event_detected or not len(power_bp):
+            return []
+
+        return self.detect(power_bp, windowTimes)
+
+    def detect(self, power_bp, chunk_times):
+        """Override to define a detection algorithm.
+
+        Called with the band-passed power of the chunks in each block of
+        samples processed after the baseline has been set, and the time of
+        the start of each chunk. Returns the times of any events found, calling
+        trip() when the voice-key is to trip.
+        """
+        raise NotImplementedError('override; see StreamingOnsetVoiceKey')
+
+    def trip(self, event_time):
+        """Trip the voice-key at `event_time`; does not stop processing.
+        """
+        self.event_detected = True
+        self.event_time = event_time
+
+    def process_clip(self, clip):
+        """Run the voice-key over a `psychopy.sound.AudioClip`.
+
+        Returns the times of the events found, in seconds from the start of
+        the clip.
+        """
+        self.reset()
+        return self.process(clip.samples, clip.sampleRateHz, 0.)
+
+
+class StreamingOnsetVoiceKey(StreamingVoiceKey):
+    """Speech onset detection, as OnsetVoiceKey.
+
+    Uses the bandpass-filtered signal (100-3000Hz). When the voice key trips,
+    the best voice-onset RT estimate is saved as `self.event_onset`, in sec
+    from the start of the recording.
+    """
+    window = 5  # recent hold duration window, in chunks
+
+    def reset(self):
+        StreamingVoiceKey.reset(self)
+        self._run = 0
+
+    def detect(self, power_bp, chunk_times):
+        """Trip if recent audio power is greater than the baseline.
+        """
+        threshold = self.config['threshold'] * self.baseline
+        index, self._run = _find_run(
+            power_bp > threshold, self._run, self.window)
+        if index is None:
+            return []
+        onset = chunk_times[index] - (self.window - 1) * self.sec_per_chunk
+        self.event_onset = onset - self.start_time
+        self.trip(onset)
+        return [onset]
+
+
+class StreamingOffsetVoiceKey(StreamingVoiceKey):
+    """Detect the onset and offset of a single-word utterance, as
+    OffsetVoiceKey.
+
+    Speech starts as for StreamingOnsetVoiceKey, and ends with the first
+    `offset_window` chunks below the threshold after that. Both times are
+    events; the voice-key trips at the offset, which is saved as
+    `self.event_offset` in sec from the start of the recording.
+    """
+    window = 5  # chunks above the threshold for the onset
+    offset_window = 25  # chunks below the threshold for the offset
+
+    def reset(self):
+        StreamingVoiceKey.reset(self)
+        self._run = 0
+
+    def detect(self, power_bp, chunk_times):
+        """Listen for onset, then offset.
+        """
+        events = []
+        sec = self.sec_per_chunk
+        above = power_bp > self.config['threshold'] * self.baseline
+        if not self.event_onset:
+            index, self._run = _find_run(above, self._run, self.window)
+            if index is None:
+                return events
+            onset = chunk_times[index] - (self.window - 1) * sec
+            self.event_onset = onset - self.start_time
+            events.append(onset)
+            # look for the offset in the chunks after the onset
+            above, chunk_times = above[index + 1:], chunk_times[index + 1:]
+            self._run = 0
+
+        index, self._run = _find_run(~above, self._run, self.offset_window)
+        if index is not None:
+            offset = chunk_times[index] - (self.offset_window - 1) * sec
+            self.event_offset = offset - self.start_time
+            self.trip(offset)
+            events.append(offset)
+
+        return events
+
+
+def detect_file(filename, voicekey=StreamingOffsetVoiceKey, block_sec=0.5,
+                **config):
+    """Run a voice-key over a sound file, reading it a block at a time as if
+    streamed from a microphone.
+
+    Returns a dict with the `filename`, its `duration` and the `onset` and
+    `offset` found in sec (`None` if not found).
+    """
+    vk = voicekey(**config)
+    position = 0
+    with sf.SoundFile(filename) as f:
+        rate = f.samplerate
+        for block in f.blocks(blocksize=max(1, int(block_sec * rate)),
+                              dtype='float32', always_2d=True):
+            vk.process(block, rate, position / float(rate))
+            position += len(block)
+
+    return {'filename': filename,
+            'duration': position / float(rate),
+            'onset': vk.event_onset or None,
+            'offset': vk.event_offset or None}
+
+
+def detect_files(filenames, voicekey=StreamingOffsetVoiceKey, nworkers=None,
+                 **config):
+    """Run a voice-key over many sound files in parallel processes.
+
+    `nworkers` is the number of processes, by default one per processor core;
+    1 runs in this process. Other arguments are as for detect_file(). Returns
+    a list of its results, in the order of `filenames`.
+
+    On Windows and macOS, call this from within an `if __name__ ==
+    "__main__":` block of your script.
+    """
+    filenames = list(filenames)
+    if nworkers is None:
+        nworkers = os.cpu_count() or 1
+    if nworkers < 1:
+        raise VoiceKeyException('nworkers must be 1 or more')
+    nworkers = min(int(nworkers), len(filenames))
+
+    detect = functools.partial(detect_file, voicekey=voicekey, **config)
+    if nworkers <= 1:
+        return [detect(filename) for filename in filenames]
+
+    chunksize = max(1, len(filenames) // (4 * nworkers))
+    with ProcessPoolExecutor(nworkers) as executor:
+        return list(executor.map(detect, filenames, chunksize=chunksize))
@@ -15,7 +15,10 @@ from scipy.signal import butter, lfilter
 try:
     import pyo64 as pyo
 except Exception:
-    import pyo
+    try:
+        import pyo
+    except ImportError:
+        pyo = None  # pyo tables and files are unavailable
 
 
 class PyoFormatException(Exception):